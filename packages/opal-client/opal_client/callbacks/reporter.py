@@ -4,6 +4,7 @@ from typing import Any, Awaitable, Callable, Dict, List, Optional
 import aiohttp
 from opal_client.callbacks.register import CallbackConfig, CallbacksRegister
 from opal_client.data.fetcher import DataFetcher
+from opal_common.fetcher.events import FetchPriority
 from opal_common.fetcher.providers.http_fetch_provider import HttpFetcherConfig
 from opal_common.http_utils import is_http_error_response
 from opal_common.logger import logger
@@ -61,7 +62,10 @@ class CallbacksReporter:
                     urls.append((url, config, None))
 
             logger.info("Reporting the update to requested callbacks", urls=repr(urls))
-            report_results = await self._fetcher.handle_urls(urls)
+            # (reports are least urgent - they never hold back fetching data updates)
+            report_results = await self._fetcher.handle_urls(
+                urls, priority=FetchPriority.LOW
+            )
             # log reports which we failed to send
             for url, config, result in report_results:
                 if isinstance(result, Exception):
@@ -1,11 +1,12 @@
 import asyncio
 import functools
+import json
 import os
 import signal
 import tempfile
 import uuid
 from logging import disable
-from typing import Awaitable, Callable, List, Literal, Optional, Union
+from typing import Any, Awaitable, Callable, Dict, List, Literal, Optional, Union
 
 import aiofiles
 import aiofiles.os
@@ -28,14 +29,24 @@ from opal_client.policy.api import init_policy_router
 from opal_client.policy.updater import PolicyUpdater
 from opal_client.policy_store.api import init_policy_store_router
 from opal_client.policy_store.base_policy_store_client import BasePolicyStoreClient
+from opal_client.policy_store.journal import (
+    DigestingWriter,
+    StoreJournal,
+    file_digest,
+    replay_journal,
+)
 from opal_client.policy_store.policy_store_client_factory import (
     PolicyStoreClientFactory,
 )
+from opal_client.policy_store.snapshot import export_store, read_snapshot
 from opal_common.authentication.deps import JWTAuthenticator
 from opal_common.authentication.verifier import JWTVerifier
 from opal_common.config import opal_common_config
+from opal_common.http_sessions import shared_http_sessions
 from opal_common.logger import configure_logs, logger
 from opal_common.middleware import configure_middleware
+from opal_common.monitoring import metrics
+from opal_common.rpc_connections import shared_rpc_connections
 from opal_common.security.sslcontext import get_custom_ssl_context
 
 
@@ -86,6 +97,12 @@ class OpalClient:
         )
         # set logs
         configure_logs()
+        metrics.configure_metrics(
+            enable_metrics=opal_common_config.ENABLE_METRICS,
+            statsd_host=os.environ.get("DD_AGENT_HOST", "localhost"),
+            statsd_port=8125,
+            namespace="opal-client",
+        )
 
         self.offline_mode_enabled = (
             offline_mode_enabled or opal_client_config.OFFLINE_MODE_ENABLED
@@ -192,6 +209,7 @@ class OpalClient:
             store_backup_interval or opal_client_config.STORE_BACKUP_INTERVAL
         )
         self._backup_loaded = False
+        self.store_journal: Optional[StoreJournal] = None
 
         # init fastapi app
         self.app: FastAPI = self._init_fast_api_app()
@@ -218,12 +236,7 @@ class OpalClient:
                 )
 
             if self.data_updater:
-                rehydration_callbacks.append(
-                    functools.partial(
-                        self.data_updater.get_base_policy_data,
-                        data_fetch_reason="policy store rehydration",
-                    )
-                )
+                rehydration_callbacks.append(self.data_updater.rehydrate_policy_store)
 
             return OpaRunner.setup_opa_runner(
                 options=inline_opa_options,
@@ -336,7 +349,8 @@ class OpalClient:
         @app.on_event("shutdown")
         async def shutdown_event():
             if self.offline_mode_enabled:
-                await self.backup_store()
+                # (a clean restart restores the backup alone, with no journal to replay)
+                await self.backup_store(compact=True)
 
             await self.stop_client_background_tasks()
 
@@ -393,44 +407,194 @@ class OpalClient:
         except Exception:
             logger.exception("exception while shutting down updaters")
 
+        # release pooled connections to the policy store
+        try:
+            await self.policy_store.close()
+        except Exception:
+            logger.exception("exception while closing policy store client")
+
+        # release keep-alive connections to data sources / opal server
+        try:
+            await shared_http_sessions.close_all()
+        except Exception:
+            logger.exception("exception while closing shared http sessions")
+
+        # release long-lived connections to rpc data sources
+        try:
+            await shared_rpc_connections.close_all()
+        except Exception:
+            logger.exception("exception while closing pooled rpc connections")
+
     async def load_store_from_backup(self):
-        """Imports the backup file, if exists, to the policy store."""
+        """Imports the backup file, if exists, to the policy store (and replays
+        the store journal over it)."""
+        if (
+            opal_client_config.STORE_BACKUP_JOURNAL_ENABLED
+            and self.policy_store.supports_journal
+        ):
+            self.store_journal = StoreJournal(self.store_backup_path)
+        snapshot_digest = None
+        journaled_paths = []
+        metadata = {}
         try:
-            if os.path.isfile(self.store_backup_path):
-                async with aiofiles.open(self.store_backup_path, "r") as backup_file:
+            snapshot_digest = await file_digest(self.store_backup_path)
+            if snapshot_digest is not None:
+                async with aiofiles.open(self.store_backup_path, "rb") as backup_file:
                     logger.info("importing policy store from backup file...")
-                    await self.policy_store.full_import(backup_file)
+                    state, metadata = await read_snapshot(backup_file)
+                    if not self._backup_policy_source_matches(metadata):
+                        # (a delta bundle from that version would not apply to our policy)
+                        state = state._replace(policy_version=None)
+                    await self.policy_store.import_state(state)
                     logger.debug("import completed")
                     self._backup_loaded = True
             else:
                 logger.warning("policy store backup file wasn't found")
+            if self.store_journal is not None:
+                logger.info("replaying the policy store journal...")
+                journaled_paths = await replay_journal(
+                    self.policy_store, self.store_journal.records(snapshot_digest)
+                )
+                self._backup_loaded = self._backup_loaded or bool(journaled_paths)
+                if not self._backup_policy_source_matches(metadata):
+                    await self.policy_store.set_policy_version(None)
         except Exception:
             logger.exception("failed to load backup data to policy store")
+            return
+        finally:
+            if self.store_journal is not None:
+                await self.store_journal.open(snapshot_digest)
+                self.policy_store.attach_journal(self.store_journal)
+        if self._backup_loaded and self.data_updater is not None:
+            await self.load_fetch_state_from_backup()
+            # (the fetch state describes the backup, not the writes journaled after it)
+            self.data_updater.forget_written(journaled_paths)
+            # Resume from the data updates in the backup (replayed once connected)
+            if metadata.get("data_updates") and not journaled_paths:
+                try:
+                    self.data_updater.load_update_sequences(metadata["data_updates"])
+                except Exception:
+                    logger.exception("failed to load the data updates of the backup")
+
+    def _backup_policy_source_matches(self, metadata: Dict[str, Any]) -> bool:
+        """Whether the backup was taken with the same policy source (the policy
+        version in it is then a valid base for delta bundles)."""
+        return (
+            self.policy_updater is not None
+            and metadata.get("policy_source") == self.policy_updater.policy_source
+        )
 
-    async def backup_store(self):
-        """Exports the policy store's data to a backup file."""
+    def _backup_metadata(self) -> Dict[str, Any]:
+        metadata = {}
+        if self.policy_updater is not None:
+            metadata["policy_source"] = self.policy_updater.policy_source
+        if self.data_updater is not None:
+            metadata["data_updates"] = self.data_updater.dump_update_sequences()
+        return metadata
+
+    @property
+    def store_fetch_state_path(self) -> str:
+        """What is known about the content of the backup (to fetch it
+        conditionally once restored) is kept next to it."""
+        return f"{os.path.splitext(self.store_backup_path)[0]}.fetch-state.json"
+
+    async def load_fetch_state_from_backup(self):
+        try:
+            if os.path.isfile(self.store_fetch_state_path):
+                async with aiofiles.open(self.store_fetch_state_path, "r") as f:
+                    self.data_updater.load_fetch_state(json.loads(await f.read()))
+        except Exception:
+            # the data is then refetched unconditionally
+            logger.exception("failed to load the fetch state of the backup")
+
+    def _should_compact_store_journal(self) -> bool:
+        if not os.path.isfile(self.store_backup_path):
+            return True
+        return (
+            self.store_journal.size
+            > opal_client_config.STORE_BACKUP_JOURNAL_COMPACTION_RATIO
+            * os.path.getsize(self.store_backup_path)
+        )
+
+    async def backup_store(self, compact: bool = False):
+        """Exports the policy store's data to a backup file.
+
+        With a store journal, the writes since the last backup are
+        already journaled - a new backup is exported (and the journal
+        compacted into it) only once the journal grew large, or if
+        `compact` is set.
+        """
         try:
             async with self._backup_lock:
+                journal = self.store_journal
+                if (
+                    journal is not None
+                    and not compact
+                    and not self._should_compact_store_journal()
+                ):
+                    return
                 await aiofiles.os.makedirs(
                     os.path.dirname(self.store_backup_path), exist_ok=True
                 )
                 tmp_backup_path = ""
+                fetch_state = None
+                state = None
+                if journal is not None:
+                    # (the data is captured as of the rotation - the new snapshot then holds
+                    # exactly the rotated writes, and the journal the ones after it)
+                    data = await journal.rotate(capture=self.policy_store.capture_data)
+                    state = (await self.policy_store.export_state())._replace(data=data)
+                if self.data_updater is not None:
+                    # (taken before the export, so it never claims newer content than exported)
+                    fetch_state = self.data_updater.fetch_state_snapshot()
+                # (the applied policy version and data updates, kept within the backup)
+                metadata = self._backup_metadata()
                 async with aiofiles.tempfile.NamedTemporaryFile(
-                    "w",
+                    "wb",
                     delete=False,
                     dir=os.path.dirname(self.store_backup_path),
-                    suffix=".json.tmp",
+                    suffix=".tmp",
                 ) as backup_file:
                     tmp_backup_path = backup_file.name
+                    # (digested as it's written, for the journal to name the snapshot it follows)
+                    writer = DigestingWriter(backup_file)
                     logger.debug("exporting policy store to backup file...")
-                    await self.policy_store.full_export(backup_file)
+                    await export_store(
+                        self.policy_store,
+                        writer,
+                        opal_client_config.STORE_BACKUP_FORMAT,
+                        metadata,
+                        state,
+                    )
+                    await backup_file.flush()
+                    # (durable before it replaces the previous backup)
+                    await asyncio.get_running_loop().run_in_executor(
+                        None, os.fsync, backup_file.fileno()
+                    )
                     logger.debug("export completed")
-
+                # The previous fetch state must not outlive the backup it describes
+                if os.path.isfile(self.store_fetch_state_path):
+                    await aiofiles.os.remove(self.store_fetch_state_path)
                 # Atomically replace the previous backup (only after the new one is ready)
                 await aiofiles.os.replace(tmp_backup_path, self.store_backup_path)
+                if fetch_state is not None:
+                    await self._backup_fetch_state(fetch_state)
+                if journal is not None:
+                    await journal.compacted(writer.hexdigest())
         except Exception:
             logger.exception("failed to backup policy store")
 
+    async def _backup_fetch_state(self, snapshot):
+        state = json.dumps(self.data_updater.dump_fetch_state(snapshot))
+        async with aiofiles.tempfile.NamedTemporaryFile(
+            "w",
+            delete=False,
+            dir=os.path.dirname(self.store_backup_path),
+            suffix=".json.tmp",
+        ) as state_file:
+            await state_file.write(state)
+        await aiofiles.os.replace(state_file.name, self.store_fetch_state_path)
+
     async def periodically_backup_store(self):
         self._backup_lock = asyncio.Lock()
 
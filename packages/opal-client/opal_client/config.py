@@ -2,7 +2,11 @@ from enum import Enum
 
 from opal_client.engine.options import CedarServerOptions, OpaServerOptions
 from opal_client.policy.options import ConnRetryOptions
-from opal_client.policy_store.schemas import PolicyStoreAuth, PolicyStoreTypes
+from opal_client.policy_store.schemas import (
+    PolicyStoreAuth,
+    PolicyStoreTypes,
+    StoreBackupFormat,
+)
 from opal_common.confi import Confi, confi
 from opal_common.config import opal_common_config
 from opal_common.fetcher.providers.http_fetch_provider import HttpFetcherConfig
@@ -125,6 +129,28 @@ class OpalClientConfig(Confi):
         description="Path to the file containing the CA certificate(s) used for TLS authentication with the policy store",
     )
 
+    POLICY_STORE_CONN_POOL_SIZE = confi.int(
+        "POLICY_STORE_CONN_POOL_SIZE",
+        100,
+        description="Max number of simultaneous keep-alive connections OPAL client holds to the policy store (0 for unlimited)",
+    )
+    POLICY_STORE_CONN_KEEPALIVE_TIMEOUT = confi.float(
+        "POLICY_STORE_CONN_KEEPALIVE_TIMEOUT",
+        15,
+        description="Time in seconds an idle connection to the policy store is kept open for reuse",
+    )
+    POLICY_STORE_RESTORE_CONCURRENCY = confi.int(
+        "POLICY_STORE_RESTORE_CONCURRENCY",
+        16,
+        description="Max number of concurrent writes to the policy store when restoring it from a backup",
+    )
+    POLICY_STORE_UNIX_SOCKET = confi.str(
+        "POLICY_STORE_UNIX_SOCKET",
+        None,
+        description="Path of a unix domain socket to connect to the policy store through (instead of TCP). "
+        "If not set and inline OPA listens on a unix:// address, that socket is used.",
+    )
+
     EXCLUDE_POLICY_STORE_SECRETS = confi.bool(
         "EXCLUDE_POLICY_STORE_SECRETS",
         False,
@@ -300,6 +326,14 @@ class OpalClientConfig(Confi):
         description="Default URL to fetch data configuration from",
     )
 
+    DATA_UPDATES_REPLAY_URL = confi.str(
+        "DATA_UPDATES_REPLAY_URL",
+        confi.delay("{SERVER_URL}/data/updates/replay"),
+        description="URL to replay the data updates missed while disconnected from the server from, instead of "
+        "refetching all data on reconnect (data is refetched if the server can't replay them) - empty to "
+        "always refetch",
+    )
+
     DEFAULT_DATA_URL = confi.str(
         "DEFAULT_DATA_URL",
         "http://localhost:8000/policy-config",
@@ -366,6 +400,22 @@ class OpalClientConfig(Confi):
         60,
         description="Interval in seconds to backup policy store's data",
     )
+    STORE_BACKUP_FORMAT = confi.enum(
+        "STORE_BACKUP_FORMAT",
+        StoreBackupFormat,
+        StoreBackupFormat.SNAPSHOT,
+        description="The format of policy store backups: snapshot (compact and checksummed binary), or json. Backups of either format are restored",
+    )
+    STORE_BACKUP_JOURNAL_ENABLED = confi.bool(
+        "STORE_BACKUP_JOURNAL_ENABLED",
+        True,
+        description="Whether to journal every write to the policy store between backups (so the store is restored as the backup plus the journal), and only export a new backup once the journal grew large",
+    )
+    STORE_BACKUP_JOURNAL_COMPACTION_RATIO = confi.float(
+        "STORE_BACKUP_JOURNAL_COMPACTION_RATIO",
+        0.5,
+        description="Once the store journal grows larger than this ratio of the backup's size, the journal is compacted into a new backup",
+    )
     OFFLINE_MODE_ENABLED = confi.bool(
         "OFFLINE_MODE_ENABLED",
         False,
@@ -374,6 +424,32 @@ class OpalClientConfig(Confi):
     SPLIT_ROOT_DATA = confi.bool(
         "SPLIT_ROOT_DATA", False, description="Split writing data updates to root path"
     )
+    DATA_UPDATE_CONCURRENCY = confi.int(
+        "DATA_UPDATE_CONCURRENCY",
+        6,
+        description="Max number of data entries fetched concurrently (across all data updates). Writes to "
+        "conflicting destination paths are still applied one at a time, in the order the updates arrived. "
+        "Fetches beyond OPAL_FETCHING_WORKER_COUNT wait in the fetching queue (and count towards its timeout)",
+    )
+    DATA_UPDATER_POLLING_JITTER = confi.float(
+        "DATA_UPDATER_POLLING_JITTER",
+        0.1,
+        description="Random jitter (as a fraction of the interval) added to each poll of a data source entry with "
+        "periodic_update_interval, so entries with the same interval do not poll in lockstep",
+    )
+    DATA_UPDATER_POLLING_MAX_BACKOFF = confi.float(
+        "DATA_UPDATER_POLLING_MAX_BACKOFF",
+        600,
+        description="Max time in seconds between polls of a periodic data source entry that keeps failing "
+        "(failing entries are polled with exponential backoff)",
+    )
+    SKIP_UNCHANGED_DATA_WRITES = confi.bool(
+        "SKIP_UNCHANGED_DATA_WRITES",
+        True,
+        description="If set, opal client keeps a digest of the raw content written to each data destination path, "
+        "and skips writing fetched data into the policy store if its content is unchanged (i.e: periodic updates and "
+        "refetches on reconnect). Writes are not skipped when rehydrating a restarted inline policy store",
+    )
 
     def on_load(self):
         # LOGGER
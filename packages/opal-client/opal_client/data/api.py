@@ -22,4 +22,16 @@ def init_data_router(data_updater: Optional[DataUpdater]):
                 detail="Data Updater is currently disabled. Dynamic data updates are not available.",
             )
 
+    @router.get("/data-updater/fetch-queue", status_code=status.HTTP_200_OK)
+    async def get_fetch_queue_stats():
+        """Returns the depth and wait times of each priority lane of the data
+        fetching queue, and the number of active / idle fetching workers."""
+        if data_updater:
+            return data_updater.fetch_queue_stats()
+        else:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Data Updater is currently disabled. Dynamic data updates are not available.",
+            )
+
     return router
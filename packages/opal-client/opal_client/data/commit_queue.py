@@ -0,0 +1,175 @@
+import asyncio
+from typing import Dict, List, Optional
+
+from opal_client.config import opal_client_config
+from opal_client.logger import logger
+from opal_common.schemas.data import DataEntryReport, DataSourceEntry
+from opal_common.synchronization.hierarchical_lock import HierarchicalLock
+from opal_common.synchronization.path_sequencer import PathSequencer
+
+
+def normalize_dst_path(dst_path: Optional[str]) -> str:
+    """Normalizes a destination path to the form used to write into the policy
+    store ("/a/b", root is "")."""
+    path = (dst_path or "").rstrip("/")
+    if path and not path.startswith("/"):
+        path = f"/{path}"
+    return path
+
+
+def is_same_or_descendant(path: str, ancestor: str) -> bool:
+    """Checks whether the (normalized) path is the ancestor path itself or is
+    nested under it."""
+    return ancestor == "" or path == ancestor or path.startswith(f"{ancestor}/")
+
+
+class PendingCommit:
+    """An entry of a data update, from the moment the update arrived and until
+    its data is written into the policy store."""
+
+    def __init__(self, entry: DataSourceEntry, ticket: PathSequencer.Ticket):
+        self.entry = entry
+        self.ticket = ticket
+        # the normalized destination path
+        self.path = ticket.path
+        # set once the entry started writing into the policy store (cannot be coalesced anymore)
+        self.committing = False
+        # a later pending commit that makes writing this entry redundant
+        self.superseded_by: Optional["PendingCommit"] = None
+        # JSON patch operations of later PATCH entries, applied as part of this entry's write
+        self.merged_patches: List = []
+        self._report: asyncio.Future = asyncio.get_running_loop().create_future()
+
+    @property
+    def is_superseded(self) -> bool:
+        return self.superseded_by is not None
+
+    def with_merged_patches(self, data):
+        if not self.merged_patches:
+            return data
+        return [*data, *self.merged_patches]
+
+    def set_report(self, report: DataEntryReport):
+        if not self._report.done():
+            self._report.set_result(report)
+
+    async def report(self) -> DataEntryReport:
+        """The report of the entry.
+
+        If the entry was coalesced into a later write, reports the
+        outcome of that write.
+        """
+        if self.superseded_by is not None and not self._report.done():
+            superseding = await self.superseded_by.report()
+            return DataEntryReport(
+                entry=self.entry,
+                fetched=superseding.fetched,
+                saved=superseding.saved,
+                hash=superseding.hash,
+            )
+        return await asyncio.shield(self._report)
+
+
+class DataCommitQueue:
+    """Tracks the entries of data updates that are queued or in flight, and
+    orders their writes into the policy store.
+
+    - Writes to the same path (or an ancestor / descendant path) are applied
+      in the order the updates arrived in (@see PathSequencer).
+    - A PUT entry supersedes pending entries of the same path or of paths nested
+      under it (these are not written at all, as the PUT overwrites them anyway).
+    - A PATCH entry with inline data is merged into a pending PATCH entry (with
+      inline data) of the same path, so both are written as a single JSON patch.
+    """
+
+    def __init__(self, split_root_data: Optional[bool] = None):
+        self._split_root_data = (
+            split_root_data
+            if split_root_data is not None
+            else opal_client_config.SPLIT_ROOT_DATA
+        )
+        self._sequencer = PathSequencer()
+        # pending commits by their sequence number (in arrival order)
+        self._pending: Dict[int, PendingCommit] = {}
+
+    def enqueue(self, entry: DataSourceEntry) -> PendingCommit:
+        """Reserves the place of the entry in the commit order of its path,
+        coalescing it with pending commits where possible."""
+        path = normalize_dst_path(entry.dst_path)
+        commit = PendingCommit(entry, self._sequencer.take(path))
+        self._pending[commit.ticket.seq] = commit
+        if entry.save_method == "PUT":
+            self._supersede_pending(commit)
+        elif entry.save_method == "PATCH" and entry.data is not None:
+            self._merge_patch(commit)
+        return commit
+
+    def _conflicting_pending(self, commit: PendingCommit):
+        """Yields pending commits that arrived before the given commit and
+        conflict with it, latest first."""
+        for seq in reversed(list(self._pending)):
+            other = self._pending[seq]
+            if other.ticket.seq >= commit.ticket.seq or other.is_superseded:
+                continue
+            if HierarchicalLock._is_conflicting(commit.path, other.path):
+                yield other
+
+    def _supersede_pending(self, commit: PendingCommit):
+        if self._split_root_data and commit.path == "":
+            # root data is split into top-level keys, which does not overwrite other keys
+            return
+        for other in self._conflicting_pending(commit):
+            # earlier writes to ancestor paths must be applied before writes nested under them
+            if other.committing or not is_same_or_descendant(other.path, commit.path):
+                break
+            logger.debug(
+                "Coalescing pending data update entry for '{path}' into a newer write to '{dst}'",
+                path=other.path,
+                dst=commit.path,
+            )
+            other.superseded_by = commit
+            self.done(other)
+
+    def _merge_patch(self, commit: PendingCommit):
+        for other in self._conflicting_pending(commit):
+            # only the latest conflicting commit can take the patch without reordering writes
+            # (and only if it has nothing to fetch - a failed fetch would drop the patch)
+            if (
+                not other.committing
+                and other.entry.save_method == "PATCH"
+                and other.entry.data is not None
+                and other.path == commit.path
+            ):
+                logger.debug(
+                    "Merging pending data update patch for '{path}'", path=commit.path
+                )
+                other.merged_patches.extend(
+                    [*commit.entry.data, *commit.merged_patches]
+                )
+                commit.superseded_by = other
+                self.done(commit)
+            break
+
+    async def wait_turn(self, commit: PendingCommit):
+        """Waits until all earlier conflicting commits are done."""
+        await self._sequencer.wait_turn(commit.ticket)
+
+    def begin(self, commit: PendingCommit) -> bool:
+        """Marks the commit as writing into the store (after which it will not
+        be coalesced), returns False if it was superseded."""
+        if commit.is_superseded:
+            return False
+        commit.committing = True
+        return True
+
+    def done(self, commit: Optional[PendingCommit]):
+        """Marks the commit as done (written, failed, superseded or
+        skipped)."""
+        if commit is None:
+            return
+        self._pending.pop(commit.ticket.seq, None)
+        self._sequencer.done(commit.ticket)
+
+    @property
+    def pending_count(self) -> int:
+        return len(self._pending)
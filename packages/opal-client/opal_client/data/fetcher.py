@@ -1,11 +1,11 @@
 import asyncio
-from typing import Any, List, Optional, Tuple
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
 
 from opal_client.config import opal_client_config
 from opal_client.policy_store.base_policy_store_client import JsonableValue
 from opal_common.config import opal_common_config
 from opal_common.fetcher import FetchingEngine
-from opal_common.fetcher.events import FetcherConfig
+from opal_common.fetcher.events import FetcherConfig, FetchPriority
 from opal_common.fetcher.providers.http_fetch_provider import HttpFetcherConfig
 from opal_common.logger import logger
 from opal_common.utils import get_authorization_header, tuple_to_dict
@@ -34,6 +34,15 @@ class DataFetcher:
             callback_timeout=opal_common_config.FETCHING_CALLBACK_TIMEOUT,
             enqueue_timeout=opal_common_config.FETCHING_ENQUEUE_TIMEOUT,
             retry_config=retry_config,
+            lane_size=opal_common_config.FETCHING_QUEUE_SIZE,
+            reserved_worker_count=opal_common_config.FETCHING_RESERVED_WORKER_COUNT,
+            memo_ttl=opal_common_config.FETCHING_MEMO_TTL,
+            memo_max_entries=opal_common_config.FETCHING_MEMO_MAX_ENTRIES,
+            memo_max_bytes=opal_common_config.FETCHING_MEMO_MAX_BYTES,
+            max_worker_count=opal_common_config.FETCHING_MAX_WORKER_COUNT,
+            worker_idle_timeout=opal_common_config.FETCHING_WORKER_IDLE_TIMEOUT,
+            source_max_concurrency=opal_common_config.FETCHING_SOURCE_MAX_CONCURRENCY,
+            stream_timeout=opal_common_config.FETCHING_STREAM_TIMEOUT,
         )
         self._data_url = default_data_url
         self._token = token
@@ -57,29 +66,85 @@ class DataFetcher:
         """Release internal tasks and resources."""
         await self._engine.terminate_workers()
 
+    def queue_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Statistics of each priority lane of the fetching queue."""
+        return self._engine.queue_stats()
+
+    def worker_stats(self) -> Dict[str, Any]:
+        """Statistics of the fetching workers pool."""
+        return self._engine.worker_stats()
+
     async def handle_url(
-        self, url: str, config: dict, data: Optional[JsonableValue]
+        self,
+        url: str,
+        config: dict,
+        data: Optional[JsonableValue],
+        priority: FetchPriority = FetchPriority.NORMAL,
     ) -> Optional[JsonableValue]:
         """Helper function wrapping self._engine.handle_url."""
+        result, _ = await self.handle_url_with_digest(url, config, data, priority)
+        return result
+
+    async def handle_url_with_digest(
+        self,
+        url: str,
+        config: dict,
+        data: Optional[JsonableValue],
+        priority: FetchPriority = FetchPriority.NORMAL,
+        known_digest: Optional[str] = None,
+    ) -> Tuple[Optional[JsonableValue], Optional[str]]:
+        """Same as self.handle_url, but also returns the digest of the raw
+        fetched content (None for inline data, or if the fetcher did not
+        compute one).
+
+        If the digest of the content the caller already holds is given,
+        the result may be NOT_MODIFIED (with the known digest) if the
+        fetcher can tell the content did not change since.
+        """
         if data is not None:
             logger.info("Data provided inline for url: {url}", url=url)
-            return data
+            return data, None
 
         if url is None:
             logger.error("Invalid data update: no embedded data or URL")
-            return None
+            return None, None
 
         logger.info("Fetching data from url: {url}", url=url)
         try:
             # ask the engine to get our data
-            response = await self._engine.handle_url(url, config=config)
-            return response
+            return await self._engine.handle_url_with_digest(
+                url, config=config, priority=priority, known_digest=known_digest
+            )
         except asyncio.TimeoutError as e:
             logger.exception("Timeout while fetching url: {url}", url=url)
             raise
 
+    async def stream_url(
+        self,
+        url: str,
+        config: dict,
+        consumer: Callable[[AsyncIterator[bytes]], Awaitable[Any]],
+        priority: FetchPriority = FetchPriority.NORMAL,
+    ) -> Tuple[Any, Optional[str]]:
+        """Helper function wrapping self._engine.stream_url - hands the raw
+        content of the url to the consumer, as it is fetched.
+
+        Returns the value returned by the consumer, and the digest of
+        the fetched content.
+        """
+        logger.info("Streaming data from url: {url}", url=url)
+        try:
+            return await self._engine.stream_url(
+                url, consumer, config=config, priority=priority
+            )
+        except asyncio.TimeoutError as e:
+            logger.exception("Timeout while streaming url: {url}", url=url)
+            raise
+
     async def handle_urls(
-        self, urls: List[Tuple[str, FetcherConfig, Optional[JsonableValue]]] = None
+        self,
+        urls: List[Tuple[str, FetcherConfig, Optional[JsonableValue]]] = None,
+        priority: FetchPriority = FetchPriority.NORMAL,
     ) -> List[Tuple[str, FetcherConfig, Any]]:
         """Fetch data for each given url with the (optional) fetching
         configuration; return the resulting data mapped to each URL.
@@ -87,6 +152,7 @@ class DataFetcher:
         Args:
             urls (List[Tuple[str, FetcherConfig]], optional): Urls (and fetching configuration) to fetch from.
             Defaults to None - init data_url with HttpFetcherConfig (loaded with the provided auth token).
+            priority (FetchPriority, optional): the fetching queue lane to queue the fetches in. Defaults to NORMAL.
 
         Returns:
             List[Tuple[str,FetcherConfig, Any]]: urls mapped to their resulting fetched data
@@ -99,7 +165,7 @@ class DataFetcher:
             urls = [(self._data_url, self._default_fetcher_config, None)]
         # create a task for each url
         for url, config, data in urls:
-            tasks.append(self.handle_url(url, config, data))
+            tasks.append(self.handle_url(url, config, data, priority))
         # wait for all data fetches to complete
         results = await asyncio.gather(*tasks, return_exceptions=True)
 
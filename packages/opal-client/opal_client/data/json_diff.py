@@ -0,0 +1,90 @@
+from typing import Any, List, Optional
+
+from opal_common import json_codec
+from opal_common.schemas.store import JSONPatchAction
+
+# approximate serialized size of an operation, without its path and value
+_OP_SIZE = len('{"op": "replace", "path": "", "value": }, ')
+
+
+class _PatchTooLarge(Exception):
+    pass
+
+
+def _escape(key: str) -> str:
+    # JSON pointer escaping (RFC 6901)
+    return str(key).replace("~", "~0").replace("/", "~1")
+
+
+def _contains_none(value: Any) -> bool:
+    if value is None:
+        return True
+    if isinstance(value, dict):
+        return any(_contains_none(v) for v in value.values())
+    if isinstance(value, list):
+        return any(_contains_none(v) for v in value)
+    return False
+
+
+class _Differ:
+    def __init__(self, max_size: float):
+        self.ops: List[JSONPatchAction] = []
+        self._max_size = max_size
+        self._size = 0
+
+    def _emit(self, op: str, path: str, value: Any = None):
+        if op != "remove" and _contains_none(value):
+            # null values are dropped when patches are serialized (the write would lose them)
+            raise _PatchTooLarge()
+        self._size += _OP_SIZE + len(path)
+        if op != "remove":
+            self._size += len(json_codec.dumps(value))
+        if self._size > self._max_size:
+            raise _PatchTooLarge()
+        self.ops.append(JSONPatchAction(op=op, path=path, value=value))
+
+    def diff(self, old: Any, new: Any, path: str):
+        if type(old) is not type(new):
+            self._emit("replace", path, new)
+        elif isinstance(new, dict):
+            for key in old:
+                if key not in new:
+                    self._emit("remove", f"{path}/{_escape(key)}")
+            for key, value in new.items():
+                if key not in old:
+                    self._emit("add", f"{path}/{_escape(key)}", value)
+                else:
+                    self.diff(old[key], value, f"{path}/{_escape(key)}")
+        elif isinstance(new, list) and len(old) == len(new):
+            for i, (old_item, new_item) in enumerate(zip(old, new)):
+                self.diff(old_item, new_item, f"{path}/{i}")
+        elif old != new:
+            self._emit("replace", path, new)
+
+
+def make_json_patch(
+    old: Any, new: Any, max_ratio: float, new_size: Optional[int] = None
+) -> Optional[List[JSONPatchAction]]:
+    """Computes an RFC 6902 patch (using add, remove and replace operations
+    only) that turns the old document into the new one.
+
+    Returns None if the patch is not worth it - its (approximate) serialized
+    size is more than max_ratio of the new document's size, or it cannot be
+    written faithfully as a patch. An empty list means the documents are
+    equal.
+
+    new_size is the serialized size of the new document (if already known).
+    """
+    if type(old) is not type(new) or not isinstance(new, (dict, list)):
+        return None
+    if new_size is None:
+        new_size = len(json_codec.dumps(new))
+    differ = _Differ(max_size=max_ratio * new_size)
+    try:
+        differ.diff(old, new, "")
+    except _PatchTooLarge:
+        return None
+    if any(op.path == "" for op in differ.ops):
+        # replaces the whole document (i.e: lists of different lengths)
+        return None
+    return differ.ops
@@ -0,0 +1,141 @@
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+from opal_client.data.commit_queue import is_same_or_descendant
+
+
+class FetchedContent(NamedTuple):
+    """The content last fetched into a path: the digest of the raw content (as
+    computed by the fetcher), and the hash it was reported with."""
+
+    digest: str
+    report_hash: str
+
+
+class EntryCursor(NamedTuple):
+    """The cursor of the data last fetched into a path as incremental changes
+    (only valid for the same data source - by its key)."""
+
+    source: str
+    cursor: str
+
+
+def _overlap(path: str, other: str) -> bool:
+    return is_same_or_descendant(other, path) or is_same_or_descendant(path, other)
+
+
+class LastWrittenData:
+    """Remembers what was last written to each (normalized) destination path
+    of the policy store: the digest of the raw content it was fetched as,
+    (for entries that are written as diffs) the written document itself, and
+    (for entries fetched as incremental changes) the cursor of the data.
+
+    What is remembered about a path is only valid as long as nothing else was
+    written to the path, its ancestors or its descendants - recording or
+    forgetting a path drops everything remembered about overlapping paths.
+
+    The digests and cursors can be dumped alongside a backup of the policy
+    store (@see snapshot), and loaded once the backup is restored.
+    """
+
+    def __init__(self):
+        self._digests: Dict[str, str] = {}
+        self._fetched: Dict[str, FetchedContent] = {}
+        self._documents: Dict[str, Any] = {}
+        self._cursors: Dict[str, EntryCursor] = {}
+        # incremented on every change, and the last change of each path
+        self._generation = 0
+        self._changed_at: Dict[str, int] = {}
+
+    def get_digest(self, path: str) -> Optional[str]:
+        return self._digests.get(path)
+
+    def get_fetched(self, path: str) -> Optional[FetchedContent]:
+        return self._fetched.get(path)
+
+    def get_document(self, path: str) -> Optional[Any]:
+        return self._documents.get(path)
+
+    def get_cursor(self, path: str, source: str) -> Optional[str]:
+        """The cursor of the data at the path, if fetched from the source."""
+        cursor = self._cursors.get(path)
+        return cursor.cursor if cursor is not None and cursor.source == source else None
+
+    def record(
+        self,
+        path: str,
+        digest: Optional[str] = None,
+        document: Optional[Any] = None,
+        fetched: Optional[FetchedContent] = None,
+        cursor: Optional[EntryCursor] = None,
+    ):
+        """Records what was just written to the path (unknown digest, document
+        or cursor are not remembered)."""
+        self.forget(path)
+        if digest is not None:
+            self._digests[path] = digest
+            if fetched is not None:
+                self._fetched[path] = fetched
+        if document is not None:
+            self._documents[path] = document
+        if cursor is not None:
+            self._cursors[path] = cursor
+
+    def forget(self, path: str):
+        """Forgets the path and any path overlapping it (call before writing to
+        the path, as its state is unknown until the write is recorded)."""
+        for memo in (self._digests, self._fetched, self._documents, self._cursors):
+            for other in list(memo):
+                if _overlap(path, other):
+                    del memo[other]
+        self._generation += 1
+        self._changed_at[path] = self._generation
+
+    def clear(self):
+        self._digests.clear()
+        self._fetched.clear()
+        self._documents.clear()
+        self._cursors.clear()
+        self._generation += 1
+        self._changed_at = {"": self._generation}
+
+    def snapshot(self) -> Tuple[int, Dict[str, Dict[str, List[str]]]]:
+        """What is remembered about the fetched content (and cursor) of each
+        path, as of now (take before exporting the policy store, @see
+        valid_since)."""
+        return self._generation, {
+            "fetched": {
+                path: [digest, *self._fetched[path]]
+                for path, digest in self._digests.items()
+                if path in self._fetched
+            },
+            "cursors": {path: list(cursor) for path, cursor in self._cursors.items()},
+        }
+
+    def valid_since(
+        self, snapshot: Tuple[int, Dict[str, Dict[str, List[str]]]]
+    ) -> Dict[str, Dict[str, List[str]]]:
+        """The paths of the snapshot that did not change since it was taken (so
+        their content in an export that started after the snapshot is what the
+        snapshot remembers)."""
+        generation, dumped = snapshot
+        changed = [p for p, at in self._changed_at.items() if at > generation]
+        return {
+            kind: {
+                path: remembered
+                for path, remembered in paths.items()
+                if not any(_overlap(path, other) for other in changed)
+            }
+            for kind, paths in dumped.items()
+        }
+
+    def load(self, dumped: Dict[str, Dict[str, List[str]]]):
+        """Loads remembered paths (i.e: once the export they were dumped with
+        is restored)."""
+        for path, (digest, fetched_digest, report_hash) in dumped.get(
+            "fetched", {}
+        ).items():
+            self.record(
+                path, digest, fetched=FetchedContent(fetched_digest, report_hash)
+            )
+        for path, (source, cursor) in dumped.get("cursors", {}).items():
+            self.record(path, cursor=EntryCursor(source, cursor))
@@ -0,0 +1,102 @@
+from typing import Any, Dict, List, Optional
+
+from opal_common.schemas.data import DataProjection
+
+WILDCARD = "*"
+
+
+class ProjectionError(Exception):
+    pass
+
+
+class _Missing:
+    pass
+
+
+_MISSING = _Missing()
+
+
+def _split(path: Optional[str]) -> List[str]:
+    return path.split(".") if path else []
+
+
+def _get(value: Any, segments: List[str]) -> Any:
+    for segment in segments:
+        if isinstance(value, dict) and segment in value:
+            value = value[segment]
+        elif (
+            isinstance(value, list) and segment.isdigit() and int(segment) < len(value)
+        ):
+            value = value[int(segment)]
+        else:
+            return _MISSING
+    return value
+
+
+def _select(value: Any, segments: List[str]) -> Any:
+    for i, segment in enumerate(segments):
+        if segment == WILDCARD:
+            # (items missing the rest of the path are left out)
+            rest = segments[i + 1 :]
+            if isinstance(value, list):
+                selected = (_select(item, rest) for item in value)
+                return [item for item in selected if item is not _MISSING]
+            if isinstance(value, dict):
+                selected = ((key, _select(item, rest)) for key, item in value.items())
+                return {key: item for key, item in selected if item is not _MISSING}
+            return _MISSING
+        value = _get(value, [segment])
+        if value is _MISSING:
+            return _MISSING
+    return value
+
+
+def _pick(item: Any, fields: List[List[str]]) -> Any:
+    """The fields of the item (nested fields keep their parents)."""
+    if not isinstance(item, dict):
+        return item
+    picked: Dict[str, Any] = {}
+    for field in fields:
+        value = _get(item, field)
+        if value is _MISSING:
+            continue
+        parent = picked
+        for segment in field[:-1]:
+            parent = parent.setdefault(segment, {})
+        parent[field[-1]] = value
+    return picked
+
+
+def _key_by(items: Any, key_field: List[str]) -> Dict[str, Any]:
+    if not isinstance(items, list):
+        raise ProjectionError("only a list can be keyed")
+    keyed = {}
+    for item in items:
+        key = _get(item, key_field)
+        if key is _MISSING or key is None:
+            raise ProjectionError(f"an item has no '{'.'.join(key_field)}' field")
+        keyed[str(key)] = item
+    return keyed
+
+
+def project_data(data: Any, projection: DataProjection) -> Any:
+    """The projected part of the data (@see DataProjection) - built anew, the
+    data itself (which may be shared with other fetches) is not modified."""
+    segments = _split(projection.select)
+    selected = _select(data, segments)
+    if selected is _MISSING:
+        raise ProjectionError(f"'{projection.select}' selects nothing")
+    # whether the fields apply to each value of the selection (or to the selection itself)
+    each_value = bool(segments) and segments[-1] == WILDCARD
+    if projection.key_by:
+        selected = _key_by(selected, _split(projection.key_by))
+        each_value = True
+    if projection.fields:
+        fields = [_split(field) for field in projection.fields]
+        if isinstance(selected, list):
+            selected = [_pick(item, fields) for item in selected]
+        elif isinstance(selected, dict) and each_value:
+            selected = {key: _pick(item, fields) for key, item in selected.items()}
+        else:
+            selected = _pick(selected, fields)
+    return selected
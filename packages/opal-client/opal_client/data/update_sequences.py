@@ -0,0 +1,79 @@
+from typing import Dict, List, Optional, Set
+
+from opal_common.schemas.data import DataUpdateLogPosition, DataUpdateReplayRequest
+
+
+class UpdateSequences:
+    """Tracks which of the updates published on the data topics were seen, by
+    their sequence numbers in the server's log of data updates.
+
+    Updates may arrive out of order (i.e: published by different server
+    workers), so each topic tracks the last sequence up to which all
+    updates were seen, and the sequences seen after it. A reconnecting
+    client replays the updates after the former, skipping the latter.
+    """
+
+    def __init__(self, topics: List[str]):
+        self._topics = set(topics)
+        self.reset()
+
+    def reset(self):
+        """Forgets the seen updates (there is no resuming but with a full
+        refetch)."""
+        self._log_id: Optional[str] = None
+        self._last: Dict[str, int] = {}
+        self._seen_after: Dict[str, Set[int]] = {}
+
+    def start(self, log_id: str, heads: Dict[str, int]):
+        """Starts tracking from the log heads (taken before a full refetch)."""
+        self._log_id = log_id
+        self._last = {topic: heads.get(topic, 0) for topic in self._topics}
+        self._seen_after = {topic: set() for topic in self._topics}
+
+    @property
+    def resumable(self) -> bool:
+        return self._log_id is not None
+
+    def _our_sequences(self, position: DataUpdateLogPosition) -> Dict[str, int]:
+        return {
+            topic: seq
+            for topic, seq in position.sequences.items()
+            if topic in self._topics
+        }
+
+    def is_new(self, position: Optional[DataUpdateLogPosition]) -> bool:
+        """Whether the update was not seen yet."""
+        if position is None or position.log_id != self._log_id:
+            return True
+        return any(
+            seq > self._last[topic] and seq not in self._seen_after[topic]
+            for topic, seq in self._our_sequences(position).items()
+        )
+
+    def record(self, position: Optional[DataUpdateLogPosition]):
+        """Records a seen update.
+
+        An update that is not in the tracked log (i.e: published by
+        another server, or without a log) can't be replayed - tracking
+        stops until the next full refetch.
+        """
+        if not self.resumable:
+            return
+        if position is None or position.log_id != self._log_id:
+            self.reset()
+            return
+        for topic, seq in self._our_sequences(position).items():
+            if seq <= self._last[topic]:
+                continue
+            seen = self._seen_after[topic]
+            seen.add(seq)
+            while self._last[topic] + 1 in seen:
+                self._last[topic] += 1
+                seen.remove(self._last[topic])
+
+    def replay_request(self) -> DataUpdateReplayRequest:
+        return DataUpdateReplayRequest(
+            topics=sorted(self._topics),
+            log_id=self._log_id,
+            sequences=dict(self._last),
+        )
@@ -3,18 +3,27 @@ import hashlib
 import json
 import uuid
 from functools import partial
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple, Union
 
 import aiohttp
-from aiohttp.client import ClientError, ClientSession
+from aiohttp.client import ClientError
 from fastapi_websocket_pubsub import PubSubClient
 from fastapi_websocket_pubsub.pub_sub_client import PubSubOnConnectCallback
 from fastapi_websocket_rpc.rpc_channel import OnDisconnectCallback, RpcChannel
 from opal_client.callbacks.register import CallbacksRegister
 from opal_client.callbacks.reporter import CallbacksReporter
 from opal_client.config import opal_client_config
+from opal_client.data.commit_queue import (
+    DataCommitQueue,
+    PendingCommit,
+    normalize_dst_path,
+)
 from opal_client.data.fetcher import DataFetcher
+from opal_client.data.json_diff import make_json_patch
+from opal_client.data.last_written import EntryCursor, FetchedContent, LastWrittenData
+from opal_client.data.projection import project_data
 from opal_client.data.rpc import TenantAwareRpcEventClientMethods
+from opal_client.data.update_sequences import UpdateSequences
 from opal_client.logger import logger
 from opal_client.policy_store.base_policy_store_client import (
     BasePolicyStoreClient,
@@ -24,14 +33,20 @@ from opal_client.policy_store.base_policy_store_client import (
 from opal_client.policy_store.policy_store_client_factory import (
     DEFAULT_POLICY_STORE_GETTER,
 )
-from opal_common.async_utils import TasksPool, repeated_call
+from opal_client.utils import EncodedPolicyData, policy_data_value
+from opal_common.async_utils import PeriodicScheduler, TasksPool
 from opal_common.config import opal_common_config
+from opal_common.fetcher.events import NOT_MODIFIED, FetchedDelta, FetchPriority
+from opal_common.fetcher.providers.http_validators import http_validators
+from opal_common.http_sessions import shared_http_sessions
 from opal_common.http_utils import is_http_error_response
 from opal_common.schemas.data import (
     DataEntryReport,
     DataSourceConfig,
     DataSourceEntry,
     DataUpdate,
+    DataUpdateReplay,
+    DataUpdateReplayRequest,
     DataUpdateReport,
 )
 from opal_common.schemas.store import TransactionType
@@ -114,6 +129,13 @@ class DataUpdater:
 
         # Should the client fetch data when it first connects (or reconnects)
         self._fetch_on_connect = fetch_on_connect
+        # The published updates seen so far (to replay only missed updates on reconnect)
+        self._update_sequences = UpdateSequences(self._data_topics)
+        # The published updates written to the policy store (persisted with its backups)
+        self._applied_sequences = UpdateSequences(self._data_topics)
+        self._replay_url = opal_client_config.DATA_UPDATES_REPLAY_URL
+        # Published (and replayed) updates are triggered one at a time, in order
+        self._published_updates_lock = asyncio.Lock()
         # Policy store client
         self._policy_store = policy_store or DEFAULT_POLICY_STORE_GETTER()
 
@@ -158,9 +180,22 @@ class DataUpdater:
 
         # Lock to prevent multiple concurrent writes to the same path
         self._dst_lock = HierarchicalLock()
+        # Orders (and coalesces) writes to the same path by update arrival (fetches may complete out of order)
+        self._commit_queue = DataCommitQueue()
+        # What was last written to each path (to skip rewriting unchanged data, or write it as a diff)
+        self._last_written = LastWrittenData()
+
+        # Limits the number of entries fetched concurrently
+        self._fetch_semaphore = asyncio.Semaphore(
+            max(1, opal_client_config.DATA_UPDATE_CONCURRENCY)
+        )
 
-        # References to repeated polling tasks (periodic data fetch)
-        self._polling_update_tasks = []
+        # Polls the entries with periodic_update_interval (keyed by entry)
+        self._polling_scheduler = PeriodicScheduler(
+            jitter=opal_client_config.DATA_UPDATER_POLLING_JITTER,
+            max_backoff=opal_client_config.DATA_UPDATER_POLLING_MAX_BACKOFF,
+            logger=logger,
+        )
 
         # Optional user-defined hooks for connection lifecycle
         self._on_connect_callbacks = on_connect or []
@@ -188,17 +223,50 @@ class DataUpdater:
 
         logger.info("Updating policy data, reason: {reason}", reason=reason)
         update = DataUpdate.parse_obj(data)
-        await self.trigger_data_update(update)
-
-    async def trigger_data_update(self, update: DataUpdate):
+        async with self._published_updates_lock:
+            await self._trigger_published_update(update)
+
+    async def _trigger_published_update(self, update: DataUpdate):
+        if not self._update_sequences.is_new(update.log_position):
+            # (i.e: replayed on reconnect as well)
+            logger.info("Skipping already seen data update: {id}", id=update.id)
+            return
+        self._update_sequences.record(update.log_position)
+        if not self._update_sequences.resumable:
+            self._applied_sequences.reset()
+        # published updates are time sensitive - never queue them behind bulk fetches
+        task = await self.trigger_data_update(update, priority=FetchPriority.HIGH)
+        task.add_done_callback(partial(self._on_published_update_done, update))
+
+    def _on_published_update_done(self, update: DataUpdate, task: asyncio.Task):
+        if not task.cancelled() and task.exception() is None:
+            self._applied_sequences.record(update.log_position)
+
+    async def trigger_data_update(
+        self, update: DataUpdate, priority: FetchPriority = FetchPriority.NORMAL
+    ) -> asyncio.Task:
         """Queues up a data update to run in the background. If no update ID is
         provided, generate one for tracking/logging.
 
         Note:
             We spin off the data update in the background so that multiple updates
-            can run concurrently. Internally, the `_update_policy_data` method uses
-            a hierarchical lock to avoid race conditions when multiple updates try
-            to write to the same destination path.
+            can run concurrently. The place of each entry in the commit order of its
+            destination path is reserved here (i.e: by arrival order), so fetches may
+            complete in any order while writes to the same path are applied in order.
+            Entries that are made redundant by this update's entries (i.e: an older PUT
+            to the same path that was not written yet) are coalesced here as well.
+            Internally, the `_update_policy_data` method uses a hierarchical lock to
+            avoid race conditions when multiple updates try to write to the same
+            destination path.
+
+        Args:
+            update (DataUpdate): The data update instructions.
+            priority (FetchPriority, optional): the fetching queue lane the update's
+                fetches are queued in. Defaults to NORMAL.
+
+        Returns:
+            asyncio.Task: the background task of the update (resolves to the reports
+                of its entries).
         """
         # Ensure we have a unique update ID
         if update.id is None:
@@ -206,10 +274,17 @@ class DataUpdater:
 
         logger.info("Triggering data update with id: {id}", id=update.id)
 
+        commits = self._enqueue_commits(update)
         # Run the update in the background concurrently with other updates
         # The TaskGroup will manage the lifecycle of this task,
         # managing graceful shutdown of the updater without losing running data updates
-        self._tasks.add_task(self._update_policy_data(update))
+        try:
+            return self._tasks.add_task(
+                self._update_policy_data(update, commits, priority)
+            )
+        except:
+            self._release_commits(commits)
+            raise
 
     async def get_policy_data_config(self, url: str = None) -> DataSourceConfig:
         """Fetches the DataSourceConfig (list of DataSourceEntry) from the
@@ -230,41 +305,46 @@ class DataUpdater:
         logger.info("Getting data-sources configuration from '{source}'", source=url)
 
         try:
-            async with ClientSession(headers=self._extra_headers) as session:
-                response = await session.get(url, **self._ssl_context_kwargs)
-                if response.status == 200:
-                    return DataSourceConfig.parse_obj(await response.json())
-                else:
-                    error_details = await response.json()
-                    raise ClientError(
-                        f"Fetch data sources failed with status code {response.status}, error: {error_details}"
-                    )
+            async with shared_http_sessions.session(
+                url,
+                headers=self._extra_headers,
+                ssl_context=self._custom_ssl_context,
+            ) as session:
+                async with session.get(url, **self._ssl_context_kwargs) as response:
+                    if response.status == 200:
+                        return DataSourceConfig.parse_obj(await response.json())
+                    else:
+                        error_details = await response.json()
+                        raise ClientError(
+                            f"Fetch data sources failed with status code {response.status}, error: {error_details}"
+                        )
         except:
             logger.exception("Failed to load data sources config")
             raise
 
     async def get_base_policy_data(
         self, config_url: str = None, data_fetch_reason="Initial load"
-    ):
+    ) -> asyncio.Task:
         """Fetches an initial (or base) set of data from the configuration URL
         and stores it in the policy store.
 
-        This method also sets up any periodic data polling tasks for entries
-        that specify a 'periodic_update_interval'.
+        This method also schedules periodic data polling of entries that specify
+        a 'periodic_update_interval' (polled right away, and replacing the polling
+        of entries that are no longer configured).
 
         Args:
             config_url (str, optional): A specific config URL to fetch from. If not given,
                                         uses self._data_sources_config_url.
             data_fetch_reason (str, optional): Reason for logging this fetch. Defaults to
                                                "Initial load".
+
+        Returns:
+            asyncio.Task: the background task of the update of the one-time entries
         """
         logger.info(
             "Performing data configuration, reason: {reason}", reason=data_fetch_reason
         )
 
-        # If we're reconnecting, stop any old periodic tasks before fetching anew
-        await self._stop_polling_update_tasks()
-
         # Fetch the base config with all data entries
         sources_config = await self.get_policy_data_config(url=config_url)
 
@@ -276,33 +356,202 @@ class DataUpdater:
                 init_entries.append(entry)
 
         # Process one-time entries now
+        # (bulk loads and polling yield the fetching queue to published updates)
         update = DataUpdate(reason=data_fetch_reason, entries=init_entries)
-        await self.trigger_data_update(update)
+        task = await self.trigger_data_update(update, priority=FetchPriority.LOW)
 
         # Schedule repeated processing (polling) of periodic entries
-        async def _trigger_update_with_entry(entry: DataSourceEntry):
-            await self.trigger_data_update(
-                DataUpdate(reason="Periodic Update", entries=[entry])
-            )
-
+        # (rescheduling on reconnect replaces the jobs of the same entries)
+        polled_keys = set()
         for entry in periodic_entries:
-            repeat_process_entry = repeated_call(
-                partial(_trigger_update_with_entry, entry),
+            key = entry.json(sort_keys=True)
+            polled_keys.add(key)
+            self._polling_scheduler.schedule(
+                key,
+                partial(self._poll_entry, entry),
                 entry.periodic_update_interval,
-                logger=logger,
+                name=f"polling of {entry.url} into {entry.dst_path}",
+            )
+        for key in self._polling_scheduler.keys():
+            if key not in polled_keys:
+                self._polling_scheduler.unschedule(key)
+        return task
+
+    async def _replay_data_updates(
+        self, request: DataUpdateReplayRequest
+    ) -> Optional[DataUpdateReplay]:
+        """Requests the data updates published since the given sequences from
+        the server (None if the server can't replay them)."""
+        if not self._replay_url:
+            return None
+        try:
+            async with shared_http_sessions.session(
+                self._replay_url,
+                headers=self._extra_headers,
+                ssl_context=self._custom_ssl_context,
+            ) as session:
+                async with session.post(
+                    self._replay_url, json=request.dict(), **self._ssl_context_kwargs
+                ) as response:
+                    if response.status == 200:
+                        return DataUpdateReplay.parse_obj(await response.json())
+                    if response.status != 410:
+                        logger.warning(
+                            "Replaying data updates failed with status code {status}",
+                            status=response.status,
+                        )
+                    return None
+        except Exception as e:
+            logger.warning("Failed to replay data updates: {err}", err=repr(e))
+            return None
+
+    async def _sync_policy_data(self):
+        """Brings the policy data up to date with the server, once connected.
+
+        Replays the data updates published since the last seen updates,
+        or refetches all the data if they can't be replayed (as on the
+        first connection).
+        """
+        async with self._published_updates_lock:
+            if self._update_sequences.resumable:
+                replay = await self._replay_data_updates(
+                    self._update_sequences.replay_request()
+                )
+                if replay is not None:
+                    logger.info(
+                        "Replaying {count} data updates published while disconnected",
+                        count=len(replay.updates),
+                    )
+                    for update in replay.updates:
+                        await self._trigger_published_update(update)
+                    return
+            # track the updates published from now on (before the data is refetched)
+            heads = await self._replay_data_updates(
+                DataUpdateReplayRequest(topics=self._data_topics)
             )
-            self._polling_update_tasks.append(asyncio.create_task(repeat_process_entry))
+            if heads is not None:
+                self._update_sequences.start(heads.log_id, heads.sequences)
+            else:
+                self._update_sequences.reset()
+            # (the stored data is not known to be up to date until it's refetched)
+            self._applied_sequences.reset()
+
+        try:
+            task = await self.get_base_policy_data()
+        except:
+            self._update_sequences.reset()
+            raise
+        task.add_done_callback(partial(self._on_base_policy_data_done, heads))
+
+    def _on_base_policy_data_done(
+        self, heads: Optional[DataUpdateReplay], task: asyncio.Task
+    ):
+        # missing base data can't be made up for by replaying updates - refetch on reconnect
+        if (
+            task.cancelled()
+            or task.exception() is not None
+            or not all(report.saved for report in task.result())
+        ):
+            self._update_sequences.reset()
+        elif heads is not None and self._update_sequences.resumable:
+            # (updates applied meanwhile are replayed again, at worst)
+            self._applied_sequences.start(heads.log_id, heads.sequences)
+
+    def dump_update_sequences(self) -> Optional[Dict[str, Any]]:
+        """The published updates written to the policy store so far (to be
+        persisted with a backup of the store, @see load_update_sequences).
+
+        Returns None if the stored data can't be brought up to date by
+        replaying updates.
+        """
+        if not self._applied_sequences.resumable:
+            return None
+        return self._applied_sequences.replay_request().dict()
+
+    def load_update_sequences(self, dumped: Dict[str, Any]):
+        """Resumes from the updates written to a restored backup of the policy
+        store - the updates published since are replayed once connected,
+        rather than refetching all the data."""
+        request = DataUpdateReplayRequest.parse_obj(dumped)
+        if request.log_id is None or set(request.topics) != set(self._data_topics):
+            # (the backup was taken with other data topics)
+            return
+        self._update_sequences.start(request.log_id, request.sequences)
+        self._applied_sequences.start(request.log_id, request.sequences)
+
+    async def _poll_entry(self, entry: DataSourceEntry):
+        """Updates the data of a periodic entry, and waits for the update to
+        complete (raises if the entry could not be fetched, so the scheduler
+        backs off)."""
+        task = await self.trigger_data_update(
+            DataUpdate(reason="Periodic Update", entries=[entry]),
+            priority=FetchPriority.LOW,
+        )
+        # (a cancelled poll does not cancel the update itself)
+        reports = await asyncio.shield(task)
+        if reports and not all(report.fetched for report in reports):
+            raise Exception(f"Failed to fetch periodic entry {entry.url}")
+
+    def fetch_queue_stats(self) -> Dict[str, Any]:
+        """Statistics of each priority lane of the data fetching queue, and of
+        its workers."""
+        return {
+            "lanes": self._data_fetcher.queue_stats(),
+            "workers": self._data_fetcher.worker_stats(),
+        }
+
+    def fetch_state_snapshot(self) -> Any:
+        """Takes a snapshot of what is known about the written content.
+
+        The snapshot is taken before the policy store is exported, and
+        dumped once the export is done (@see dump_fetch_state).
+        """
+        return self._last_written.snapshot()
+
+    def dump_fetch_state(self, snapshot: Any) -> Dict[str, Any]:
+        """Dumps what is known about the content written to the policy store
+        (that is still valid for an export that started after the snapshot was
+        taken), and the validators to fetch that content conditionally.
+
+        Loaded once the export is restored, the content is not refetched
+        if the data sources tell it did not change.
+        """
+        return {
+            "validators": http_validators.dump(),
+            "written": self._last_written.valid_since(snapshot),
+        }
+
+    def load_fetch_state(self, state: Dict[str, Any]):
+        """Loads a fetch state dumped alongside an export of the policy store
+        (once the export is restored)."""
+        http_validators.load(state.get("validators", {}))
+        self._last_written.load(state.get("written", {}))
+
+    def forget_written(self, paths: List[str]):
+        """Forgets what is known about the content of the paths (i.e: written
+        to the policy store after the fetch state was dumped)."""
+        for path in paths:
+            self._last_written.forget(normalize_dst_path(path))
+
+    async def rehydrate_policy_store(self):
+        """Rewrites the base policy data into a policy store that lost its
+        state (i.e: a restarted OPA), regardless of what was written before."""
+        self._last_written.clear()
+        self._applied_sequences.reset()
+        await self.get_base_policy_data(data_fetch_reason="policy store rehydration")
 
     async def on_connect(self, client: PubSubClient, channel: RpcChannel):
         """Invoked when the Pub/Sub client establishes a connection to the
         server.
 
-        By default, this re-fetches base policy data. Also publishes a
-        statistic event if statistics are enabled.
+        By default, this replays the data updates missed while
+        disconnected (or re-fetches base policy data if they can't be
+        replayed). Also publishes a statistic event if statistics are
+        enabled.
         """
         logger.info("Connected to server")
         if self._fetch_on_connect:
-            await self.get_base_policy_data()
+            await self._sync_policy_data()
         if opal_common_config.STATISTICS_ENABLED:
             # Publish stats about the newly connected client
             await self._client.wait_until_ready()
@@ -356,16 +605,8 @@ class DataUpdater:
             await self._client.wait_until_done()
 
     async def _stop_polling_update_tasks(self):
-        """Cancels all periodic polling tasks (if any).
-
-        Used on reconnection or shutdown to ensure we don't have stale
-        tasks still running.
-        """
-        if self._polling_update_tasks:
-            for task in self._polling_update_tasks:
-                task.cancel()
-            await asyncio.gather(*self._polling_update_tasks, return_exceptions=True)
-            self._polling_update_tasks = []
+        """Stops all periodic polling (used on shutdown)."""
+        await self._polling_scheduler.stop()
 
     async def stop(self):
         """
@@ -422,7 +663,7 @@ class DataUpdater:
             await self._subscriber_task
 
     @staticmethod
-    def calc_hash(data: JsonableValue) -> str:
+    def calc_hash(data: Union[JsonableValue, EncodedPolicyData]) -> str:
         """Calculates a SHA-256 hash of the given data to be used to identify
         the updates (e.g. in logging reports on the transactions)  . If 'data'
         is not a string, it is first serialized to JSON. Returns an empty
@@ -434,6 +675,7 @@ class DataUpdater:
         Returns:
             str: The hexadecimal representation of the SHA-256 hash.
         """
+        data = policy_data_value(data)
         try:
             if not isinstance(data, str):
                 data = json.dumps(data, default=pydantic_encoder)
@@ -442,56 +684,97 @@ class DataUpdater:
             logger.exception(f"Failed to calculate hash for data {data}: {e}")
             return ""
 
-    async def _update_policy_data(self, update: DataUpdate) -> None:
+    def _should_process_entry(self, entry: DataSourceEntry) -> bool:
+        """Checks whether the entry is addressed to one of our data topics."""
+        if not entry.topics:
+            logger.debug("Data entry {entry} has no topics, skipping", entry=entry)
+            return False
+
+        # Only process entries that match one of our subscribed data topics
+        if set(entry.topics).isdisjoint(set(self._data_topics)):
+            logger.debug(
+                "Data entry {entry} has no topics matching the data topics, skipping",
+                entry=entry,
+            )
+            return False
+        return True
+
+    def _enqueue_commits(self, update: DataUpdate) -> List[Optional[PendingCommit]]:
+        """Reserves a place in the commit order of the destination path of each
+        entry of the update (None for entries we should not process)."""
+        return [
+            self._commit_queue.enqueue(entry)
+            if self._should_process_entry(entry)
+            else None
+            for entry in update.entries
+        ]
+
+    def _release_commits(self, commits: List[Optional[PendingCommit]]):
+        for commit in commits:
+            if commit is not None and not commit.is_superseded:
+                # no-op if the entry was already reported
+                commit.set_report(
+                    DataEntryReport(entry=commit.entry, fetched=False, saved=False)
+                )
+            self._commit_queue.done(commit)
+
+    async def _update_policy_data(
+        self,
+        update: DataUpdate,
+        commits: Optional[List[Optional[PendingCommit]]] = None,
+        priority: FetchPriority = FetchPriority.NORMAL,
+    ) -> List[DataEntryReport]:
         """Performs the core data update process for the given DataUpdate
         object.
 
         Steps:
-          1. Iterate over the DataUpdate entries.
-          2. For each entry, check if any of its topics match our client's topics.
-          3. Acquire a lock for the destination path, so we don't fetch and overwrite concurrently.
-             - Note: This means that fetches that can technically happen concurrently wait on one another.
-                          This can be improved with  a Fetcher-Writer Lock ( a la Reader-Writer Lock ) pattern
-          4. Fetch the data from the source (if applicable).
-          5. Write the data into the policy store.
-          6. Collect a report (success/failure, hash of the data, etc.).
-          7. Send a consolidated report after processing all entries.
+          1. Process the DataUpdate entries concurrently (skipping entries whose topics do
+             not match our client's topics, or that were coalesced into a later write).
+          2. Fetch the data from the source (if applicable), without holding any lock,
+             so fetches of conflicting paths can run concurrently (up to
+             DATA_UPDATE_CONCURRENCY fetches at a time).
+          3. Wait for the entry's turn to commit: all updates to the same (or an ancestor /
+             descendant) path that arrived earlier must be committed first, so a slow fetch
+             of an old update can never overwrite newer data.
+          4. Acquire a lock for the destination path and write the data into the policy store.
+          5. Collect a report (success/failure, hash of the data, etc.). Entries coalesced
+             into a later write report the outcome of that write.
+          6. Send a consolidated report after processing all entries.
 
         Args:
             update (DataUpdate): The data update instructions (entries, reason, etc.).
+            commits (List[PendingCommit], optional): the commit order reserved for each
+                entry when the update arrived (reserved now if not given).
+            priority (FetchPriority, optional): the fetching queue lane of the update's fetches.
 
         Returns:
-            None
+            List[DataEntryReport]: the reports of the update's entries
         """
-        reports: list[DataEntryReport] = []
+        if commits is None:
+            commits = self._enqueue_commits(update)
 
-        for entry in update.entries:
-            if not entry.topics:
-                logger.debug("Data entry {entry} has no topics, skipping", entry=entry)
-                continue
-
-            # Only process entries that match one of our subscribed data topics
-            if set(entry.topics).isdisjoint(set(self._data_topics)):
-                logger.debug(
-                    "Data entry {entry} has no topics matching the data topics, skipping",
-                    entry=entry,
-                )
-                continue
-
-            transaction_context = self._policy_store.transaction_context(
-                update.id, transaction_type=TransactionType.data
+        try:
+            results = await asyncio.gather(
+                *(
+                    self._fetch_and_save_data(commit, update.id, priority)
+                    for commit in commits
+                    if commit is not None
+                ),
+                return_exceptions=True,
             )
-
-            # Acquire a per-destination lock to avoid overwriting the same path concurrently
-            async with (
-                transaction_context as store_transaction,
-                self._dst_lock.lock(entry.dst_path),
-            ):
-                report = await self._fetch_and_save_data(entry, store_transaction)
-
-            reports.append(report)
-
+        finally:
+            # make sure later updates never wait on entries we did not commit
+            self._release_commits(commits)
+        for result in results:
+            if isinstance(result, BaseException):
+                raise result
+
+        # coalesced entries are reported once the write that superseded them is done
+        reports: list[DataEntryReport] = [
+            await commit.report() for commit in commits if commit is not None
+        ]
         await self._send_reports(reports, update)
+        return reports
 
     async def _send_reports(self, reports: list[DataEntryReport], update: DataUpdate):
         """Handles the reporting of completed data updates back to callbacks.
@@ -515,37 +798,222 @@ class DataUpdater:
 
     async def _fetch_and_save_data(
         self,
-        entry: DataSourceEntry,
-        store_transaction: PolicyStoreTransactionContextManager,
-    ) -> DataEntryReport:
+        commit: PendingCommit,
+        update_id: str,
+        priority: FetchPriority = FetchPriority.NORMAL,
+    ):
         """Orchestrates fetching data from a source and saving it into the
         policy store.
 
         Flow:
           1. Attempt to fetch data via the data fetcher (e.g., HTTP).
-          2. If data is fetched successfully, store it in the policy store.
-          3. Return a DataEntryReport indicating success/failure of each step.
+          2. If data is fetched successfully, wait for the entry's turn to commit
+             and store it in the policy store (under the destination path lock).
+          3. Set the entry's DataEntryReport indicating success/failure of each step.
+
+        Entries that are superseded by a later write (before or while being fetched)
+        are not written at all.
+
+        Args:
+            commit (PendingCommit): The data source entry and its place in the
+                commit order of its destination path.
+            update_id (str): The id of the update (used as the policy store transaction id).
+            priority (FetchPriority, optional): the fetching queue lane of the entry's fetch.
+        """
+        entry = commit.entry
+        if commit.is_superseded:
+            return
+
+        # streamed entries are fetched while being written (once it's their turn)
+        stream = self._should_stream_data(entry, commit.path)
+        try:
+            if not stream:
+                fetched = self._fetched_content(entry, commit.path)
+                cursor = self._cursor_of(entry, commit.path)
+                async with self._fetch_semaphore:
+                    result, digest = await self._fetch_data(
+                        entry,
+                        priority,
+                        known_digest=fetched and fetched.digest,
+                        cursor=cursor,
+                    )
+        except Exception as e:
+            # nothing to commit, do not hold back later updates to this path
+            self._commit_queue.done(commit)
+            if commit.is_superseded:
+                return
+            commit.set_report(await self._report_fetch_failure(entry, update_id, e))
+            return
+
+        try:
+            await self._commit_queue.wait_turn(commit)
+            if not self._commit_queue.begin(commit):
+                return
+            if not stream and self._is_relative_to_stale_data(
+                entry, commit.path, result, digest, cursor
+            ):
+                # the path was written since the (conditional / incremental) fetch,
+                # refetch all of its data
+                try:
+                    async with self._fetch_semaphore:
+                        result, digest = await self._fetch_data(entry, priority)
+                except Exception as e:
+                    commit.set_report(
+                        await self._report_fetch_failure(entry, update_id, e)
+                    )
+                    return
+            transaction_context = self._policy_store.transaction_context(
+                update_id, transaction_type=TransactionType.data
+            )
+            # Acquire a per-destination lock to avoid overwriting the same path concurrently
+            async with (
+                transaction_context as store_transaction,
+                self._dst_lock.lock(commit.path),
+            ):
+                if stream:
+                    report = await self._stream_fetched_data(
+                        entry, commit.path, store_transaction, priority
+                    )
+                else:
+                    report = await self._commit_fetched_data(
+                        entry,
+                        commit.with_merged_patches(result),
+                        store_transaction,
+                        digest=None if commit.merged_patches else digest,
+                    )
+            commit.set_report(report)
+        finally:
+            self._commit_queue.done(commit)
+
+    def _is_relative_to_stale_data(
+        self,
+        entry: DataSourceEntry,
+        path: str,
+        result: Any,
+        digest: Optional[str],
+        cursor: Optional[str],
+    ) -> bool:
+        """Whether the fetched result is relative to data the path no longer
+        holds (i.e: content not modified since its digest, or changes since a
+        cursor)."""
+        if result is NOT_MODIFIED:
+            fetched = self._fetched_content(entry, path)
+            return fetched is None or fetched.digest != digest
+        if isinstance(result, FetchedDelta) and not result.is_snapshot:
+            return self._cursor_of(entry, path) != cursor
+        return False
+
+    async def _report_fetch_failure(
+        self, entry: DataSourceEntry, update_id: str, error: Exception
+    ) -> DataEntryReport:
+        async with self._policy_store.transaction_context(
+            update_id, transaction_type=TransactionType.data
+        ) as store_transaction:
+            store_transaction._update_remote_status(
+                url=entry.url, status=False, error=str(error)
+            )
+        return DataEntryReport(entry=entry, fetched=False, saved=False)
+
+    async def _commit_fetched_data(
+        self,
+        entry: DataSourceEntry,
+        result: JsonableValue,
+        store_transaction: PolicyStoreTransactionContextManager,
+        digest: Optional[str] = None,
+    ) -> DataEntryReport:
+        """Saves fetched data into the policy store and reports the outcome.
+
+        A PUT of content identical to what was last written to the same path
+        (by digest) is skipped, and reported as saved and unchanged. A PUT of an
+        entry with a diff threshold may be written as a JSON patch of the changes
+        since the last written document.
+
+        A result of NOT_MODIFIED (content unchanged since its digest) is
+        reported as unchanged, if the path still holds the content. Fetched
+        incremental changes are written as a JSON patch (@see
+        self._commit_fetched_delta).
 
         Args:
             entry (DataSourceEntry): The configuration details of the data source entry.
+            result (JsonableValue): The fetched data.
             store_transaction (PolicyStoreTransactionContextManager): An active
                 transaction to the policy store.
+            digest (str, optional): The digest of the fetched content, if known.
 
         Returns:
-            DataEntryReport: Includes information about whether data was fetched,
-                saved, and the computed hash for the data if successfully saved.
+            DataEntryReport: the report of the (fetched) entry.
         """
-        try:
-            result = await self._fetch_data(entry)
-        except Exception as e:
+        if isinstance(result, FetchedDelta):
+            return await self._commit_fetched_delta(entry, result, store_transaction)
+        path = normalize_dst_path(entry.dst_path)
+        fetched_digest = digest
+        if (
+            entry.save_method != "PUT"
+            or not opal_client_config.SKIP_UNCHANGED_DATA_WRITES
+        ):
+            digest = None
+        else:
+            digest = self._content_key(entry, digest)
+            if digest is not None and self._last_written.get_digest(path) == digest:
+                # (the same content - reported as it was, hashed only if not stored)
+                fetched = self._last_written.get_fetched(path)
+                if fetched is not None:
+                    result_hash = fetched.report_hash
+                elif result is not NOT_MODIFIED:
+                    result_hash = self.calc_hash(EncodedPolicyData(result))
+                else:
+                    result_hash = None
+                if result_hash is not None:
+                    return self._report_unchanged(
+                        entry, result_hash, path, store_transaction
+                    )
+        if result is NOT_MODIFIED:
+            # (only fetched conditionally for content the path held)
+            logger.error("Data at '{path}' changed while fetching it", path=path)
             store_transaction._update_remote_status(
-                url=entry.url, status=False, error=str(e)
+                url=entry.url,
+                status=False,
+                error=f"Data at '{path}' changed while fetching it",
             )
-            return DataEntryReport(entry=entry, fetched=False, saved=False)
+            return DataEntryReport(entry=entry, fetched=True, saved=False)
 
+        # encoded once, reused for the write (and for its size when diffing)
+        document = EncodedPolicyData(result) if entry.save_method == "PUT" else result
+        diff_document = self._should_write_as_diff(entry, result, path)
         try:
-            await self._store_fetched_data(entry, result, store_transaction)
+            patch = None
+            if diff_document:
+                patch = make_json_patch(
+                    self._last_written.get_document(path),
+                    result,
+                    entry.diff_threshold,
+                    new_size=len(document.content),
+                )
+            if patch == []:
+                self._last_written.record(path, digest, result)
+                return self._report_unchanged(
+                    entry, self.calc_hash(document), path, store_transaction
+                )
+            # the state of the path is unknown until the write is done
+            self._last_written.forget(path)
+            if patch is not None:
+                logger.info(
+                    "Writing data as a diff of {n} operations to '{path}'",
+                    n=len(patch),
+                    path=path,
+                )
+                await self._set_policy_data(
+                    store_transaction,
+                    url=entry.url,
+                    path=path,
+                    save_method="PATCH",
+                    data=patch,
+                )
+            else:
+                await self._store_fetched_data(entry, document, store_transaction)
         except Exception as e:
+            # the state of the path in the policy store is unknown
+            self._last_written.forget(path)
             logger.exception("Failed to save data update to policy-store: {exc}", exc=e)
             store_transaction._update_remote_status(
                 url=entry.url,
@@ -553,31 +1021,283 @@ class DataUpdater:
                 error=f"Failed to save data to policy store: {e}",
             )
             return DataEntryReport(
-                entry=entry, hash=self.calc_hash(result), fetched=True, saved=False
+                entry=entry, hash=self.calc_hash(document), fetched=True, saved=False
             )
         else:
+            result_hash = self.calc_hash(document)
+            self._last_written.record(
+                path,
+                digest,
+                result if diff_document else None,
+                fetched=FetchedContent(fetched_digest, result_hash),
+            )
             store_transaction._update_remote_status(
                 url=entry.url, status=True, error=""
             )
             return DataEntryReport(
-                entry=entry, hash=self.calc_hash(result), fetched=True, saved=True
+                entry=entry, hash=result_hash, fetched=True, saved=True
+            )
+
+    async def _commit_fetched_delta(
+        self,
+        entry: DataSourceEntry,
+        delta: FetchedDelta,
+        store_transaction: PolicyStoreTransactionContextManager,
+    ) -> DataEntryReport:
+        """Saves fetched incremental changes into the policy store (as a JSON
+        patch of the entry's destination path, or all of the data if the
+        changes are unknown), and remembers the cursor of the written data (to
+        fetch only the changes since it next time).
+
+        Args:
+            entry (DataSourceEntry): The configuration details of the data source entry.
+            delta (FetchedDelta): The fetched changes.
+            store_transaction (PolicyStoreTransactionContextManager): An active
+                transaction to the policy store.
+
+        Returns:
+            DataEntryReport: the report of the (fetched) entry.
+        """
+        path = normalize_dst_path(entry.dst_path)
+        cursor = EntryCursor(self._source_key(entry), delta.cursor)
+        if delta.is_snapshot:
+            document = EncodedPolicyData(delta.data)
+            result_hash = self.calc_hash(document)
+        else:
+            # (the fetched changes may be shared with other fetches, and patching mutates them)
+            document = [change.copy() for change in delta.changes]
+            result_hash = self.calc_hash(delta.changes)
+            if not document:
+                self._last_written.record(path, cursor=cursor)
+                return self._report_unchanged(
+                    entry, result_hash, path, store_transaction
+                )
+        # the state of the path is unknown until the write is done
+        self._last_written.forget(path)
+        try:
+            if delta.is_snapshot:
+                await self._store_fetched_data(entry, document, store_transaction)
+            else:
+                logger.info(
+                    "Writing {n} fetched changes to '{path}'",
+                    n=len(document),
+                    path=path,
+                )
+                await self._set_policy_data(
+                    store_transaction,
+                    url=entry.url,
+                    path=path,
+                    save_method="PATCH",
+                    data=document,
+                )
+        except Exception as e:
+            logger.exception("Failed to save data update to policy-store: {exc}", exc=e)
+            store_transaction._update_remote_status(
+                url=entry.url,
+                status=False,
+                error=f"Failed to save data to policy store: {e}",
+            )
+            return DataEntryReport(
+                entry=entry, hash=result_hash, fetched=True, saved=False
+            )
+        self._last_written.record(path, cursor=cursor)
+        store_transaction._update_remote_status(url=entry.url, status=True, error="")
+        return DataEntryReport(entry=entry, hash=result_hash, fetched=True, saved=True)
+
+    async def _stream_fetched_data(
+        self,
+        entry: DataSourceEntry,
+        path: str,
+        store_transaction: PolicyStoreTransactionContextManager,
+        priority: FetchPriority = FetchPriority.NORMAL,
+    ) -> DataEntryReport:
+        """Fetches the entry's raw content and streams it into the policy store
+        as it arrives (without parsing it), and reports the outcome.
+
+        Args:
+            entry (DataSourceEntry): The configuration details of the data source entry.
+            path (str): The (normalized) destination path.
+            store_transaction (PolicyStoreTransactionContextManager): An active
+                transaction to the policy store.
+            priority (FetchPriority, optional): the fetching queue lane of the entry's fetch.
+
+        Returns:
+            DataEntryReport: the report of the entry.
+        """
+        fetched = False
+
+        async def write(chunks):
+            nonlocal fetched
+            fetched = True
+            logger.info(
+                "Streaming fetched data to policy-store: source url='{url}', destination path='{path}'",
+                url=entry.url,
+                path=path,
             )
+            await store_transaction.set_policy_data_stream(chunks, path=path)
+
+        # the state of the path is unknown until the write is done
+        self._last_written.forget(path)
+        try:
+            # (holding the semaphore only once it's the entry's turn - so it never waits for others)
+            async with self._fetch_semaphore:
+                _, digest = await self._data_fetcher.stream_url(
+                    entry.url, entry.config, write, priority=priority
+                )
+        except Exception as e:
+            # the state of the path in the policy store is unknown
+            self._last_written.forget(path)
+            if not fetched:
+                logger.exception(
+                    "Failed to fetch data for entry {entry} with exception {exc}",
+                    entry=entry,
+                    exc=e,
+                )
+                store_transaction._update_remote_status(
+                    url=entry.url,
+                    status=False,
+                    error=f"Failed to fetch data for entry {entry.url}: {e}",
+                )
+                return DataEntryReport(entry=entry, fetched=False, saved=False)
+            logger.exception("Failed to save data update to policy-store: {exc}", exc=e)
+            store_transaction._update_remote_status(
+                url=entry.url,
+                status=False,
+                error=f"Failed to save data to policy store: {e}",
+            )
+            return DataEntryReport(entry=entry, fetched=True, saved=False)
+
+        self._last_written.record(path, self._content_key(entry, digest))
+        store_transaction._update_remote_status(url=entry.url, status=True, error="")
+        return DataEntryReport(entry=entry, hash=digest, fetched=True, saved=True)
+
+    def _should_stream_data(self, entry: DataSourceEntry, path: str) -> bool:
+        """Whether the entry's content should be streamed into the policy store
+        as is (@see DataSourceEntry.stream_raw)."""
+        if not entry.stream_raw or entry.save_method != "PUT" or entry.data is not None:
+            return False
+        if entry.projection is not None:
+            # projections need the parsed document
+            return False
+        if path == "" or entry.diff_threshold is not None:
+            # root data may be split or wrapped, diffs need the parsed document
+            return False
+        config = entry.config or {}
+        if config.get("fetcher") not in (None, "HttpFetchProvider") or not config.get(
+            "is_json", True
+        ):
+            return False
+        return self._policy_store.supports_data_streaming
+
+    def _content_key(
+        self, entry: DataSourceEntry, digest: Optional[str]
+    ) -> Optional[str]:
+        """The digest of fetched content, as remembered for the entry's
+        destination path."""
+        if digest is None:
+            return None
+        # the written data also depends on how the content is fetched and processed
+        return (
+            self.calc_hash([digest, entry.url, entry.config, entry.projection]) or None
+        )
+
+    def _fetched_content(
+        self, entry: DataSourceEntry, path: str
+    ) -> Optional[FetchedContent]:
+        """The fetched content the entry's destination path holds, if the entry
+        would write the same content (so it can be fetched conditionally)."""
+        if (
+            entry.save_method != "PUT"
+            or entry.data is not None
+            or not opal_client_config.SKIP_UNCHANGED_DATA_WRITES
+        ):
+            return None
+        fetched = self._last_written.get_fetched(path)
+        if fetched is None or self._last_written.get_digest(path) != self._content_key(
+            entry, fetched.digest
+        ):
+            return None
+        return fetched
 
-    async def _fetch_data(self, entry: DataSourceEntry) -> JsonableValue:
+    def _cursor_of(self, entry: DataSourceEntry, path: str) -> Optional[str]:
+        """The cursor of the data the entry's destination path holds, if
+        fetched from the entry's data source (as incremental changes)."""
+        if entry.save_method != "PUT" or entry.data is not None:
+            return None
+        return self._last_written.get_cursor(path, self._source_key(entry))
+
+    def _source_key(self, entry: DataSourceEntry) -> str:
+        return self.calc_hash([entry.url, entry.config])
+
+    def _report_unchanged(
+        self,
+        entry: DataSourceEntry,
+        result_hash: str,
+        path: str,
+        store_transaction: PolicyStoreTransactionContextManager,
+    ) -> DataEntryReport:
+        logger.info(
+            "Data at '{path}' is unchanged, skipping write (url: {url})",
+            path=path,
+            url=entry.url,
+        )
+        store_transaction._update_remote_status(url=entry.url, status=True, error="")
+        return DataEntryReport(
+            entry=entry,
+            hash=result_hash,
+            fetched=True,
+            saved=True,
+            unchanged=True,
+        )
+
+    @staticmethod
+    def _should_write_as_diff(
+        entry: DataSourceEntry, result: JsonableValue, path: str
+    ) -> bool:
+        """Whether the entry's data should be written as a diff of the last
+        written document (and the written document remembered)."""
+        if entry.diff_threshold is None or entry.save_method != "PUT":
+            return False
+        if path == "" and (
+            opal_client_config.SPLIT_ROOT_DATA or not isinstance(result, dict)
+        ):
+            # root data is written split by keys (or wrapped, for lists)
+            return False
+        return isinstance(result, (dict, list))
+
+    async def _fetch_data(
+        self,
+        entry: DataSourceEntry,
+        priority: FetchPriority = FetchPriority.NORMAL,
+        known_digest: Optional[str] = None,
+        cursor: Optional[str] = None,
+    ) -> Tuple[JsonableValue, Optional[str]]:
         """Fetches data from a data source using the configured data fetcher.
-        Handles fetch errors, HTTP errors, and empty responses.
+        Handles fetch errors, HTTP errors, and empty responses, and applies the
+        entry's projection (if any).
 
         Args:
             entry (DataSourceEntry): The configuration specifying how and where to fetch data.
+            priority (FetchPriority, optional): the fetching queue lane of the fetch.
+            known_digest (str, optional): the digest of the content the destination
+                path holds (the result may be NOT_MODIFIED if it did not change).
+            cursor (str, optional): the cursor of the data the destination path holds
+                (fetchers of incremental changes fetch the changes since it).
 
         Returns:
-            JsonableValue: The fetched data, as a JSON-serializable object.
+            Tuple[JsonableValue, Optional[str]]: The fetched data, as a JSON-serializable
+                object, and the digest of the raw fetched content (if known).
         """
         try:
-            result = await self._data_fetcher.handle_url(
+            config = entry.config
+            if cursor is not None:
+                config = {**(config or {}), "cursor": cursor}
+            result, digest = await self._data_fetcher.handle_url_with_digest(
                 url=entry.url,
-                config=entry.config,
+                config=config,
                 data=entry.data,
+                priority=priority,
+                known_digest=known_digest,
             )
         except Exception as e:
             logger.exception(
@@ -590,6 +1310,11 @@ class DataUpdater:
         if result is None:
             raise Exception(f"Fetched data is empty for entry {entry.url}")
 
+        if isinstance(result, FetchedDelta) and entry.save_method != "PUT":
+            raise Exception(
+                f"Fetched incremental changes for entry {entry.url}, which is not a PUT"
+            )
+
         if isinstance(result, aiohttp.ClientResponse) and is_http_error_response(
             result
         ):
@@ -604,12 +1329,28 @@ class DataUpdater:
                 f"Failed to decode response from url: '{entry.url}', got response code {result.status} with response: {error_content}"
             )
 
-        return result
+        if (
+            entry.projection is not None
+            and entry.save_method == "PUT"
+            and result is not NOT_MODIFIED
+        ):
+            # (as soon as possible, so the rest of the document is not held while
+            # waiting to be written)
+            if isinstance(result, FetchedDelta):
+                raise Exception(
+                    f"Fetched incremental changes for entry {entry.url}, which has a projection"
+                )
+            try:
+                result = project_data(result, entry.projection)
+            except Exception as e:
+                raise Exception(f"Failed to project data for entry {entry.url}: {e}")
+
+        return result, digest
 
     async def _store_fetched_data(
         self,
         entry: DataSourceEntry,
-        result: JsonableValue,
+        result: Union[JsonableValue, EncodedPolicyData],
         store_transaction: PolicyStoreTransactionContextManager,
     ) -> None:
         """Decides how to store fetched data (entirely or split by root keys)
@@ -633,13 +1374,13 @@ class DataUpdater:
         if (
             opal_client_config.SPLIT_ROOT_DATA
             and policy_store_path in ("/", "")
-            and isinstance(result, dict)
+            and isinstance(policy_data_value(result), dict)
         ):
             await self._set_split_policy_data(
                 store_transaction,
                 url=entry.url,
                 save_method=entry.save_method,
-                data=result,
+                data=policy_data_value(result),
             )
         else:
             await self._set_policy_data(
@@ -41,7 +41,7 @@ class OpaServerOptions(BaseModel):
 
     addr: str = Field(
         ":8181",
-        description="listening address of the opa server (e.g., [ip]:<port> for TCP)",
+        description="listening address of the opa server (e.g., [ip]:<port> for TCP, unix://<path> for a unix domain socket)",
     )
     authentication: AuthenticationScheme = Field(
         AuthenticationScheme.off, description="opa authentication scheme (default off)"
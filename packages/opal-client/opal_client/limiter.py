@@ -2,6 +2,7 @@ import aiohttp
 from fastapi import HTTPException, status
 from opal_client.config import opal_client_config
 from opal_client.logger import logger
+from opal_common.http_sessions import shared_http_sessions
 from opal_common.security.sslcontext import get_custom_ssl_context
 from opal_common.utils import get_authorization_header, tuple_to_dict
 from tenacity import retry, stop, wait_random_exponential
@@ -31,7 +32,9 @@ class StartupLoadLimiter:
     @retry(wait=wait_random_exponential(max=10), stop=stop.stop_never, reraise=True)
     async def wait_for_server_ready(self):
         logger.info("Trying to get server's load limit pass")
-        async with aiohttp.ClientSession() as session:
+        async with shared_http_sessions.session(
+            self._loadlimit_endpoint_url, ssl_context=self._custom_ssl_context
+        ) as session:
             try:
                 async with session.get(
                     self._loadlimit_endpoint_url,
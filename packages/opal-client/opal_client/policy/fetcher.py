@@ -4,6 +4,7 @@ import aiohttp
 from fastapi import HTTPException, status
 from opal_client.config import opal_client_config
 from opal_client.logger import logger
+from opal_common.http_sessions import shared_http_sessions
 from opal_common.schemas.policy import PolicyBundle
 from opal_common.security.sslcontext import get_custom_ssl_context
 from opal_common.utils import (
@@ -85,7 +86,9 @@ class PolicyFetcher:
         params = {"path": directories}
         if base_hash is not None:
             params["base_hash"] = base_hash
-        async with aiohttp.ClientSession() as session:
+        async with shared_http_sessions.session(
+            self._policy_endpoint_url, ssl_context=self._custom_ssl_context
+        ) as session:
             logger.info(
                 "Fetching policy bundle from {url}",
                 url=self._policy_endpoint_url,
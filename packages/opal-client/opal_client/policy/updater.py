@@ -1,5 +1,5 @@
 import asyncio
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
 
 import pydantic
 from fastapi_websocket_pubsub import PubSubClient
@@ -151,6 +151,16 @@ class PolicyUpdater:
         )
         await self.trigger_update_policy(directories)
 
+    @property
+    def policy_source(self) -> Dict[str, Any]:
+        """What the policy bundles are fetched from (the policy version of the
+        store is only meaningful as a base hash for bundles of the same
+        source)."""
+        return {
+            "url": self._policy_fetcher.policy_endpoint_url,
+            "directories": [str(d) for d in default_subscribed_policy_directories()],
+        }
+
     async def trigger_update_policy(
         self, directories: List[str] = None, force_full_update: bool = False
     ):
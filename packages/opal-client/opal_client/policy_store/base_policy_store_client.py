@@ -1,19 +1,67 @@
 import json
+import time
 import uuid
 from datetime import datetime
 from functools import partial
 from inspect import signature
-from typing import Any, Dict, List, Optional, Union
+from typing import Any, AsyncIterator, Dict, List, NamedTuple, Optional, Union
 
 from aiofiles.threadpool.text import AsyncTextIOWrapper
 from opal_client.config import opal_client_config
 from opal_client.logger import logger
+from opal_client.policy_store.journal import StoreJournal
 from opal_common.schemas.data import JsonableValue
 from opal_common.schemas.policy import PolicyBundle
 from opal_common.schemas.store import RemoteStatus, StoreTransaction
 from pydantic import BaseModel
 
 
+class StoreState(NamedTuple):
+    """The state of a policy store (what is exported to its backup)."""
+
+    policies: Dict[str, str]
+    data: JsonableValue
+    # (the hash of the policy bundle the policies are of, if known)
+    policy_version: Optional[str] = None
+
+
+class ImportProgress:
+    """Logs the progress of an import into the policy store (every tenth of the
+    items), and its timing."""
+
+    def __init__(self, kind: str, total: int):
+        self._kind = kind
+        self._total = total
+        self._done = 0
+        self._logged_tenths = 0
+        self._started = time.monotonic()
+
+    @property
+    def elapsed(self) -> float:
+        return time.monotonic() - self._started
+
+    def advance(self, count: int = 1):
+        self._done += count
+        tenths = self._done * 10 // max(self._total, 1)
+        if tenths > self._logged_tenths and self._done < self._total:
+            self._logged_tenths = tenths
+            logger.info(
+                "Imported {done}/{total} {kind} ({elapsed:.1f}s)",
+                done=self._done,
+                total=self._total,
+                kind=self._kind,
+                elapsed=self.elapsed,
+            )
+
+    def complete(self):
+        logger.info(
+            "Imported {total} {kind} in {elapsed:.2f}s",
+            total=self._total,
+            kind=self._kind,
+            elapsed=self.elapsed,
+        )
+
+
 class AbstractPolicyStore:
     """Holds only the interface of a policy store."""
 
@@ -39,6 +87,9 @@ class AbstractPolicyStore:
     async def get_policy_version(self) -> Optional[str]:
         raise NotImplementedError()
 
+    async def set_policy_version(self, version: Optional[str]):
+        raise NotImplementedError()
+
     async def set_policy_data(
         self,
         policy_data: JsonableValue,
@@ -52,6 +103,38 @@ class AbstractPolicyStore:
     ):
         raise NotImplementedError()
 
+    @property
+    def supports_data_streaming(self) -> bool:
+        """Whether set_policy_data_stream() is supported."""
+        return False
+
+    async def set_policy_data_stream(
+        self,
+        chunks: AsyncIterator[bytes],
+        path: str = "",
+        transaction_id: Optional[str] = None,
+    ):
+        """Same as set_policy_data(), but the data is given as the chunks of
+        its (raw) JSON encoding, written as they arrive."""
+        raise NotImplementedError()
+
+    @property
+    def supports_journal(self) -> bool:
+        """Whether the writes to the store can be journaled (@see
+        attach_journal())."""
+        return False
+
+    def attach_journal(self, journal: StoreJournal):
+        """Appends every successful write to the store (from now on) to the
+        journal."""
+        raise NotImplementedError()
+
+    def capture_data(self) -> JsonableValue:
+        """A copy of the data in the store as of now (unchanged by later
+        writes), for a snapshot to be exported while the store is written to
+        (@see StoreJournal.rotate())."""
+        raise NotImplementedError()
+
     async def get_data(self, path: str) -> Dict:
         raise NotImplementedError()
 
@@ -70,12 +153,30 @@ class AbstractPolicyStore:
     async def is_ready(self) -> bool:
         raise NotImplementedError()
 
-    async def full_export(self, writer: AsyncTextIOWrapper) -> None:
+    async def export_state(self) -> StoreState:
+        """The policies and the data in the store."""
         raise NotImplementedError()
 
-    async def full_import(self, reader: AsyncTextIOWrapper) -> None:
+    async def import_state(self, state: StoreState) -> None:
+        """Writes exported policies and data into the store."""
         raise NotImplementedError()
 
+    async def full_export(self, writer: AsyncTextIOWrapper) -> None:
+        state = await self.export_state()
+        await writer.write(
+            json.dumps({"policies": state.policies, "data": state.data}, default=str)
+        )
+
+    async def full_import(self, reader: AsyncTextIOWrapper) -> None:
+        import_data = json.loads(await reader.read())
+        await self.import_state(
+            StoreState(policies=import_data["policies"], data=import_data["data"])
+        )
+
+    async def close(self):
+        """Releases resources held by the client (i.e: pooled connections)"""
+        pass
+
 
 class PolicyStoreTransactionContextManager(AbstractPolicyStore):
     def __init__(
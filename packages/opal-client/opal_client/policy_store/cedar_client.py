@@ -1,17 +1,18 @@
 import asyncio
-import json
 from typing import Dict, List, Optional, Set, Union
 from urllib.parse import quote_plus
 
 import aiohttp
-from aiofiles.threadpool.text import AsyncTextIOWrapper
 from fastapi import status
 from opal_client.config import opal_client_config
 from opal_client.logger import logger
 from opal_client.policy_store.base_policy_store_client import (
     BasePolicyStoreClient,
+    ImportProgress,
     JsonableValue,
+    StoreState,
 )
+from opal_client.policy_store.http_session import PolicyStoreHttpSession
 from opal_client.policy_store.opa_client import (
     RETRY_CONFIG,
     affects_transaction,
@@ -20,6 +21,7 @@ from opal_client.policy_store.opa_client import (
     should_ignore_path,
 )
 from opal_client.policy_store.schemas import PolicyStoreAuth
+from opal_client.utils import policy_data_value
 from opal_common.schemas.policy import PolicyBundle
 from opal_common.schemas.store import StoreTransaction, TransactionType
 from tenacity import retry
@@ -31,6 +33,9 @@ class CedarClient(BasePolicyStoreClient):
         cedar_server_url=None,
         cedar_auth_token: Optional[str] = None,
         auth_type: PolicyStoreAuth = PolicyStoreAuth.NONE,
+        conn_pool_size: Optional[int] = None,
+        conn_keepalive_timeout: Optional[float] = None,
+        unix_socket: Optional[str] = None,
     ):
         base_url = cedar_server_url or opal_client_config.POLICY_STORE_URL
         self._cedar_url = f"{base_url}/v1"
@@ -53,6 +58,20 @@ class CedarClient(BasePolicyStoreClient):
 
         logger.info(f"Authentication mode for policy store: {auth_type}")
 
+        # a single keep-alive connection pool shared by all requests to the Cedar agent
+        self._http_session = PolicyStoreHttpSession(
+            pool_size=conn_pool_size
+            if conn_pool_size is not None
+            else opal_client_config.POLICY_STORE_CONN_POOL_SIZE,
+            keepalive_timeout=conn_keepalive_timeout
+            if conn_keepalive_timeout is not None
+            else opal_client_config.POLICY_STORE_CONN_KEEPALIVE_TIMEOUT,
+            unix_socket=unix_socket,
+        )
+
+    async def close(self):
+        await self._http_session.close()
+
     async def _get_auth_headers(self) -> Dict[str, str]:
         headers: Dict[str, str] = {}
         if self._auth_type == PolicyStoreAuth.TOKEN and self._token is not None:
@@ -75,59 +94,59 @@ class CedarClient(BasePolicyStoreClient):
                 f"Ignoring setting policy - {policy_id}, set in POLICY_STORE_POLICY_PATHS_TO_IGNORE."
             )
             return
-        async with aiohttp.ClientSession() as session:
-            try:
-                headers = await self._get_auth_headers()
-                async with session.put(
-                    f"{self._cedar_url}/policies/{quote_plus(policy_id)}",
-                    json={
-                        "content": policy_code,
-                    },
-                    headers=headers,
-                ) as cedar_response:
-                    return await proxy_response_unless_invalid(
-                        cedar_response,
-                        accepted_status_codes=[
-                            status.HTTP_200_OK,
-                            status.HTTP_400_BAD_REQUEST,  # No point in immediate retry, this means erroneous policy (bad syntax, duplicated definition, etc)
-                        ],
-                    )
-            except aiohttp.ClientError as e:
-                logger.warning("Cedar Agent connection error: {err}", err=repr(e))
-                raise
+        session = self._http_session.get()
+        try:
+            headers = await self._get_auth_headers()
+            async with session.put(
+                f"{self._cedar_url}/policies/{quote_plus(policy_id)}",
+                json={
+                    "content": policy_code,
+                },
+                headers=headers,
+            ) as cedar_response:
+                return await proxy_response_unless_invalid(
+                    cedar_response,
+                    accepted_status_codes=[
+                        status.HTTP_200_OK,
+                        status.HTTP_400_BAD_REQUEST,  # No point in immediate retry, this means erroneous policy (bad syntax, duplicated definition, etc)
+                    ],
+                )
+        except aiohttp.ClientError as e:
+            logger.warning("Cedar Agent connection error: {err}", err=repr(e))
+            raise
 
     @fail_silently()
     @retry(**RETRY_CONFIG)
     async def get_policy(self, policy_id: str) -> Optional[str]:
-        async with aiohttp.ClientSession() as session:
-            try:
-                headers = await self._get_auth_headers()
-
-                async with session.get(
-                    f"{self._cedar_url}/policies/{quote_plus(policy_id)}",
-                    headers=headers,
-                ) as cedar_response:
-                    result = await cedar_response.json()
-                    return result.get("result", {}).get("raw", None)
-            except aiohttp.ClientError as e:
-                logger.warning("Cedar Agent connection error: {err}", err=repr(e))
-                raise
+        session = self._http_session.get()
+        try:
+            headers = await self._get_auth_headers()
+
+            async with session.get(
+                f"{self._cedar_url}/policies/{quote_plus(policy_id)}",
+                headers=headers,
+            ) as cedar_response:
+                result = await cedar_response.json()
+                return result.get("result", {}).get("raw", None)
+        except aiohttp.ClientError as e:
+            logger.warning("Cedar Agent connection error: {err}", err=repr(e))
+            raise
 
     @fail_silently()
     @retry(**RETRY_CONFIG)
     async def get_policies(self) -> Optional[Dict[str, str]]:
-        async with aiohttp.ClientSession() as session:
-            try:
-                headers = await self._get_auth_headers()
-
-                async with session.get(
-                    f"{self._cedar_url}/policies", headers=headers
-                ) as cedar_response:
-                    result = await cedar_response.json()
-                    return {policy["id"]: policy["content"] for policy in result}
-            except aiohttp.ClientError as e:
-                logger.warning("Cedar Agent connection error: {err}", err=repr(e))
-                raise
+        session = self._http_session.get()
+        try:
+            headers = await self._get_auth_headers()
+
+            async with session.get(
+                f"{self._cedar_url}/policies", headers=headers
+            ) as cedar_response:
+                result = await cedar_response.json()
+                return {policy["id"]: policy["content"] for policy in result}
+        except aiohttp.ClientError as e:
+            logger.warning("Cedar Agent connection error: {err}", err=repr(e))
+            raise
 
     @affects_transaction
     @retry(**RETRY_CONFIG)
@@ -141,24 +160,24 @@ class CedarClient(BasePolicyStoreClient):
             )
             return
 
-        async with aiohttp.ClientSession() as session:
-            try:
-                headers = await self._get_auth_headers()
-
-                async with session.delete(
-                    f"{self._cedar_url}/policies/{quote_plus(policy_id)}",
-                    headers=headers,
-                ) as cedar_response:
-                    return await proxy_response_unless_invalid(
-                        cedar_response,
-                        accepted_status_codes=[
-                            status.HTTP_204_NO_CONTENT,
-                            status.HTTP_404_NOT_FOUND,
-                        ],
-                    )
-            except aiohttp.ClientError as e:
-                logger.warning("Cedar Agent connection error: {err}", err=repr(e))
-                raise
+        session = self._http_session.get()
+        try:
+            headers = await self._get_auth_headers()
+
+            async with session.delete(
+                f"{self._cedar_url}/policies/{quote_plus(policy_id)}",
+                headers=headers,
+            ) as cedar_response:
+                return await proxy_response_unless_invalid(
+                    cedar_response,
+                    accepted_status_codes=[
+                        status.HTTP_204_NO_CONTENT,
+                        status.HTTP_404_NOT_FOUND,
+                    ],
+                )
+        except aiohttp.ClientError as e:
+            logger.warning("Cedar Agent connection error: {err}", err=repr(e))
+            raise
 
     @affects_transaction
     @retry(**RETRY_CONFIG)
@@ -171,31 +190,32 @@ class CedarClient(BasePolicyStoreClient):
         if path != "":
             raise ValueError("Cedar can only change the entire data structure at once.")
 
+        policy_data = policy_data_value(policy_data)
         if not isinstance(policy_data, list):
             logger.warning(
                 "OPAL client was instructed to put something that is not a list on Cedar. This will probably not work."
             )
 
-        async with aiohttp.ClientSession() as session:
-            try:
-                headers = await self._get_auth_headers()
-                async with session.put(
-                    f"{self._cedar_url}/data",
-                    json=policy_data,
-                    headers=headers,
-                ) as cedar_response:
-                    response = await proxy_response_unless_invalid(
-                        cedar_response,
-                        accepted_status_codes=[
-                            status.HTTP_200_OK,
-                            status.HTTP_204_NO_CONTENT,
-                            status.HTTP_304_NOT_MODIFIED,
-                        ],
-                    )
-                    return response
-            except aiohttp.ClientError as e:
-                logger.warning("Cedar Agent connection error: {err}", err=repr(e))
-                raise
+        session = self._http_session.get()
+        try:
+            headers = await self._get_auth_headers()
+            async with session.put(
+                f"{self._cedar_url}/data",
+                json=policy_data,
+                headers=headers,
+            ) as cedar_response:
+                response = await proxy_response_unless_invalid(
+                    cedar_response,
+                    accepted_status_codes=[
+                        status.HTTP_200_OK,
+                        status.HTTP_204_NO_CONTENT,
+                        status.HTTP_304_NOT_MODIFIED,
+                    ],
+                )
+                return response
+        except aiohttp.ClientError as e:
+            logger.warning("Cedar Agent connection error: {err}", err=repr(e))
+            raise
 
     @affects_transaction
     @retry(**RETRY_CONFIG)
@@ -205,24 +225,24 @@ class CedarClient(BasePolicyStoreClient):
         if path != "":
             raise ValueError("Cedar can only change the entire data structure at once.")
 
-        async with aiohttp.ClientSession() as session:
-            try:
-                headers = await self._get_auth_headers()
-
-                async with session.delete(
-                    f"{self._cedar_url}/data", headers=headers
-                ) as cedar_response:
-                    response = await proxy_response_unless_invalid(
-                        cedar_response,
-                        accepted_status_codes=[
-                            status.HTTP_204_NO_CONTENT,
-                            status.HTTP_404_NOT_FOUND,
-                        ],
-                    )
-                    return response
-            except aiohttp.ClientError as e:
-                logger.warning("Cedar Agent connection error: {err}", err=repr(e))
-                raise
+        session = self._http_session.get()
+        try:
+            headers = await self._get_auth_headers()
+
+            async with session.delete(
+                f"{self._cedar_url}/data", headers=headers
+            ) as cedar_response:
+                response = await proxy_response_unless_invalid(
+                    cedar_response,
+                    accepted_status_codes=[
+                        status.HTTP_204_NO_CONTENT,
+                        status.HTTP_404_NOT_FOUND,
+                    ],
+                )
+                return response
+        except aiohttp.ClientError as e:
+            logger.warning("Cedar Agent connection error: {err}", err=repr(e))
+            raise
 
     @fail_silently()
     @retry(**RETRY_CONFIG)
@@ -238,12 +258,12 @@ class CedarClient(BasePolicyStoreClient):
         try:
             headers = await self._get_auth_headers()
 
-            async with aiohttp.ClientSession() as session:
-                async with session.get(
-                    f"{self._cedar_url}/data", headers=headers
-                ) as cedar_response:
-                    json_response = await cedar_response.json()
-                    return json_response
+            session = self._http_session.get()
+            async with session.get(
+                f"{self._cedar_url}/data", headers=headers
+            ) as cedar_response:
+                json_response = await cedar_response.json()
+                return json_response
         except aiohttp.ClientError as e:
             logger.warning("Cedar Agent connection error: {err}", err=repr(e))
             raise
@@ -273,24 +293,36 @@ class CedarClient(BasePolicyStoreClient):
             and self._most_recent_data_transaction.success
         )
 
-    async def full_export(self, writer: AsyncTextIOWrapper) -> None:
+    async def export_state(self) -> StoreState:
         policies = await self.get_policies()
         data = await self.get_data("")
-        await writer.write(
-            json.dumps({"policies": policies, "data": data}, default=str)
-        )
+        # (no policy version - a bundle that is partially set can't be told apart)
+        return StoreState(policies=policies, data=data)
 
-    async def full_import(self, reader: AsyncTextIOWrapper) -> None:
-        import_data = json.loads(await reader.read())
+    async def import_state(self, state: StoreState) -> None:
+        # (cedar policies don't depend on each other, and the data is written at once)
+        semaphore = asyncio.Semaphore(
+            opal_client_config.POLICY_STORE_RESTORE_CONCURRENCY
+        )
+        progress = ImportProgress("policies", len(state.policies))
 
-        for id, raw in import_data["policies"].items():
-            self.set_policy(policy_id=id, policy_code=raw)
+        async def set_policy(policy_id: str, policy_code: str):
+            async with semaphore:
+                await self.set_policy(policy_id=policy_id, policy_code=policy_code)
+            progress.advance()
 
-        await self.set_policy_data(import_data["data"])
+        await asyncio.gather(
+            *(set_policy(id, raw) for id, raw in state.policies.items()),
+            self.set_policy_data(state.data),
+        )
+        progress.complete()
 
     async def get_policy_version(self) -> Optional[str]:
         return self._policy_version
 
+    async def set_policy_version(self, version: Optional[str]):
+        self._policy_version = version
+
     @affects_transaction
     async def set_policies(
         self, bundle: PolicyBundle, transaction_id: Optional[str] = None
@@ -0,0 +1,76 @@
+import asyncio
+from typing import Optional
+
+import aiohttp
+from opal_client.logger import logger
+
+
+class PolicyStoreHttpSession:
+    """Holds a single long-lived aiohttp session (and its keep-alive connection
+    pool) used by a policy store client for all its requests.
+
+    - The session is created lazily, inside the running event loop, on first use.
+    - If the policy store is reachable via a unix domain socket (i.e: inline OPA
+      listening on unix://), all requests are sent through that socket.
+    - Call close() on shutdown to release pooled connections.
+    """
+
+    DEFAULT_POOL_SIZE = 100
+    DEFAULT_KEEPALIVE_TIMEOUT = 15
+
+    def __init__(
+        self,
+        pool_size: int = DEFAULT_POOL_SIZE,
+        keepalive_timeout: float = DEFAULT_KEEPALIVE_TIMEOUT,
+        unix_socket: Optional[str] = None,
+    ):
+        """
+        Args:
+            pool_size (int, optional): max number of simultaneous connections to the policy store (0 for unlimited).
+            keepalive_timeout (float, optional): time in seconds to keep an idle connection open for reuse.
+            unix_socket (str, optional): path of a unix domain socket to connect through instead of TCP.
+        """
+        self._pool_size = pool_size
+        self._keepalive_timeout = keepalive_timeout
+        self._unix_socket = unix_socket
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    @property
+    def unix_socket(self) -> Optional[str]:
+        return self._unix_socket
+
+    def _create_connector(self) -> aiohttp.BaseConnector:
+        if self._unix_socket:
+            return aiohttp.UnixConnector(
+                path=self._unix_socket,
+                limit=self._pool_size,
+                keepalive_timeout=self._keepalive_timeout,
+            )
+        return aiohttp.TCPConnector(
+            limit=self._pool_size,
+            keepalive_timeout=self._keepalive_timeout,
+        )
+
+    def get(self) -> aiohttp.ClientSession:
+        """Returns the shared session, (re)creating it if it was never created,
+        was closed, or belongs to an event loop that is no longer running."""
+        loop = asyncio.get_running_loop()
+        if self._session is None or self._session.closed or self._loop is not loop:
+            if self._session is not None and not self._session.closed:
+                logger.debug(
+                    "Dropping policy store http session bound to a stale event loop"
+                )
+            self._session = aiohttp.ClientSession(connector=self._create_connector())
+            self._loop = loop
+        return self._session
+
+    async def close(self):
+        """Closes the session and all the pooled connections it holds."""
+        session, self._session = self._session, None
+        if session is None or session.closed:
+            return
+        if self._loop is not asyncio.get_running_loop():
+            # cannot gracefully close connections owned by another loop
+            return
+        await session.close()
@@ -0,0 +1,326 @@
+import asyncio
+import hashlib
+import itertools
+import os
+import shutil
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, List, Optional, TypeVar
+
+from opal_client.logger import logger
+from opal_common import json_codec
+from opal_common.schemas.store import JSONPatchAction
+
+JOURNAL_VERSION = 1
+
+T = TypeVar("T")
+
+
+def _header(follows: Optional[str]) -> bytes:
+    return json_codec.dumps({"journal": JOURNAL_VERSION, "follows": follows}) + b"\n"
+
+
+def _read_header(path: str) -> Optional[Dict[str, Any]]:
+    try:
+        with open(path, "rb") as f:
+            header = json_codec.loads(f.readline())
+    except FileNotFoundError:
+        return None
+    except ValueError:
+        logger.warning("Corrupted store journal header: {path}", path=path)
+        return None
+    if not isinstance(header, dict) or header.get("journal") != JOURNAL_VERSION:
+        return None
+    return header
+
+
+def _file_digest(path: str) -> Optional[str]:
+    if not os.path.isfile(path):
+        return None
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+async def file_digest(path: str) -> Optional[str]:
+    """The digest of a (snapshot) file, None if it does not exist."""
+    return await asyncio.get_running_loop().run_in_executor(None, _file_digest, path)
+
+
+class DigestingWriter:
+    """Wraps the writer of a snapshot, to digest it as it's written (rather
+    than reading it again)."""
+
+    def __init__(self, writer):
+        self._writer = writer
+        self._digest = hashlib.sha256()
+
+    async def write(self, content: bytes):
+        self._digest.update(content)
+        return await self._writer.write(content)
+
+    def hexdigest(self) -> str:
+        return self._digest.hexdigest()
+
+
+class StoreJournal:
+    """An append-only journal of the writes to the policy store, kept next to
+    its snapshot (the backup file), so backing up the store costs as much as
+    the data that changed rather than a full export of the store.
+
+    - every successful write (set / patch / delete data, set / delete policy, and the
+      policy version) is appended to the journal
+    - the store is restored by importing the snapshot, and replaying the journal
+    - once the journal grew large (relative to the snapshot), it is compacted: the
+      journal is rotated aside and a new snapshot is exported, and the rotated journal
+      is dropped once the new snapshot is in place. Writes wait only for the rotation,
+      and for the data of the new snapshot to be captured (so it holds exactly the
+      rotated writes) - not for the export itself
+
+    The journal files are read and written by a dedicated thread (in the order of the
+    writes), never on the event loop.
+
+    Each journal names (by digest) the snapshot it follows, so a journal is never
+    replayed over a snapshot that already holds its writes (i.e: a compaction that
+    was interrupted after the new snapshot was in place).
+    """
+
+    # records read from the journal files at a time
+    READ_BATCH_SIZE = 1000
+
+    def __init__(self, snapshot_path: str):
+        base = os.path.splitext(snapshot_path)[0]
+        self.path = f"{base}.journal.ndjson"
+        self.compacting_path = f"{base}.journal.compacting.ndjson"
+        self._file = None
+        # the size of the records that are not in the snapshot (and of the rotated ones)
+        self._size = 0
+        self._rotated_size = 0
+        # writes wait while the journal is rotated (and the snapshot is exported)
+        self._writes_allowed = asyncio.Event()
+        self._writes_allowed.set()
+        self._active_writes = 0
+        self._writes_done = asyncio.Event()
+        self._writes_done.set()
+        # (a single thread, so the journal is written in order)
+        self._executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="store-journal"
+        )
+
+    async def _run(self, func, *args):
+        return await asyncio.get_running_loop().run_in_executor(
+            self._executor, func, *args
+        )
+
+    @property
+    def size(self) -> int:
+        """The size of the journaled writes that are not in the snapshot."""
+        return self._size
+
+    @property
+    def is_open(self) -> bool:
+        return self._file is not None
+
+    def _replayed_paths(self, snapshot_digest: Optional[str]) -> List[str]:
+        """The journals to replay over the snapshot (in order)."""
+        compacting = _read_header(self.compacting_path)
+        live = _read_header(self.path)
+        if compacting is not None and compacting["follows"] == snapshot_digest:
+            # the compaction did not complete - the snapshot is the one both follow
+            return [self.compacting_path] + ([self.path] if live is not None else [])
+        if live is None:
+            return []
+        if (
+            live["follows"] == snapshot_digest
+            or (compacting is not None and live["follows"] == compacting["follows"])
+            or snapshot_digest in self._snapshot_markers(self.path)
+        ):
+            return [self.path]
+        logger.warning(
+            "The store journal does not follow the store snapshot, ignoring it"
+        )
+        return []
+
+    @staticmethod
+    def _snapshot_markers(path: str) -> List[str]:
+        with open(path, "rb") as f:
+            return [
+                json_codec.loads(line)["snapshot"]
+                for line in f
+                if line.startswith(b'{"snapshot"')
+            ]
+
+    async def records(
+        self, snapshot_digest: Optional[str]
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """The journaled writes that are not in the snapshot, in the order they
+        were written (read a batch at a time)."""
+        for path in await self._run(self._replayed_paths, snapshot_digest):
+            records = self._read_records(path)
+            try:
+                while batch := await self._run(
+                    list, itertools.islice(records, self.READ_BATCH_SIZE)
+                ):
+                    for record in batch:
+                        yield record
+            finally:
+                await self._run(records.close)
+
+    @staticmethod
+    def _read_records(path: str) -> Iterator[Dict[str, Any]]:
+        with open(path, "rb") as f:
+            f.readline()
+            for line in f:
+                if not line.endswith(b"\n"):
+                    # a record that was not completely written
+                    logger.warning("Ignoring a truncated store journal record")
+                    break
+                record = json_codec.loads(line)
+                if "op" in record:
+                    yield record
+
+    async def open(self, snapshot_digest: Optional[str]):
+        """Starts journaling (once the store is restored from the snapshot and
+        the journal)."""
+        await self._run(self._open, snapshot_digest)
+
+    def _open(self, snapshot_digest: Optional[str]):
+        replayed = self._replayed_paths(snapshot_digest)
+        # (journals that were not replayed hold writes that are in the snapshot, or
+        # that do not follow it)
+        for path in (self.path, self.compacting_path):
+            if path not in replayed and os.path.isfile(path):
+                os.remove(path)
+        if not os.path.isfile(self.path):
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            # (follows the snapshot, or the rotated journal that follows it)
+            with open(self.path, "wb") as f:
+                f.write(_header(snapshot_digest))
+        self._size = sum(
+            os.path.getsize(path) - len(_header(_read_header(path)["follows"]))
+            for path in replayed
+        )
+        self._file = open(self.path, "ab")
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    @asynccontextmanager
+    async def writing(self) -> AsyncIterator[None]:
+        """Wraps a write to the policy store (that is appended once done)."""
+        while not self._writes_allowed.is_set():
+            await self._writes_allowed.wait()
+        self._active_writes += 1
+        self._writes_done.clear()
+        try:
+            yield
+        finally:
+            self._active_writes -= 1
+            if self._active_writes == 0:
+                self._writes_done.set()
+
+    async def append(self, op: str, value: Optional[bytes] = None, **fields):
+        """Appends a write (its value is given encoded as JSON)."""
+        if self._file is None:
+            return
+        record = json_codec.dumps({"op": op, **fields})
+        if value is not None:
+            record = b"".join([record[:-1], b',"value":', value, b"}"])
+        self._size += len(record) + 1
+        await self._run(self._write, record + b"\n")
+
+    def _write(self, record: bytes):
+        self._file.write(record)
+        # (written through to the OS, so it survives the process)
+        self._file.flush()
+
+    async def rotate(self, capture: Optional[Callable[[], T]] = None) -> Optional[T]:
+        """Rotates the journal aside, for a new snapshot to be exported (@see
+        compacted).
+
+        Writes wait only until the journal is rotated, and `capture` (if
+        given) is called - so what it captures of the store holds exactly the
+        rotated writes, and its result is returned.
+        """
+        self._writes_allowed.clear()
+        try:
+            await self._writes_done.wait()
+            await self._run(self._rotate)
+            self._rotated_size = self._size
+            return capture() if capture is not None else None
+        finally:
+            self._writes_allowed.set()
+
+    def _rotate(self):
+        self.close()
+        follows = _read_header(self.path)["follows"]
+        if os.path.isfile(self.compacting_path):
+            # a previous compaction failed - the rotated journal is appended to
+            with open(self.compacting_path, "ab") as compacting, open(
+                self.path, "rb"
+            ) as live:
+                live.readline()
+                shutil.copyfileobj(live, compacting)
+            follows = _read_header(self.compacting_path)["follows"]
+            os.remove(self.path)
+        else:
+            os.replace(self.path, self.compacting_path)
+        with open(self.path, "wb") as f:
+            f.write(_header(follows))
+        self._file = open(self.path, "ab")
+
+    async def compacted(self, snapshot_digest: str):
+        """Drops the rotated journal, once the new snapshot is in place."""
+        await self._run(self._compacted, snapshot_digest)
+        self._size -= self._rotated_size
+        self._rotated_size = 0
+
+    def _compacted(self, snapshot_digest: str):
+        self._write(json_codec.dumps({"snapshot": snapshot_digest}) + b"\n")
+        if os.path.isfile(self.compacting_path):
+            os.remove(self.compacting_path)
+
+
+async def replay_journal(store, records: AsyncIterator[Dict[str, Any]]) -> List[str]:
+    """Replays journaled writes into the policy store.
+
+    Returns:
+        List[str]: the data paths that were written
+    """
+    written = []
+    async for record in records:
+        op = record["op"]
+        try:
+            if op == "set_policy":
+                await store.set_policy(record["id"], record["value"])
+            elif op == "delete_policy":
+                await store.delete_policy(record["id"])
+            elif op == "set_data":
+                await store.set_policy_data(record["value"], path=record["path"])
+            elif op == "patch_data":
+                value = record["value"]
+                if isinstance(value, list):
+                    value = [JSONPatchAction(**action) for action in value]
+                await store.patch_policy_data(value, path=record["path"])
+            elif op == "delete_data":
+                await store.delete_policy_data(path=record["path"])
+            elif op == "policy_version":
+                await store.set_policy_version(record["value"])
+            else:
+                logger.warning("Unknown store journal record: {op}", op=op)
+                continue
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning(
+                "Failed to replay store journal record ({op}): {err}",
+                op=op,
+                err=repr(e),
+            )
+        if "path" in record:
+            written.append(record["path"])
+    return written
@@ -1,13 +1,13 @@
 import asyncio
 import json
-from typing import Any, Dict, List, Optional
+from typing import Any, AsyncIterator, Dict, List, Optional
 
 import jsonpatch
 from opal_client.policy_store.base_policy_store_client import (
     BasePolicyStoreClient,
     JsonableValue,
 )
-from opal_client.utils import exclude_none_fields
+from opal_client.utils import exclude_none_fields, policy_data_value
 from opal_common.schemas.policy import PolicyBundle
 from opal_common.schemas.store import JSONPatchAction, StoreTransaction
 from pydantic import BaseModel
@@ -55,9 +55,22 @@ class MockPolicyStoreClient(BasePolicyStoreClient):
         path: str = "",
         transaction_id: Optional[str] = None,
     ):
-        self._data[path] = policy_data
+        self._data[path] = policy_data_value(policy_data)
         self.has_data_event.set()
 
+    @property
+    def supports_data_streaming(self) -> bool:
+        return True
+
+    async def set_policy_data_stream(
+        self,
+        chunks: AsyncIterator[bytes],
+        path: str = "",
+        transaction_id: Optional[str] = None,
+    ):
+        content = b"".join([chunk async for chunk in chunks])
+        await self.set_policy_data(json.loads(content), path, transaction_id)
+
     async def patch_policy_data(
         self,
         policy_data: List[JSONPatchAction],
@@ -3,23 +3,31 @@ import functools
 import json
 import ssl
 import time
-from typing import Any, Awaitable, Callable, Dict, List, Optional, Set
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Set
 from urllib.parse import urlencode
 
 import aiohttp
 import dpath
 import jsonpatch
-from aiofiles.threadpool.text import AsyncTextIOWrapper
 from fastapi import Response, status
 from opal_client.config import opal_client_config
 from opal_client.logger import logger
 from opal_client.policy_store.base_policy_store_client import (
     BasePolicyStoreClient,
+    ImportProgress,
     JsonableValue,
+    StoreState,
 )
+from opal_client.policy_store.http_session import PolicyStoreHttpSession
+from opal_client.policy_store.journal import StoreJournal
 from opal_client.policy_store.schemas import PolicyStoreAuth
-from opal_client.utils import exclude_none_fields, proxy_response
-from opal_common.engine.parsing import get_rego_package
+from opal_client.utils import policy_data_content, policy_data_value, proxy_response
+from opal_common import json_codec
+from opal_common.engine.parsing import (
+    get_rego_package,
+    sort_rego_modules_by_dependencies,
+)
 from opal_common.git_utils.bundle_utils import BundleUtils
 from opal_common.paths import PathUtils
 from opal_common.schemas.policy import DataModule, PolicyBundle, RegoModule
@@ -282,7 +290,7 @@ class OpaStaticDataCache:
         for i, _ in enumerate(data):
             if not path == "/":
                 data[i].path = path + data[i].path
-        patch = jsonpatch.JsonPatch.from_string(json.dumps(exclude_none_fields(data)))
+        patch = jsonpatch.JsonPatch(json_codec.loads(policy_data_content(data)))
         patch.apply(self._root_data, in_place=True)
 
     def delete(self, path):
@@ -314,6 +322,9 @@ class OpaClient(BasePolicyStoreClient):
         tls_client_cert: Optional[str] = None,
         tls_client_key: Optional[str] = None,
         tls_ca: Optional[str] = None,
+        conn_pool_size: Optional[int] = None,
+        conn_keepalive_timeout: Optional[float] = None,
+        unix_socket: Optional[str] = None,
     ):
         base_url = opa_server_url or opal_client_config.POLICY_STORE_URL
         self._opa_url = f"{base_url}/v1"
@@ -378,6 +389,17 @@ class OpaClient(BasePolicyStoreClient):
             else {}
         )
 
+        # a single keep-alive connection pool shared by all requests to OPA
+        self._http_session = PolicyStoreHttpSession(
+            pool_size=conn_pool_size
+            if conn_pool_size is not None
+            else opal_client_config.POLICY_STORE_CONN_POOL_SIZE,
+            keepalive_timeout=conn_keepalive_timeout
+            if conn_keepalive_timeout is not None
+            else opal_client_config.POLICY_STORE_CONN_KEEPALIVE_TIMEOUT,
+            unix_socket=unix_socket,
+        )
+
         self._transaction_state = OpaTransactionLogState(
             data_updater_enabled=data_updater_enabled,
             policy_updater_enabled=policy_updater_enabled,
@@ -388,6 +410,7 @@ class OpaClient(BasePolicyStoreClient):
         self._policy_data_cache: Optional[OpaStaticDataCache] = None
         if cache_policy_data:
             self._policy_data_cache = OpaStaticDataCache()
+        self._journal: Optional[StoreJournal] = None
 
     def _get_custom_ssl_context(self) -> Optional[ssl.SSLContext]:
         if not self._tls_ca:
@@ -407,6 +430,15 @@ class OpaClient(BasePolicyStoreClient):
     async def get_policy_version(self) -> Optional[str]:
         return self._policy_version
 
+    async def set_policy_version(self, version: Optional[str]):
+        self._policy_version = version
+        if self._journal:
+            async with self._journaled_write():
+                await self._journal.append("policy_version", json_codec.dumps(version))
+
+    async def close(self):
+        await self._http_session.close()
+
     @retry(**RETRY_CONFIG)
     async def _get_oauth_token(self):
         logger.info("Retrieving a new OAuth access_token.")
@@ -475,63 +507,72 @@ class OpaClient(BasePolicyStoreClient):
                 f"Ignoring setting policy - {policy_id}, set in POLICY_STORE_POLICY_PATHS_TO_IGNORE."
             )
             return
-        async with aiohttp.ClientSession() as session:
-            try:
-                headers = await self._get_auth_headers()
-
-                async with session.put(
-                    f"{self._opa_url}/policies/{policy_id}",
-                    data=policy_code,
-                    headers={"content-type": "text/plain", **headers},
-                    **self._ssl_context_kwargs,
-                ) as opa_response:
-                    return await proxy_response_unless_invalid(
-                        opa_response,
-                        accepted_status_codes=[
-                            status.HTTP_200_OK,
-                            # No point in immediate retry, this means erroneous rego (bad syntax, duplicated definition, etc)
-                            status.HTTP_400_BAD_REQUEST,
-                        ],
+        session = self._http_session.get()
+        try:
+            headers = await self._get_auth_headers()
+
+            async with self._journaled_write(), session.put(
+                f"{self._opa_url}/policies/{policy_id}",
+                data=policy_code,
+                headers={"content-type": "text/plain", **headers},
+                **self._ssl_context_kwargs,
+            ) as opa_response:
+                response = await proxy_response_unless_invalid(
+                    opa_response,
+                    accepted_status_codes=[
+                        status.HTTP_200_OK,
+                        # No point in immediate retry, this means erroneous rego (bad syntax, duplicated definition, etc)
+                        status.HTTP_400_BAD_REQUEST,
+                    ],
+                )
+                if (
+                    self._journal
+                    and response.status_code == status.HTTP_200_OK
+                    and policy_id not in self._builtin_module_ids()
+                ):
+                    await self._journal.append(
+                        "set_policy", json_codec.dumps(policy_code), id=policy_id
                     )
-            except aiohttp.ClientError as e:
-                logger.warning("Opa connection error: {err}", err=repr(e))
-                raise
+                return response
+        except aiohttp.ClientError as e:
+            logger.warning("Opa connection error: {err}", err=repr(e))
+            raise
 
     @fail_silently()
     @retry(**RETRY_CONFIG)
     async def get_policy(self, policy_id: str) -> Optional[str]:
-        async with aiohttp.ClientSession() as session:
-            try:
-                headers = await self._get_auth_headers()
-
-                async with session.get(
-                    f"{self._opa_url}/policies/{policy_id}",
-                    headers=headers,
-                    **self._ssl_context_kwargs,
-                ) as opa_response:
-                    result = await opa_response.json()
-                    return result.get("result", {}).get("raw", None)
-            except aiohttp.ClientError as e:
-                logger.warning("Opa connection error: {err}", err=repr(e))
-                raise
+        session = self._http_session.get()
+        try:
+            headers = await self._get_auth_headers()
+
+            async with session.get(
+                f"{self._opa_url}/policies/{policy_id}",
+                headers=headers,
+                **self._ssl_context_kwargs,
+            ) as opa_response:
+                result = await opa_response.json()
+                return result.get("result", {}).get("raw", None)
+        except aiohttp.ClientError as e:
+            logger.warning("Opa connection error: {err}", err=repr(e))
+            raise
 
     @fail_silently()
     @retry(**RETRY_CONFIG)
     async def get_policies(self) -> Optional[Dict[str, str]]:
-        async with aiohttp.ClientSession() as session:
-            try:
-                headers = await self._get_auth_headers()
-
-                async with session.get(
-                    f"{self._opa_url}/policies",
-                    headers=headers,
-                    **self._ssl_context_kwargs,
-                ) as opa_response:
-                    result = await opa_response.json()
-                    return OpaClient._extract_modules_from_policies_json(result)
-            except aiohttp.ClientError as e:
-                logger.warning("Opa connection error: {err}", err=repr(e))
-                raise
+        session = self._http_session.get()
+        try:
+            headers = await self._get_auth_headers()
+
+            async with session.get(
+                f"{self._opa_url}/policies",
+                headers=headers,
+                **self._ssl_context_kwargs,
+            ) as opa_response:
+                result = await opa_response.json()
+                return OpaClient._extract_modules_from_policies_json(result)
+        except aiohttp.ClientError as e:
+            logger.warning("Opa connection error: {err}", err=repr(e))
+            raise
 
     @affects_transaction
     @retry(**RETRY_CONFIG)
@@ -545,30 +586,37 @@ class OpaClient(BasePolicyStoreClient):
             )
             return
 
-        async with aiohttp.ClientSession() as session:
-            try:
-                headers = await self._get_auth_headers()
-
-                async with session.delete(
-                    f"{self._opa_url}/policies/{policy_id}",
-                    headers=headers,
-                    **self._ssl_context_kwargs,
-                ) as opa_response:
-                    return await proxy_response_unless_invalid(
-                        opa_response,
-                        accepted_status_codes=[
-                            status.HTTP_200_OK,
-                            status.HTTP_404_NOT_FOUND,
-                        ],
-                    )
-            except aiohttp.ClientError as e:
-                logger.warning("Opa connection error: {err}", err=repr(e))
-                raise
+        session = self._http_session.get()
+        try:
+            headers = await self._get_auth_headers()
+
+            async with self._journaled_write(), session.delete(
+                f"{self._opa_url}/policies/{policy_id}",
+                headers=headers,
+                **self._ssl_context_kwargs,
+            ) as opa_response:
+                response = await proxy_response_unless_invalid(
+                    opa_response,
+                    accepted_status_codes=[
+                        status.HTTP_200_OK,
+                        status.HTTP_404_NOT_FOUND,
+                    ],
+                )
+                if self._journal:
+                    await self._journal.append("delete_policy", id=policy_id)
+                return response
+        except aiohttp.ClientError as e:
+            logger.warning("Opa connection error: {err}", err=repr(e))
+            raise
 
     async def get_policy_module_ids(self) -> List[str]:
         modules = await self.get_policies()
         return modules.keys()
 
+    @staticmethod
+    def _builtin_module_ids() -> List[str]:
+        return [opal_client_config.OPA_HEALTH_CHECK_POLICY_PATH]
+
     @staticmethod
     def _extract_modules_from_policies_json(result: Dict[str, Any]) -> Dict[str, str]:
         """return all module ids in OPA cache who are not:
@@ -577,7 +625,7 @@ class OpaClient(BasePolicyStoreClient):
         - all modules with package name starting with "system" (special OPA policies)
         """
         policies: List[Dict[str, Any]] = result.get("result", [])
-        builtin_modules = [opal_client_config.OPA_HEALTH_CHECK_POLICY_PATH]
+        builtin_modules = OpaClient._builtin_module_ids()
 
         modules = {}
         for policy in policies:
@@ -654,6 +702,9 @@ class OpaClient(BasePolicyStoreClient):
         )
 
         async with self._lock:
+            # (the policies are of no known version until the bundle is applied)
+            await self.set_policy_version(None)
+
             # save bundled policy *static* data into store
             for module in BundleUtils.sorted_data_modules_to_load(bundle):
                 await self._set_policy_data_from_bundle_data_module(
@@ -677,10 +728,13 @@ class OpaClient(BasePolicyStoreClient):
                 await self.delete_policy(policy_id=module_id)
 
             # save policy version (hash) into store
-            self._policy_version = bundle.hash
+            await self.set_policy_version(bundle.hash)
 
     async def _set_policies_from_delta_bundle(self, bundle: PolicyBundle):
         async with self._lock:
+            # (the policies are of no known version until the bundle is applied)
+            await self.set_policy_version(None)
+
             # save bundled policy *static* data into store
             for module in BundleUtils.sorted_data_modules_to_load(bundle):
                 await self._set_policy_data_from_bundle_data_module(
@@ -709,7 +763,7 @@ class OpaClient(BasePolicyStoreClient):
             )
 
             # save policy version (hash) into store
-            self._policy_version = bundle.hash
+            await self.set_policy_version(bundle.hash)
 
     @classmethod
     def _safe_data_module_path(cls, path: str):
@@ -753,35 +807,73 @@ class OpaClient(BasePolicyStoreClient):
         path = self._safe_data_module_path(path)
 
         # in OPA, the root document must be an object, so we must wrap list values
-        if not path and isinstance(policy_data, list):
+        if not path and isinstance(policy_data_value(policy_data), list):
             logger.warning(
                 "OPAL client was instructed to put a list on OPA's root document. In OPA the root document must be an object so the original value was wrapped."
             )
-            policy_data = {"items": policy_data}
+            policy_data = {"items": policy_data_value(policy_data)}
 
-        async with aiohttp.ClientSession() as session:
-            try:
-                headers = await self._get_auth_headers()
-                data = json.dumps(exclude_none_fields(policy_data))
-                async with session.put(
-                    f"{self._opa_url}/data{path}",
-                    data=data,
-                    headers=headers,
-                    **self._ssl_context_kwargs,
-                ) as opa_response:
-                    response = await proxy_response_unless_invalid(
-                        opa_response,
-                        accepted_status_codes=[
-                            status.HTTP_204_NO_CONTENT,
-                            status.HTTP_304_NOT_MODIFIED,
-                        ],
-                    )
-                    if self._policy_data_cache:
-                        self._policy_data_cache.set(path, json.loads(data))
-                    return response
-            except aiohttp.ClientError as e:
-                logger.warning("Opa connection error: {err}", err=repr(e))
-                raise
+        session = self._http_session.get()
+        try:
+            headers = await self._get_auth_headers()
+            # encoded once, and reused for the cache
+            data = policy_data_content(policy_data)
+            async with self._journaled_write(), session.put(
+                f"{self._opa_url}/data{path}",
+                data=data,
+                headers=headers,
+                **self._ssl_context_kwargs,
+            ) as opa_response:
+                response = await proxy_response_unless_invalid(
+                    opa_response,
+                    accepted_status_codes=[
+                        status.HTTP_204_NO_CONTENT,
+                        status.HTTP_304_NOT_MODIFIED,
+                    ],
+                )
+                if self._policy_data_cache:
+                    self._policy_data_cache.set(path, json_codec.loads(data))
+                if self._journal:
+                    await self._journal.append("set_data", data, path=path)
+                return response
+        except aiohttp.ClientError as e:
+            logger.warning("Opa connection error: {err}", err=repr(e))
+            raise
+
+    @property
+    def supports_data_streaming(self) -> bool:
+        # the static data cache (and the journal) need the parsed data
+        return self._policy_data_cache is None and self._journal is None
+
+    @affects_transaction
+    async def set_policy_data_stream(
+        self,
+        chunks: AsyncIterator[bytes],
+        path: str = "",
+        transaction_id: Optional[str] = None,
+    ):
+        # (not retried - the chunks can only be consumed once)
+        path = self._safe_data_module_path(path)
+        session = self._http_session.get()
+        try:
+            headers = await self._get_auth_headers()
+            headers["Content-Type"] = "application/json"
+            async with session.put(
+                f"{self._opa_url}/data{path}",
+                data=chunks,
+                headers=headers,
+                **self._ssl_context_kwargs,
+            ) as opa_response:
+                return await proxy_response_unless_invalid(
+                    opa_response,
+                    accepted_status_codes=[
+                        status.HTTP_204_NO_CONTENT,
+                        status.HTTP_304_NOT_MODIFIED,
+                    ],
+                )
+        except aiohttp.ClientError as e:
+            logger.warning("Opa connection error: {err}", err=repr(e))
+            raise
 
     @affects_transaction
     @retry(**RETRY_CONFIG)
@@ -800,30 +892,33 @@ class OpaClient(BasePolicyStoreClient):
             )
             policy_data = {"items": policy_data}
 
-        async with aiohttp.ClientSession() as session:
-            try:
-                headers = await self._get_auth_headers()
-                headers["Content-Type"] = "application/json-patch+json"
-
-                async with session.patch(
-                    f"{self._opa_url}/data{path}",
-                    data=json.dumps(exclude_none_fields(policy_data)),
-                    headers=headers,
-                    **self._ssl_context_kwargs,
-                ) as opa_response:
-                    response = await proxy_response_unless_invalid(
-                        opa_response,
-                        accepted_status_codes=[
-                            status.HTTP_204_NO_CONTENT,
-                            status.HTTP_304_NOT_MODIFIED,
-                        ],
-                    )
-                    if self._policy_data_cache:
-                        self._policy_data_cache.patch(path, policy_data)
-                    return response
-            except aiohttp.ClientError as e:
-                logger.warning("Opa connection error: {err}", err=repr(e))
-                raise
+        session = self._http_session.get()
+        try:
+            headers = await self._get_auth_headers()
+            headers["Content-Type"] = "application/json-patch+json"
+            data = policy_data_content(policy_data)
+
+            async with self._journaled_write(), session.patch(
+                f"{self._opa_url}/data{path}",
+                data=data,
+                headers=headers,
+                **self._ssl_context_kwargs,
+            ) as opa_response:
+                response = await proxy_response_unless_invalid(
+                    opa_response,
+                    accepted_status_codes=[
+                        status.HTTP_204_NO_CONTENT,
+                        status.HTTP_304_NOT_MODIFIED,
+                    ],
+                )
+                if self._policy_data_cache:
+                    self._policy_data_cache.patch(path, policy_data)
+                if self._journal:
+                    await self._journal.append("patch_data", data, path=path)
+                return response
+        except aiohttp.ClientError as e:
+            logger.warning("Opa connection error: {err}", err=repr(e))
+            raise
 
     @affects_transaction
     @retry(**RETRY_CONFIG)
@@ -834,28 +929,30 @@ class OpaClient(BasePolicyStoreClient):
         if not path:
             return await self.set_policy_data({})
 
-        async with aiohttp.ClientSession() as session:
-            try:
-                headers = await self._get_auth_headers()
-
-                async with session.delete(
-                    f"{self._opa_url}/data{path}",
-                    headers=headers,
-                    **self._ssl_context_kwargs,
-                ) as opa_response:
-                    response = await proxy_response_unless_invalid(
-                        opa_response,
-                        accepted_status_codes=[
-                            status.HTTP_204_NO_CONTENT,
-                            status.HTTP_404_NOT_FOUND,
-                        ],
-                    )
-                    if self._policy_data_cache:
-                        self._policy_data_cache.delete(path)
-                    return response
-            except aiohttp.ClientError as e:
-                logger.warning("Opa connection error: {err}", err=repr(e))
-                raise
+        session = self._http_session.get()
+        try:
+            headers = await self._get_auth_headers()
+
+            async with self._journaled_write(), session.delete(
+                f"{self._opa_url}/data{path}",
+                headers=headers,
+                **self._ssl_context_kwargs,
+            ) as opa_response:
+                response = await proxy_response_unless_invalid(
+                    opa_response,
+                    accepted_status_codes=[
+                        status.HTTP_204_NO_CONTENT,
+                        status.HTTP_404_NOT_FOUND,
+                    ],
+                )
+                if self._policy_data_cache:
+                    self._policy_data_cache.delete(path)
+                if self._journal:
+                    await self._journal.append("delete_data", path=path)
+                return response
+        except aiohttp.ClientError as e:
+            logger.warning("Opa connection error: {err}", err=repr(e))
+            raise
 
     @fail_silently()
     @retry(**RETRY_CONFIG)
@@ -872,14 +969,14 @@ class OpaClient(BasePolicyStoreClient):
         try:
             headers = await self._get_auth_headers()
 
-            async with aiohttp.ClientSession() as session:
-                async with session.get(
-                    f"{self._opa_url}/data{path}",
-                    headers=headers,
-                    **self._ssl_context_kwargs,
-                ) as opa_response:
-                    json_response = await opa_response.json()
-                    return json_response.get("result", {})
+            session = self._http_session.get()
+            async with session.get(
+                f"{self._opa_url}/data{path}",
+                headers=headers,
+                **self._ssl_context_kwargs,
+            ) as opa_response:
+                json_response = await opa_response.json()
+                return json_response.get("result", {})
         except aiohttp.ClientError as e:
             logger.warning("Opa connection error: {err}", err=repr(e))
             raise
@@ -902,14 +999,14 @@ class OpaClient(BasePolicyStoreClient):
         try:
             headers = await self._get_auth_headers()
 
-            async with aiohttp.ClientSession() as session:
-                async with session.post(
-                    f"{self._opa_url}/data/{path}",
-                    data=json.dumps(opa_input),
-                    headers=headers,
-                    **self._ssl_context_kwargs,
-                ) as opa_response:
-                    return await proxy_response(opa_response)
+            session = self._http_session.get()
+            async with session.post(
+                f"{self._opa_url}/data/{path}",
+                data=json.dumps(opa_input),
+                headers=headers,
+                **self._ssl_context_kwargs,
+            ) as opa_response:
+                return await proxy_response(opa_response)
         except aiohttp.ClientError as e:
             logger.warning("Opa connection error: {err}", err=repr(e))
             raise
@@ -951,21 +1048,103 @@ class OpaClient(BasePolicyStoreClient):
     async def is_healthy(self) -> bool:
         return self._transaction_state.healthy
 
-    async def full_export(self, writer: AsyncTextIOWrapper) -> None:
+    @property
+    def supports_journal(self) -> bool:
+        # the snapshots the journal follows are exported from the static data cache
+        return self._policy_data_cache is not None
+
+    def attach_journal(self, journal: StoreJournal):
+        self._journal = journal
+
+    def capture_data(self) -> JsonableValue:
+        # (a copy of the cached data - encoded and decoded, which is faster than a deep copy)
+        return json_codec.loads(json_codec.dumps(self._policy_data_cache.get_data()))
+
+    @asynccontextmanager
+    async def _journaled_write(self) -> AsyncIterator[None]:
+        if self._journal is None:
+            yield
+        else:
+            async with self._journal.writing():
+                yield
+
+    async def export_state(self) -> StoreState:
+        # (while a bundle is applied, the policies are of no known version)
+        policy_version = None if self._lock.locked() else self._policy_version
         policies = await self.get_policies()
+        if self._lock.locked() or self._policy_version != policy_version:
+            policy_version = None
         data = self._policy_data_cache.get_data()
-        await writer.write(
-            json.dumps({"policies": policies, "data": data}, default=str)
+        return StoreState(policies=policies, data=data, policy_version=policy_version)
+
+    async def import_state(self, state: StoreState) -> None:
+        """Imports policy modules and data concurrently (the writes are bounded
+        by POLICY_STORE_RESTORE_CONCURRENCY)."""
+        started = time.monotonic()
+        semaphore = asyncio.Semaphore(
+            opal_client_config.POLICY_STORE_RESTORE_CONCURRENCY
+        )
+        await asyncio.gather(
+            self._import_policies(state.policies, semaphore),
+            self._import_data(state.data, semaphore),
+        )
+        await self.set_policy_version(state.policy_version)
+        logger.info(
+            "Policy store import completed in {elapsed:.2f}s",
+            elapsed=time.monotonic() - started,
         )
 
-    async def full_import(self, reader: AsyncTextIOWrapper) -> None:
-        import_data = json.loads(await reader.read())
+    async def _import_policies(
+        self, policies: Dict[str, str], semaphore: asyncio.Semaphore
+    ):
+        """Sets the policy modules a dependency level at a time (@see
+        sort_rego_modules_by_dependencies), concurrently within each level."""
+        progress = ImportProgress("policy modules", len(policies))
+
+        async def set_policy(policy_id: str) -> Optional[Response]:
+            async with semaphore:
+                response = await self.set_policy(
+                    policy_id=policy_id, policy_code=policies[policy_id]
+                )
+            progress.advance()
+            return response
+
+        failed_ops = []
+        for level in sort_rego_modules_by_dependencies(policies):
+            responses = await asyncio.gather(*(set_policy(id) for id in level))
+            failed_ops.extend(
+                functools.partial(
+                    self.set_policy, policy_id=id, policy_code=policies[id]
+                )
+                for id, response in zip(level, responses)
+                if response and response.status_code != status.HTTP_200_OK
+            )
+        if failed_ops:
+            # (i.e: dependencies the import statements don't tell)
+            await OpaClient._attempt_operations_with_postponed_failure_retry(failed_ops)
+        progress.complete()
 
-        await OpaClient._attempt_operations_with_postponed_failure_retry(
-            [
-                functools.partial(self.set_policy, policy_id=id, policy_code=raw)
-                for id, raw in import_data["policies"].items()
-            ]
-        )
+    @staticmethod
+    def _is_safe_data_key(key: str) -> bool:
+        return bool(key) and not any(c in key for c in "/?#%")
+
+    async def _import_data(self, data: JsonableValue, semaphore: asyncio.Semaphore):
+        """Sets the data a top-level document at a time, concurrently."""
+        if not (
+            isinstance(data, dict)
+            and data
+            and all(self._is_safe_data_key(key) for key in data)
+        ):
+            return await self.set_policy_data(data)
+
+        progress = ImportProgress("data documents", len(data))
+
+        async def set_document(key: str):
+            async with semaphore:
+                await self.set_policy_data(data[key], path=f"/{key}")
+            progress.advance()
 
-        await self.set_policy_data(import_data["data"])
+        # (replaces the whole data tree, as writing the data at once would)
+        await self.set_policy_data({})
+        await asyncio.gather(*(set_document(key) for key in data))
+        progress.complete()
@@ -4,6 +4,8 @@ from opal_client.config import opal_client_config
 from opal_client.policy_store.base_policy_store_client import BasePolicyStoreClient
 from opal_client.policy_store.schemas import PolicyStoreAuth, PolicyStoreTypes
 
+UNIX_SOCKET_ADDR_PREFIX = "unix://"
+
 
 class PolicyStoreClientFactoryException(Exception):
     pass
@@ -75,6 +77,7 @@ class PolicyStoreClientFactory:
         tls_client_cert: Optional[str] = None,
         tls_client_key: Optional[str] = None,
         tls_ca: Optional[str] = None,
+        unix_socket: Optional[str] = None,
     ) -> BasePolicyStoreClient:
         """
         Factory method - create a new policy store by type.
@@ -126,6 +129,8 @@ class PolicyStoreClientFactory:
 
         tls_ca = tls_ca or opal_client_config.POLICY_STORE_TLS_CA
 
+        unix_socket = unix_socket or cls.get_default_unix_socket(store_type)
+
         # OPA
         if PolicyStoreTypes.OPA == store_type:
             from opal_client.policy_store.opa_client import OpaClient
@@ -143,6 +148,7 @@ class PolicyStoreClientFactory:
                 tls_client_cert=tls_client_cert,
                 tls_client_key=tls_client_key,
                 tls_ca=tls_ca,
+                unix_socket=unix_socket,
             )
         elif PolicyStoreTypes.CEDAR == store_type:
             from opal_client.policy_store.cedar_client import CedarClient
@@ -151,6 +157,7 @@ class PolicyStoreClientFactory:
                 url,
                 cedar_auth_token=store_token,
                 auth_type=auth_type,
+                unix_socket=unix_socket,
             )
         # MOCK
         elif PolicyStoreTypes.MOCK == store_type:
@@ -171,6 +178,20 @@ class PolicyStoreClientFactory:
         # return the result
         return res
 
+    @staticmethod
+    def get_default_unix_socket(store_type: PolicyStoreTypes) -> Optional[str]:
+        """Returns the unix domain socket the policy store can be reached
+        through, if configured explicitly or if inline OPA listens on one."""
+        if opal_client_config.POLICY_STORE_UNIX_SOCKET:
+            return opal_client_config.POLICY_STORE_UNIX_SOCKET
+
+        if PolicyStoreTypes.OPA == store_type and opal_client_config.INLINE_OPA_ENABLED:
+            addr: str = opal_client_config.INLINE_OPA_CONFIG.addr
+            if addr.startswith(UNIX_SOCKET_ADDR_PREFIX):
+                return addr[len(UNIX_SOCKET_ADDR_PREFIX) :]
+
+        return None
+
     @staticmethod
     def get_cache_key(store_type, url):
         return f"{store_type.value}|{url}"
@@ -10,6 +10,11 @@ class PolicyStoreTypes(Enum):
     MOCK = "MOCK"
 
 
+class StoreBackupFormat(Enum):
+    SNAPSHOT = "snapshot"
+    JSON = "json"
+
+
 class PolicyStoreAuth(Enum):
     NONE = "none"
     TOKEN = "token"
@@ -0,0 +1,280 @@
+"""Backups (snapshots) of the policy store's state, written as a versioned,
+compressed binary stream - or as plain JSON, which is always readable.
+
+A snapshot is a header (magic, version and the encoding of the body),
+followed by the compressed body: a stream of frames - the policy version
+of the store and the metadata of the backup, a frame per policy module, a
+frame per top-level document of the data, and a last frame holding the
+frame count and the sha256 of the preceding frames.
+
+Frames are encoded with msgpack, and compressed with zstd, when they're
+installed - and as JSON lines compressed with zlib otherwise.
+"""
+
+import hashlib
+import json
+import zlib
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Tuple
+
+from aiofiles.threadpool.binary import AsyncBufferedIOBase, AsyncBufferedReader
+from opal_client.policy_store.base_policy_store_client import StoreState
+from opal_client.policy_store.schemas import StoreBackupFormat
+from opal_common import json_codec
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+SNAPSHOT_MAGIC = b"OPALSNAP"
+SNAPSHOT_VERSION = 1
+READ_CHUNK_SIZE = 1024 * 1024
+
+
+class SnapshotError(ValueError):
+    """The snapshot can't be read (corrupted, truncated or of an unknown
+    version)."""
+
+
+def _default_encoding() -> str:
+    return "msgpack" if msgpack is not None else "json"
+
+
+def _default_compression() -> str:
+    return "zstd" if zstandard is not None else "zlib"
+
+
+class _FrameCodec:
+    def __init__(self, encoding: str):
+        if encoding == "msgpack" and msgpack is None:
+            raise SnapshotError("The snapshot is encoded with msgpack (not installed)")
+        if encoding not in ("msgpack", "json"):
+            raise SnapshotError(f"Unknown snapshot encoding: {encoding}")
+        self._encoding = encoding
+        self._unpacker = (
+            msgpack.Unpacker(raw=False, max_buffer_size=0)
+            if encoding == "msgpack"
+            else None
+        )
+        # decoded content that is not part of a complete frame yet
+        self._pending = bytearray()
+        self._decoded = 0
+
+    def encode(self, frame: List[Any]) -> bytes:
+        if self._encoding == "msgpack":
+            return msgpack.packb(frame, use_bin_type=True, default=str)
+        return json_codec.dumps(frame) + b"\n"
+
+    def decode(self, content: bytes) -> Iterator[Tuple[List[Any], bytes]]:
+        """Decodes the frames completed by the content (fed in order), along
+        with their encoded bytes."""
+        self._pending += content
+        if self._unpacker is not None:
+            self._unpacker.feed(content)
+            for frame in self._unpacker:
+                end = self._unpacker.tell() - self._decoded
+                encoded = bytes(self._pending[:end])
+                del self._pending[:end]
+                self._decoded += end
+                yield frame, encoded
+            return
+        *lines, pending = self._pending.split(b"\n")
+        self._pending = bytearray(pending)
+        for line in lines:
+            yield json_codec.loads(line), line + b"\n"
+
+
+def _compressor(compression: str):
+    if compression == "zstd":
+        return zstandard.ZstdCompressor(write_checksum=True).compressobj()
+    return zlib.compressobj()
+
+
+def _decompressor(compression: str):
+    if compression == "zstd":
+        if zstandard is None:
+            raise SnapshotError("The snapshot is compressed with zstd (not installed)")
+        return zstandard.ZstdDecompressor().decompressobj()
+    if compression == "zlib":
+        return zlib.decompressobj()
+    raise SnapshotError(f"Unknown snapshot compression: {compression}")
+
+
+def _frames(state: StoreState, metadata: Dict[str, Any]) -> Iterator[List[Any]]:
+    yield ["policy_version", state.policy_version]
+    yield ["metadata", metadata]
+    for policy_id, raw in (state.policies or {}).items():
+        yield ["policy", policy_id, raw]
+    if isinstance(state.data, dict):
+        for key, value in state.data.items():
+            yield ["data", key, value]
+    else:
+        yield ["root", "", state.data]
+
+
+async def write_snapshot(
+    writer: AsyncBufferedIOBase,
+    state: StoreState,
+    metadata: Optional[Dict[str, Any]] = None,
+    encoding: Optional[str] = None,
+    compression: Optional[str] = None,
+):
+    """Writes the state (and the metadata of the backup) as a snapshot, a frame
+    at a time."""
+    encoding = encoding or _default_encoding()
+    compression = compression or _default_compression()
+    codec = _FrameCodec(encoding)
+    compressor = _compressor(compression)
+    checksum = hashlib.sha256()
+    count = 0
+
+    await writer.write(
+        SNAPSHOT_MAGIC
+        + bytes([SNAPSHOT_VERSION])
+        + json_codec.dumps({"encoding": encoding, "compression": compression})
+        + b"\n"
+    )
+    for frame in _frames(state, metadata or {}):
+        encoded = codec.encode(frame)
+        checksum.update(encoded)
+        count += 1
+        compressed = compressor.compress(encoded)
+        if compressed:
+            await writer.write(compressed)
+    await writer.write(
+        compressor.compress(codec.encode(["end", count, checksum.hexdigest()]))
+        + compressor.flush()
+    )
+
+
+async def _read_chunks(
+    reader: AsyncBufferedReader, first: bytes = b""
+) -> AsyncIterator[bytes]:
+    if first:
+        yield first
+    while True:
+        chunk = await reader.read(READ_CHUNK_SIZE)
+        if not chunk:
+            return
+        yield chunk
+
+
+async def _read_header(reader: AsyncBufferedReader, prefix: bytes) -> bytes:
+    """Reads the rest of the header, and returns the body content read
+    along."""
+    content = prefix
+    while b"\n" not in content[len(SNAPSHOT_MAGIC) :]:
+        chunk = await reader.read(1024)
+        if not chunk:
+            raise SnapshotError("Truncated snapshot header")
+        content += chunk
+    return content
+
+
+async def read_snapshot(
+    reader: AsyncBufferedReader,
+) -> Tuple[StoreState, Dict[str, Any]]:
+    """Reads a snapshot (or a plain JSON backup), a chunk at a time.
+
+    The state (and the metadata of the backup) are returned once the
+    whole snapshot is read and its checksum is verified (so a corrupted
+    snapshot is never partially imported).
+    """
+    prefix = await reader.read(len(SNAPSHOT_MAGIC))
+    if prefix != SNAPSHOT_MAGIC:
+        # a plain JSON backup
+        content = prefix + await reader.read()
+        try:
+            import_data = json.loads(content)
+        except ValueError as e:
+            raise SnapshotError(f"Not a snapshot, nor a JSON backup: {e}")
+        state = StoreState(
+            policies=import_data["policies"],
+            data=import_data["data"],
+            policy_version=import_data.get("policy_version"),
+        )
+        return state, import_data.get("metadata", {})
+
+    content = await _read_header(reader, prefix)
+    version = content[len(SNAPSHOT_MAGIC)]
+    if version != SNAPSHOT_VERSION:
+        raise SnapshotError(f"Unsupported snapshot version: {version}")
+    header, _, body = content[len(SNAPSHOT_MAGIC) + 1 :].partition(b"\n")
+    options = json_codec.loads(header)
+    codec = _FrameCodec(options.get("encoding"))
+    decompressor = _decompressor(options.get("compression"))
+
+    checksum = hashlib.sha256()
+    count = 0
+    policies, data, policy_version, metadata = {}, {}, None, {}
+    end = None
+    async for chunk in _read_chunks(reader, body):
+        try:
+            frames = list(codec.decode(decompressor.decompress(chunk)))
+        except Exception as e:
+            raise SnapshotError(f"Corrupted snapshot: {e!r}")
+        for frame, encoded in frames:
+            if end is not None:
+                raise SnapshotError("Corrupted snapshot: frames after its end")
+            kind = frame[0]
+            if kind == "end":
+                end = frame
+                continue
+            checksum.update(encoded)
+            count += 1
+            if kind == "policy":
+                policies[frame[1]] = frame[2]
+            elif kind == "data":
+                data[frame[1]] = frame[2]
+            elif kind == "root":
+                data = frame[2]
+            elif kind == "policy_version":
+                policy_version = frame[1]
+            elif kind == "metadata":
+                metadata = frame[1]
+            else:
+                raise SnapshotError(f"Unknown snapshot frame: {kind}")
+    if end is None:
+        raise SnapshotError("Truncated snapshot")
+    if end[1] != count or end[2] != checksum.hexdigest():
+        raise SnapshotError("Corrupted snapshot: checksum mismatch")
+    return (
+        StoreState(policies=policies, data=data, policy_version=policy_version),
+        metadata,
+    )
+
+
+async def export_store(
+    store,
+    writer: AsyncBufferedIOBase,
+    format: StoreBackupFormat,
+    metadata: Optional[Dict[str, Any]] = None,
+    state: Optional[StoreState] = None,
+):
+    """Exports the policy store's state (and the metadata of the backup) to a
+    backup file (opened for binary writing).
+
+    The state may be given (i.e: with data captured earlier), it's
+    exported from the store otherwise.
+    """
+    if state is None:
+        state = await store.export_state()
+    if format == StoreBackupFormat.JSON:
+        await writer.write(
+            json.dumps(
+                {
+                    "policies": state.policies,
+                    "data": state.data,
+                    "policy_version": state.policy_version,
+                    "metadata": metadata or {},
+                },
+                default=str,
+            ).encode("utf-8")
+        )
+    else:
+        await write_snapshot(writer, state, metadata)
@@ -0,0 +1,103 @@
+import pytest
+from opal_client.data.commit_queue import DataCommitQueue, normalize_dst_path
+from opal_common.schemas.data import DataSourceEntry
+from opal_common.schemas.store import JSONPatchAction
+
+
+def put(dst_path: str) -> DataSourceEntry:
+    return DataSourceEntry(url="", data={}, dst_path=dst_path)
+
+
+def patch(dst_path: str, key: str) -> DataSourceEntry:
+    return DataSourceEntry(
+        url="",
+        data=[JSONPatchAction(op="add", path=f"/{key}", value=key)],
+        dst_path=dst_path,
+        save_method="PATCH",
+    )
+
+
+def test_normalize_dst_path():
+    assert normalize_dst_path(None) == ""
+    assert normalize_dst_path("/") == ""
+    assert normalize_dst_path("users/") == "/users"
+    assert normalize_dst_path("/users/bob") == "/users/bob"
+
+
+@pytest.mark.asyncio
+async def test_put_supersedes_same_and_nested_paths():
+    queue = DataCommitQueue(split_root_data=False)
+    same = queue.enqueue(put("/users"))
+    nested = queue.enqueue(put("users/bob"))
+    # prefix of the path, but not nested under it
+    sibling = queue.enqueue(put("/users_v2"))
+    last = queue.enqueue(put("/users"))
+
+    assert same.superseded_by is None
+    assert nested.superseded_by is None
+    assert not sibling.is_superseded
+    assert not last.is_superseded
+    # "/users_v2" conflicts with "/users" (hierarchical lock), and stops coalescing
+    queue.done(sibling)
+    newest = queue.enqueue(put("/users"))
+    assert last.superseded_by is newest
+    assert same.superseded_by is newest
+    assert nested.superseded_by is newest
+    assert queue.pending_count == 1
+
+
+@pytest.mark.asyncio
+async def test_put_does_not_skip_over_pending_ancestor_write():
+    queue = DataCommitQueue(split_root_data=False)
+    nested = queue.enqueue(put("/users/bob"))
+    ancestor = queue.enqueue(patch("/users", "alice"))
+    queue.enqueue(put("/users/bob"))
+    # the ancestor patch may depend on the nested write
+    assert not nested.is_superseded
+    assert not ancestor.is_superseded
+
+
+@pytest.mark.asyncio
+async def test_committing_entries_are_not_coalesced():
+    queue = DataCommitQueue(split_root_data=False)
+    first = queue.enqueue(put("/users"))
+    assert queue.begin(first)
+    queue.enqueue(put("/users"))
+    assert not first.is_superseded
+
+    first_patch = queue.enqueue(patch("/groups", "a"))
+    assert queue.begin(first_patch)
+    second_patch = queue.enqueue(patch("/groups", "b"))
+    assert not second_patch.is_superseded
+
+
+@pytest.mark.asyncio
+async def test_split_root_put_does_not_supersede():
+    queue = DataCommitQueue(split_root_data=True)
+    first = queue.enqueue(put("/"))
+    queue.enqueue(put(""))
+    assert not first.is_superseded
+
+
+@pytest.mark.asyncio
+async def test_patches_to_same_path_are_merged():
+    queue = DataCommitQueue(split_root_data=False)
+    first = queue.enqueue(patch("/groups", "a"))
+    second = queue.enqueue(patch("/groups", "b"))
+    third = queue.enqueue(patch("/groups", "c"))
+    assert second.superseded_by is first
+    assert third.superseded_by is first
+    merged = first.with_merged_patches(first.entry.data)
+    assert [op.path for op in merged] == ["/a", "/b", "/c"]
+    # a patch to another path is not merged
+    other = queue.enqueue(patch("/groups/admins", "d"))
+    assert not other.is_superseded
+    # nor is a patch merged into a patch that is yet to be fetched
+    fetched = queue.enqueue(
+        DataSourceEntry(
+            url="https://example.com/groups", dst_path="/groups", save_method="PATCH"
+        )
+    )
+    inline = queue.enqueue(patch("/groups", "e"))
+    assert not inline.is_superseded
+    assert fetched.merged_patches == []
@@ -6,6 +6,7 @@ import os
 import sys
 from multiprocessing import Event, Process
 
+import jsonpatch
 import pytest
 import requests
 import uvicorn
@@ -21,13 +22,20 @@ sys.path.append(root_dir)
 
 from opal_client.config import opal_client_config
 from opal_client.data.rpc import TenantAwareRpcEventClientMethods
+from opal_client.data.update_sequences import UpdateSequences
 from opal_client.data.updater import DataSourceEntry, DataUpdate, DataUpdater
+from opal_client.policy_store.mock_policy_store_client import MockPolicyStoreClient
 from opal_client.policy_store.policy_store_client_factory import (
     PolicyStoreClientFactory,
 )
 from opal_client.policy_store.schemas import PolicyStoreTypes
+from opal_client.utils import EncodedPolicyData, exclude_none_fields
+from opal_common.fetcher import NOT_MODIFIED, FetchedDelta
 from opal_common.schemas.data import (
     DataSourceConfig,
+    DataSourceEntryWithPollingInterval,
+    DataUpdateLogPosition,
+    DataUpdateReplay,
     DataUpdateReport,
     ServerDataSourceConfig,
     UpdateCallback,
@@ -323,3 +331,795 @@ async def test_client_get_initial_data(server):
     # cleanup
     finally:
         await updater.stop()
+
+
+class DelayedDataFetcher:
+    """Returns the inline data of the entry after the delay given in its
+    config."""
+
+    async def handle_url_with_digest(
+        self, url, config, data, priority=None, known_digest=None
+    ):
+        await asyncio.sleep(config.get("delay", 0))
+        # the tests set the digest of the "raw content" explicitly
+        return data, config.get("digest")
+
+
+@pytest.mark.asyncio
+async def test_late_fetch_does_not_overwrite_newer_update():
+    """Fetches run concurrently, but writes to the same path are applied in the
+    order the updates arrived in."""
+    policy_store = CountingPolicyStore()
+    updater = DataUpdater(
+        pubsub_url=UPDATES_URL,
+        policy_store=policy_store,
+        data_fetcher=DelayedDataFetcher(),
+        fetch_on_connect=False,
+        data_topics=DATA_TOPICS,
+        should_send_reports=False,
+    )
+
+    def make_update(value, delay, dst_path):
+        entry = DataSourceEntry(
+            url="",
+            data=value,
+            config={"delay": delay},
+            dst_path=dst_path,
+            topics=DATA_TOPICS,
+        )
+        return DataUpdate(reason="Test", entries=[entry])
+
+    loop = asyncio.get_event_loop()
+    start_time = loop.time()
+    await updater.trigger_data_update(make_update({"name": "old"}, 0.3, "/users"))
+    await updater.trigger_data_update(make_update({"id": 1}, 0, "/groups"))
+    await updater.trigger_data_update(make_update({"name": "new"}, 0.2, "/users/alice"))
+    # the newer fetch is done before the old one, but must wait for it
+    await asyncio.sleep(0.25)
+    assert policy_store.writes == [("PUT", "/groups")]
+    await updater._tasks.shutdown()
+    # fetches of conflicting paths ran concurrently
+    assert loop.time() - start_time < 0.45
+    assert policy_store.writes == [
+        ("PUT", "/groups"),
+        ("PUT", "/users"),
+        ("PUT", "/users/alice"),
+    ]
+
+
+class CountingPolicyStore(MockPolicyStoreClient):
+    def __init__(self):
+        super().__init__()
+        self.writes = []
+
+    async def set_policy_data(self, policy_data, path="", transaction_id=None):
+        self.writes.append(("PUT", path))
+        await super().set_policy_data(policy_data, path, transaction_id)
+
+    async def patch_policy_data(self, policy_data, path="", transaction_id=None):
+        self.writes.append(("PATCH", path))
+        await super().patch_policy_data(policy_data, path, transaction_id)
+
+
+@pytest.mark.asyncio
+async def test_pending_updates_to_same_path_are_coalesced():
+    policy_store = CountingPolicyStore()
+    updater = DataUpdater(
+        pubsub_url=UPDATES_URL,
+        policy_store=policy_store,
+        data_fetcher=DelayedDataFetcher(),
+        fetch_on_connect=False,
+        data_topics=DATA_TOPICS,
+        should_send_reports=False,
+    )
+    reports = {}
+
+    async def send_reports(entry_reports, update):
+        reports[update.id] = entry_reports
+
+    updater._send_reports = send_reports
+
+    def make_update(update_id, data, dst_path, save_method="PUT", delay=0.05):
+        entry = DataSourceEntry(
+            url="",
+            data=data,
+            config={"delay": delay},
+            dst_path=dst_path,
+            save_method=save_method,
+            topics=DATA_TOPICS,
+        )
+        return DataUpdate(id=update_id, reason="Test", entries=[entry])
+
+    # a burst of PUTs to the same path (and a nested path), only the last one is written
+    for i in range(5):
+        await updater.trigger_data_update(make_update(f"put{i}", {"i": i}, "/users"))
+    await updater.trigger_data_update(make_update("nested", {"i": 5}, "/users/bob"))
+    await updater.trigger_data_update(make_update("last", {"i": 6}, "/users"))
+
+    # a burst of PATCHes to the same path is written as a single patch
+    policy_store._data["groups"] = {}
+    patch = lambda key: [JSONPatchAction(op="add", path=f"/{key}", value=key)]
+    for key in ("a", "b", "c"):
+        await updater.trigger_data_update(
+            make_update(f"patch_{key}", patch(key), "/groups", "PATCH")
+        )
+
+    await updater._tasks.shutdown()
+
+    assert policy_store.writes == [("PUT", "/users"), ("PATCH", "/groups")]
+    assert await policy_store.get_data("/users") == {"i": 6}
+    assert policy_store._data["groups"] == {"a": "a", "b": "b", "c": "c"}
+    # every update is still reported (with the outcome of the write it was coalesced into)
+    assert set(reports) == {
+        *(f"put{i}" for i in range(5)),
+        "nested",
+        "last",
+        "patch_a",
+        "patch_b",
+        "patch_c",
+    }
+    for update_id, entry_reports in reports.items():
+        assert len(entry_reports) == 1
+        assert entry_reports[0].saved
+    assert reports["put0"][0].hash == reports["last"][0].hash
+    assert reports["put0"][0].entry.data == {"i": 0}
+
+
+@pytest.mark.asyncio
+async def test_patch_is_not_lost_when_an_earlier_patch_fails_to_fetch():
+    policy_store = CountingPolicyStore()
+    policy_store._data["groups"] = {}
+    updater = DataUpdater(
+        pubsub_url=UPDATES_URL,
+        policy_store=policy_store,
+        data_fetcher=DelayedDataFetcher(),
+        fetch_on_connect=False,
+        data_topics=DATA_TOPICS,
+        should_send_reports=False,
+    )
+    reports = {}
+
+    async def send_reports(entry_reports, update):
+        reports[update.id] = entry_reports
+
+    updater._send_reports = send_reports
+
+    def make_update(update_id, data=None):
+        entry = DataSourceEntry(
+            url="https://example.com/groups",
+            # (a PATCH entry without data is fetched)
+            **({"data": data} if data is not None else {}),
+            config={"delay": 0.05},
+            dst_path="/groups",
+            save_method="PATCH",
+            topics=DATA_TOPICS,
+        )
+        return DataUpdate(id=update_id, reason="Test", entries=[entry])
+
+    # (the fetched data is empty - the fetch fails)
+    await updater.trigger_data_update(make_update("fetched"))
+    await updater.trigger_data_update(
+        make_update("inline", [JSONPatchAction(op="add", path="/a", value="a")])
+    )
+    await updater._tasks.shutdown()
+
+    assert not reports["fetched"][0].saved
+    assert reports["inline"][0].saved
+    assert policy_store.writes == [("PATCH", "/groups")]
+    assert policy_store._data["groups"] == {"a": "a"}
+
+
+@pytest.mark.asyncio
+async def test_unchanged_data_is_not_rewritten():
+    policy_store = CountingPolicyStore()
+    updater = DataUpdater(
+        pubsub_url=UPDATES_URL,
+        policy_store=policy_store,
+        data_fetcher=DelayedDataFetcher(),
+        fetch_on_connect=False,
+        data_topics=DATA_TOPICS,
+        should_send_reports=False,
+    )
+    reports = []
+
+    async def send_reports(entry_reports, update):
+        reports.extend(entry_reports)
+
+    updater._send_reports = send_reports
+
+    async def update(data, digest, dst_path="/users", save_method="PUT"):
+        entry = DataSourceEntry(
+            url="https://example.com/users",
+            data=data,
+            config={"digest": digest},
+            dst_path=dst_path,
+            save_method=save_method,
+            topics=DATA_TOPICS,
+        )
+        await updater.trigger_data_update(DataUpdate(reason="Test", entries=[entry]))
+        await asyncio.gather(*updater._tasks._tasks)
+        return reports[-1]
+
+    first = await update({"name": "alice"}, "a")
+    assert first.saved and not first.unchanged
+    # same content is not written again (nor hashed), but is still reported as saved
+    hashed = []
+    calc_hash = updater.calc_hash
+    updater.calc_hash = lambda data: hashed.append(data) or calc_hash(data)
+    second = await update({"name": "alice"}, "a")
+    updater.calc_hash = calc_hash
+    assert not any(isinstance(data, EncodedPolicyData) for data in hashed)
+    assert second.saved and second.fetched and second.unchanged
+    assert second.hash == first.hash
+    assert policy_store.writes == [("PUT", "/users")]
+
+    # no digest (i.e: inline data) - always written
+    await update({"name": "alice"}, None)
+    await update({"name": "alice"}, "a")
+    assert len(policy_store.writes) == 3
+    await update({"name": "alice"}, "a")
+    assert len(policy_store.writes) == 3
+
+    # a write to a nested path invalidates the digest of its ancestors
+    await update({"name": "bob"}, "b", dst_path="users/bob")
+    await update({"name": "alice"}, "a")
+    assert policy_store.writes[-2:] == [("PUT", "/users/bob"), ("PUT", "/users")]
+
+    # and so does a patch
+    patch = [JSONPatchAction(op="add", path="/id", value=1)]
+    await update(patch, None, save_method="PATCH")
+    await update({"name": "alice"}, "a")
+    assert policy_store.writes[-2:] == [("PATCH", "/users"), ("PUT", "/users")]
+
+    # a rehydrated policy store is written regardless of previous writes
+    updater.get_base_policy_data = lambda **kwargs: update({"name": "alice"}, "a")
+    await updater.rehydrate_policy_store()
+    assert policy_store.writes[-1] == ("PUT", "/users")
+    assert not reports[-1].unchanged
+
+
+class PathDocumentsPolicyStore(CountingPolicyStore):
+    """Applies patches to the document stored at the path (the mock store keeps
+    documents by their path)."""
+
+    async def patch_policy_data(self, policy_data, path="", transaction_id=None):
+        self.writes.append(("PATCH", path))
+        self._data[path] = jsonpatch.apply_patch(
+            self._data[path], exclude_none_fields(policy_data)
+        )
+
+
+class ConditionalDataFetcher:
+    """Fetches the content set for each url - as not modified, if its
+    digest is the known digest."""
+
+    def __init__(self):
+        self.content = {}
+        self.known_digests = []
+
+    async def handle_url_with_digest(
+        self, url, config, data, priority=None, known_digest=None
+    ):
+        self.known_digests.append(known_digest)
+        content = self.content[url]
+        digest = json.dumps(content)
+        if digest == known_digest:
+            return NOT_MODIFIED, digest
+        return content, digest
+
+
+@pytest.mark.asyncio
+async def test_not_modified_data_is_not_rewritten():
+    policy_store = CountingPolicyStore()
+    data_fetcher = ConditionalDataFetcher()
+
+    def make_updater():
+        return DataUpdater(
+            pubsub_url=UPDATES_URL,
+            policy_store=policy_store,
+            data_fetcher=data_fetcher,
+            fetch_on_connect=False,
+            data_topics=DATA_TOPICS,
+            should_send_reports=False,
+        )
+
+    updater = make_updater()
+    reports = []
+
+    async def send_reports(entry_reports, update):
+        reports.extend(entry_reports)
+
+    async def update(updater, dst_path="/users"):
+        updater._send_reports = send_reports
+        entry = DataSourceEntry(
+            url="https://example.com/users", dst_path=dst_path, topics=DATA_TOPICS
+        )
+        await updater.trigger_data_update(DataUpdate(reason="Test", entries=[entry]))
+        await asyncio.gather(*updater._tasks._tasks)
+        return reports[-1]
+
+    data_fetcher.content["https://example.com/users"] = {"name": "alice"}
+    first = await update(updater)
+    assert data_fetcher.known_digests == [None]
+    second = await update(updater)
+    assert data_fetcher.known_digests[-1] == json.dumps({"name": "alice"})
+    assert second.saved and second.unchanged
+    assert second.hash == first.hash
+    assert policy_store.writes == [("PUT", "/users")]
+
+    # the fetch state is kept alongside a backup of the policy store
+    state = json.loads(
+        json.dumps(updater.dump_fetch_state(updater.fetch_state_snapshot()))
+    )
+    restored = make_updater()
+    restored.load_fetch_state(state)
+    third = await update(restored)
+    assert third.unchanged and third.hash == first.hash
+    assert len(policy_store.writes) == 1
+
+    # other content is written
+    data_fetcher.content["https://example.com/users"] = {"name": "bob"}
+    fourth = await update(restored)
+    assert fourth.saved and not fourth.unchanged
+    assert len(policy_store.writes) == 2
+
+    # paths written during the backup are not claimed by it
+    snapshot = restored.fetch_state_snapshot()
+    await update(restored, dst_path="/users/bob")
+    assert restored.dump_fetch_state(snapshot)["written"]["fetched"] == {}
+
+
+class DeltaDataFetcher:
+    """Fetches the changes since the requested cursor (all of the data if no
+    cursor is requested) - the cursor is the number of changes."""
+
+    def __init__(self, data):
+        self.data = data
+        self.changes = []
+        self.cursors = []
+
+    async def handle_url_with_digest(
+        self, url, config, data, priority=None, known_digest=None
+    ):
+        if data is not None:
+            return data, None
+        cursor = (config or {}).get("cursor")
+        self.cursors.append(cursor)
+        latest = str(len(self.changes))
+        if cursor is None:
+            current = jsonpatch.apply_patch(self.data, self.changes)
+            return FetchedDelta(cursor=latest, data=current), None
+        return FetchedDelta(cursor=latest, changes=self.changes[int(cursor) :]), None
+
+
+@pytest.mark.asyncio
+async def test_incremental_changes_written_as_patches():
+    policy_store = PathDocumentsPolicyStore()
+    data_fetcher = DeltaDataFetcher({"alice": {"role": "admin"}})
+
+    def make_updater():
+        updater = DataUpdater(
+            pubsub_url=UPDATES_URL,
+            policy_store=policy_store,
+            data_fetcher=data_fetcher,
+            fetch_on_connect=False,
+            data_topics=DATA_TOPICS,
+            should_send_reports=False,
+        )
+        updater._send_reports = send_reports
+        return updater
+
+    reports = []
+
+    async def send_reports(entry_reports, update):
+        reports.extend(entry_reports)
+
+    async def update(updater, **kwargs):
+        entry = DataSourceEntry(
+            url="https://example.com/users",
+            dst_path="/users",
+            topics=DATA_TOPICS,
+            **kwargs,
+        )
+        await updater.trigger_data_update(DataUpdate(reason="Test", entries=[entry]))
+        await asyncio.gather(*updater._tasks._tasks)
+        return reports[-1]
+
+    updater = make_updater()
+    await update(updater)
+    assert policy_store.writes == [("PUT", "/users")]
+
+    data_fetcher.changes.append({"op": "add", "path": "/bob", "value": {"role": "dev"}})
+    report = await update(updater)
+    assert report.saved and not report.unchanged
+    assert data_fetcher.cursors == [None, "0"]
+    assert policy_store.writes[-1] == ("PATCH", "/users")
+    assert policy_store._data["/users"] == {
+        "alice": {"role": "admin"},
+        "bob": {"role": "dev"},
+    }
+
+    # no changes - nothing is written
+    report = await update(updater)
+    assert report.unchanged
+    assert len(policy_store.writes) == 2
+
+    # the cursor is kept alongside a backup of the policy store
+    state = json.loads(
+        json.dumps(updater.dump_fetch_state(updater.fetch_state_snapshot()))
+    )
+    restored = make_updater()
+    restored.load_fetch_state(state)
+    data_fetcher.changes.append({"op": "remove", "path": "/alice"})
+    await update(restored)
+    assert data_fetcher.cursors[-1] == "1"
+    assert policy_store._data["/users"] == {"bob": {"role": "dev"}}
+
+    # once other data is written to the path, all of the data is fetched again
+    await update(restored, data={"carol": {}})
+    await update(restored)
+    assert data_fetcher.cursors[-1] is None
+    assert policy_store.writes[-1] == ("PUT", "/users")
+    assert policy_store._data["/users"] == {"bob": {"role": "dev"}}
+
+
+@pytest.mark.asyncio
+async def test_projected_data_is_written():
+    policy_store = CountingPolicyStore()
+    updater = DataUpdater(
+        pubsub_url=UPDATES_URL,
+        policy_store=policy_store,
+        data_fetcher=DelayedDataFetcher(),
+        fetch_on_connect=False,
+        data_topics=DATA_TOPICS,
+        should_send_reports=False,
+    )
+    entry = DataSourceEntry(
+        url="https://example.com/users",
+        data={"users": [{"name": "alice", "age": 30}], "total": 1},
+        config={},
+        dst_path="/users",
+        projection={"select": "users", "key_by": "name", "fields": ["age"]},
+        topics=DATA_TOPICS,
+    )
+    await updater.trigger_data_update(DataUpdate(reason="Test", entries=[entry]))
+    await asyncio.gather(*updater._tasks._tasks)
+    assert policy_store._data["/users"] == {"alice": {"age": 30}}
+
+
+@pytest.mark.asyncio
+async def test_put_written_as_diff():
+    policy_store = PathDocumentsPolicyStore()
+    updater = DataUpdater(
+        pubsub_url=UPDATES_URL,
+        policy_store=policy_store,
+        data_fetcher=DelayedDataFetcher(),
+        fetch_on_connect=False,
+        data_topics=DATA_TOPICS,
+        should_send_reports=False,
+    )
+    reports = []
+
+    async def send_reports(entry_reports, update):
+        reports.extend(entry_reports)
+
+    updater._send_reports = send_reports
+
+    async def update(data, dst_path="/users", diff_threshold=0.5):
+        entry = DataSourceEntry(
+            url="https://example.com/users",
+            data=data,
+            config={},
+            dst_path=dst_path,
+            diff_threshold=diff_threshold,
+            topics=DATA_TOPICS,
+        )
+        await updater.trigger_data_update(DataUpdate(reason="Test", entries=[entry]))
+        await asyncio.gather(*updater._tasks._tasks)
+        return reports[-1]
+
+    users = {f"user{i}": {"roles": ["viewer"]} for i in range(20)}
+    await update(users)
+    changed = {**users, "user3": {"roles": ["admin"]}}
+    report = await update(changed)
+    assert report.saved and not report.unchanged
+    assert policy_store.writes == [("PUT", "/users"), ("PATCH", "/users")]
+    assert await policy_store.get_data("/users") == changed
+    # identical documents are not written at all
+    assert (await update(dict(changed))).unchanged
+    assert len(policy_store.writes) == 2
+
+    # too many changes - written as a full document
+    await update({f"user{i}": {"roles": ["admin"]} for i in range(20)})
+    assert policy_store.writes[-1] == ("PUT", "/users")
+
+    # a write to an overlapping path invalidates the remembered document
+    await update({"roles": []}, dst_path="/users/user0", diff_threshold=None)
+    await update(changed)
+    assert policy_store.writes[-2:] == [("PUT", "/users/user0"), ("PUT", "/users")]
+
+
+class StreamingDataFetcher(DelayedDataFetcher):
+    """Streams the (json encoded) inline data of the entry given in its
+    config."""
+
+    def __init__(self):
+        self.streamed = []
+
+    async def stream_url(self, url, config, consumer, priority=None):
+        self.streamed.append(url)
+
+        async def chunks():
+            content = json.dumps(config["content"]).encode()
+            for i in range(0, len(content), 4):
+                yield content[i : i + 4]
+
+        return await consumer(chunks()), "digest"
+
+    async def handle_url_with_digest(
+        self, url, config, data, priority=None, known_digest=None
+    ):
+        if data is None:
+            return config["content"], None
+        return data, None
+
+
+@pytest.mark.asyncio
+async def test_raw_data_streamed_into_policy_store():
+    policy_store = CountingPolicyStore()
+    data_fetcher = StreamingDataFetcher()
+    updater = DataUpdater(
+        pubsub_url=UPDATES_URL,
+        policy_store=policy_store,
+        data_fetcher=data_fetcher,
+        fetch_on_connect=False,
+        data_topics=DATA_TOPICS,
+        should_send_reports=False,
+    )
+    reports = []
+
+    async def send_reports(entry_reports, update):
+        reports.extend(entry_reports)
+
+    updater._send_reports = send_reports
+
+    def make_entry(url, dst_path, **kwargs):
+        return DataSourceEntry(
+            url=url,
+            config={"content": {"url": url}},
+            dst_path=dst_path,
+            stream_raw=True,
+            topics=DATA_TOPICS,
+            **kwargs,
+        )
+
+    await updater.trigger_data_update(
+        DataUpdate(
+            reason="Test",
+            entries=[
+                make_entry("https://example.com/users", "/users"),
+                # not streamed - diffed data, inline data
+                make_entry("https://example.com/diff", "/diff", diff_threshold=0.5),
+                make_entry("https://example.com/inline", "/inline", data={"a": 1}),
+            ],
+        )
+    )
+    await asyncio.gather(*updater._tasks._tasks)
+
+    assert data_fetcher.streamed == ["https://example.com/users"]
+    assert await policy_store.get_data("/users") == {"url": "https://example.com/users"}
+    assert all(report.saved for report in reports)
+    assert reports[0].hash == "digest"
+
+
+@pytest.mark.asyncio
+async def test_entries_of_update_processed_concurrently():
+    policy_store = CountingPolicyStore()
+    updater = DataUpdater(
+        pubsub_url=UPDATES_URL,
+        policy_store=policy_store,
+        data_fetcher=DelayedDataFetcher(),
+        fetch_on_connect=False,
+        data_topics=DATA_TOPICS,
+        should_send_reports=False,
+    )
+
+    def make_update(*dst_paths, delay=0.2):
+        return DataUpdate(
+            reason="Test",
+            entries=[
+                DataSourceEntry(
+                    url="",
+                    data={"path": dst_path},
+                    config={"delay": delay},
+                    dst_path=dst_path,
+                    topics=DATA_TOPICS,
+                )
+                for dst_path in dst_paths
+            ],
+        )
+
+    loop = asyncio.get_event_loop()
+    start_time = loop.time()
+    await updater._update_policy_data(make_update("/a", "/b", "/c", "/a/x"))
+    assert loop.time() - start_time < 0.35
+    # conflicting paths are still written in order
+    assert policy_store.writes.index(("PUT", "/a")) < policy_store.writes.index(
+        ("PUT", "/a/x")
+    )
+    assert len(policy_store.writes) == 4
+
+    # the number of concurrent fetches is limited
+    updater._fetch_semaphore = asyncio.Semaphore(2)
+    start_time = loop.time()
+    await updater._update_policy_data(make_update("/a", "/b", "/c", delay=0.1))
+    assert 0.2 <= loop.time() - start_time < 0.3
+
+
+@pytest.mark.asyncio
+async def test_periodic_entries_are_not_duplicated_on_reconnect():
+    policy_store = CountingPolicyStore()
+    updater = DataUpdater(
+        pubsub_url=UPDATES_URL,
+        policy_store=policy_store,
+        data_fetcher=DelayedDataFetcher(),
+        fetch_on_connect=False,
+        data_topics=DATA_TOPICS,
+        should_send_reports=False,
+    )
+
+    def make_entry(dst_path, interval=0.1):
+        return DataSourceEntryWithPollingInterval(
+            url="",
+            data={"path": dst_path},
+            config={},
+            dst_path=dst_path,
+            topics=DATA_TOPICS,
+            periodic_update_interval=interval,
+        )
+
+    sources = DataSourceConfig(entries=[make_entry("/polled"), make_entry("/gone")])
+
+    async def get_policy_data_config(url=None):
+        return sources
+
+    updater.get_policy_data_config = get_policy_data_config
+    try:
+        await updater.get_base_policy_data()
+        # reconnect - the entry that's no longer configured stops being polled
+        sources = DataSourceConfig(entries=[make_entry("/polled")])
+        await updater.get_base_policy_data()
+        assert len(updater._polling_scheduler.keys()) == 1
+
+        policy_store.writes.clear()
+        await asyncio.sleep(0.35)
+        assert 2 <= policy_store.writes.count(("PUT", "/polled")) <= 4
+        assert ("PUT", "/gone") not in policy_store.writes
+    finally:
+        await updater._stop_polling_update_tasks()
+
+
+@pytest.mark.asyncio
+async def test_missed_updates_replayed_on_reconnect():
+    policy_store = CountingPolicyStore()
+    updater = DataUpdater(
+        pubsub_url=UPDATES_URL,
+        policy_store=policy_store,
+        data_fetcher=DelayedDataFetcher(),
+        fetch_on_connect=True,
+        data_topics=DATA_TOPICS,
+        should_send_reports=False,
+    )
+
+    def make_update(dst_path, seq=None, log_id="log"):
+        entry = DataSourceEntry(
+            url="", data={}, config={}, dst_path=dst_path, topics=DATA_TOPICS
+        )
+        update = DataUpdate(reason="Test", entries=[entry])
+        if seq is not None:
+            update.log_position = DataUpdateLogPosition(
+                log_id=log_id, sequences={"policy_data": seq, "other": 100}
+            )
+        return update
+
+    async def get_policy_data_config(url=None):
+        return DataSourceConfig(entries=[make_update("/base").entries[0]])
+
+    # the server's log of published updates
+    published = [make_update(f"/{seq}", seq) for seq in range(1, 8)]
+    replay_requests = []
+
+    async def replay_data_updates(request):
+        replay_requests.append(request)
+        if request.log_id not in (None, "log"):
+            return None
+        if not request.sequences:
+            # the log heads
+            return DataUpdateReplay(log_id="log", sequences={"policy_data": 5})
+        since = request.sequences["policy_data"]
+        return DataUpdateReplay(
+            log_id="log", sequences={"policy_data": 7}, updates=published[since:]
+        )
+
+    async def settle():
+        await asyncio.gather(*updater._tasks._tasks)
+        await asyncio.sleep(0)
+
+    async def publish(update):
+        await updater._update_policy_data_callback(update.dict())
+        await settle()
+
+    updater.get_policy_data_config = get_policy_data_config
+    updater._replay_data_updates = replay_data_updates
+
+    # first connection - all data is fetched, and updates are tracked from the log heads
+    await updater._sync_policy_data()
+    await settle()
+    assert policy_store.writes == [("PUT", "/base")]
+    assert replay_requests[-1].log_id is None
+    assert updater.dump_update_sequences()["sequences"] == {"policy_data": 5}
+
+    # update 6 is missed
+    await publish(published[6])
+    assert policy_store.writes[1:] == [("PUT", "/7")]
+    assert updater.dump_update_sequences()["sequences"] == {"policy_data": 5}
+
+    # reconnect - only the missed (not seen) updates are replayed
+    policy_store.writes.clear()
+    await updater._sync_policy_data()
+    await settle()
+    assert replay_requests[-1].sequences == {"policy_data": 5}
+    assert policy_store.writes == [("PUT", "/6")]
+    await publish(published[6])
+    assert policy_store.writes == [("PUT", "/6")]
+    dumped = updater.dump_update_sequences()
+    assert dumped["sequences"] == {"policy_data": 7}
+
+    # an update that's not in the log can't be replayed - all data is refetched
+    await publish(make_update("/unlogged"))
+    assert updater.dump_update_sequences() is None
+    policy_store.writes.clear()
+    await updater._sync_policy_data()
+    await settle()
+    assert policy_store.writes == [("PUT", "/base")]
+    await updater._stop_polling_update_tasks()
+
+    # a restored backup resumes from the updates that were written to it
+    updater = DataUpdater(
+        pubsub_url=UPDATES_URL,
+        policy_store=policy_store,
+        data_fetcher=DelayedDataFetcher(),
+        fetch_on_connect=True,
+        data_topics=DATA_TOPICS,
+        should_send_reports=False,
+    )
+    updater.get_policy_data_config = get_policy_data_config
+    updater._replay_data_updates = replay_data_updates
+    updater.load_update_sequences(dumped)
+    policy_store.writes.clear()
+    await updater._sync_policy_data()
+    await settle()
+    assert replay_requests[-1].sequences == {"policy_data": 7}
+    assert policy_store.writes == []
+    await updater._stop_polling_update_tasks()
+
+
+def test_update_sequences_track_out_of_order_updates():
+    sequences = UpdateSequences(["a", "b"])
+    position = lambda **seqs: DataUpdateLogPosition(log_id="log", sequences=seqs)
+    assert not sequences.resumable
+    sequences.start("log", {"a": 2})
+    assert sequences.replay_request().sequences == {"a": 2, "b": 0}
+
+    for seq in (4, 3, 6):
+        assert sequences.is_new(position(a=seq, c=1))
+        sequences.record(position(a=seq, c=1))
+    assert not sequences.is_new(position(a=3))
+    assert not sequences.is_new(position(a=6))
+    assert sequences.is_new(position(a=5))
+    # updates are replayed after the last contiguously seen update
+    assert sequences.replay_request().sequences == {"a": 4, "b": 0}
+
+    # updates of another log can't be replayed
+    sequences.record(position(a=5).copy(update={"log_id": "other"}))
+    assert not sequences.resumable
@@ -0,0 +1,40 @@
+import jsonpatch
+from opal_client.data.json_diff import make_json_patch
+from opal_client.utils import exclude_none_fields
+
+
+def apply(document, patch):
+    return jsonpatch.apply_patch(document, exclude_none_fields(patch))
+
+
+def test_patch_turns_old_document_into_new():
+    old = {
+        "users": {"alice": {"roles": ["admin"]}, "bob": {"roles": []}},
+        "a/b": 1,
+        "flags": [1, 2, 3],
+    }
+    new = {
+        "users": {"alice": {"roles": ["viewer"]}, "carol": {"roles": []}},
+        "a/b": 2,
+        "flags": [1, 2, 3, 4],
+    }
+    patch = make_json_patch(old, new, max_ratio=5)
+    assert {op.op for op in patch} == {"add", "remove", "replace"}
+    assert apply(old, patch) == new
+
+
+def test_equal_documents_have_empty_patch():
+    document = {"users": {"alice": {"roles": ["admin"]}}}
+    assert make_json_patch(document, dict(document), max_ratio=0.1) == []
+
+
+def test_no_patch_if_not_worth_it():
+    old = {str(i): i for i in range(100)}
+    new = {str(i): i + 1 for i in range(100)}
+    assert make_json_patch(old, new, max_ratio=0.5) is None
+    assert make_json_patch(old, new, max_ratio=10) is not None
+    # the whole document is replaced
+    assert make_json_patch([1, 2], [1, 2, 3], max_ratio=1) is None
+    assert make_json_patch({"a": 1}, [1], max_ratio=1) is None
+    # null values cannot be written as a patch
+    assert make_json_patch({"a": 1}, {"a": None}, max_ratio=1) is None
@@ -1,9 +1,12 @@
+import asyncio
 import functools
 import os
 import random
 
 import pytest
+from aiohttp import web
 from fastapi import Response, status
+from opal_client.policy_store.base_policy_store_client import StoreState
 from opal_client.policy_store.opa_client import OpaClient, should_ignore_path
 from opal_client.policy_store.schemas import PolicyStoreAuth
 
@@ -113,6 +116,118 @@ async def test_attempt_operations_with_postponed_failure_retry():
         )
 
 
+@pytest.mark.asyncio
+async def test_requests_reuse_pooled_connection_over_unix_socket(tmpdir):
+    socket_path = os.path.join(tmpdir, "opa.sock")
+    connections = set()
+
+    async def handle_put(request: web.Request):
+        connections.add(id(request.transport))
+        return web.Response(status=status.HTTP_204_NO_CONTENT)
+
+    app = web.Application()
+    app.router.add_put("/v1/data/{path:.*}", handle_put)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    await web.UnixSite(runner, socket_path).start()
+
+    try:
+        client = OpaClient("http://opa", unix_socket=socket_path)
+        for i in range(10):
+            await client.set_policy_data({"i": i}, path=f"/key{i}")
+        await client.close()
+    finally:
+        await runner.cleanup()
+
+    assert len(connections) == 1, "All writes should reuse a single connection"
+
+
+@pytest.mark.asyncio
+async def test_set_policy_data_stream_writes_chunks_as_body(tmpdir):
+    socket_path = os.path.join(tmpdir, "opa.sock")
+    bodies = {}
+
+    async def handle_put(request: web.Request):
+        bodies[request.match_info["path"]] = await request.read()
+        return web.Response(status=status.HTTP_204_NO_CONTENT)
+
+    app = web.Application()
+    app.router.add_put("/v1/data/{path:.*}", handle_put)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    await web.UnixSite(runner, socket_path).start()
+
+    async def chunks():
+        yield b'{"users": '
+        yield b'["alice", "bob"]}'
+
+    try:
+        client = OpaClient("http://opa", unix_socket=socket_path)
+        assert client.supports_data_streaming
+        await client.set_policy_data_stream(chunks(), path="/static")
+        await client.close()
+    finally:
+        await runner.cleanup()
+
+    assert bodies == {"static": b'{"users": ["alice", "bob"]}'}
+
+
+@pytest.mark.asyncio
+async def test_import_state_writes_concurrently_in_dependency_order(tmpdir):
+    socket_path = os.path.join(tmpdir, "opa.sock")
+    loaded = []
+    writes = []
+    inflight = {"now": 0, "max": 0}
+
+    async def handle(request: web.Request):
+        inflight["now"] += 1
+        inflight["max"] = max(inflight["max"], inflight["now"])
+        try:
+            await asyncio.sleep(0.02)
+            path = request.match_info["path"].lstrip("/")
+            if request.path.startswith("/v1/policies/"):
+                if path == "app.rego" and "rbac.rego" not in loaded:
+                    return web.json_response({"code": "invalid_parameter"}, status=400)
+                loaded.append(path)
+                return web.json_response({})
+            writes.append((path, await request.json()))
+            return web.Response(status=status.HTTP_204_NO_CONTENT)
+        finally:
+            inflight["now"] -= 1
+
+    app = web.Application()
+    app.router.add_route("*", "/v1/{kind:data|policies}{path:.*}", handle)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    await web.UnixSite(runner, socket_path).start()
+
+    policies = {
+        "app.rego": "package app\n\nimport data.app.rbac\n",
+        "rbac.rego": "package app.rbac\n\nimport data.lib.utils\n",
+        **{f"lib{i}.rego": f"package lib.utils.m{i}\n" for i in range(5)},
+    }
+    data = {f"key{i}": {"i": i} for i in range(5)}
+    try:
+        client = OpaClient(
+            "http://opa", unix_socket=socket_path, cache_policy_data=True
+        )
+        await client.import_state(StoreState(policies=policies, data=data))
+        await client.close()
+    finally:
+        await runner.cleanup()
+
+    # modules are loaded after the modules they import
+    assert loaded.index("rbac.rego") > max(
+        loaded.index(f"lib{i}.rego") for i in range(5)
+    )
+    assert loaded.index("app.rego") > loaded.index("rbac.rego")
+    # the data is replaced, a top-level document at a time
+    assert writes[0] == ("", {})
+    assert sorted(writes[1:]) == sorted((k, v) for k, v in data.items())
+    assert client._policy_data_cache.get_data() == data
+    assert inflight["max"] > 2
+
+
 def test_should_not_ignore_anything_with_no_ignore_paths():
     ignore_paths = []
     assert should_ignore_path("myFolder", ignore_paths) == False
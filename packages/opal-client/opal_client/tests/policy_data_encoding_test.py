@@ -0,0 +1,32 @@
+import json
+
+import pytest
+from opal_client.utils import (
+    EncodedPolicyData,
+    encode_policy_data,
+    exclude_none_fields,
+    policy_data_content,
+)
+from opal_common.schemas.store import JSONPatchAction
+
+
+@pytest.mark.parametrize(
+    "data",
+    [
+        {"users": [{"name": "alice", "roles": ["admin"]}], "count": 1.5},
+        {"a": None, "b": [1, {"c": None}], "d": "null"},
+        {1: "non-string keys", "unicode": "שלום"},
+        [JSONPatchAction(op="add", path="/a", value={"b": None})],
+    ],
+)
+def test_encoding_is_same_as_excluding_none_fields(data):
+    assert json.loads(encode_policy_data(data)) == json.loads(
+        json.dumps(exclude_none_fields(data))
+    )
+
+
+def test_encoded_data_is_encoded_once():
+    data = EncodedPolicyData({"users": ["alice"]})
+    content = data.content
+    assert policy_data_content(data) is content
+    assert data.content is content
@@ -0,0 +1,69 @@
+import copy
+
+import pytest
+from opal_client.data.projection import ProjectionError, project_data
+from opal_common.schemas.data import DataProjection
+
+DOCUMENT = {
+    "data": {
+        "users": [
+            {"id": 1, "name": "alice", "address": {"city": "TLV", "zip": "1"}},
+            {"id": 2, "name": "bob", "address": {"city": "NYC", "zip": "2"}},
+            {"name": "nobody"},
+        ],
+        "groups": {
+            "admins": {"members": ["alice"], "created": "2020"},
+            "devs": {"members": ["bob"], "created": "2021"},
+        },
+    },
+    "meta": {"total": 3},
+}
+
+
+def project(**spec):
+    document = copy.deepcopy(DOCUMENT)
+    projected = project_data(document, DataProjection(**spec))
+    # the fetched document itself is left as is
+    assert document == DOCUMENT
+    return projected
+
+
+def test_select():
+    assert project(select="meta.total") == 3
+    assert project(select="data.users.1.name") == "bob"
+    assert project(select="data.users.*.address.city") == ["TLV", "NYC"]
+    assert project(select="data.groups.*.members") == {
+        "admins": ["alice"],
+        "devs": ["bob"],
+    }
+    with pytest.raises(ProjectionError):
+        project(select="data.roles")
+
+
+def test_fields():
+    assert project(select="data.users", fields=["name", "address.city"]) == [
+        {"name": "alice", "address": {"city": "TLV"}},
+        {"name": "bob", "address": {"city": "NYC"}},
+        {"name": "nobody"},
+    ]
+    assert project(select="data.groups.*", fields=["members"]) == {
+        "admins": {"members": ["alice"]},
+        "devs": {"members": ["bob"]},
+    }
+    assert project(fields=["meta"]) == {"meta": {"total": 3}}
+
+
+def test_key_by():
+    users = DOCUMENT["data"]["users"][:2]
+    assert project(select="data.users.*", key_by="name", fields=["address.zip"]) == {
+        "alice": {"address": {"zip": "1"}},
+        "bob": {"address": {"zip": "2"}},
+        "nobody": {},
+    }
+    with pytest.raises(ProjectionError):
+        # an item has no id
+        project(select="data.users", key_by="id")
+    assert project_data(users, DataProjection(key_by="id")) == {
+        "1": users[0],
+        "2": users[1],
+    }
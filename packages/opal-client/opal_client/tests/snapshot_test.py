@@ -0,0 +1,97 @@
+import json
+import os
+import zlib
+
+import aiofiles
+import pytest
+from opal_client.policy_store import snapshot
+from opal_client.policy_store.base_policy_store_client import StoreState
+from opal_client.policy_store.snapshot import (
+    SnapshotError,
+    read_snapshot,
+    write_snapshot,
+)
+
+STATE = StoreState(
+    policies={"rbac.rego": "package rbac\n\ndefault allow := false\n"},
+    data={
+        "users": [
+            {"name": f"user-{i}", "roles": ["admin"] * (i % 3)} for i in range(500)
+        ],
+        "settings": {"enabled": True, "ratio": 0.5, "nested": {"empty": {}}},
+        "empty": None,
+    },
+    policy_version="5f1c2a",
+)
+METADATA = {"data_updates": {"log_id": "log", "sequences": {"policy_data": 7}}}
+
+
+async def write(path, state=STATE, **kwargs):
+    async with aiofiles.open(path, "wb") as f:
+        await write_snapshot(f, state, METADATA, **kwargs)
+
+
+async def read(path):
+    async with aiofiles.open(path, "rb") as f:
+        return await read_snapshot(f)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "encoding,compression",
+    [("json", "zlib"), ("msgpack", "zlib"), ("json", "zstd"), ("msgpack", "zstd")],
+)
+async def test_snapshot_round_trip(tmpdir, encoding, compression):
+    if encoding == "msgpack" and snapshot.msgpack is None:
+        pytest.skip("msgpack is not installed")
+    if compression == "zstd" and snapshot.zstandard is None:
+        pytest.skip("zstandard is not installed")
+    path = os.path.join(tmpdir, "opa.json")
+    # (read a small chunk at a time, so frames span chunks)
+    snapshot.READ_CHUNK_SIZE, chunk_size = 64, snapshot.READ_CHUNK_SIZE
+    try:
+        await write(path, encoding=encoding, compression=compression)
+        assert await read(path) == (STATE, METADATA)
+    finally:
+        snapshot.READ_CHUNK_SIZE = chunk_size
+    assert os.path.getsize(path) < len(json.dumps(STATE._asdict())) / 4
+
+
+@pytest.mark.asyncio
+async def test_plain_json_backups_are_read(tmpdir):
+    path = os.path.join(tmpdir, "opa.json")
+    with open(path, "w") as f:
+        json.dump({"policies": STATE.policies, "data": STATE.data}, f)
+    # (backups of former versions hold no policy version, nor metadata)
+    assert await read(path) == (STATE._replace(policy_version=None), {})
+
+
+@pytest.mark.asyncio
+async def test_damaged_snapshots_are_rejected(tmpdir):
+    path = os.path.join(tmpdir, "opa.json")
+    await write(path, encoding="json", compression="zlib")
+    with open(path, "rb") as f:
+        content = f.read()
+
+    # truncated
+    with open(path, "wb") as f:
+        f.write(content[: len(content) // 2])
+    with pytest.raises(SnapshotError):
+        await read(path)
+
+    # a frame is tampered with (the compressed stream itself is valid)
+    header_end = content.index(b"\n") + 1
+    frames = zlib.decompress(content[header_end:])
+    with open(path, "wb") as f:
+        f.write(
+            content[:header_end]
+            + zlib.compress(frames.replace(b'"user-1"', b'"user-X"'))
+        )
+    with pytest.raises(SnapshotError, match="checksum"):
+        await read(path)
+
+    # an unknown version
+    with open(path, "wb") as f:
+        f.write(content[:8] + bytes([99]) + content[9:])
+    with pytest.raises(SnapshotError, match="version"):
+        await read(path)
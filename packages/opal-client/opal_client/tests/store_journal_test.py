@@ -0,0 +1,184 @@
+import asyncio
+import os
+
+import pytest
+from aiohttp import web
+from fastapi import status
+from opal_client.config import opal_client_config
+from opal_client.policy_store.journal import StoreJournal, file_digest, replay_journal
+from opal_client.policy_store.opa_client import OpaClient
+from opal_common.schemas.store import JSONPatchAction
+
+
+async def write_snapshot(path, content: str):
+    with open(path, "w") as f:
+        f.write(content)
+    return await file_digest(path)
+
+
+async def ops(records):
+    return [(r["op"], r.get("path", r.get("id"))) async for r in records]
+
+
+async def values(records):
+    return [r.get("value") async for r in records]
+
+
+@pytest.mark.asyncio
+async def test_journal_compaction_is_restorable_at_every_step(tmpdir):
+    snapshot_path = os.path.join(tmpdir, "opa.json")
+    journal = StoreJournal(snapshot_path)
+    await journal.open(None)
+    await journal.append("set_data", b'{"x": 1}', path="/a")
+    assert await ops(StoreJournal(snapshot_path).records(None)) == [("set_data", "/a")]
+    assert await values(StoreJournal(snapshot_path).records(None)) == [{"x": 1}]
+
+    # the journal is rotated (and the store captured) once the writes in progress are
+    # done, before any other write starts
+    store = {"a": {"x": 1}}
+    writing = journal.writing()
+    await writing.__aenter__()
+    rotate = asyncio.create_task(journal.rotate(capture=lambda: dict(store)))
+    await asyncio.sleep(0.01)
+    assert not rotate.done()
+
+    async def delete_a():
+        async with journal.writing():
+            store.pop("a")
+            await journal.append("delete_data", path="/a")
+
+    delete = asyncio.create_task(delete_a())
+    await asyncio.sleep(0.01)
+    assert "a" in store
+    await writing.__aexit__(None, None, None)
+    # (the captured store holds exactly the rotated writes)
+    assert await rotate == {"a": {"x": 1}}
+    # writes go on while the new snapshot is exported
+    await delete
+    new_snapshot = os.path.join(tmpdir, "opa.json.tmp")
+    digest = await write_snapshot(new_snapshot, '{"data": {"a": {"x": 1}}}')
+
+    # interrupted before the new snapshot was in place - both journals are replayed
+    assert await ops(StoreJournal(snapshot_path).records(None)) == [
+        ("set_data", "/a"),
+        ("delete_data", "/a"),
+    ]
+    # interrupted once the new snapshot was in place - the rotated journal is in it
+    os.replace(new_snapshot, snapshot_path)
+    assert await ops(StoreJournal(snapshot_path).records(digest)) == [
+        ("delete_data", "/a")
+    ]
+    await journal.compacted(digest)
+    assert not os.path.exists(journal.compacting_path)
+    assert await ops(StoreJournal(snapshot_path).records(digest)) == [
+        ("delete_data", "/a")
+    ]
+    # (only the writes that are not in the snapshot count)
+    with open(journal.path, "rb") as f:
+        header, delete, marker = f.readlines()
+    assert journal.size == len(delete)
+
+    # a journal is never replayed over a snapshot it does not follow
+    restored = StoreJournal(snapshot_path)
+    assert await ops(restored.records("other")) == []
+    await restored.open("other")
+    assert await ops(restored.records("other")) == []
+    assert restored.size == 0
+
+
+@pytest.mark.asyncio
+async def test_failed_compaction_is_merged_into_the_next(tmpdir):
+    snapshot_path = os.path.join(tmpdir, "opa.json")
+    digest = await write_snapshot(snapshot_path, "{}")
+    journal = StoreJournal(snapshot_path)
+    await journal.open(digest)
+    await journal.append("set_policy", b'"package a"', id="a.rego")
+    # (the export of the new snapshot fails)
+    await journal.rotate()
+    await journal.append("delete_policy", id="a.rego")
+    await journal.rotate()
+    await journal.append("set_data", b"[]", path="/b")
+
+    assert await ops(StoreJournal(snapshot_path).records(digest)) == [
+        ("set_policy", "a.rego"),
+        ("delete_policy", "a.rego"),
+        ("set_data", "/b"),
+    ]
+    # a truncated record (i.e: the process died mid-write) is dropped
+    with open(journal.path, "ab") as f:
+        f.write(b'{"op":"delete_data","pa')
+    assert len(await values(StoreJournal(snapshot_path).records(digest))) == 3
+
+
+@pytest.mark.asyncio
+async def test_opa_client_writes_are_journaled_and_replayed(tmpdir):
+    socket_path = os.path.join(tmpdir, "opa.sock")
+    requests = []
+
+    async def handle(request: web.Request):
+        requests.append((request.method, request.match_info["path"]))
+        if request.path.startswith("/v1/policies") and request.method != "DELETE":
+            return web.json_response({"result": []})
+        if request.method == "DELETE" and request.path.startswith("/v1/policies"):
+            return web.json_response({})
+        return web.Response(status=status.HTTP_204_NO_CONTENT)
+
+    app = web.Application()
+    app.router.add_route("*", "/v1/{path:.*}", handle)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    await web.UnixSite(runner, socket_path).start()
+
+    journal = StoreJournal(os.path.join(tmpdir, "opa.json"))
+    await journal.open(None)
+    try:
+        client = OpaClient(
+            "http://opa", unix_socket=socket_path, cache_policy_data=True
+        )
+        assert client.supports_journal
+        client.attach_journal(journal)
+        assert not client.supports_data_streaming
+        await client.set_policy_data({"users": ["alice"]}, path="/static")
+        await client.patch_policy_data(
+            [JSONPatchAction(op="add", path="/users/-", value="bob")], path="/static"
+        )
+        await client.set_policy_data({"x": 1}, path="other")
+        await client.delete_policy_data(path="/other")
+        await client.set_policy("a.rego", "package a")
+        await client.set_policy(opal_client_config.OPA_HEALTH_CHECK_POLICY_PATH, "")
+        await client.delete_policy("a.rego")
+        await client.set_policy_version("5f1c2a")
+        await client.close()
+
+        assert await ops(journal.records(None)) == [
+            ("set_data", "/static"),
+            ("patch_data", "/static"),
+            ("set_data", "/other"),
+            ("delete_data", "/other"),
+            ("set_policy", "a.rego"),
+            ("delete_policy", "a.rego"),
+            ("policy_version", None),
+        ]
+
+        requests.clear()
+        restored = OpaClient(
+            "http://opa", unix_socket=socket_path, cache_policy_data=True
+        )
+        written = await replay_journal(restored, journal.records(None))
+        await restored.close()
+    finally:
+        await runner.cleanup()
+
+    assert written == ["/static", "/static", "/other", "/other"]
+    assert await restored.get_policy_version() == "5f1c2a"
+    assert restored._policy_data_cache.get_data() == {
+        "static": {"users": ["alice", "bob"]}
+    }
+    assert [method for method, _ in requests][:6] == [
+        "PUT",
+        "PATCH",
+        "PUT",
+        "DELETE",
+        "PUT",
+        "DELETE",
+    ]
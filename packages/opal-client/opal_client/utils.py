@@ -1,6 +1,9 @@
+from typing import Any, Optional
+
 import aiohttp
 from fastapi import Response
 from fastapi.encoders import jsonable_encoder
+from opal_common import json_codec
 
 
 async def proxy_response(response: aiohttp.ClientResponse) -> Response:
@@ -17,3 +20,50 @@ def exclude_none_fields(data):
     # remove default values from the pydatic model with a None value and also
     # convert the model to a valid JSON serializable type using jsonable_encoder
     return jsonable_encoder(data, exclude_none=True)
+
+
+def encode_policy_data(data) -> bytes:
+    """Encodes data to be written into the policy store, exactly as json-
+    dumping exclude_none_fields(data) would (but faster).
+
+    Plain JSON values without nulls (most data coming from fetchers) are
+    encoded in a single pass, skipping jsonable_encoder.
+    """
+    try:
+        content = json_codec.dumps(data)
+    except (TypeError, ValueError):
+        # not plain json (i.e: pydantic models)
+        pass
+    else:
+        # (a null may also be part of a string value, which is fine - just slower)
+        if b"null" not in content:
+            return content
+    return json_codec.dumps(exclude_none_fields(data))
+
+
+class EncodedPolicyData:
+    """Data to be written into the policy store, along with its encoding
+    (computed once, on first use) - so the same bytes are reused for the write
+    itself, and any local copy of it."""
+
+    def __init__(self, value: Any):
+        self.value = value
+        self._content: Optional[bytes] = None
+
+    @property
+    def content(self) -> bytes:
+        if self._content is None:
+            self._content = encode_policy_data(self.value)
+        return self._content
+
+
+def policy_data_value(data) -> Any:
+    """Returns the (decoded) value of data given to a policy store."""
+    return data.value if isinstance(data, EncodedPolicyData) else data
+
+
+def policy_data_content(data) -> bytes:
+    """Returns the encoding of data given to a policy store."""
+    if isinstance(data, EncodedPolicyData):
+        return data.content
+    return encode_policy_data(data)
@@ -1,9 +1,25 @@
 from __future__ import annotations
 
 import asyncio
+import heapq
+import random
 import sys
+import time
+from dataclasses import dataclass, field
 from functools import partial
-from typing import Any, Callable, Coroutine, Optional, Set, Tuple, TypeVar
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Coroutine,
+    Dict,
+    Hashable,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    TypeVar,
+)
 
 import loguru
 from loguru import logger
@@ -101,12 +117,13 @@ class TasksPool:
     def _cleanup_task(self, done_task):
         self._tasks.remove(done_task)
 
-    def add_task(self, f):
+    def add_task(self, f) -> asyncio.Task:
         if not self._running:
             raise RuntimeError("TasksPool is already shutdown")
         t = asyncio.create_task(f)
         self._tasks.add(t)
         t.add_done_callback(self._cleanup_task)
+        return t
 
     async def shutdown(self, force: bool = False):
         """Wait for them to finish.
@@ -148,3 +165,177 @@ async def repeated_call(
                 func=func,
                 exc=exc,
             )
+
+
+@dataclass
+class _PeriodicJob:
+    func: Callable[[], Awaitable[Any]]
+    interval: float
+    # (for logging)
+    name: str = ""
+    # when the job is due next (monotonic time), and the version of the schedule entry
+    due: float = 0
+    version: int = 0
+    failures: int = 0
+    skipped_ticks: int = 0
+    running: Optional[asyncio.Task] = field(default=None, repr=False)
+
+
+class PeriodicScheduler:
+    """Runs many periodic jobs from a single task (instead of a task per job).
+
+    - Each run is delayed by a random jitter (a fraction of the interval), so jobs
+      with the same interval do not fire in lockstep.
+    - Jobs that fail are backed off exponentially (up to max_backoff seconds).
+    - A tick is skipped if the job's previous run is still in flight.
+    - Jobs are identified by key - scheduling a key again replaces its job, so
+      re-scheduling (i.e: on reconnect) never duplicates jobs.
+    """
+
+    def __init__(
+        self,
+        jitter: float = 0.1,
+        max_backoff: float = 600,
+        logger: Optional[loguru.Logger] = None,
+    ):
+        self._jitter = jitter
+        self._max_backoff = max_backoff
+        self._logger = logger if logger is not None else loguru.logger
+        self._jobs: Dict[Hashable, _PeriodicJob] = {}
+        # (due, version, key) of each scheduled job, stale entries are skipped
+        self._heap: List[Tuple[float, int, Hashable]] = []
+        self._versions = 0
+        self._changed = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._jobs
+
+    def keys(self) -> List[Hashable]:
+        return list(self._jobs)
+
+    def schedule(
+        self,
+        key: Hashable,
+        func: Callable[[], Awaitable[Any]],
+        interval: float,
+        run_now: bool = True,
+        name: Optional[str] = None,
+    ):
+        """Schedules func to run every interval seconds (replacing the job
+        scheduled under the same key, if any).
+
+        Args:
+            key: identifies the job
+            func: the job (a failure is an exception)
+            interval: seconds between runs
+            run_now: run the job shortly (within its jitter) - otherwise a job that
+                was already scheduled with the same interval keeps its next run time
+            name: describes the job in logs (defaults to the key)
+        """
+        job = self._jobs.get(key)
+        if job is None:
+            job = self._jobs[key] = _PeriodicJob(func=func, interval=interval)
+        job.func = func
+        job.name = name if name is not None else str(key)
+        if job.version and job.interval == interval and not run_now:
+            return
+        job.interval = interval
+        job.failures = 0
+        if run_now:
+            self._set_due(key, job, random.uniform(0, self._jitter * interval))
+        else:
+            self._set_due(key, job, self._next_delay(job))
+        self._ensure_running()
+
+    def unschedule(self, key: Hashable):
+        """Removes the job (a run in flight is not cancelled)."""
+        self._jobs.pop(key, None)
+
+    def stats(self, key: Hashable) -> Dict[str, Any]:
+        job = self._jobs[key]
+        return {
+            "interval": job.interval,
+            "failures": job.failures,
+            "skipped_ticks": job.skipped_ticks,
+            "running": job.running is not None,
+            "next_run_in": max(job.due - time.monotonic(), 0),
+        }
+
+    async def stop(self):
+        """Removes all jobs, and cancels the scheduler and the runs in
+        flight."""
+        tasks = [job.running for job in self._jobs.values() if job.running]
+        self._jobs.clear()
+        self._heap.clear()
+        if self._task is not None:
+            tasks.append(self._task)
+            self._task = None
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def _next_delay(self, job: _PeriodicJob) -> float:
+        delay = job.interval
+        if job.failures:
+            delay = min(delay * 2**job.failures, max(self._max_backoff, job.interval))
+        return delay * (1 + random.uniform(-self._jitter, self._jitter))
+
+    def _set_due(self, key: Hashable, job: _PeriodicJob, delay: float):
+        self._versions += 1
+        job.version = self._versions
+        job.due = time.monotonic() + delay
+        heapq.heappush(self._heap, (job.due, job.version, key))
+        self._changed.set()
+
+    def _ensure_running(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def _run(self):
+        while True:
+            self._changed.clear()
+            now = time.monotonic()
+            while self._heap and self._heap[0][0] <= now:
+                _, version, key = heapq.heappop(self._heap)
+                job = self._jobs.get(key)
+                if job is None or job.version != version:
+                    continue  # unscheduled or rescheduled
+                self._tick(key, job)
+            timeout = self._heap[0][0] - now if self._heap else None
+            try:
+                await asyncio.wait_for(self._changed.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    def _tick(self, key: Hashable, job: _PeriodicJob):
+        if job.running is not None:
+            job.skipped_ticks += 1
+            self._logger.debug(
+                "Skipping periodic job {name}, its previous run is in flight",
+                name=job.name,
+            )
+        else:
+            job.running = asyncio.create_task(self._run_job(key, job))
+        self._set_due(key, job, self._next_delay(job))
+
+    async def _run_job(self, key: Hashable, job: _PeriodicJob):
+        try:
+            await job.func()
+        except asyncio.CancelledError:
+            raise
+        except Exception as exc:
+            job.failures += 1
+            self._logger.exception(
+                "Error during periodic job {name} (failed {failures} times in a row): {exc}",
+                name=job.name,
+                failures=job.failures,
+                exc=exc,
+            )
+            # back off starting now (instead of from the next tick)
+            if self._jobs.get(key) is job:
+                self._set_due(key, job, self._next_delay(job))
+        else:
+            job.failures = 0
+        finally:
+            job.running = None
@@ -120,18 +120,70 @@ class OpalCommonConfig(Confi):
         6,
         description="Max number of worker tasks handling fetch events concurrently",
     )
+    # Max number of worker tasks the pool scales up to when the queue is backed up
+    FETCHING_MAX_WORKER_COUNT = confi.int(
+        "FETCHING_MAX_WORKER_COUNT",
+        32,
+        description="Max number of fetching worker tasks - the pool scales up from FETCHING_WORKER_COUNT workers when queued fetches are expected to wait (by queue depth and observed fetch latency)",
+    )
+    # Time in seconds an additional worker may be idle before it exits
+    FETCHING_WORKER_IDLE_TIMEOUT = confi.float(
+        "FETCHING_WORKER_IDLE_TIMEOUT",
+        30,
+        description="Time in seconds an additional (scaled up) fetching worker may be idle before it exits",
+    )
+    # Max number of concurrent fetches from a single data source
+    FETCHING_SOURCE_MAX_CONCURRENCY = confi.int(
+        "FETCHING_SOURCE_MAX_CONCURRENCY",
+        0,
+        description="Max number of concurrent fetches from a single data source (i.e: an HTTP server), so a slow source can't occupy every fetching worker. 0 for no limit",
+    )
     # Time in seconds to wait on the queued fetch task.
     FETCHING_CALLBACK_TIMEOUT = confi.int(
         "FETCHING_CALLBACK_TIMEOUT",
         10,
         description="Time in seconds to wait on the queued fetch task",
     )
+    # Time in seconds to wait on a streamed fetch (that is consumed as it arrives)
+    FETCHING_STREAM_TIMEOUT = confi.int(
+        "FETCHING_STREAM_TIMEOUT",
+        300,
+        description="Time in seconds to wait on a streamed fetch task, including writing its content to the policy store (the write is aborted on timeout)",
+    )
     # Time in seconds to wait for queuing a new task (if the queue is full)
     FETCHING_ENQUEUE_TIMEOUT = confi.int(
         "FETCHING_ENQUEUE_TIMEOUT",
         10,
         description="Time in seconds to wait for queuing a new task (if the queue is full)",
     )
+    # Max number of queued tasks in each priority lane of the fetching queue
+    FETCHING_QUEUE_SIZE = confi.int(
+        "FETCHING_QUEUE_SIZE",
+        1000,
+        description="Max number of queued fetch tasks in each priority lane (high, normal, low) of the fetching queue, 0 for unbounded",
+    )
+    # Time in seconds to memoize fetched results for (identical concurrent fetches are always shared)
+    FETCHING_MEMO_TTL = confi.float(
+        "FETCHING_MEMO_TTL",
+        0,
+        description="Time in seconds to serve repeated fetches of the same url (with the same config) from memory, 0 to disable (concurrent identical fetches are shared regardless). Fetch providers may override it",
+    )
+    FETCHING_MEMO_MAX_ENTRIES = confi.int(
+        "FETCHING_MEMO_MAX_ENTRIES",
+        256,
+        description="Max number of fetched results memoized at once",
+    )
+    FETCHING_MEMO_MAX_BYTES = confi.int(
+        "FETCHING_MEMO_MAX_BYTES",
+        32 * 1024 * 1024,
+        description="Max total (serialized) size in bytes of the memoized fetched results",
+    )
+    # Number of fetching workers which only handle high priority tasks
+    FETCHING_RESERVED_WORKER_COUNT = confi.int(
+        "FETCHING_RESERVED_WORKER_COUNT",
+        1,
+        description="Number of fetching workers which only handle high priority tasks (i.e: pubsub data updates), so those are never stuck behind bulk fetches",
+    )
 
     GIT_SSH_KEY_FILE = confi.str(
         "GIT_SSH_KEY_FILE",
@@ -208,6 +260,82 @@ class OpalCommonConfig(Confi):
         description="The client to use for fetching data, can be either aiohttp or httpx."
         "if provided different value, aiohttp will be used.",
     )
+    HTTP_CLIENT_POOL_LIMIT = confi.int(
+        "HTTP_CLIENT_POOL_LIMIT",
+        100,
+        description="Max number of simultaneous connections of each shared outbound http session (0 for unlimited)",
+    )
+    HTTP_CLIENT_POOL_LIMIT_PER_HOST = confi.int(
+        "HTTP_CLIENT_POOL_LIMIT_PER_HOST",
+        20,
+        description="Max number of simultaneous connections to the same remote host (0 for unlimited)",
+    )
+    HTTP_CLIENT_DNS_CACHE_TTL = confi.int(
+        "HTTP_CLIENT_DNS_CACHE_TTL",
+        60,
+        description="Time in seconds to cache resolved DNS entries of outbound http requests",
+    )
+    HTTP_CLIENT_KEEPALIVE_TIMEOUT = confi.float(
+        "HTTP_CLIENT_KEEPALIVE_TIMEOUT",
+        30,
+        description="Time in seconds to keep an idle outbound connection open for reuse",
+    )
+    HTTP_CLIENT_IDLE_TIMEOUT = confi.float(
+        "HTTP_CLIENT_IDLE_TIMEOUT",
+        300,
+        description="Time in seconds after which an unused shared outbound http session is closed",
+    )
+    RPC_CLIENT_MAX_CONNECTIONS_PER_ENDPOINT = confi.int(
+        "RPC_CLIENT_MAX_CONNECTIONS_PER_ENDPOINT",
+        2,
+        description="Max number of pooled websocket connections to the same rpc endpoint (of FastApiRpcFetchProvider)",
+    )
+    RPC_CLIENT_MAX_INFLIGHT_CALLS = confi.int(
+        "RPC_CLIENT_MAX_INFLIGHT_CALLS",
+        16,
+        description="Max number of concurrent rpc calls multiplexed over a single pooled rpc connection",
+    )
+    RPC_CLIENT_KEEP_ALIVE = confi.float(
+        "RPC_CLIENT_KEEP_ALIVE",
+        20,
+        description="Interval in seconds of health pings over pooled rpc connections (0 to disable) - "
+        "a connection failing a ping is dropped and reconnected on its next use",
+    )
+    RPC_CLIENT_IDLE_TIMEOUT = confi.float(
+        "RPC_CLIENT_IDLE_TIMEOUT",
+        300,
+        description="Time in seconds after which an unused pooled rpc connection is closed",
+    )
+    JSON_CODEC = confi.str(
+        "JSON_CODEC",
+        "auto",
+        description="The codec used to encode JSON written into the policy store: orjson, json, or auto "
+        "(orjson if it's installed, json otherwise)",
+    )
+    HTTP_FETCHER_STREAM_CHUNK_SIZE = confi.int(
+        "HTTP_FETCHER_STREAM_CHUNK_SIZE",
+        64 * 1024,
+        description="Size in bytes of the chunks in which fetched content is streamed (for data entries "
+        "written into the policy store without being processed)",
+    )
+    HTTP_FETCHER_CONDITIONAL_REQUESTS = confi.bool(
+        "HTTP_FETCHER_CONDITIONAL_REQUESTS",
+        True,
+        description="Remember the ETag / Last-Modified validators of fetched data, and refetch unchanged data "
+        "with If-None-Match / If-Modified-Since requests (a 304 response skips the policy store write)",
+    )
+    FILE_FETCHER_ALLOWED_PATHS = confi.list(
+        "FILE_FETCHER_ALLOWED_PATHS",
+        [],
+        description="Directories FileFetchProvider may read (file://) data from - none by default, which "
+        "disables it",
+    )
+    HTTP_FETCHER_PAGINATED_CONCURRENCY = confi.int(
+        "HTTP_FETCHER_PAGINATED_CONCURRENCY",
+        4,
+        description="Max number of concurrent requests of a single PaginatedHttpFetchProvider fetch (pages, "
+        "or byte ranges) - unless set in the entry's fetcher config",
+    )
 
 
 opal_common_config = OpalCommonConfig(prefix="OPAL_")
@@ -1,9 +1,12 @@
 import re
-from typing import Optional
+from typing import Dict, List, Optional, Set
 
 # This regex matches the package declaration at the top of a valid .rego file
 REGO_PACKAGE_DECLARATION = re.compile(r"^package\s+([a-zA-Z0-9\.\"\[\]]+)$")
 
+# This regex matches the imports of data documents (i.e: other packages) in a .rego file
+REGO_DATA_IMPORT = re.compile(r"^\s*import\s+data\.([a-zA-Z0-9_\.]+)")
+
 
 def get_rego_package(contents: str) -> Optional[str]:
     """Try to parse the package name from rego file contents.
@@ -16,3 +19,62 @@ def get_rego_package(contents: str) -> Optional[str]:
         if match is not None:
             return match.group(1)
     return None
+
+
+def get_rego_data_imports(contents: str) -> List[str]:
+    """The data documents imported by rego file contents (i.e: "a.b" for
+    "import data.a.b")."""
+    imports = []
+    for line in contents.splitlines():
+        match = REGO_DATA_IMPORT.match(line)
+        if match is not None:
+            imports.append(match.group(1))
+    return imports
+
+
+def sort_rego_modules_by_dependencies(modules: Dict[str, str]) -> List[List[str]]:
+    """Groups rego modules (given by id) into levels, where the modules of
+    each level only import packages of the previous levels - so the modules of
+    a level can be loaded concurrently.
+
+    Modules of an import cycle are put in the last level.
+    """
+    packages: Dict[str, str] = {
+        module_id: get_rego_package(contents) for module_id, contents in modules.items()
+    }
+    # the modules of each package, and the modules under each document
+    modules_of: Dict[str, Set[str]] = {}
+    modules_under: Dict[str, Set[str]] = {}
+    for module_id, package in packages.items():
+        if package is None:
+            continue
+        modules_of.setdefault(package, set()).add(module_id)
+        parts = package.split(".")
+        for i in range(1, len(parts) + 1):
+            modules_under.setdefault(".".join(parts[:i]), set()).add(module_id)
+
+    dependencies: Dict[str, Set[str]] = {}
+    for module_id, contents in modules.items():
+        deps = set()
+        for imported in get_rego_data_imports(contents):
+            # the imported document's package (importing a rule), or the packages under it
+            parts = imported.split(".")
+            for i in range(1, len(parts)):
+                deps.update(modules_of.get(".".join(parts[:i]), ()))
+            deps.update(modules_under.get(imported, ()))
+        deps.discard(module_id)
+        dependencies[module_id] = deps
+
+    levels = []
+    loaded: Set[str] = set()
+    remaining = list(modules)
+    while remaining:
+        level = [m for m in remaining if dependencies[m] <= loaded]
+        if not level:
+            # an import cycle
+            levels.append(remaining)
+            break
+        levels.append(level)
+        loaded.update(level)
+        remaining = [m for m in remaining if m not in loaded]
+    return levels
@@ -14,7 +14,11 @@ root_dir = os.path.abspath(
 )
 sys.path.append(root_dir)
 
-from opal_common.engine.parsing import get_rego_package
+from opal_common.engine.parsing import (
+    get_rego_data_imports,
+    get_rego_package,
+    sort_rego_modules_by_dependencies,
+)
 
 
 def test_can_extract_the_correct_package_name():
@@ -57,3 +61,23 @@ def test_no_package_name_in_file():
 
     # empty file
     assert get_rego_package("") is None
+
+
+def test_modules_are_sorted_by_their_imports():
+    modules = {
+        "app.rego": "package app\n\nimport data.app.rbac\nimport data.lib\n",
+        "rbac.rego": "package app.rbac\n\nimport data.lib.utils.is_admin\n",
+        "utils.rego": "package lib.utils\n",
+        "other.rego": "package other\n\nimport input.user\n",
+        "a.rego": "package cycle.a\nimport data.cycle.b\n",
+        "b.rego": "package cycle.b\nimport data.cycle.a\n",
+    }
+    assert get_rego_data_imports(modules["app.rego"]) == ["app.rbac", "lib"]
+    assert get_rego_data_imports(modules["other.rego"]) == []
+    assert sort_rego_modules_by_dependencies(modules) == [
+        ["utils.rego", "other.rego"],
+        ["rbac.rego"],
+        ["app.rego"],
+        # (an import cycle)
+        ["a.rego", "b.rego"],
+    ]
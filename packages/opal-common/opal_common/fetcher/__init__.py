@@ -1,3 +1,10 @@
 from opal_common.fetcher.engine.fetching_engine import FetchingEngine
-from opal_common.fetcher.events import FetcherConfig, FetchEvent
+from opal_common.fetcher.events import (
+    NOT_MODIFIED,
+    FetchedDelta,
+    FetcherConfig,
+    FetchEvent,
+    FetchPriority,
+    NotModified,
+)
 from opal_common.fetcher.fetcher_register import FetcherRegister
@@ -0,0 +1,125 @@
+import asyncio
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Optional, Tuple
+
+from opal_common.fetcher.events import FetchPriority
+
+
+class FetchLane:
+    """A bounded FIFO of queued fetch tasks of a single priority (and its
+    statistics)."""
+
+    def __init__(self, priority: FetchPriority, maxsize: int):
+        self.priority = priority
+        self.maxsize = maxsize
+        # (enqueue time, item)
+        self.items: Deque[Tuple[float, Any]] = deque()
+        self.total_enqueued = 0
+        self.total_wait_time = 0.0
+        self.max_wait_time = 0.0
+
+    @property
+    def full(self) -> bool:
+        return self.maxsize > 0 and len(self.items) >= self.maxsize
+
+    def stats(self) -> Dict[str, Any]:
+        dequeued = self.total_enqueued - len(self.items)
+        oldest_wait = time.monotonic() - self.items[0][0] if self.items else 0.0
+        return {
+            "depth": len(self.items),
+            "maxsize": self.maxsize,
+            "total_enqueued": self.total_enqueued,
+            "avg_wait_time": self.total_wait_time / dequeued if dequeued else 0.0,
+            "max_wait_time": self.max_wait_time,
+            "oldest_wait_time": oldest_wait,
+        }
+
+
+class FetchLanes:
+    """A queue of fetch tasks, split into bounded lanes by priority.
+
+    - get() always returns the oldest task of the most urgent non-empty lane
+      (optionally, only of lanes at least as urgent as a given priority, and
+      skipping tasks that can't be accepted yet - call wake() once they might be).
+    - put() waits while the task's lane is full (backpressure), put_nowait()
+      raises asyncio.QueueFull instead.
+    """
+
+    def __init__(self, maxsize: int = 0):
+        self._lanes: Dict[FetchPriority, FetchLane] = {
+            priority: FetchLane(priority, maxsize) for priority in FetchPriority
+        }
+        # waiters re-check the lanes whenever an item is added / removed
+        self._item_added = asyncio.Event()
+        self._item_removed = asyncio.Event()
+
+    def _first_task(
+        self, lowest: FetchPriority, accept: Optional[Callable[[Any], bool]]
+    ) -> Optional[Tuple[FetchLane, int]]:
+        for priority, lane in self._lanes.items():
+            if priority > lowest:
+                break
+            for index, (_, item) in enumerate(lane.items):
+                if accept is None or accept(item):
+                    return lane, index
+        return None
+
+    async def put(self, item: Any, priority: FetchPriority = FetchPriority.NORMAL):
+        while self._lanes[priority].full:
+            self._item_removed.clear()
+            await self._item_removed.wait()
+        self.put_nowait(item, priority)
+
+    def put_nowait(self, item: Any, priority: FetchPriority = FetchPriority.NORMAL):
+        lane = self._lanes[priority]
+        if lane.full:
+            raise asyncio.QueueFull()
+        lane.items.append((time.monotonic(), item))
+        lane.total_enqueued += 1
+        self._item_added.set()
+
+    async def get(
+        self,
+        lowest: FetchPriority = FetchPriority.LOW,
+        accept: Optional[Callable[[Any], bool]] = None,
+        taken: Optional[Callable[[Any], None]] = None,
+    ) -> Any:
+        """Takes the first accepted task (of the lanes up to `lowest`), waiting
+        for one if there is none.
+
+        `taken` is called with the task as it's taken - before any other
+        getter checks which tasks it accepts (i.e: to reserve what accepting
+        them depends on).
+        """
+        while (found := self._first_task(lowest, accept)) is None:
+            self._item_added.clear()
+            await self._item_added.wait()
+        lane, index = found
+        enqueued_at, item = lane.items[index]
+        del lane.items[index]
+        if taken is not None:
+            taken(item)
+        wait_time = time.monotonic() - enqueued_at
+        lane.total_wait_time += wait_time
+        lane.max_wait_time = max(lane.max_wait_time, wait_time)
+        self._item_removed.set()
+        return item
+
+    def task_done(self):
+        pass
+
+    def wake(self):
+        """Makes waiting getters re-check the queued tasks (i.e: once a skipped
+        task can be accepted)."""
+        self._item_added.set()
+
+    def qsize(self) -> int:
+        return sum(len(lane.items) for lane in self._lanes.values())
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Depth and wait time statistics of each lane."""
+        return {
+            priority.name.lower(): lane.stats()
+            for priority, lane in self._lanes.items()
+        }
@@ -0,0 +1,59 @@
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional, Tuple
+
+
+class FetchMemo:
+    """A short lived memo of fetch results, bounded by entry count and
+    (approximate) total size in bytes.
+
+    Entries expire after their ttl, and the least recently used entries
+    are evicted to stay within bounds.
+    """
+
+    def __init__(self, max_entries: int, max_bytes: int):
+        self._max_entries = max_entries
+        self._max_bytes = max_bytes
+        # key -> (expiry time, size, value)
+        self._entries: "OrderedDict[Hashable, Tuple[float, int, Any]]" = OrderedDict()
+        self._bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def size(self) -> int:
+        return self._bytes
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Returns the memoized value of the key (None if missing or
+        expired)."""
+        memoized = self._entries.get(key)
+        if memoized is None:
+            return None
+        expires_at, _, value = memoized
+        if expires_at <= time.monotonic():
+            self._remove(key)
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def put(self, key: Hashable, value: Any, size: int, ttl: float):
+        """Memoizes the value for ttl seconds (values larger than the whole
+        memo are not memoized)."""
+        self._remove(key)
+        if ttl <= 0 or size > self._max_bytes or self._max_entries <= 0:
+            return
+        self._entries[key] = (time.monotonic() + ttl, size, value)
+        self._bytes += size
+        while len(self._entries) > self._max_entries or self._bytes > self._max_bytes:
+            self._remove(next(iter(self._entries)))
+
+    def clear(self):
+        self._entries.clear()
+        self._bytes = 0
+
+    def _remove(self, key: Hashable):
+        memoized = self._entries.pop(key, None)
+        if memoized is not None:
+            self._bytes -= memoized[1]
@@ -1,29 +1,77 @@
 import asyncio
-from typing import Coroutine
+import time
+from typing import Coroutine, Optional
 
 from opal_common.fetcher.engine.base_fetching_engine import BaseFetchingEngine
-from opal_common.fetcher.events import FetchEvent
+from opal_common.fetcher.engine.fetch_lanes import FetchLanes
+from opal_common.fetcher.engine.worker_pool import FetchWorkerPool
+from opal_common.fetcher.events import FetchEvent, FetchPriority
+from opal_common.fetcher.fetch_provider import BaseFetchProvider
 from opal_common.fetcher.fetcher_register import FetcherRegister
 from opal_common.fetcher.logger import get_logger
 
 logger = get_logger("fetch_worker")
 
 
-async def fetch_worker(queue: asyncio.Queue, engine):
+async def _stream_content(fetcher: BaseFetchProvider, res, event: FetchEvent):
+    async for chunk in fetcher.stream(res):
+        yield chunk
+    # known once the content was fully consumed
+    event.content_digest = fetcher.content_digest
+
+
+async def _run_callback(callback: Coroutine, data, event: FetchEvent, engine):
+    try:
+        await callback(data)
+    except Exception as err:
+        logger.exception(f"Fetcher callback - {callback} failed")
+        await engine._on_failure(err, event)
+
+
+async def fetch_worker(
+    queue: FetchLanes,
+    engine,
+    lowest_priority: FetchPriority = FetchPriority.LOW,
+    idle_timeout: Optional[float] = None,
+):
     """The worker task performing items added to the Engine's Queue.
 
     Args:
-        queue (asyncio.Queue): The Queue
+        queue (FetchLanes): The Queue
         engine (BaseFetchingEngine): The engine itself
+        lowest_priority (FetchPriority): The least urgent lane the worker takes tasks from
+        idle_timeout (float, optional): Seconds without tasks after which the worker exits
+            (if the engine's pool can scale down). None to never exit.
+
+    The engine accounts for the worker's start / exit, the worker accounts for its fetches.
     """
     engine: BaseFetchingEngine
     register: FetcherRegister = engine.register
+    pool: FetchWorkerPool = engine.pool
+    general = lowest_priority == FetchPriority.LOW
     while True:
         # types
         event: FetchEvent
         callback: Coroutine
-        # get a event from the queue
-        event, callback = await queue.get()
+        # get a event from the queue (skipping events of data sources at their concurrency
+        # limit - the event's data source capacity is reserved as it's taken)
+        get_task = queue.get(
+            lowest_priority, accept=engine.can_start_fetch, taken=engine.fetch_taken
+        )
+        if idle_timeout is None:
+            event, callback = await get_task
+        else:
+            try:
+                event, callback = await asyncio.wait_for(get_task, idle_timeout)
+            except asyncio.TimeoutError:
+                if pool.can_scale_down():
+                    return
+                continue
+        source = engine.source_of(event)
+        pool.fetch_started(general)
+        # other workers may be needed for the rest of the queue
+        engine.scale_workers()
+        started_at = time.monotonic()
         # take care of it
         try:
             # get fetcher for the event
@@ -31,16 +79,23 @@ async def fetch_worker(queue: asyncio.Queue, engine):
             # fetch
             async with fetcher:
                 res = await fetcher.fetch()
-                data = await fetcher.process(res)
-            # callback to event owner
-            try:
-                await callback(data)
-            except Exception as err:
-                logger.exception(f"Fetcher callback - {callback} failed")
-                await engine._on_failure(err, event)
+                if event.stream:
+                    # the raw content is consumed by the callback while the response is open
+                    await _run_callback(
+                        callback, _stream_content(fetcher, res, event), event, engine
+                    )
+                else:
+                    data = await fetcher.process(res)
+                    event.content_digest = fetcher.content_digest
+            if not event.stream:
+                # callback to event owner
+                await _run_callback(callback, data, event, engine)
         except Exception as err:
             logger.exception("Failed to process fetch event")
             await engine._on_failure(err, event)
         finally:
+            pool.fetch_done(general, source, time.monotonic() - started_at)
             # Notify the queue that the "work item" has been processed.
             queue.task_done()
+            # (tasks of the data source may be accepted again)
+            queue.wake()
@@ -1,14 +1,33 @@
 import asyncio
+import json
 import uuid
-from typing import Coroutine, Dict, List, Union
+from functools import partial
+from typing import (
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Coroutine,
+    Dict,
+    Hashable,
+    List,
+    Optional,
+    Tuple,
+    Union,
+)
 
+from opal_common import json_codec
 from opal_common.fetcher.engine.base_fetching_engine import BaseFetchingEngine
 from opal_common.fetcher.engine.core_callbacks import OnFetchFailureCallback
+from opal_common.fetcher.engine.fetch_lanes import FetchLanes
+from opal_common.fetcher.engine.fetch_memo import FetchMemo
 from opal_common.fetcher.engine.fetch_worker import fetch_worker
-from opal_common.fetcher.events import FetcherConfig, FetchEvent
+from opal_common.fetcher.engine.worker_pool import FetchWorkerPool
+from opal_common.fetcher.events import FetcherConfig, FetchEvent, FetchPriority
 from opal_common.fetcher.fetch_provider import BaseFetchProvider
 from opal_common.fetcher.fetcher_register import FetcherRegister
 from opal_common.fetcher.logger import get_logger
+from pydantic import BaseModel
 
 logger = get_logger("engine")
 
@@ -19,12 +38,25 @@ class FetchingEngine(BaseFetchingEngine):
     - Configure with different fetcher providers - via __init__'s register_config or via self.register.register_fetcher()
     - Use queue_url() to fetch a given URL with the default FetchProvider
     - Use queue_fetch_event() to fetch data using a configured FetchProvider
+    - Queued tasks are handled by priority (@see FetchPriority), each priority has its own bounded lane
+    - Concurrent identical handle_url() calls share a single fetch, and (if memo_ttl is set) their
+      results are memoized for a short while (@see BaseFetchProvider.can_share_fetches)
+    - The workers pool scales between worker_count and max_worker_count workers by the queue depth
+      and the observed fetch latency, with a limit on concurrent fetches per data source
+      (@see BaseFetchProvider.source_of)
     - Use with 'async with' to terminate tasks (or call self.terminate_tasks() when done)
     """
 
     DEFAULT_WORKER_COUNT = 6
     DEFAULT_CALLBACK_TIMEOUT = 10
     DEFAULT_ENQUEUE_TIMEOUT = 10
+    DEFAULT_LANE_SIZE = 1000
+    DEFAULT_RESERVED_WORKER_COUNT = 1
+    DEFAULT_MEMO_MAX_ENTRIES = 256
+    DEFAULT_MEMO_MAX_BYTES = 32 * 1024 * 1024
+    DEFAULT_WORKER_IDLE_TIMEOUT = 30
+    DEFAULT_SCALE_UP_WAIT = 0.5
+    DEFAULT_STREAM_TIMEOUT = 300
 
     @staticmethod
     def gen_uid():
@@ -37,34 +69,75 @@ class FetchingEngine(BaseFetchingEngine):
         callback_timeout: int = DEFAULT_CALLBACK_TIMEOUT,
         enqueue_timeout: int = DEFAULT_ENQUEUE_TIMEOUT,
         retry_config=None,
+        lane_size: int = DEFAULT_LANE_SIZE,
+        reserved_worker_count: int = DEFAULT_RESERVED_WORKER_COUNT,
+        memo_ttl: float = 0,
+        memo_max_entries: int = DEFAULT_MEMO_MAX_ENTRIES,
+        memo_max_bytes: int = DEFAULT_MEMO_MAX_BYTES,
+        max_worker_count: Optional[int] = None,
+        worker_idle_timeout: float = DEFAULT_WORKER_IDLE_TIMEOUT,
+        scale_up_wait: float = DEFAULT_SCALE_UP_WAIT,
+        source_max_concurrency: int = 0,
+        stream_timeout: float = DEFAULT_STREAM_TIMEOUT,
     ) -> None:
         # The internal task queue (created at start_workers)
-        self._queue: asyncio.Queue = None
+        self._queue: FetchLanes = None
         # Worker working the queue
         self._tasks: List[asyncio.Task] = []
         # register of the fetch providers workers can use
         self._fetcher_register = FetcherRegister(register_config)
         # core event callback registers
         self._failure_handlers: List[OnFetchFailureCallback] = []
-        # how many workers to run
+        # how many workers to always run
         self._worker_count: int = worker_count
+        # scaling of additional workers (up to max_worker_count, each exits after worker_idle_timeout
+        # seconds without tasks), by default the pool is not scaled
+        self._pool = FetchWorkerPool(
+            min_workers=worker_count,
+            max_workers=(
+                max_worker_count if max_worker_count is not None else worker_count
+            ),
+            scale_up_wait=scale_up_wait,
+            source_max_concurrency=source_max_concurrency,
+        )
+        self._worker_idle_timeout = worker_idle_timeout
+        # how many of the workers only handle high priority tasks (so they are never stuck behind bulk work)
+        self._reserved_worker_count: int = min(
+            reserved_worker_count, max(worker_count - 1, 0)
+        )
+        # max number of queued tasks in each priority lane (0 for unbounded)
+        self._lane_size = lane_size
         # time in seconds before timeout on a fetch callback
         self._callback_timeout = callback_timeout
+        # time in seconds before timeout on a streamed fetch (including consuming the content)
+        self._stream_timeout = stream_timeout
         # time in seconds before time out on adding a task to queue (when full)
         self._enqueue_timeout = enqueue_timeout
         self._retry_config = retry_config
+        # shared fetches in progress (by share key)
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+        # seconds to memoize results for (unless the fetch provider overrides it)
+        self._memo_ttl = memo_ttl
+        self._memo = FetchMemo(max_entries=memo_max_entries, max_bytes=memo_max_bytes)
 
     def start_workers(self):
         if self._queue is None:
-            self._queue = asyncio.Queue()
+            self._queue = FetchLanes(maxsize=self._lane_size)
             # create worker tasks
-            for _ in range(self._worker_count):
-                self.create_worker()
+            for i in range(self._worker_count):
+                if i < self._reserved_worker_count:
+                    self.create_worker(lowest_priority=FetchPriority.HIGH)
+                else:
+                    self.create_worker()
 
     @property
     def register(self) -> FetcherRegister:
         return self._fetcher_register
 
+    @property
+    def pool(self) -> FetchWorkerPool:
+        return self._pool
+
     async def __aenter__(self):
         """Async Context manager to cancel tasks on exit."""
         self.start_workers()
@@ -87,6 +160,7 @@ class FetchingEngine(BaseFetchingEngine):
         await asyncio.gather(*self._tasks, return_exceptions=True)
         # reset queue
         self._queue = None
+        self._memo.clear()
 
     async def handle_url(self, url: str, timeout: float = None, **kwargs):
         """
@@ -100,6 +174,92 @@ class FetchingEngine(BaseFetchingEngine):
             asyncio.TimeoutError: if the given timeout has expired
             also - @see self.queue_fetch_event
         """
+        data, _ = await self.handle_url_with_digest(url, timeout=timeout, **kwargs)
+        return data
+
+    async def handle_url_with_digest(
+        self, url: str, timeout: float = None, **kwargs
+    ) -> Tuple[Any, Optional[str]]:
+        """Same as self.handle_url, but also returns the digest of the raw
+        fetched content (None if the fetcher did not compute one)
+
+        Identical concurrent calls (same url, fetcher and config) share a single
+        fetch (and its failure), if the fetch provider allows it - callers must
+        not mutate the returned data.
+
+        Raises:
+            @see self.handle_url
+        """
+        key = self._share_key(
+            url,
+            kwargs.get("config"),
+            kwargs.get("fetcher", "HttpFetchProvider"),
+            kwargs.get("known_digest"),
+        )
+        if key is None:
+            return await self._fetch_with_digest(url, timeout=timeout, **kwargs)
+
+        memoized = self._memo.get(key)
+        if memoized is not None:
+            return memoized
+        shared = self._inflight.get(key)
+        if shared is None:
+            shared = asyncio.ensure_future(
+                self._fetch_and_memoize(key, url, timeout=timeout, **kwargs)
+            )
+            self._inflight[key] = shared
+            shared.add_done_callback(partial(self._on_shared_fetch_done, key))
+        # (a cancelled caller does not cancel the fetch for the others)
+        return await asyncio.shield(shared)
+
+    def _share_key(
+        self,
+        url: str,
+        config: Union[FetcherConfig, dict, None],
+        fetcher: str,
+        known_digest: Optional[str] = None,
+    ) -> Optional[Hashable]:
+        """The key identical fetches share (None if the fetch can't be
+        shared)."""
+        fetcher = self._resolve_fetcher(config, fetcher)
+        provider_class = self._fetcher_register.get_fetcher_class(fetcher)
+        if provider_class is None:
+            return None
+        try:
+            if not provider_class.can_share_fetches(config):
+                return None
+            if isinstance(config, BaseModel):
+                config = config.dict()
+            config_key = json.dumps(config, sort_keys=True, default=str)
+        except Exception:
+            return None
+        return fetcher, url, config_key, known_digest
+
+    async def _fetch_and_memoize(
+        self, key: Hashable, url: str, **kwargs
+    ) -> Tuple[Any, Optional[str]]:
+        result = await self._fetch_with_digest(url, **kwargs)
+        ttl = self._fetcher_register.get_fetcher_class(key[0]).MEMO_TTL
+        ttl = self._memo_ttl if ttl is None else ttl
+        if ttl > 0 and result[0] is not None:
+            try:
+                size = len(json_codec.dumps(result[0]))
+            except TypeError:
+                # not plain JSON, its size is unknown
+                return result
+            self._memo.put(key, result, size=size, ttl=ttl)
+        return result
+
+    def _on_shared_fetch_done(self, key: Hashable, shared: asyncio.Future):
+        if self._inflight.get(key) is shared:
+            del self._inflight[key]
+        if not shared.cancelled():
+            # retrieved, even if all callers were cancelled
+            shared.exception()
+
+    async def _fetch_with_digest(
+        self, url: str, timeout: float = None, **kwargs
+    ) -> Tuple[Any, Optional[str]]:
         timeout = self._callback_timeout if timeout is None else timeout
         wait_event = asyncio.Event()
         data = {"result": None}
@@ -110,7 +270,7 @@ class FetchingEngine(BaseFetchingEngine):
             # Signal callback is done
             wait_event.set()
 
-        await self.queue_url(url, waiter_callback, **kwargs)
+        event = await self.queue_url(url, waiter_callback, **kwargs)
         # Wait with timeout
         if timeout is not None:
             await asyncio.wait_for(wait_event.wait(), timeout)
@@ -118,7 +278,66 @@ class FetchingEngine(BaseFetchingEngine):
         else:
             await wait_event.wait()
         # return saved result value from callback
-        return data["result"]
+        return data["result"], event.content_digest
+
+    async def stream_url(
+        self,
+        url: str,
+        consumer: Callable[[AsyncIterator[bytes]], Awaitable[Any]],
+        timeout: float = None,
+        **kwargs,
+    ) -> Tuple[Any, Optional[str]]:
+        """Fetches the url, and hands its raw content (without processing it)
+        to the consumer as an async iterator of chunks, so it can be passed on
+        without holding all of it in memory.
+
+        Args:
+            url (str): the URL to fetch from
+            consumer (Callable): awaited with the chunks iterator (while the response is open)
+            timeout (float, optional): time in seconds to wait on the queued fetch task
+                (including consuming the content). Defaults to self._stream_timeout.
+            kwargs: additional args passed to self.queue_url
+
+        Returns:
+            The value returned by the consumer, and the digest of the content
+            (if computed by the fetcher and the content was fully consumed).
+
+        Raises:
+            asyncio.TimeoutError: if the given timeout has expired (i.e: the fetch failed),
+                the consumer is cancelled (and done) by then
+            any exception raised by the consumer
+        """
+        timeout = self._stream_timeout if timeout is None else timeout
+        done: asyncio.Future = asyncio.get_running_loop().create_future()
+        consuming: Optional[asyncio.Task] = None
+
+        async def stream_callback(chunks: AsyncIterator[bytes]):
+            nonlocal consuming
+            if done.done():
+                # (timed out before the content arrived)
+                return
+            # the consumer runs in its own task, so it can be cancelled without the worker
+            consuming = asyncio.create_task(consumer(chunks))
+            await asyncio.wait([consuming])
+            if consuming.cancelled():
+                return
+            if consuming.exception() is not None:
+                if not done.done():
+                    done.set_exception(consuming.exception())
+                raise consuming.exception()
+            if not done.done():
+                done.set_result(consuming.result())
+
+        event = await self.queue_url(url, stream_callback, stream=True, **kwargs)
+        try:
+            result = await asyncio.wait_for(done, timeout)
+        except (asyncio.TimeoutError, asyncio.CancelledError):
+            # the consumer must not outlive the wait (i.e: keep writing what it consumes)
+            if consuming is not None and not consuming.done():
+                consuming.cancel()
+                await asyncio.wait([consuming])
+            raise
+        return result, event.content_digest
 
     async def queue_url(
         self,
@@ -126,6 +345,9 @@ class FetchingEngine(BaseFetchingEngine):
         callback: Coroutine,
         config: Union[FetcherConfig, dict, None] = None,
         fetcher="HttpFetchProvider",
+        stream: bool = False,
+        priority: FetchPriority = FetchPriority.NORMAL,
+        known_digest: Optional[str] = None,
     ) -> FetchEvent:
         """Simplified default fetching handler for queuing a fetch task.
 
@@ -134,35 +356,53 @@ class FetchingEngine(BaseFetchingEngine):
             callback (Coroutine): a callback to call with the fetched result
             config (FetcherConfig, optional): Configuration to be used by the fetcher. Defaults to None.
             fetcher (str, optional): Which fetcher class to use. Defaults to "HttpFetchProvider".
+            stream (bool, optional): Call the callback with an iterator over the raw content
+                instead of the processed data (@see self.stream_url). Defaults to False.
+            priority (FetchPriority, optional): the lane to queue the task in. Defaults to NORMAL.
+            known_digest (str, optional): digest of the content the caller already holds
+                (the result may be NOT_MODIFIED, @see FetchEvent.known_digest).
         Returns:
             the queued event (which will be mutated to at least have an Id)
 
         Raises:
             @see self.queue_fetch_event
         """
-        # override default fetcher with (potential) override value from FetcherConfig
-        if isinstance(config, dict) and config.get("fetcher", None) is not None:
-            fetcher = config["fetcher"]
-        elif isinstance(config, FetcherConfig) and config.fetcher is not None:
-            fetcher = config.fetcher
-
         # init a URL event
         event = FetchEvent(
-            url=url, fetcher=fetcher, config=config, retry=self._retry_config
+            url=url,
+            fetcher=self._resolve_fetcher(config, fetcher),
+            config=config,
+            retry=self._retry_config,
+            stream=stream,
+            known_digest=known_digest,
         )
-        return await self.queue_fetch_event(event, callback)
+        return await self.queue_fetch_event(event, callback, priority=priority)
+
+    @staticmethod
+    def _resolve_fetcher(config: Union[FetcherConfig, dict, None], fetcher: str) -> str:
+        # override default fetcher with (potential) override value from FetcherConfig
+        if isinstance(config, dict) and config.get("fetcher", None) is not None:
+            return config["fetcher"]
+        elif isinstance(config, FetcherConfig) and config.fetcher is not None:
+            return config.fetcher
+        return fetcher
 
     async def queue_fetch_event(
-        self, event: FetchEvent, callback: Coroutine, enqueue_timeout=None
+        self,
+        event: FetchEvent,
+        callback: Coroutine,
+        enqueue_timeout=None,
+        priority: FetchPriority = FetchPriority.NORMAL,
     ) -> FetchEvent:
         """Basic handler to queue a fetch event for a fetcher class. Waits if
-        the queue is full until enqueue_timeout seconds; if enqueue_timeout is
-        None returns immediately or raises QueueFull.
+        the event's priority lane is full until enqueue_timeout seconds; if
+        enqueue_timeout is None returns immediately or raises QueueFull.
 
         Args:
             event (FetchEvent): the fetch event to queue as a task
             callback (Coroutine): a callback to call with the fetched result
             enqueue_timeout (float): timeout in seconds or None for no timeout, Defaults to self.DEFAULT_ENQUEUE_TIMEOUT
+            priority (FetchPriority, optional): the lane to queue the task in. Defaults to NORMAL.
 
         Returns:
             the queued event (which will be mutated to at least have an Id)
@@ -179,19 +419,82 @@ class FetchingEngine(BaseFetchingEngine):
         # add to the queue for handling
         # if no timeout we return immediately or raise QueueFull
         if enqueue_timeout is None:
-            await self._queue.put_nowait((event, callback))
+            self._queue.put_nowait((event, callback), priority)
         # if timeout
         else:
-            await asyncio.wait_for(self._queue.put((event, callback)), enqueue_timeout)
+            await asyncio.wait_for(
+                self._queue.put((event, callback), priority), enqueue_timeout
+            )
+        self.scale_workers()
         return event
 
-    def create_worker(self) -> asyncio.Task:
+    def create_worker(
+        self,
+        lowest_priority: FetchPriority = FetchPriority.LOW,
+        idle_timeout: Optional[float] = None,
+    ) -> asyncio.Task:
         """Create an asyncio worker to work the engine's queue Engine init
-        starts several workers according to given configuration."""
-        task = asyncio.create_task(fetch_worker(self._queue, self))
+        starts several workers according to given configuration.
+
+        Args:
+            lowest_priority (FetchPriority): the least urgent lane the worker takes tasks from
+            idle_timeout (float, optional): seconds without tasks after which the worker exits
+        """
+        general = lowest_priority == FetchPriority.LOW
+        task = asyncio.create_task(
+            fetch_worker(
+                self._queue,
+                self,
+                lowest_priority=lowest_priority,
+                idle_timeout=idle_timeout,
+            )
+        )
+        self._pool.worker_started(general)
         self._tasks.append(task)
+        task.add_done_callback(partial(self._on_worker_done, general))
         return task
 
+    def _on_worker_done(self, general: bool, task: asyncio.Task):
+        self._pool.worker_stopped(general)
+        if task in self._tasks:
+            self._tasks.remove(task)
+
+    def scale_workers(self):
+        """Starts another (temporary) worker if the queued tasks are expected
+        to wait too long for the current workers."""
+        if self._queue is not None and self._pool.should_scale_up(self._queue.qsize()):
+            self.create_worker(idle_timeout=self._worker_idle_timeout)
+
+    def source_of(self, event: FetchEvent) -> str:
+        """The data source of the event (@see BaseFetchProvider.source_of)."""
+        provider_class = self._fetcher_register.get_fetcher_class(event.fetcher)
+        if provider_class is None:
+            return event.fetcher
+        return provider_class.source_of(event)
+
+    def can_start_fetch(self, task: Tuple[FetchEvent, Coroutine]) -> bool:
+        """Whether a queued task's data source is below its concurrency
+        limit."""
+        event, _ = task
+        provider_class = self._fetcher_register.get_fetcher_class(event.fetcher)
+        limit = provider_class.MAX_CONCURRENCY if provider_class is not None else None
+        return self._pool.has_capacity(self.source_of(event), limit)
+
+    def fetch_taken(self, task: Tuple[FetchEvent, Coroutine]):
+        """Reserves the data source's capacity for a task taken off the queue
+        (so other workers don't take tasks beyond its limit meanwhile)."""
+        event, _ = task
+        self._pool.reserve_source(self.source_of(event))
+
+    def worker_stats(self) -> Dict[str, Any]:
+        """Number of active / idle workers, and the observed fetch latency."""
+        return self._pool.stats()
+
+    def queue_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Depth and wait time statistics of each priority lane of the
+        queue."""
+        return self._queue.stats() if self._queue is not None else {}
+
     def register_failure_handler(self, callback: OnFetchFailureCallback):
         """Register a callback to be called with exception and original event
         in case of failure.
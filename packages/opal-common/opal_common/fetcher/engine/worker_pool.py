@@ -0,0 +1,121 @@
+from typing import Any, Dict, Optional
+
+from opal_common.config import opal_common_config
+from opal_common.monitoring import metrics
+
+
+class FetchWorkerPool:
+    """Book-keeping of the fetching engine's workers - how many are busy /
+    idle, the observed fetch latency, and the fetches in progress of each
+    data source - used to decide when to scale the pool up (workers scale
+    down on their own, when idle for long enough).
+
+    Only general workers (taking tasks of every priority) are scaled,
+    reserved (high priority only) workers are always kept.
+    """
+
+    # weight of the latest fetch in the (exponentially weighted) average latency
+    LATENCY_SMOOTHING = 0.2
+
+    def __init__(
+        self,
+        min_workers: int,
+        max_workers: int,
+        scale_up_wait: float,
+        source_max_concurrency: int = 0,
+    ):
+        self.min_workers = min_workers
+        self.max_workers = max(max_workers, min_workers)
+        # scale up when queued tasks are expected to wait longer than this (in seconds)
+        self._scale_up_wait = scale_up_wait
+        # max fetches in progress from a single data source (0 for no limit)
+        self._source_max_concurrency = source_max_concurrency
+        self.workers = 0
+        self.general_workers = 0
+        self.active_workers = 0
+        self.idle_general_workers = 0
+        self.avg_latency: Optional[float] = None
+        self._in_progress: Dict[str, int] = {}
+
+    @property
+    def idle_workers(self) -> int:
+        return self.workers - self.active_workers
+
+    def should_scale_up(self, queued: int) -> bool:
+        """Whether another (general) worker should be started to handle the
+        queued tasks."""
+        if queued == 0 or self.workers >= self.max_workers:
+            return False
+        if self.idle_general_workers > 0:
+            return False
+        if self.avg_latency is None:
+            return True
+        expected_wait = queued * self.avg_latency / max(self.general_workers, 1)
+        return expected_wait > self._scale_up_wait
+
+    def can_scale_down(self) -> bool:
+        return self.workers > self.min_workers
+
+    def worker_started(self, general: bool):
+        self.workers += 1
+        if general:
+            self.general_workers += 1
+            self.idle_general_workers += 1
+        self._report()
+
+    def worker_stopped(self, general: bool):
+        self.workers -= 1
+        if general:
+            self.general_workers -= 1
+            self.idle_general_workers -= 1
+        self._report()
+
+    def reserve_source(self, source: str):
+        """Counts a fetch from the data source as in progress (as soon as its
+        task is taken off the queue, @see has_capacity) - until fetch_done."""
+        self._in_progress[source] = self._in_progress.get(source, 0) + 1
+
+    def fetch_started(self, general: bool):
+        self.active_workers += 1
+        if general:
+            self.idle_general_workers -= 1
+        self._report()
+
+    def fetch_done(self, general: bool, source: str, latency: float):
+        self.active_workers -= 1
+        if general:
+            self.idle_general_workers += 1
+        self._in_progress[source] -= 1
+        if not self._in_progress[source]:
+            del self._in_progress[source]
+        if self.avg_latency is None:
+            self.avg_latency = latency
+        else:
+            self.avg_latency += self.LATENCY_SMOOTHING * (latency - self.avg_latency)
+        self._report()
+
+    def has_capacity(self, source: str, limit: Optional[int] = None) -> bool:
+        """Whether another fetch from the data source may start (limit
+        overrides the pool's per source limit)."""
+        limit = self._source_max_concurrency if limit is None else limit
+        return not limit or self._in_progress.get(source, 0) < limit
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "workers": self.workers,
+            "active": self.active_workers,
+            "idle": self.idle_workers,
+            "min_workers": self.min_workers,
+            "max_workers": self.max_workers,
+            "avg_fetch_latency": self.avg_latency,
+            "fetches_in_progress": dict(self._in_progress),
+        }
+
+    def _report(self):
+        if opal_common_config.ENABLE_METRICS:
+            metrics.gauge(
+                "fetching_engine.workers", self.active_workers, tags={"state": "active"}
+            )
+            metrics.gauge(
+                "fetching_engine.workers", self.idle_workers, tags={"state": "idle"}
+            )
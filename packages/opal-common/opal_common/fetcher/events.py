@@ -1,8 +1,21 @@
-from typing import List, Optional
+from enum import IntEnum
+from typing import Any, List, Optional
 
+from opal_common.schemas.store import JSONPatchAction
 from pydantic import BaseModel, Field
 
 
+class FetchPriority(IntEnum):
+    """The lane a fetch task is queued in - tasks of more urgent lanes are
+    always handled first."""
+
+    # latency sensitive (i.e: incremental data updates)
+    HIGH = 0
+    NORMAL = 1
+    # bulk / background work (i.e: base data refetches, periodic polling, callbacks)
+    LOW = 2
+
+
 class FetcherConfig(BaseModel):
     """The configuration of a fetcher, used as part of a FetchEvent Fetch
     Provider's have their own uniqueue events and configurations.
@@ -14,6 +27,10 @@ class FetcherConfig(BaseModel):
         None,
         description="indicates to OPAL client that it should use a custom FetcherProvider to fetch the data",
     )
+    cursor: Optional[str] = Field(
+        None,
+        description="the cursor to fetch the changes since (set by OPAL client for fetchers of incremental changes, @see FetchedDelta)",
+    )
 
 
 class FetchEvent(BaseModel):
@@ -34,3 +51,37 @@ class FetchEvent(BaseModel):
     config: dict = None
     # Tenacity.retry - Override default retry configuration for this event
     retry: dict = None
+    # Filled by the fetch worker - digest of the raw fetched content (if computed by the fetcher)
+    content_digest: Optional[str] = None
+    # If set, the callback is given an async iterator over the raw fetched content (consumed
+    # while the response is still open) instead of the processed data
+    stream: bool = False
+    # Digest of content the requester already holds - fetchers that can tell the content is
+    # unchanged since (i.e: by a conditional request) return NOT_MODIFIED instead of the data
+    known_digest: Optional[str] = None
+
+
+class NotModified:
+    """The fetched data of a fetch whose content is unchanged since its known
+    digest (the fetch's content digest is the known digest)."""
+
+    def __repr__(self) -> str:
+        return "NOT_MODIFIED"
+
+
+NOT_MODIFIED = NotModified()
+
+
+class FetchedDelta(BaseModel):
+    """The fetched data of fetchers of incremental changes: the changes since
+    the requested cursor (as JSON patch operations relative to the data), or
+    all of the data if the changes are unknown (i.e: no cursor was
+    requested) - along with the cursor of the fetched state."""
+
+    cursor: str
+    data: Any = None
+    changes: Optional[List[JSONPatchAction]] = None
+
+    @property
+    def is_snapshot(self) -> bool:
+        return self.changes is None
@@ -1,4 +1,6 @@
-from opal_common.fetcher.events import FetchEvent
+from typing import AsyncIterator, Optional, Union
+
+from opal_common.fetcher.events import FetcherConfig, FetchEvent
 from opal_common.fetcher.logger import get_logger
 from tenacity import retry, stop, wait
 
@@ -11,8 +13,21 @@ class BaseFetchProvider:
     - Override self._fetch_ to implement fetching
     - call self.fetch() to retrieve data (wrapped in retries and safe execution guards)
     - override __aenter__ and __aexit__ for async context
+    - set self.content_digest (in _fetch_ / _process_) to a digest of the raw fetched
+      content, to let consumers detect unchanged content without re-serializing it
+    - override self.stream() to let consumers read the raw content in chunks, without
+      materializing it (i.e: to pass it on as is)
+    - override can_share_fetches() (and set MEMO_TTL) to control whether identical fetches
+      may share a single result
+    - override source_of() (and set MAX_CONCURRENCY) to limit the concurrent fetches from
+      a single data source
     """
 
+    # Seconds to memoize fetched results for (None - the engine's default, 0 - never)
+    MEMO_TTL: Optional[float] = None
+    # Max concurrent fetches from a single data source (None - the engine's default, 0 - no limit)
+    MAX_CONCURRENCY: Optional[int] = None
+
     DEFAULT_RETRY_CONFIG = {
         "wait": wait.wait_random_exponential(),
         "stop": stop.stop_after_attempt(200),
@@ -31,6 +46,20 @@ class BaseFetchProvider:
         self._retry_config = (
             retry_config if retry_config is not None else self.DEFAULT_RETRY_CONFIG
         )
+        self.content_digest: Optional[str] = None
+
+    @classmethod
+    def can_share_fetches(cls, config: Union[FetcherConfig, dict, None]) -> bool:
+        """Whether concurrent (or recent) fetches of the same url with the
+        same config may share one fetch and its result - i.e: fetching has no
+        side effects, and the result is not consumed destructively."""
+        return True
+
+    @classmethod
+    def source_of(cls, event: FetchEvent) -> str:
+        """The data source the event fetches from (concurrent fetches are
+        limited per source) - by default, the provider itself."""
+        return cls.__name__
 
     def parse_event(self, event: FetchEvent) -> FetchEvent:
         """Parse the event (And config within it) into the right object type.
@@ -59,6 +88,13 @@ class BaseFetchProvider:
             logger.exception("Failed to process fetched data")
             raise
 
+    def stream(self, res) -> AsyncIterator[bytes]:
+        """Returns an async iterator over the raw fetched content (instead of
+        processing it), valid until the provider's context exits."""
+        raise NotImplementedError(
+            f"{self.__class__.__name__} does not support streaming fetched content"
+        )
+
     async def __aenter__(self):
         return self
 
@@ -63,7 +63,7 @@ class FetcherRegister:
         Returns:
             BaseFetchProvider: A fetcher instance
         """
-        provider_class = self._config.get(name, None)
+        provider_class = self.get_fetcher_class(name)
         if provider_class is None:
             raise NoMatchingFetchProviderException(
                 f"Couldn't find a match for - {name} , {event}"
@@ -73,6 +73,11 @@ class FetcherRegister:
             fetcher.set_retry_config(event.retry)
         return fetcher
 
+    def get_fetcher_class(self, name: str) -> Optional[Type[BaseFetchProvider]]:
+        """The fetcher class registered under the name (None if there is no
+        such fetcher)."""
+        return self._config.get(name, None)
+
     def get_fetcher_for_event(self, event: FetchEvent) -> BaseFetchProvider:
         """Same as get_fetcher, using the event information to deduce the
         fetcher class.
@@ -1,10 +1,9 @@
 """Simple HTTP get data fetcher using requests supports."""
 
-from fastapi_websocket_rpc.rpc_methods import RpcMethodsBase
-from fastapi_websocket_rpc.websocket_rpc_client import WebSocketRpcClient
 from opal_common.fetcher.events import FetcherConfig, FetchEvent
 from opal_common.fetcher.fetch_provider import BaseFetchProvider
 from opal_common.fetcher.logger import get_logger
+from opal_common.rpc_connections import shared_rpc_connections
 
 logger = get_logger("rpc_fetch_provider")
 
@@ -22,6 +21,9 @@ class FastApiRpcFetchEvent(FetchEvent):
 
 
 class FastApiRpcFetchProvider(BaseFetchProvider):
+    """Fetches data with an rpc call, over the pooled (long-lived) connections
+    to the rpc endpoint (@see RpcConnectionPool)."""
+
     def __init__(self, event: FastApiRpcFetchEvent) -> None:
         self._event: FastApiRpcFetchEvent
         super().__init__(event)
@@ -37,15 +39,7 @@ class FastApiRpcFetchProvider(BaseFetchProvider):
         ), "FastApiRpcFetchEvent not provided for FastApiRpcFetchProvider"
         args = self._event.config.rpc_arguments
         method = self._event.config.rpc_method_name
-        result = None
         logger.info(
             f"{self.__class__.__name__} fetching from {self._url} with RPC call {method}({args})"
         )
-        async with WebSocketRpcClient(
-            self._url,
-            # we don't expose anything to the server
-            RpcMethodsBase(),
-            default_response_timeout=4,
-        ) as client:
-            result = await client.call(method, args)
-        return result
+        return await shared_rpc_connections.call(self._url, method, args)
@@ -0,0 +1,204 @@
+"""Local (file://) data fetcher, of JSON or NDJSON files."""
+
+import asyncio
+import hashlib
+import mmap
+import os
+from enum import Enum
+from typing import Any, List, Optional, Tuple
+from urllib.parse import urlparse
+from urllib.request import url2pathname
+
+from opal_common import json_codec
+from opal_common.config import opal_common_config
+from opal_common.fetcher.events import FetchedDelta, FetcherConfig, FetchEvent
+from opal_common.fetcher.fetch_provider import BaseFetchProvider
+from opal_common.fetcher.logger import get_logger
+from opal_common.fetcher.providers.http_paginated_fetch_provider import get_field
+
+logger = get_logger("file_fetch_provider")
+
+NDJSON_EXTENSIONS = (".ndjson", ".jsonl")
+
+
+class FileFetchError(Exception):
+    pass
+
+
+class FileFormat(str, Enum):
+    JSON = "json"
+    # a JSON document per line
+    NDJSON = "ndjson"
+
+
+class FileFetcherConfig(FetcherConfig):
+    """Config for FileFetchProvider."""
+
+    # the format of the file (by default, NDJSON for .ndjson / .jsonl files, otherwise JSON)
+    format: Optional[FileFormat] = None
+    # NDJSON - the (dot separated) field of each line to map the lines by (a list of the lines if not set)
+    key_field: Optional[str] = None
+    # NDJSON with a key field - lines with this field set remove the line's key
+    delete_field: Optional[str] = None
+    # NDJSON - fetch the lines appended since the cursor, as incremental changes (@see FetchedDelta)
+    tail: bool = False
+
+    class Config:
+        use_enum_values = True
+
+
+class FileFetchEvent(FetchEvent):
+    fetcher: str = "FileFetchProvider"
+    config: FileFetcherConfig = None
+
+
+def _escape(key: str) -> str:
+    # JSON pointer escaping (RFC 6901)
+    return key.replace("~", "~0").replace("/", "~1")
+
+
+class FileFetchProvider(BaseFetchProvider):
+    """Fetches data from local files (i.e: on a shared volume), only under the
+    directories of FILE_FETCHER_ALLOWED_PATHS.
+
+    Files are memory mapped rather than read into a buffer. NDJSON files
+    can be tailed - the lines appended since the last fetch (its cursor) are
+    fetched as incremental changes. Tailing assumes files are only appended
+    to (replace a file by renaming a new one over it - a different, or
+    shorter, file is fetched all over).
+    """
+
+    def __init__(self, event: FileFetchEvent) -> None:
+        self._event: FileFetchEvent
+        if event.config is None:
+            event.config = FileFetcherConfig()
+        super().__init__(event)
+        self._path = self._local_path(self._url)
+
+    def parse_event(self, event: FetchEvent) -> FileFetchEvent:
+        return FileFetchEvent(**event.dict(exclude={"config"}), config=event.config)
+
+    @staticmethod
+    def _local_path(url: str) -> str:
+        parsed = urlparse(url)
+        if parsed.scheme != "file" or parsed.netloc not in ("", "localhost"):
+            raise FileFetchError(f"Not a local file url: {url}")
+        return os.path.realpath(url2pathname(parsed.path))
+
+    def _check_allowed(self):
+        for allowed in opal_common_config.FILE_FETCHER_ALLOWED_PATHS:
+            allowed = os.path.realpath(allowed)
+            if os.path.commonpath([allowed, self._path]) == allowed:
+                return
+        raise FileFetchError(
+            f"{self._path} is not under the allowed paths (FILE_FETCHER_ALLOWED_PATHS)"
+        )
+
+    @property
+    def _format(self) -> FileFormat:
+        if self._event.config.format is not None:
+            return FileFormat(self._event.config.format)
+        if self._path.endswith(NDJSON_EXTENSIONS):
+            return FileFormat.NDJSON
+        return FileFormat.JSON
+
+    async def _fetch_(self):
+        logger.debug(f"{self.__class__.__name__} fetching from {self._url}")
+        self._check_allowed()
+        if self._event.config.tail and self._format != FileFormat.NDJSON:
+            raise FileFetchError("Only NDJSON files can be tailed")
+        # (files are read off the event loop)
+        return await asyncio.get_running_loop().run_in_executor(None, self._read)
+
+    def _read(self) -> Any:
+        with open(self._path, "rb") as f:
+            stat = os.fstat(f.fileno())
+            file_id = f"{stat.st_dev}:{stat.st_ino}"
+            if stat.st_size == 0:
+                # (empty files can't be mapped)
+                return self._parse(b"", file_id, start=None)
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as content:
+                start = self._resume_offset(file_id, len(content))
+                return self._parse(content, file_id, start)
+
+    def _resume_offset(self, file_id: str, size: int) -> Optional[int]:
+        """The offset to fetch appended lines from (None to fetch the whole
+        file)."""
+        cursor = self._event.config.cursor
+        if not self._event.config.tail or cursor is None:
+            return None
+        cursor_file_id, _, offset = cursor.rpartition(":")
+        if cursor_file_id != file_id or not offset.isdigit() or int(offset) > size:
+            # a different (or truncated) file
+            return None
+        return int(offset)
+
+    def _parse(self, content, file_id: str, start: Optional[int]) -> Any:
+        if self._format == FileFormat.JSON:
+            with memoryview(content) as view:
+                self.content_digest = hashlib.sha256(view).hexdigest()
+                return json_codec.loads(view)
+
+        if self._event.config.tail:
+            # only complete lines (the rest is fetched once it's complete)
+            end = content.rfind(b"\n") + 1
+        else:
+            end = len(content)
+        lines, digest = self._parse_lines(content, start or 0, end)
+        self.content_digest = digest
+        if not self._event.config.tail:
+            return self._to_document(lines)
+        cursor = f"{file_id}:{end}"
+        if start is None:
+            return FetchedDelta(cursor=cursor, data=self._to_document(lines))
+        return FetchedDelta(cursor=cursor, changes=self._to_changes(lines))
+
+    @staticmethod
+    def _parse_lines(content, start: int, end: int) -> Tuple[List[Any], str]:
+        lines, digest = [], hashlib.sha256()
+        position = start
+        while position < end:
+            line_end = content.find(b"\n", position, end)
+            if line_end == -1:
+                line_end = end
+            line = content[position:line_end]
+            digest.update(line)
+            if line.strip():
+                lines.append(json_codec.loads(line))
+            position = line_end + 1
+        return lines, digest.hexdigest()
+
+    def _key_of(self, line: Any) -> str:
+        key = get_field(line, self._event.config.key_field)
+        if key is None:
+            raise FileFetchError(
+                f"A line of {self._path} has no '{self._event.config.key_field}' field"
+            )
+        return str(key)
+
+    def _is_deletion(self, line: Any) -> bool:
+        delete_field = self._event.config.delete_field
+        return delete_field is not None and bool(get_field(line, delete_field))
+
+    def _to_document(self, lines: List[Any]) -> Any:
+        if self._event.config.key_field is None:
+            return lines
+        document = {}
+        for line in lines:
+            if self._is_deletion(line):
+                document.pop(self._key_of(line), None)
+            else:
+                document[self._key_of(line)] = line
+        return document
+
+    def _to_changes(self, lines: List[Any]) -> List[dict]:
+        if self._event.config.key_field is None:
+            return [{"op": "add", "path": "/-", "value": line} for line in lines]
+        changes = []
+        for line in lines:
+            path = f"/{_escape(self._key_of(line))}"
+            if self._is_deletion(line):
+                changes.append({"op": "remove", "path": path})
+            else:
+                changes.append({"op": "add", "path": path, "value": line})
+        return changes
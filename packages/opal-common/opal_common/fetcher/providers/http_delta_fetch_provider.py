@@ -0,0 +1,111 @@
+"""HTTP data fetcher of incremental changes since a cursor."""
+
+from typing import Any, Union
+
+import httpx
+from aiohttp import ClientResponse
+from opal_common.fetcher.events import FetchedDelta, FetchEvent
+from opal_common.fetcher.logger import get_logger
+from opal_common.fetcher.providers.http_fetch_provider import (
+    HttpFetcherConfig,
+    HttpFetchProvider,
+)
+from opal_common.fetcher.providers.http_paginated_fetch_provider import (
+    get_field,
+    with_query,
+)
+from pydantic import ValidationError
+
+logger = get_logger("http_delta_fetch_provider")
+
+DELTA_OPERATIONS = ("add", "replace", "remove")
+
+
+class DeltaProtocolError(Exception):
+    pass
+
+
+class DeltaHttpFetcherConfig(HttpFetcherConfig):
+    """Config for DeltaHttpFetchProvider.
+
+    Fields of responses are given as dot separated paths (i.e:
+    "meta.cursor").
+    """
+
+    # the query param the cursor is sent as
+    cursor_param: str = "since"
+    # the field of the response holding the cursor of the fetched state
+    cursor_field: str = "cursor"
+    # the field of the response holding the changes since the requested cursor
+    changes_field: str = "changes"
+    # the field of the response holding all of the data (if the changes are unknown)
+    data_field: str = "data"
+
+
+class DeltaHttpFetchEvent(FetchEvent):
+    fetcher: str = "DeltaHttpFetchProvider"
+    config: DeltaHttpFetcherConfig = None
+
+
+class DeltaHttpFetchProvider(HttpFetchProvider):
+    """Fetches the changes of the data since a cursor (kept by OPAL client for
+    each data source entry, and sent as a query param), as a FetchedDelta.
+
+    The source responds with the cursor of its current state, and either
+    the changes since the requested cursor (add / replace / remove JSON
+    patch operations, relative to the data) or all of the data (if no
+    cursor was requested, or the changes since it are unknown).
+    """
+
+    def __init__(self, event: DeltaHttpFetchEvent) -> None:
+        self._event: DeltaHttpFetchEvent
+        if event.config is None:
+            event.config = DeltaHttpFetcherConfig()
+        super().__init__(event)
+        # the changes depend on the cursor, they are never validated as is
+        self._validators_key = None
+        if self._event.config.cursor is not None:
+            self._url = with_query(
+                self._url,
+                **{self._event.config.cursor_param: self._event.config.cursor},
+            )
+
+    def parse_event(self, event: FetchEvent) -> DeltaHttpFetchEvent:
+        return DeltaHttpFetchEvent(
+            **event.dict(exclude={"config"}), config=event.config
+        )
+
+    async def _process_(self, res: Union[ClientResponse, httpx.Response]):
+        response = await super()._process_(res)
+        if not self._event.config.process_data or isinstance(
+            response, (ClientResponse, httpx.Response)
+        ):
+            return response
+        return self._to_delta(response)
+
+    def _to_delta(self, response: Any) -> FetchedDelta:
+        config = self._event.config
+        cursor = get_field(response, config.cursor_field)
+        if cursor is None:
+            raise DeltaProtocolError(
+                f"Response of {self._url} has no '{config.cursor_field}' field"
+            )
+        changes = get_field(response, config.changes_field)
+        if changes is None:
+            return FetchedDelta(
+                cursor=str(cursor), data=get_field(response, config.data_field)
+            )
+        if config.cursor is None:
+            raise DeltaProtocolError(
+                f"Got changes from {self._url} without requesting a cursor"
+            )
+        try:
+            delta = FetchedDelta(cursor=str(cursor), changes=changes)
+        except ValidationError as e:
+            raise DeltaProtocolError(f"Invalid changes from {self._url}: {e}")
+        for change in delta.changes:
+            if change.op not in DELTA_OPERATIONS:
+                raise DeltaProtocolError(
+                    f"Unsupported change operation '{change.op}' from {self._url}"
+                )
+        return delta
@@ -1,14 +1,18 @@
 """Simple HTTP get data fetcher using requests supports."""
 
+import hashlib
 from enum import Enum
-from typing import Any, Union, cast
+from typing import Any, AsyncIterator, Union, cast
+from urllib.parse import urlparse
 
 import httpx
 from aiohttp import ClientResponse, ClientSession
 from opal_common.config import opal_common_config
-from opal_common.fetcher.events import FetcherConfig, FetchEvent
+from opal_common.fetcher.events import NOT_MODIFIED, FetcherConfig, FetchEvent
 from opal_common.fetcher.fetch_provider import BaseFetchProvider
 from opal_common.fetcher.logger import get_logger
+from opal_common.fetcher.providers.http_validators import http_validators
+from opal_common.http_sessions import HttpSessionRegistry, shared_http_sessions
 from opal_common.http_utils import is_http_error_response
 from opal_common.security.sslcontext import get_custom_ssl_context
 from pydantic import validator
@@ -58,13 +62,40 @@ class HttpFetchProvider(BaseFetchProvider):
             event.config = HttpFetcherConfig()
         super().__init__(event)
         self._session = None
+        self._session_lease = None
+        self._response = None
+        self._streamed = False
         self._custom_ssl_context = get_custom_ssl_context()
-        self._ssl_context_kwargs = (
-            {"ssl": self._custom_ssl_context}
-            if self._custom_ssl_context is not None
-            else {}
+        # key of the request in the validators cache (None if the request is not validated)
+        self._validators_key = None
+        if (
+            opal_common_config.HTTP_FETCHER_CONDITIONAL_REQUESTS
+            and HttpMethods(self._event.config.method) == HttpMethods.GET
+            and self._event.config.process_data
+        ):
+            self._validators_key = http_validators.key_of(
+                self._url, self._event.config.dict()
+            )
+
+    @classmethod
+    def can_share_fetches(cls, config: Union[FetcherConfig, dict, None]) -> bool:
+        # only reads are shared (and not raw responses, which are consumed by the callback)
+        if config is None:
+            return True
+        if not isinstance(config, HttpFetcherConfig):
+            config = HttpFetcherConfig.parse_obj(
+                config.dict() if isinstance(config, FetcherConfig) else config
+            )
+        return config.process_data and HttpMethods(config.method) in (
+            HttpMethods.GET,
+            HttpMethods.HEAD,
         )
 
+    @classmethod
+    def source_of(cls, event: FetchEvent) -> str:
+        # each server is a separate data source
+        return urlparse(event.url).netloc or event.url
+
     def parse_event(self, event: FetchEvent) -> HttpFetchEvent:
         return HttpFetchEvent(**event.dict(exclude={"config"}), config=event.config)
 
@@ -73,35 +104,115 @@ class HttpFetchProvider(BaseFetchProvider):
         if self._event.config.headers is not None:
             headers = self._event.config.headers
         if opal_common_config.HTTP_FETCHER_PROVIDER_CLIENT == "httpx":
-            self._session = httpx.AsyncClient(headers=headers)
+            kind = HttpSessionRegistry.HTTPX
         else:
-            self._session = ClientSession(headers=headers, raise_for_status=True)
-        self._session = await self._session.__aenter__()
+            kind = HttpSessionRegistry.AIOHTTP
+        # sessions (and their keep-alive connections) are shared between fetches of the same host
+        self._session_lease = shared_http_sessions.session(
+            self._url,
+            headers=headers,
+            ssl_context=self._custom_ssl_context,
+            kind=kind,
+        )
+        self._session = await self._session_lease.__aenter__()
         return self
 
     async def __aexit__(self, exc_type=None, exc_val=None, tb=None):
-        await self._session.__aexit__(exc_type, exc_val, tb)
+        try:
+            if isinstance(self._response, ClientResponse):
+                if self._streamed:
+                    # the body may not be fully consumed, do not buffer its remainder
+                    self._response.release()
+                else:
+                    # read the body (if not already read) so the connection is released back
+                    # to the shared pool while raw responses remain readable by the caller
+                    await self._response.read()
+        except Exception:
+            self._response.release()
+        finally:
+            self._response = None
+            await self._session_lease.__aexit__(exc_type, exc_val, tb)
 
     async def _fetch_(self):
         logger.debug(f"{self.__class__.__name__} fetching from {self._url}")
         http_method = self.match_http_method_from_type(
             self._session, self._event.config.method
         )
+        request_kwargs = {}
+        if isinstance(self._session, ClientSession):
+            request_kwargs["raise_for_status"] = True
         if self._event.config.data is not None:
-            result: Union[ClientResponse, httpx.Response] = await http_method(
-                self._url, data=self._event.config.data, **self._ssl_context_kwargs
-            )
-        else:
-            result = await http_method(self._url, **self._ssl_context_kwargs)
-        result.raise_for_status()
+            request_kwargs["data"] = self._event.config.data
+        conditional_headers = self._conditional_headers()
+        if conditional_headers:
+            request_kwargs["headers"] = conditional_headers
+        result: Union[ClientResponse, httpx.Response] = await http_method(
+            self._url, **request_kwargs
+        )
+        self._response = result
+        # (304 answers a conditional request - httpx counts it as an error, aiohttp doesn't)
+        if self._status_of(result) != 304:
+            result.raise_for_status()
         return result
 
+    def _conditional_headers(self) -> dict:
+        """Headers to fetch the content only if it changed since the known
+        digest (if the validators of that content are known)."""
+        if self._validators_key is None or self._event.known_digest is None:
+            return {}
+        validators = http_validators.get(self._validators_key)
+        if validators is None or validators.digest != self._event.known_digest:
+            return {}
+        headers = {}
+        if validators.etag is not None:
+            headers["If-None-Match"] = validators.etag
+        if validators.last_modified is not None:
+            headers["If-Modified-Since"] = validators.last_modified
+        return headers
+
+    def _record_validators(self, res: Union[ClientResponse, httpx.Response]):
+        if self._validators_key is None or self.content_digest is None:
+            return
+        http_validators.record(
+            self._validators_key,
+            etag=res.headers.get("ETag"),
+            last_modified=res.headers.get("Last-Modified"),
+            digest=self.content_digest,
+        )
+
+    @staticmethod
+    def _status_of(res: Union[ClientResponse, httpx.Response]) -> int:
+        return res.status if isinstance(res, ClientResponse) else res.status_code
+
     @staticmethod
     def match_http_method_from_type(
         session: Union[ClientSession, httpx.AsyncClient], method_type: HttpMethods
     ):
         return getattr(session, method_type.value)
 
+    @staticmethod
+    async def _read_body(res: Union[ClientResponse, httpx.Response]) -> bytes:
+        if isinstance(res, httpx.Response):
+            return res.content
+        # the body is cached by the response, and reused when decoding it
+        return await cast(ClientResponse, res).read()
+
+    async def stream(
+        self, res: Union[ClientResponse, httpx.Response]
+    ) -> AsyncIterator[bytes]:
+        chunk_size = opal_common_config.HTTP_FETCHER_STREAM_CHUNK_SIZE
+        self._streamed = True
+        if isinstance(res, httpx.Response):
+            # httpx responses are already read by the time they are returned
+            chunks = res.aiter_bytes(chunk_size)
+        else:
+            chunks = cast(ClientResponse, res).content.iter_chunked(chunk_size)
+        digest = hashlib.sha256()
+        async for chunk in chunks:
+            digest.update(chunk)
+            yield chunk
+        self.content_digest = digest.hexdigest()
+
     @staticmethod
     async def _response_to_data(
         res: Union[ClientResponse, httpx.Response], *, is_json: bool
@@ -119,6 +230,14 @@ class HttpFetchProvider(BaseFetchProvider):
 
         # if we are asked to process the data before we return it
         if self._event.config.process_data:
+            if self._status_of(res) == 304:
+                # (only sent for conditional requests of content with the known digest)
+                self.content_digest = self._event.known_digest
+                return NOT_MODIFIED
+            # digest the raw content, so consumers can tell if it changed without re-serializing it
+            body = await self._read_body(res)
+            self.content_digest = hashlib.sha256(body).hexdigest()
+            self._record_validators(res)
             data = await self._response_to_data(res, is_json=self._event.config.is_json)
             return data
         # return raw result
@@ -0,0 +1,347 @@
+"""HTTP data fetcher following pagination, or downloading byte ranges
+concurrently."""
+
+import asyncio
+import hashlib
+import json
+import re
+from enum import Enum
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple, Union
+from urllib.parse import parse_qsl, urlencode, urljoin, urlparse, urlunparse
+
+import httpx
+from aiohttp import ClientSession
+from opal_common.config import opal_common_config
+from opal_common.fetcher.events import FetchEvent
+from opal_common.fetcher.fetch_provider import BaseFetchProvider
+from opal_common.fetcher.logger import get_logger
+from opal_common.fetcher.providers.http_fetch_provider import (
+    HttpFetcherConfig,
+    HttpFetchProvider,
+    HttpMethods,
+)
+from pydantic import root_validator
+
+logger = get_logger("http_paginated_fetch_provider")
+
+NEXT_LINK = re.compile(r'<([^>]*)>\s*;[^,]*\brel="?next"?', re.IGNORECASE)
+CONTENT_RANGE = re.compile(r"bytes\s+(\d+)-(\d+)/(\d+|\*)")
+
+
+class PaginationError(Exception):
+    pass
+
+
+class Pagination(str, Enum):
+    # follow the rel="next" url of the Link header
+    LINK = "link"
+    # follow the next cursor (or url) found in each page
+    CURSOR = "cursor"
+    # fetch numbered pages
+    PAGE = "page"
+
+
+class MergeMode(str, Enum):
+    # concatenate the items of all pages
+    LIST = "list"
+    # map the items of all pages by their key field
+    MAP = "map"
+
+
+class PaginatedHttpFetcherConfig(HttpFetcherConfig):
+    """Config for PaginatedHttpFetchProvider.
+
+    Fields of pages are given as dot separated paths (i.e: "meta.next").
+    Without pagination, the content is downloaded as concurrent byte
+    ranges of range_chunk_size (if set, and supported by the server).
+    """
+
+    pagination: Optional[Pagination] = None
+    # field of each page holding its items (the page itself if not set)
+    items_field: Optional[str] = None
+    # the field of the page holding the next cursor (or url) - for CURSOR pagination
+    cursor_field: str = "next"
+    # the query param the cursor is sent as
+    cursor_param: str = "cursor"
+    # the query params of the page number and size - for PAGE pagination
+    page_param: str = "page"
+    first_page: int = 1
+    page_size_param: Optional[str] = None
+    page_size: Optional[int] = None
+    # field of the first page holding the number of pages (fetched concurrently, if known)
+    total_pages_field: Optional[str] = None
+    # guards against endless pagination
+    max_pages: int = 10000
+    merge: MergeMode = MergeMode.LIST
+    # the item field to map items by - for MAP merging
+    key_field: Optional[str] = None
+    range_chunk_size: Optional[int] = None
+    # max concurrent requests (defaults to HTTP_FETCHER_PAGINATED_CONCURRENCY)
+    concurrency: Optional[int] = None
+
+    @root_validator
+    def check_merge(cls, values):
+        if values.get("merge") == MergeMode.MAP and not values.get("key_field"):
+            raise ValueError("merging items to a map requires a key_field")
+        return values
+
+    class Config:
+        use_enum_values = True
+
+
+class PaginatedHttpFetchEvent(FetchEvent):
+    fetcher: str = "PaginatedHttpFetchProvider"
+    config: PaginatedHttpFetcherConfig = None
+
+
+class _Response(NamedTuple):
+    status: int
+    headers: Any
+    body: bytes
+
+
+def get_field(document: Any, field: Optional[str]) -> Any:
+    """The value of a dot separated field of the document (None if missing)."""
+    if not field:
+        return document
+    for key in field.split("."):
+        if not isinstance(document, dict):
+            return None
+        document = document.get(key)
+    return document
+
+
+def with_query(url: str, **params) -> str:
+    """The url, with the query params set."""
+    parsed = urlparse(url)
+    query = dict(parse_qsl(parsed.query, keep_blank_values=True))
+    query.update({key: str(value) for key, value in params.items()})
+    return urlunparse(parsed._replace(query=urlencode(query)))
+
+
+class PaginatedHttpFetchProvider(HttpFetchProvider):
+    """Fetches data that is split across requests, into a single document:
+
+    - paginated APIs (by Link header, cursor or page numbers) - the items
+      of all pages are merged into a list, or a map keyed by an item field.
+    - large content from servers supporting byte ranges - downloaded as
+      concurrent chunks.
+
+    The content digest is of the raw content of all pages (in order).
+    """
+
+    def __init__(self, event: PaginatedHttpFetchEvent) -> None:
+        self._event: PaginatedHttpFetchEvent
+        if event.config is None:
+            event.config = PaginatedHttpFetcherConfig()
+        super().__init__(event)
+        # pages are not fetched conditionally, nor streamed
+        self._validators_key = None
+        config = self._event.config
+        self._concurrency = max(
+            1,
+            config.concurrency or opal_common_config.HTTP_FETCHER_PAGINATED_CONCURRENCY,
+        )
+
+    def parse_event(self, event: FetchEvent) -> PaginatedHttpFetchEvent:
+        return PaginatedHttpFetchEvent(
+            **event.dict(exclude={"config"}), config=event.config
+        )
+
+    stream = BaseFetchProvider.stream
+
+    async def _fetch_(self):
+        config = self._event.config
+        if HttpMethods(config.method) != HttpMethods.GET:
+            raise PaginationError(f"{self.__class__.__name__} only supports GET")
+        logger.debug(f"{self.__class__.__name__} fetching from {self._url}")
+        if config.pagination == Pagination.LINK:
+            return await self._fetch_by_link()
+        if config.pagination == Pagination.CURSOR:
+            return await self._fetch_by_cursor()
+        if config.pagination == Pagination.PAGE:
+            return await self._fetch_by_page_number()
+        return await self._fetch_ranges()
+
+    async def _request(self, url: str, headers: Optional[dict] = None) -> _Response:
+        if isinstance(self._session, ClientSession):
+            async with self._session.get(
+                url, headers=headers, raise_for_status=True
+            ) as res:
+                return _Response(res.status, res.headers, await res.read())
+        res: httpx.Response = await self._session.get(url, headers=headers)
+        res.raise_for_status()
+        return _Response(res.status_code, res.headers, res.content)
+
+    async def _fetch_page(self, url: str) -> Tuple[_Response, Any]:
+        res = await self._request(url)
+        return res, json.loads(res.body)
+
+    def _check_page_count(self, count: int):
+        if count > self._event.config.max_pages:
+            raise PaginationError(
+                f"{self._url} has more than {self._event.config.max_pages} pages"
+            )
+
+    async def _fetch_by_link(self) -> List[Any]:
+        pages, url = [], self._url
+        while url is not None:
+            self._check_page_count(len(pages) + 1)
+            res, page = await self._fetch_page(url)
+            pages.append((res, page))
+            next_link = NEXT_LINK.search(res.headers.get("Link", ""))
+            url = urljoin(url, next_link.group(1)) if next_link else None
+        return pages
+
+    async def _fetch_by_cursor(self) -> List[Any]:
+        config = self._event.config
+        pages, url = [], self._url
+        while True:
+            self._check_page_count(len(pages) + 1)
+            res, page = await self._fetch_page(url)
+            pages.append((res, page))
+            cursor = get_field(page, config.cursor_field)
+            if not cursor or not self._items_of(page):
+                return pages
+            if isinstance(cursor, str) and cursor.startswith(("http://", "https://")):
+                # the next page's url
+                url = cursor
+            else:
+                url = with_query(self._url, **{config.cursor_param: cursor})
+
+    async def _fetch_by_page_number(self) -> List[Any]:
+        config = self._event.config
+        semaphore = asyncio.Semaphore(self._concurrency)
+
+        async def fetch(number: int):
+            params = {config.page_param: number}
+            if config.page_size_param and config.page_size:
+                params[config.page_size_param] = config.page_size
+            async with semaphore:
+                return await self._fetch_page(with_query(self._url, **params))
+
+        first = await fetch(config.first_page)
+        pages = [first]
+        total = (
+            get_field(first[1], config.total_pages_field)
+            if config.total_pages_field
+            else None
+        )
+        if total is not None:
+            self._check_page_count(int(total))
+            pages.extend(
+                await asyncio.gather(
+                    *(fetch(config.first_page + i) for i in range(1, int(total)))
+                )
+            )
+            return pages
+
+        # the number of pages is unknown - fetch windows of pages until the last (partial) page
+        while not self._is_last_page(pages[-1][1]):
+            number = config.first_page + len(pages)
+            self._check_page_count(len(pages) + 1)
+            window = min(self._concurrency, config.max_pages - len(pages))
+            fetched = await asyncio.gather(*(fetch(number + i) for i in range(window)))
+            for page in fetched:
+                pages.append(page)
+                if self._is_last_page(page[1]):
+                    break
+        return pages
+
+    def _is_last_page(self, page: Any) -> bool:
+        items = self._items_of(page)
+        page_size = self._event.config.page_size
+        return not items or (page_size is not None and len(items) < page_size)
+
+    def _items_of(self, page: Any) -> Union[list, dict]:
+        items = get_field(page, self._event.config.items_field)
+        if items is None:
+            return []
+        if not isinstance(items, (list, dict)):
+            raise PaginationError(
+                f"Items of a page of {self._url} are not a list (or an object)"
+            )
+        return items
+
+    async def _fetch_ranges(self) -> bytes:
+        chunk_size = self._event.config.range_chunk_size
+        if not chunk_size:
+            return (await self._request(self._url)).body
+        first = await self._request(
+            self._url, headers={"Range": f"bytes=0-{chunk_size - 1}"}
+        )
+        content_range = CONTENT_RANGE.match(first.headers.get("Content-Range", ""))
+        if (
+            first.status != 206
+            or content_range is None
+            or content_range.group(3) == "*"
+        ):
+            # ranges are not supported - the response is the whole content
+            return first.body
+        size = int(content_range.group(3))
+        # the remaining ranges must be of the same content as the first
+        validator = first.headers.get("ETag") or first.headers.get("Last-Modified")
+        semaphore = asyncio.Semaphore(self._concurrency)
+
+        async def fetch(start: int) -> _Response:
+            end = min(start + chunk_size, size) - 1
+            headers = {"Range": f"bytes={start}-{end}"}
+            if validator is not None:
+                headers["If-Range"] = validator
+            async with semaphore:
+                return await self._request(self._url, headers=headers)
+
+        chunks = [first]
+        chunks.extend(
+            await asyncio.gather(
+                *(fetch(start) for start in range(chunk_size, size, chunk_size))
+            )
+        )
+        for chunk in chunks[1:]:
+            if chunk.status == 200:
+                # the content changed since the first range, this is all of it
+                return chunk.body
+        body = b"".join(chunk.body for chunk in chunks)
+        if len(body) != size:
+            raise PaginationError(
+                f"Got {len(body)} bytes of {size} from the ranges of {self._url}"
+            )
+        return body
+
+    async def _process_(self, res: Union[bytes, List[Tuple[_Response, Any]]]):
+        if isinstance(res, bytes):
+            self.content_digest = hashlib.sha256(res).hexdigest()
+            return json.loads(res) if self._event.config.is_json else res.decode()
+        digest = hashlib.sha256()
+        for page, _ in res:
+            digest.update(page.body)
+        self.content_digest = digest.hexdigest()
+        return self._merge([self._items_of(page) for _, page in res])
+
+    def _merge(self, items: List[Union[list, dict]]) -> Union[list, dict]:
+        config = self._event.config
+        if config.merge == MergeMode.MAP:
+            merged: Dict[str, Any] = {}
+            for page_items in items:
+                for item in (
+                    page_items.values() if isinstance(page_items, dict) else page_items
+                ):
+                    key = get_field(item, config.key_field)
+                    if key is None:
+                        raise PaginationError(
+                            f"An item of {self._url} has no '{config.key_field}' field"
+                        )
+                    merged[str(key)] = item
+            return merged
+        if items and all(isinstance(page_items, dict) for page_items in items):
+            # pages of objects are merged into one
+            return {
+                key: value for page_items in items for key, value in page_items.items()
+            }
+        return [
+            item
+            for page_items in items
+            for item in (
+                page_items.values() if isinstance(page_items, dict) else page_items
+            )
+        ]
@@ -0,0 +1,77 @@
+import hashlib
+import json
+from collections import OrderedDict
+from typing import Any, Dict, NamedTuple, Optional
+
+
+class HttpValidators(NamedTuple):
+    """The validators (RFC 9110) of a fetched response, and the digest of the
+    response's content they validate."""
+
+    etag: Optional[str]
+    last_modified: Optional[str]
+    digest: str
+
+
+class HttpValidatorCache:
+    """Remembers the ETag / Last-Modified validators of the last response
+    fetched for each request (url and request config), so the content can be
+    fetched conditionally next time.
+
+    Keys are digests of the requests (headers may hold credentials), the
+    cache can be dumped to / loaded from JSON to persist it across
+    restarts.
+    """
+
+    DEFAULT_MAX_ENTRIES = 10000
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self._max_entries = max_entries
+        self._validators: "OrderedDict[str, HttpValidators]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._validators)
+
+    @staticmethod
+    def key_of(url: str, config: Any) -> str:
+        """The key of a request (config is the request's fetcher config, as a
+        dict)."""
+        request = json.dumps([url, config], sort_keys=True, default=str)
+        return hashlib.sha256(request.encode()).hexdigest()
+
+    def get(self, key: str) -> Optional[HttpValidators]:
+        return self._validators.get(key)
+
+    def record(
+        self,
+        key: str,
+        etag: Optional[str],
+        last_modified: Optional[str],
+        digest: str,
+    ):
+        """Records the validators of a fetched response (forgets the request if
+        there are none)."""
+        self._validators.pop(key, None)
+        if etag is None and last_modified is None:
+            return
+        self._validators[key] = HttpValidators(etag, last_modified, digest)
+        while len(self._validators) > self._max_entries:
+            self._validators.popitem(last=False)
+
+    def forget(self, key: str):
+        self._validators.pop(key, None)
+
+    def clear(self):
+        self._validators.clear()
+
+    def dump(self) -> Dict[str, Any]:
+        return {key: list(validators) for key, validators in self._validators.items()}
+
+    def load(self, dumped: Dict[str, Any]):
+        """Loads dumped validators (on top of the current ones)."""
+        for key, (etag, last_modified, digest) in dumped.items():
+            self.record(key, etag, last_modified, digest)
+
+
+# shared by all http fetch providers
+http_validators = HttpValidatorCache()
@@ -0,0 +1,134 @@
+import os
+import sys
+
+# Add parent path to use local src as package for tests
+root_dir = os.path.abspath(
+    os.path.join(
+        os.path.dirname(__file__), os.path.pardir, os.path.pardir, os.path.pardir
+    )
+)
+sys.path.append(root_dir)
+
+import asyncio
+
+import pytest
+from opal_common.fetcher import FetchingEngine, FetchPriority
+from opal_common.fetcher.engine.fetch_lanes import FetchLanes
+from opal_common.fetcher.fetch_provider import BaseFetchProvider
+
+
+@pytest.mark.asyncio
+async def test_get_returns_most_urgent_lane_first():
+    lanes = FetchLanes()
+    lanes.put_nowait("low", FetchPriority.LOW)
+    lanes.put_nowait("normal-1")
+    lanes.put_nowait("high", FetchPriority.HIGH)
+    lanes.put_nowait("normal-2")
+    assert lanes.qsize() == 4
+
+    assert [await lanes.get() for _ in range(4)] == [
+        "high",
+        "normal-1",
+        "normal-2",
+        "low",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_get_ignores_less_urgent_lanes():
+    lanes = FetchLanes()
+    lanes.put_nowait("normal")
+    get_high = asyncio.create_task(lanes.get(FetchPriority.HIGH))
+    await asyncio.sleep(0.01)
+    assert not get_high.done()
+
+    lanes.put_nowait("high", FetchPriority.HIGH)
+    assert await asyncio.wait_for(get_high, 1) == "high"
+    assert await lanes.get() == "normal"
+
+
+@pytest.mark.asyncio
+async def test_full_lane_applies_backpressure():
+    lanes = FetchLanes(maxsize=1)
+    lanes.put_nowait("low-1", FetchPriority.LOW)
+    with pytest.raises(asyncio.QueueFull):
+        lanes.put_nowait("low-2", FetchPriority.LOW)
+    # other lanes are not affected
+    lanes.put_nowait("high", FetchPriority.HIGH)
+
+    put = asyncio.create_task(lanes.put("low-2", FetchPriority.LOW))
+    await asyncio.sleep(0.01)
+    assert not put.done()
+    assert await lanes.get() == "high"
+    await asyncio.sleep(0.01)
+    # a task was taken from another lane, the low lane is still full
+    assert not put.done()
+
+    assert await lanes.get() == "low-1"
+    await asyncio.wait_for(put, 1)
+    assert await lanes.get() == "low-2"
+
+
+@pytest.mark.asyncio
+async def test_lane_stats():
+    lanes = FetchLanes(maxsize=10)
+    lanes.put_nowait("a", FetchPriority.LOW)
+    lanes.put_nowait("b", FetchPriority.LOW)
+    await asyncio.sleep(0.02)
+    await lanes.get()
+
+    stats = lanes.stats()
+    assert set(stats) == {"high", "normal", "low"}
+    assert stats["high"]["depth"] == 0 and stats["high"]["total_enqueued"] == 0
+    low = stats["low"]
+    assert low["depth"] == 1
+    assert low["maxsize"] == 10
+    assert low["total_enqueued"] == 2
+    assert low["max_wait_time"] >= 0.02
+    assert low["avg_wait_time"] == low["max_wait_time"]
+    assert low["oldest_wait_time"] >= 0.02
+
+
+class BlockingFetchProvider(BaseFetchProvider):
+    """Fetches the url as is, once the url's event is set."""
+
+    release = {}
+
+    async def _fetch_(self):
+        await self.release[self._url].wait()
+        return self._url
+
+
+@pytest.mark.asyncio
+async def test_reserved_worker_handles_high_priority_tasks():
+    BlockingFetchProvider.release = {
+        url: asyncio.Event() for url in ("bulk-1", "bulk-2", "update")
+    }
+    async with FetchingEngine(
+        register_config={"BlockingFetchProvider": BlockingFetchProvider},
+        worker_count=2,
+        reserved_worker_count=1,
+    ) as engine:
+
+        def fetch(url, priority):
+            return asyncio.create_task(
+                engine.handle_url(
+                    url, fetcher="BlockingFetchProvider", priority=priority
+                )
+            )
+
+        bulk = [fetch(url, FetchPriority.LOW) for url in ("bulk-1", "bulk-2")]
+        await asyncio.sleep(0.01)
+        # the unreserved worker is busy with bulk-1, the reserved one does not take bulk-2
+        assert engine.queue_stats()["low"]["depth"] == 1
+
+        update = fetch("update", FetchPriority.HIGH)
+        BlockingFetchProvider.release["update"].set()
+        assert await asyncio.wait_for(update, 1) == "update"
+
+        for url in ("bulk-1", "bulk-2"):
+            BlockingFetchProvider.release[url].set()
+        assert await asyncio.wait_for(asyncio.gather(*bulk), 1) == [
+            "bulk-1",
+            "bulk-2",
+        ]
@@ -0,0 +1,139 @@
+import os
+import sys
+
+# Add parent path to use local src as package for tests
+root_dir = os.path.abspath(
+    os.path.join(
+        os.path.dirname(__file__), os.path.pardir, os.path.pardir, os.path.pardir
+    )
+)
+sys.path.append(root_dir)
+
+import asyncio
+
+import pytest
+from opal_common.fetcher import FetchingEngine
+from opal_common.fetcher.engine.fetch_memo import FetchMemo
+from opal_common.fetcher.fetch_provider import BaseFetchProvider
+from opal_common.fetcher.providers.http_fetch_provider import (
+    HttpFetcherConfig,
+    HttpFetchProvider,
+)
+
+
+class CountingFetchProvider(BaseFetchProvider):
+    """Fetches {"url": url} (slowly), counting the fetches of each url."""
+
+    fetches = {}
+
+    async def _fetch_(self):
+        self.fetches[self._url] = self.fetches.get(self._url, 0) + 1
+        await asyncio.sleep(0.05)
+        if self._url == "broken":
+            raise ValueError("broken")
+        return {"url": self._url}
+
+
+class NoMemoFetchProvider(CountingFetchProvider):
+    MEMO_TTL = 0
+
+
+def counting_engine(**kwargs) -> FetchingEngine:
+    CountingFetchProvider.fetches = {}
+    return FetchingEngine(
+        register_config={
+            "CountingFetchProvider": CountingFetchProvider,
+            "NoMemoFetchProvider": NoMemoFetchProvider,
+        },
+        retry_config={"reraise": True, "stop": lambda _: True},
+        **kwargs,
+    )
+
+
+@pytest.mark.asyncio
+async def test_concurrent_identical_fetches_are_shared():
+    async with counting_engine() as engine:
+        fetch = lambda url, config=None: engine.handle_url(
+            url, fetcher="CountingFetchProvider", config=config
+        )
+        results = await asyncio.gather(
+            fetch("a"), fetch("a"), fetch("a"), fetch("b"), fetch("a", {"x": 1})
+        )
+        assert results == [{"url": "a"}] * 3 + [{"url": "b"}, {"url": "a"}]
+        # different urls or configs are fetched separately
+        assert CountingFetchProvider.fetches == {"a": 2, "b": 1}
+
+        # nothing is memoized by default
+        await fetch("a")
+        assert CountingFetchProvider.fetches["a"] == 3
+
+
+@pytest.mark.asyncio
+async def test_shared_fetch_failure():
+    async with counting_engine(callback_timeout=0.5) as engine:
+        fetch = lambda: engine.handle_url("broken", fetcher="CountingFetchProvider")
+        results = await asyncio.gather(fetch(), fetch(), return_exceptions=True)
+        assert all(isinstance(r, asyncio.TimeoutError) for r in results)
+        assert CountingFetchProvider.fetches == {"broken": 1}
+
+
+@pytest.mark.asyncio
+async def test_cancelled_caller_does_not_cancel_shared_fetch():
+    async with counting_engine() as engine:
+        fetch = lambda: engine.handle_url("a", fetcher="CountingFetchProvider")
+        first = asyncio.create_task(fetch())
+        second = asyncio.create_task(fetch())
+        await asyncio.sleep(0.01)
+        first.cancel()
+        assert await second == {"url": "a"}
+        assert CountingFetchProvider.fetches == {"a": 1}
+
+
+@pytest.mark.asyncio
+async def test_results_memoized_for_ttl():
+    async with counting_engine(memo_ttl=0.2) as engine:
+        await engine.handle_url("a", fetcher="CountingFetchProvider")
+        assert await engine.handle_url("a", fetcher="CountingFetchProvider") == {
+            "url": "a"
+        }
+        assert CountingFetchProvider.fetches == {"a": 1}
+
+        # providers may opt out
+        await engine.handle_url("b", fetcher="NoMemoFetchProvider")
+        await engine.handle_url("b", fetcher="NoMemoFetchProvider")
+        assert CountingFetchProvider.fetches["b"] == 2
+
+        await asyncio.sleep(0.25)
+        await engine.handle_url("a", fetcher="CountingFetchProvider")
+        assert CountingFetchProvider.fetches["a"] == 2
+
+
+def test_memo_bounds():
+    memo = FetchMemo(max_entries=2, max_bytes=100)
+    memo.put("a", 1, size=10, ttl=60)
+    memo.put("b", 2, size=10, ttl=60)
+    assert memo.get("a") == 1
+    # least recently used entry is evicted
+    memo.put("c", 3, size=10, ttl=60)
+    assert memo.get("b") is None
+    assert len(memo) == 2 and memo.size == 20
+
+    memo.put("d", 4, size=95, ttl=60)
+    assert memo.get("d") == 4
+    assert memo.get("a") is None and memo.get("c") is None
+    assert memo.size == 95
+
+    # too large to memoize at all
+    memo.put("e", 5, size=101, ttl=60)
+    assert memo.get("e") is None
+    assert memo.get("d") == 4
+
+
+def test_only_http_reads_are_shared():
+    assert HttpFetchProvider.can_share_fetches(None)
+    assert HttpFetchProvider.can_share_fetches({"headers": {"a": "b"}})
+    assert HttpFetchProvider.can_share_fetches(HttpFetcherConfig(method="head"))
+    assert not HttpFetchProvider.can_share_fetches({"method": "post", "data": {}})
+    assert not HttpFetchProvider.can_share_fetches(
+        HttpFetcherConfig(process_data=False)
+    )
@@ -0,0 +1,99 @@
+import os
+import sys
+
+# Add parent path to use local src as package for tests
+root_dir = os.path.abspath(
+    os.path.join(
+        os.path.dirname(__file__), os.path.pardir, os.path.pardir, os.path.pardir
+    )
+)
+sys.path.append(root_dir)
+
+import json
+
+import pytest
+from opal_common.config import opal_common_config
+from opal_common.fetcher import FetchedDelta, FetchingEngine
+from opal_common.fetcher.providers.file_fetch_provider import (
+    FileFetchEvent,
+    FileFetchProvider,
+)
+
+USERS = [{"id": 1, "name": "alice"}, {"id": 2, "name": "bob"}]
+
+
+@pytest.fixture
+def data_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(
+        opal_common_config, "FILE_FETCHER_ALLOWED_PATHS", [str(tmp_path)]
+    )
+    return tmp_path
+
+
+def write_lines(path, lines, mode="w"):
+    with open(path, mode) as f:
+        f.writelines(f"{json.dumps(line)}\n" for line in lines)
+
+
+async def fetch(path, **config):
+    async with FetchingEngine() as engine:
+        return await engine.handle_url_with_digest(
+            f"file://{path}", config=config, fetcher="FileFetchProvider"
+        )
+
+
+@pytest.mark.asyncio
+async def test_json_file(data_dir):
+    path = data_dir / "users.json"
+    path.write_text(json.dumps({"users": USERS}))
+    data, digest = await fetch(path)
+    assert data == {"users": USERS}
+    assert digest is not None
+
+
+@pytest.mark.asyncio
+async def test_ndjson_file(data_dir):
+    path = data_dir / "users.ndjson"
+    write_lines(path, USERS)
+    data, _ = await fetch(path)
+    assert data == USERS
+    data, _ = await fetch(path, key_field="name")
+    assert data == {"alice": USERS[0], "bob": USERS[1]}
+
+
+@pytest.mark.asyncio
+async def test_tail_ndjson_file(data_dir):
+    path = data_dir / "users.jsonl"
+    write_lines(path, USERS)
+    config = {"key_field": "id", "delete_field": "deleted", "tail": True}
+    snapshot, _ = await fetch(path, **config)
+    assert snapshot.is_snapshot
+    assert snapshot.data == {"1": USERS[0], "2": USERS[1]}
+
+    write_lines(path, [{"id": 3, "name": "carol"}, {"id": 1, "deleted": True}], "a")
+    with open(path, "a") as f:
+        # not complete yet
+        f.write('{"id": 4')
+    delta, _ = await fetch(path, cursor=snapshot.cursor, **config)
+    assert [(change.op, change.path) for change in delta.changes] == [
+        ("add", "/3"),
+        ("remove", "/1"),
+    ]
+
+    with open(path, "a") as f:
+        f.write("}\n")
+    delta, _ = await fetch(path, cursor=delta.cursor, **config)
+    assert [change.value for change in delta.changes] == [{"id": 4}]
+
+    # a replaced file is fetched all over
+    replacement = data_dir / "replacement.jsonl"
+    write_lines(replacement, USERS[:1])
+    os.replace(replacement, path)
+    snapshot, _ = await fetch(path, cursor=delta.cursor, **config)
+    assert snapshot.data == {"1": USERS[0]}
+
+
+def test_files_outside_allowed_paths_are_not_read(data_dir):
+    provider = FileFetchProvider(FileFetchEvent(url=f"file://{data_dir}/../users.json"))
+    with pytest.raises(Exception):
+        provider._check_allowed()
@@ -0,0 +1,73 @@
+import os
+import sys
+
+# Add parent path to use local src as package for tests
+root_dir = os.path.abspath(
+    os.path.join(
+        os.path.dirname(__file__), os.path.pardir, os.path.pardir, os.path.pardir
+    )
+)
+sys.path.append(root_dir)
+
+from multiprocessing import Process
+
+import pytest
+import uvicorn
+from fastapi import FastAPI
+from opal_common.fetcher import FetchedDelta, FetchingEngine
+from opal_common.fetcher.providers.http_delta_fetch_provider import (
+    DeltaHttpFetcherConfig,
+)
+
+# Configurable
+PORT = int(os.environ.get("PORT") or "9113")
+BASE_URL = f"http://localhost:{PORT}"
+USERS = {"alice": {"role": "admin"}}
+CHANGES = [
+    {"op": "add", "path": "/bob", "value": {"role": "dev"}},
+    {"op": "remove", "path": "/alice"},
+]
+
+
+def setup_server():
+    app = FastAPI()
+
+    @app.get("/users")
+    def users(since: int = None):
+        if since is None:
+            return {"data": USERS, "meta": {"cursor": 0}}
+        return {"changes": CHANGES[since:], "meta": {"cursor": len(CHANGES)}}
+
+    uvicorn.run(app, port=PORT)
+
+
+@pytest.fixture(scope="module")
+def server():
+    # Run the server as a separate process
+    proc = Process(target=setup_server, args=(), daemon=True)
+    proc.start()
+    yield proc
+    proc.kill()  # Cleanup after test
+
+
+async def fetch(cursor=None) -> FetchedDelta:
+    async with FetchingEngine() as engine:
+        config = DeltaHttpFetcherConfig(cursor=cursor, cursor_field="meta.cursor")
+        return await engine.handle_url(
+            f"{BASE_URL}/users",
+            config=config.dict(),
+            fetcher="DeltaHttpFetchProvider",
+        )
+
+
+@pytest.mark.asyncio
+async def test_delta_fetch(server):
+    snapshot = await fetch()
+    assert snapshot.is_snapshot
+    assert snapshot.data == USERS
+    assert snapshot.cursor == "0"
+
+    delta = await fetch(cursor="1")
+    assert not delta.is_snapshot
+    assert [change.op for change in delta.changes] == ["remove"]
+    assert delta.cursor == "2"
@@ -10,12 +10,14 @@ root_dir = os.path.abspath(
 sys.path.append(root_dir)
 
 import asyncio
+import json
 from multiprocessing import Process
 
 import pytest
 import uvicorn
-from fastapi import Depends, FastAPI, Header, HTTPException
-from opal_common.fetcher import FetchingEngine
+from fastapi import Depends, FastAPI, Header, HTTPException, Response
+from opal_common.config import opal_common_config
+from opal_common.fetcher import NOT_MODIFIED, FetchingEngine
 from opal_common.fetcher.providers.http_fetch_provider import HttpFetcherConfig
 
 # Configurable
@@ -23,6 +25,8 @@ PORT = int(os.environ.get("PORT") or "9110")
 BASE_URL = f"http://localhost:{PORT}"
 DATA_ROUTE = f"/data"
 AUTHORIZED_DATA_ROUTE = f"/data_authz"
+VALIDATED_DATA_ROUTE = f"/data_etag"
+DATA_ETAG = '"v1"'
 SECRET_TOKEN = "fake-super-secret-token"
 DATA_KEY = "Hello"
 DATA_VALUE = "World"
@@ -46,6 +50,16 @@ def setup_server():
     def get_authorized_data(token=Depends(check_token_header)):
         return {DATA_KEY: DATA_SECRET_VALUE}
 
+    @app.get(VALIDATED_DATA_ROUTE)
+    def get_validated_data(if_none_match: str = Header(None)):
+        if if_none_match == DATA_ETAG:
+            return Response(status_code=304, headers={"ETag": DATA_ETAG})
+        return Response(
+            content=json.dumps({DATA_KEY: DATA_VALUE}),
+            media_type="application/json",
+            headers={"ETag": DATA_ETAG},
+        )
+
     uvicorn.run(app, port=PORT)
 
 
@@ -83,6 +97,80 @@ async def test_simple_http_get_with_wait(server):
         assert data[DATA_KEY] == DATA_VALUE
 
 
+@pytest.mark.asyncio
+async def test_http_get_content_digest(server):
+    """The digest of the raw content is returned alongside the data."""
+    async with FetchingEngine() as engine:
+        url = f"{BASE_URL}{DATA_ROUTE}"
+        data, digest = await engine.handle_url_with_digest(url)
+        assert data[DATA_KEY] == DATA_VALUE
+        assert digest is not None
+        _, same_digest = await engine.handle_url_with_digest(url)
+        assert same_digest == digest
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("http_client", ["aiohttp", "httpx"])
+async def test_http_get_not_modified(server, monkeypatch, http_client):
+    """Content the requester holds is fetched conditionally, by its
+    validators."""
+    monkeypatch.setattr(opal_common_config, "HTTP_FETCHER_PROVIDER_CLIENT", http_client)
+    async with FetchingEngine() as engine:
+        url = f"{BASE_URL}{VALIDATED_DATA_ROUTE}"
+        data, digest = await engine.handle_url_with_digest(url)
+        assert data[DATA_KEY] == DATA_VALUE
+
+        result, same_digest = await engine.handle_url_with_digest(
+            url, known_digest=digest
+        )
+        assert result is NOT_MODIFIED
+        assert same_digest == digest
+
+        # validators of other content are not sent
+        data, _ = await engine.handle_url_with_digest(url, known_digest="other")
+        assert data[DATA_KEY] == DATA_VALUE
+
+
+@pytest.mark.asyncio
+async def test_http_stream_url(server):
+    """The raw content is handed to the consumer as is, with its digest."""
+    async with FetchingEngine() as engine:
+        url = f"{BASE_URL}{DATA_ROUTE}"
+
+        async def consumer(chunks):
+            return b"".join([chunk async for chunk in chunks])
+
+        content, digest = await engine.stream_url(url, consumer)
+        assert json.loads(content) == {DATA_KEY: DATA_VALUE}
+        _, expected_digest = await engine.handle_url_with_digest(url)
+        assert digest == expected_digest
+
+
+@pytest.mark.asyncio
+async def test_http_stream_url_timeout_stops_the_consumer(server):
+    """A consumer that is too slow is cancelled (and done) by the time the
+    stream times out, so it never writes after the caller moved on."""
+    async with FetchingEngine() as engine:
+        url = f"{BASE_URL}{DATA_ROUTE}"
+        consumer_states = []
+
+        async def slow_consumer(chunks):
+            consumer_states.append("started")
+            try:
+                async for _ in chunks:
+                    await asyncio.sleep(60)
+            finally:
+                consumer_states.append("done")
+
+        with pytest.raises(asyncio.TimeoutError):
+            await engine.stream_url(url, slow_consumer, timeout=1)
+        assert consumer_states == ["started", "done"]
+
+        # the worker is not held by the abandoned stream
+        data = await engine.handle_url(url)
+        assert data[DATA_KEY] == DATA_VALUE
+
+
 @pytest.mark.asyncio
 async def test_authorized_http_get(server):
     """Test getting data from a server route with an auth token."""
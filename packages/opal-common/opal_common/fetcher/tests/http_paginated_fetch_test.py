@@ -0,0 +1,158 @@
+import os
+import sys
+
+# Add parent path to use local src as package for tests
+root_dir = os.path.abspath(
+    os.path.join(
+        os.path.dirname(__file__), os.path.pardir, os.path.pardir, os.path.pardir
+    )
+)
+sys.path.append(root_dir)
+
+import asyncio
+import json
+from multiprocessing import Process
+
+import pytest
+import tenacity
+import uvicorn
+from fastapi import FastAPI, Header, Response
+from opal_common.fetcher import FetchEvent, FetchingEngine
+from opal_common.fetcher.providers.http_fetch_provider import HttpFetchProvider
+from opal_common.fetcher.providers.http_paginated_fetch_provider import (
+    PaginatedHttpFetcherConfig,
+    PaginatedHttpFetchEvent,
+    PaginationError,
+)
+
+# Configurable
+PORT = int(os.environ.get("PORT") or "9112")
+BASE_URL = f"http://localhost:{PORT}"
+USERS = [{"id": i, "name": f"user-{i}"} for i in range(10)]
+PAGE_SIZE = 3
+BLOB = json.dumps({"users": USERS}).encode()
+
+
+def page_of(page: int):
+    return USERS[(page - 1) * PAGE_SIZE : page * PAGE_SIZE]
+
+
+def setup_server():
+    app = FastAPI()
+
+    @app.get("/link")
+    def link_pages(page: int = 1):
+        headers = {}
+        if page * PAGE_SIZE < len(USERS):
+            headers["Link"] = f'</link?page={page + 1}>; rel="next"'
+        return Response(json.dumps(page_of(page)), headers=headers)
+
+    @app.get("/cursor")
+    def cursor_pages(cursor: int = 1):
+        has_next = cursor * PAGE_SIZE < len(USERS)
+        return {
+            "data": {"users": page_of(cursor)},
+            "meta": {"next": cursor + 1 if has_next else None},
+        }
+
+    @app.get("/pages")
+    def numbered_pages(page: int = 1, with_total: bool = False):
+        result = {"users": page_of(page)}
+        if with_total:
+            result["pages"] = -(-len(USERS) // PAGE_SIZE)
+        return result
+
+    @app.get("/blob")
+    def blob(range: str = Header(None)):
+        if range is None:
+            return Response(BLOB)
+        start, end = (int(i) for i in range[len("bytes=") :].split("-"))
+        end = min(end, len(BLOB) - 1)
+        return Response(
+            BLOB[start : end + 1],
+            status_code=206,
+            headers={"Content-Range": f"bytes {start}-{end}/{len(BLOB)}"},
+        )
+
+    uvicorn.run(app, port=PORT)
+
+
+@pytest.fixture(scope="module")
+def server():
+    # Run the server as a separate process
+    proc = Process(target=setup_server, args=(), daemon=True)
+    proc.start()
+    yield proc
+    proc.kill()  # Cleanup after test
+
+
+async def fetch(route: str, **config):
+    async with FetchingEngine() as engine:
+        return await engine.handle_url(
+            f"{BASE_URL}{route}",
+            config=PaginatedHttpFetcherConfig(**config).dict(),
+            fetcher="PaginatedHttpFetchProvider",
+        )
+
+
+@pytest.mark.asyncio
+async def test_link_pagination(server):
+    assert await fetch("/link", pagination="link") == USERS
+
+
+@pytest.mark.asyncio
+async def test_cursor_pagination_merged_to_map(server):
+    users = await fetch(
+        "/cursor",
+        pagination="cursor",
+        items_field="data.users",
+        cursor_field="meta.next",
+        merge="map",
+        key_field="name",
+    )
+    assert users == {user["name"]: user for user in USERS}
+
+
+@pytest.mark.asyncio
+async def test_page_number_pagination(server):
+    # until a partial page
+    users = await fetch(
+        "/pages", pagination="page", items_field="users", page_size=PAGE_SIZE
+    )
+    assert users == USERS
+    # by the number of pages
+    users = await fetch(
+        "/pages?with_total=true",
+        pagination="page",
+        items_field="users",
+        total_pages_field="pages",
+    )
+    assert users == USERS
+
+
+@pytest.mark.asyncio
+async def test_too_many_pages(server):
+    errors = asyncio.Queue()
+    async with FetchingEngine() as engine:
+
+        async def error_callback(error: Exception, event: FetchEvent):
+            await errors.put(error)
+
+        engine.register_failure_handler(error_callback)
+        retry_config = HttpFetchProvider.DEFAULT_RETRY_CONFIG.copy()
+        retry_config["stop"] = tenacity.stop.stop_after_attempt(1)
+        config = PaginatedHttpFetcherConfig(
+            pagination="page", items_field="users", max_pages=2
+        )
+        event = PaginatedHttpFetchEvent(
+            url=f"{BASE_URL}/pages", config=config, retry=retry_config
+        )
+        await engine.queue_fetch_event(event, lambda result: None)
+        error = await asyncio.wait_for(errors.get(), 5)
+        assert isinstance(error, PaginationError)
+
+
+@pytest.mark.asyncio
+async def test_range_download(server):
+    assert await fetch("/blob", range_chunk_size=16) == {"users": USERS}
+    assert await fetch("/blob") == {"users": USERS}
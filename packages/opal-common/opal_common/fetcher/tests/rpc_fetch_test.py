@@ -22,6 +22,7 @@ from opal_common.fetcher.providers.fastapi_rpc_fetch_provider import (
     FastApiRpcFetchEvent,
     FastApiRpcFetchProvider,
 )
+from opal_common.rpc_connections import RpcConnectionPool
 
 # Configurable
 PORT = int(os.environ.get("PORT") or "9110")
@@ -34,6 +35,10 @@ class RpcData(RpcMethodsBase):
     async def get_data(self, suffix: str) -> str:
         return DATA_PREFIX + suffix
 
+    async def get_slow_data(self, suffix: str) -> str:
+        await asyncio.sleep(0.2)
+        return DATA_PREFIX + suffix
+
 
 def setup_server():
     app = FastAPI()
@@ -77,3 +82,37 @@ async def test_simple_rpc_fetch(server):
         await engine.queue_fetch_event(fetch_event, callback)
         await asyncio.wait_for(got_data_event.wait(), 5)
         assert got_data_event.is_set()
+
+
+@pytest.mark.asyncio
+async def test_rpc_calls_are_multiplexed_over_pooled_connections(server):
+    pool = RpcConnectionPool(max_connections_per_endpoint=2, max_inflight_calls=3)
+    results = await asyncio.gather(
+        *(pool.call(uri, "get_slow_data", {"suffix": str(i)}) for i in range(3))
+    )
+    assert [r.result for r in results] == [DATA_PREFIX + str(i) for i in range(3)]
+    # all calls shared a single connection
+    assert pool.size == 1
+
+    # calls beyond the in-flight cap open another connection, then wait for a slot
+    results = await asyncio.gather(
+        *(pool.call(uri, "get_slow_data", {"suffix": str(i)}) for i in range(9))
+    )
+    assert len(results) == 9
+    assert pool.size == 2
+    await pool.close_all()
+    assert pool.size == 0
+
+
+@pytest.mark.asyncio
+async def test_closed_rpc_connections_are_reconnected(server):
+    pool = RpcConnectionPool(max_connections_per_endpoint=1)
+    async with pool.connection(uri) as client:
+        await client.call("get_data", {"suffix": SUFFIX})
+    # the connection is dropped (i.e: by the server)
+    await client.ws.close()
+    result = await pool.call(uri, "get_data", {"suffix": SUFFIX})
+    assert result.result == DATA_PREFIX + SUFFIX
+    async with pool.connection(uri) as reconnected:
+        assert reconnected is not client
+    await pool.close_all()
@@ -0,0 +1,173 @@
+import os
+import sys
+
+# Add parent path to use local src as package for tests
+root_dir = os.path.abspath(
+    os.path.join(
+        os.path.dirname(__file__), os.path.pardir, os.path.pardir, os.path.pardir
+    )
+)
+sys.path.append(root_dir)
+
+import asyncio
+
+import pytest
+from opal_common.fetcher import FetchEvent, FetchingEngine
+from opal_common.fetcher.engine.worker_pool import FetchWorkerPool
+from opal_common.fetcher.fetch_provider import BaseFetchProvider
+from opal_common.fetcher.providers.http_fetch_provider import HttpFetchProvider
+
+
+class BlockingFetchProvider(BaseFetchProvider):
+    """Fetches the url as is, once released - each url's source is its
+    first character."""
+
+    release: asyncio.Event = None
+
+    @classmethod
+    def source_of(cls, event: FetchEvent) -> str:
+        return event.url[0]
+
+    async def _fetch_(self):
+        await self.release.wait()
+        return self._url
+
+
+def blocking_engine(**kwargs) -> FetchingEngine:
+    BlockingFetchProvider.release = asyncio.Event()
+    return FetchingEngine(
+        register_config={"BlockingFetchProvider": BlockingFetchProvider},
+        reserved_worker_count=0,
+        **kwargs,
+    )
+
+
+def fetch_all(engine: FetchingEngine, *urls):
+    return [
+        asyncio.create_task(engine.handle_url(url, fetcher="BlockingFetchProvider"))
+        for url in urls
+    ]
+
+
+@pytest.mark.asyncio
+async def test_pool_scales_up_and_down():
+    async with blocking_engine(
+        worker_count=1, max_worker_count=3, scale_up_wait=0, worker_idle_timeout=0.05
+    ) as engine:
+        fetches = fetch_all(engine, "a1", "b1", "c1", "d1")
+        await asyncio.sleep(0.05)
+        stats = engine.worker_stats()
+        assert stats["workers"] == 3
+        assert stats["active"] == 3
+        assert engine.queue_stats()["normal"]["depth"] == 1
+
+        BlockingFetchProvider.release.set()
+        assert await asyncio.gather(*fetches) == ["a1", "b1", "c1", "d1"]
+        assert engine.worker_stats()["avg_fetch_latency"] is not None
+
+        # additional workers exit once idle
+        await asyncio.sleep(0.2)
+        assert engine.worker_stats()["workers"] == 1
+
+
+@pytest.mark.asyncio
+async def test_pool_is_fixed_by_default():
+    async with blocking_engine(worker_count=2) as engine:
+        fetches = fetch_all(engine, "a1", "b1", "c1")
+        await asyncio.sleep(0.05)
+        assert engine.worker_stats()["workers"] == 2
+        BlockingFetchProvider.release.set()
+        await asyncio.gather(*fetches)
+
+
+@pytest.mark.asyncio
+async def test_source_concurrency_is_limited():
+    async with blocking_engine(worker_count=3, source_max_concurrency=1) as engine:
+        fetches = fetch_all(engine, "a1", "a2", "b1")
+        await asyncio.sleep(0.05)
+        # the second fetch of source 'a' waits, while 'b' is fetched
+        stats = engine.worker_stats()
+        assert stats["fetches_in_progress"] == {"a": 1, "b": 1}
+        assert stats["idle"] == 1
+        assert engine.queue_stats()["normal"]["depth"] == 1
+
+        BlockingFetchProvider.release.set()
+        assert await asyncio.gather(*fetches) == ["a1", "a2", "b1"]
+
+
+class CountingFetchProvider(BaseFetchProvider):
+    """Fetches the url as is (after a short while), counting the concurrent
+    fetches - each url's source is its first character."""
+
+    in_progress = 0
+    max_in_progress = 0
+
+    @classmethod
+    def source_of(cls, event: FetchEvent) -> str:
+        return event.url[0]
+
+    async def _fetch_(self):
+        cls = CountingFetchProvider
+        cls.in_progress += 1
+        cls.max_in_progress = max(cls.max_in_progress, cls.in_progress)
+        try:
+            await asyncio.sleep(0.01)
+        finally:
+            cls.in_progress -= 1
+        return self._url
+
+
+@pytest.mark.asyncio
+async def test_source_concurrency_limit_holds_under_contention():
+    CountingFetchProvider.max_in_progress = 0
+    # (scaled up workers wait for tasks with a timeout - concurrently with the others)
+    async with FetchingEngine(
+        register_config={"CountingFetchProvider": CountingFetchProvider},
+        reserved_worker_count=0,
+        worker_count=1,
+        max_worker_count=8,
+        scale_up_wait=0,
+        worker_idle_timeout=5,
+        source_max_concurrency=2,
+    ) as engine:
+        for _ in range(3):
+            urls = [f"a{i}" for i in range(20)]
+            results = await asyncio.gather(
+                *(
+                    engine.handle_url(url, fetcher="CountingFetchProvider")
+                    for url in urls
+                )
+            )
+            assert results == urls
+    assert CountingFetchProvider.max_in_progress == 2
+
+
+def test_scale_up_by_expected_wait():
+    pool = FetchWorkerPool(min_workers=2, max_workers=4, scale_up_wait=1)
+    pool.worker_started(general=True)
+    pool.worker_started(general=True)
+    # idle workers would take the tasks
+    assert not pool.should_scale_up(queued=10)
+
+    for _ in range(2):
+        pool.reserve_source("a")
+        pool.fetch_started(general=True)
+    # no latency observed yet
+    assert pool.should_scale_up(queued=1)
+    pool.fetch_done(general=True, source="a", latency=0.1)
+    pool.reserve_source("a")
+    pool.fetch_started(general=True)
+    # 10 tasks * 0.1s / 2 workers - short enough
+    assert not pool.should_scale_up(queued=10)
+    assert pool.should_scale_up(queued=30)
+
+    pool.worker_started(general=True)
+    pool.worker_started(general=True)
+    pool.fetch_started(general=True)
+    pool.fetch_started(general=True)
+    assert not pool.should_scale_up(queued=100)
+
+
+def test_http_sources_are_servers():
+    event = FetchEvent(fetcher="HttpFetchProvider", url="https://api.example.com/data")
+    assert HttpFetchProvider.source_of(event) == "api.example.com"
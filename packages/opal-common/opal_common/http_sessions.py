@@ -0,0 +1,226 @@
+import asyncio
+import ssl
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, Mapping, NamedTuple, Optional, Tuple
+from urllib.parse import urlparse
+
+import aiohttp
+import httpx
+from loguru import logger
+from opal_common.config import opal_common_config
+
+HeadersProfile = Tuple[Tuple[str, str], ...]
+
+
+class SessionKey(NamedTuple):
+    """Identifies a reusable outbound session."""
+
+    scheme: str
+    host: str
+    tls_profile: Optional[int]
+    headers_profile: HeadersProfile
+    kind: str
+
+
+class _SessionEntry:
+    def __init__(self, session, loop: asyncio.AbstractEventLoop):
+        self.session = session
+        self.loop = loop
+        self.leases = 0
+        self.last_used = time.monotonic()
+
+    @property
+    def closed(self) -> bool:
+        if isinstance(self.session, httpx.AsyncClient):
+            return self.session.is_closed
+        return self.session.closed
+
+    async def close(self):
+        if isinstance(self.session, httpx.AsyncClient):
+            await self.session.aclose()
+        else:
+            await self.session.close()
+
+
+class HttpSessionRegistry:
+    """A registry of long-lived outbound http sessions, shared by all the
+    components that call the same remote host the same way (fetchers, the data
+    sources config, policy bundles, etc).
+
+    - sessions are keyed by (scheme, host, TLS context, headers profile)
+    - each session keeps a keep-alive connection pool, limited per host, and caches DNS lookups
+    - sessions are leased with `async with registry.session(...)`, and sessions that
+      were not leased for `idle_timeout` seconds are closed and evicted
+    """
+
+    AIOHTTP = "aiohttp"
+    HTTPX = "httpx"
+
+    def __init__(
+        self,
+        limit: Optional[int] = None,
+        limit_per_host: Optional[int] = None,
+        dns_cache_ttl: Optional[int] = None,
+        keepalive_timeout: Optional[float] = None,
+        idle_timeout: Optional[float] = None,
+    ):
+        self._limit = (
+            limit if limit is not None else opal_common_config.HTTP_CLIENT_POOL_LIMIT
+        )
+        self._limit_per_host = (
+            limit_per_host
+            if limit_per_host is not None
+            else opal_common_config.HTTP_CLIENT_POOL_LIMIT_PER_HOST
+        )
+        self._dns_cache_ttl = (
+            dns_cache_ttl
+            if dns_cache_ttl is not None
+            else opal_common_config.HTTP_CLIENT_DNS_CACHE_TTL
+        )
+        self._keepalive_timeout = (
+            keepalive_timeout
+            if keepalive_timeout is not None
+            else opal_common_config.HTTP_CLIENT_KEEPALIVE_TIMEOUT
+        )
+        self._idle_timeout = (
+            idle_timeout
+            if idle_timeout is not None
+            else opal_common_config.HTTP_CLIENT_IDLE_TIMEOUT
+        )
+        self._entries: Dict[SessionKey, _SessionEntry] = {}
+
+    @staticmethod
+    def _headers_profile(headers: Optional[Mapping[str, str]]) -> HeadersProfile:
+        if not headers:
+            return ()
+        # also accepts a list of (key, value) tuples
+        items = headers.items() if isinstance(headers, Mapping) else headers
+        return tuple(sorted((str(k).lower(), str(v)) for k, v in items))
+
+    @classmethod
+    def make_key(
+        cls,
+        url: str,
+        headers: Optional[Mapping[str, str]] = None,
+        ssl_context: Optional[ssl.SSLContext] = None,
+        kind: str = AIOHTTP,
+    ) -> SessionKey:
+        parsed = urlparse(url)
+        return SessionKey(
+            scheme=parsed.scheme.lower(),
+            host=parsed.netloc.lower(),
+            tls_profile=id(ssl_context) if ssl_context is not None else None,
+            headers_profile=cls._headers_profile(headers),
+            kind=kind,
+        )
+
+    def _httpx_limits(self) -> httpx.Limits:
+        # httpx limits the connections of the client as a whole (not per host) - each
+        # session calls a single host, so both limits apply to it. Idle connections are
+        # not limited apart (as in aiohttp), beyond the limit of all connections
+        limits = [limit for limit in (self._limit, self._limit_per_host) if limit]
+        return httpx.Limits(
+            max_connections=min(limits) if limits else None,
+            max_keepalive_connections=None,
+            keepalive_expiry=self._keepalive_timeout,
+        )
+
+    def _create_session(
+        self,
+        kind: str,
+        headers_profile: HeadersProfile,
+        ssl_context: Optional[ssl.SSLContext],
+    ):
+        headers = dict(headers_profile)
+        if kind == self.HTTPX:
+            return httpx.AsyncClient(
+                headers=headers,
+                verify=ssl_context if ssl_context is not None else True,
+                limits=self._httpx_limits(),
+            )
+        connector = aiohttp.TCPConnector(
+            limit=self._limit,
+            limit_per_host=self._limit_per_host,
+            use_dns_cache=True,
+            ttl_dns_cache=self._dns_cache_ttl,
+            keepalive_timeout=self._keepalive_timeout,
+            ssl=ssl_context if ssl_context is not None else True,
+        )
+        return aiohttp.ClientSession(
+            headers=headers,
+            connector=connector,
+            # sessions are shared by different callers, never share cookies between them
+            cookie_jar=aiohttp.DummyCookieJar(),
+        )
+
+    async def _evict_idle(self, loop: asyncio.AbstractEventLoop):
+        now = time.monotonic()
+        for key, entry in list(self._entries.items()):
+            if entry.loop is not loop:
+                # session belongs to a loop that is no longer running, cannot be reused
+                if entry.loop.is_closed():
+                    del self._entries[key]
+                continue
+            if entry.closed:
+                del self._entries[key]
+            elif entry.leases == 0 and now - entry.last_used > self._idle_timeout:
+                logger.debug(
+                    "Evicting idle http session: {scheme}://{host}",
+                    scheme=key.scheme,
+                    host=key.host,
+                )
+                del self._entries[key]
+                await entry.close()
+
+    def _get_entry(self, key: SessionKey, ssl_context: Optional[ssl.SSLContext]):
+        loop = asyncio.get_running_loop()
+        entry = self._entries.get(key)
+        if entry is None or entry.closed or entry.loop is not loop:
+            entry = _SessionEntry(
+                self._create_session(key.kind, key.headers_profile, ssl_context), loop
+            )
+            self._entries[key] = entry
+        return entry
+
+    @asynccontextmanager
+    async def session(
+        self,
+        url: str,
+        headers: Optional[Mapping[str, str]] = None,
+        ssl_context: Optional[ssl.SSLContext] = None,
+        kind: str = AIOHTTP,
+    ) -> AsyncIterator[aiohttp.ClientSession]:
+        """Leases a shared session for requests to the host of the given url.
+
+        Args:
+            url (str): the url to be requested (only scheme and host are taken into account)
+            headers (Mapping[str, str], optional): default headers of the session
+            ssl_context (ssl.SSLContext, optional): custom ssl context to use with https hosts
+            kind (str, optional): "aiohttp" (default) for aiohttp.ClientSession, "httpx" for httpx.AsyncClient
+        """
+        await self._evict_idle(asyncio.get_running_loop())
+        key = self.make_key(url, headers, ssl_context, kind)
+        entry = self._get_entry(key, ssl_context)
+        entry.leases += 1
+        try:
+            yield entry.session
+        finally:
+            entry.leases -= 1
+            entry.last_used = time.monotonic()
+
+    @property
+    def size(self) -> int:
+        return len(self._entries)
+
+    async def close_all(self):
+        """Closes all sessions (and their pooled connections) owned by the
+        running event loop."""
+        loop = asyncio.get_running_loop()
+        entries, self._entries = self._entries, {}
+        for key, entry in entries.items():
+            if entry.loop is loop and not entry.closed:
+                await entry.close()
+
+
+shared_http_sessions = HttpSessionRegistry()
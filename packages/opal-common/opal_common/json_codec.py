@@ -0,0 +1,48 @@
+"""Compact JSON encoding / decoding, using orjson when it's installed (and not
+disabled via OPAL_JSON_CODEC)."""
+
+import json
+from typing import Any, Union
+
+from opal_common.config import opal_common_config
+from opal_common.logger import logger
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _orjson_dumps(value: Any) -> bytes:
+    return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS)
+
+
+def _json_dumps(value: Any) -> bytes:
+    return json.dumps(value, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+def _select_codec(name: str):
+    if name == "orjson" and orjson is None:
+        logger.warning("OPAL_JSON_CODEC is orjson, but it's not installed - using json")
+    if name != "json" and orjson is not None:
+        return "orjson", _orjson_dumps, orjson.loads
+    return "json", _json_dumps, json.loads
+
+
+codec_name, _dumps, _loads = _select_codec(opal_common_config.JSON_CODEC)
+
+
+def dumps(value: Any) -> bytes:
+    """Encodes a (plain) JSON value as compact utf-8 JSON.
+
+    Raises TypeError for values that are not plain JSON (i.e: pydantic
+    models).
+    """
+    return _dumps(value)
+
+
+def loads(content: Union[bytes, str, memoryview]) -> Any:
+    if isinstance(content, memoryview) and codec_name == "json":
+        # (json only decodes bytes / str, orjson decodes buffers without copying them)
+        content = bytes(content)
+    return _loads(content)
@@ -0,0 +1,223 @@
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from fastapi_websocket_rpc.rpc_methods import RpcMethodsBase
+from fastapi_websocket_rpc.websocket_rpc_client import WebSocketRpcClient
+from loguru import logger
+from opal_common.config import opal_common_config
+from websockets.exceptions import ConnectionClosed
+
+DEFAULT_RESPONSE_TIMEOUT = 4
+
+
+class _RpcConnection:
+    def __init__(self, client: WebSocketRpcClient, max_inflight_calls: int):
+        self.client = client
+        # calls leased to this connection (including calls waiting for a slot)
+        self.leases = 0
+        self.slots = asyncio.Semaphore(max_inflight_calls)
+        self.last_used = time.monotonic()
+        self.closed = False
+        self.health_task: Optional[asyncio.Task] = None
+
+    @property
+    def healthy(self) -> bool:
+        if self.closed:
+            return False
+        channel = self.client.channel
+        read_task = self.client._read_task
+        return (
+            channel is not None
+            and not channel.isClosed()
+            and read_task is not None
+            and not read_task.done()
+        )
+
+    async def close(self):
+        if self.closed:
+            return
+        self.closed = True
+        if (
+            self.health_task is not None
+            and self.health_task is not asyncio.current_task()
+        ):
+            self.health_task.cancel()
+        try:
+            await self.client.close()
+        except Exception:
+            logger.debug("Error closing rpc connection to {uri}", uri=self.client.uri)
+
+
+class _Endpoint:
+    def __init__(self, loop: asyncio.AbstractEventLoop):
+        self.loop = loop
+        # (connections are opened one at a time, to not open more than needed)
+        self.lock = asyncio.Lock()
+        self.connections: List[_RpcConnection] = []
+
+
+class RpcConnectionPool:
+    """A pool of long-lived websocket rpc connections, shared by all the rpc
+    fetches from the same endpoint (instead of a connection per fetch).
+
+    - concurrent calls are multiplexed over the connections of the endpoint (up to
+      `max_inflight_calls` calls at a time per connection), and up to
+      `max_connections_per_endpoint` connections are opened as calls pile up
+    - connections are pinged every `keep_alive` seconds, and connections that fail
+      a ping (or are closed by the server) are dropped - the next call reconnects
+    - connections that were not used for `idle_timeout` seconds are closed
+    """
+
+    def __init__(
+        self,
+        max_connections_per_endpoint: Optional[int] = None,
+        max_inflight_calls: Optional[int] = None,
+        keep_alive: Optional[float] = None,
+        idle_timeout: Optional[float] = None,
+        response_timeout: float = DEFAULT_RESPONSE_TIMEOUT,
+    ):
+        self._max_connections = (
+            max_connections_per_endpoint
+            if max_connections_per_endpoint is not None
+            else opal_common_config.RPC_CLIENT_MAX_CONNECTIONS_PER_ENDPOINT
+        )
+        self._max_inflight_calls = (
+            max_inflight_calls
+            if max_inflight_calls is not None
+            else opal_common_config.RPC_CLIENT_MAX_INFLIGHT_CALLS
+        )
+        self._keep_alive = (
+            keep_alive
+            if keep_alive is not None
+            else opal_common_config.RPC_CLIENT_KEEP_ALIVE
+        )
+        self._idle_timeout = (
+            idle_timeout
+            if idle_timeout is not None
+            else opal_common_config.RPC_CLIENT_IDLE_TIMEOUT
+        )
+        self._response_timeout = response_timeout
+        self._endpoints: Dict[str, _Endpoint] = {}
+
+    def _get_endpoint(self, uri: str) -> _Endpoint:
+        loop = asyncio.get_running_loop()
+        endpoint = self._endpoints.get(uri)
+        if endpoint is None or endpoint.loop is not loop:
+            # (connections of a loop that is no longer running cannot be reused)
+            endpoint = self._endpoints[uri] = _Endpoint(loop)
+        return endpoint
+
+    async def _evict(self, endpoint: _Endpoint):
+        now = time.monotonic()
+        for connection in list(endpoint.connections):
+            if not connection.healthy:
+                endpoint.connections.remove(connection)
+                await connection.close()
+            elif (
+                connection.leases == 0
+                and now - connection.last_used > self._idle_timeout
+            ):
+                logger.debug(
+                    "Closing idle rpc connection: {uri}", uri=connection.client.uri
+                )
+                endpoint.connections.remove(connection)
+                await connection.close()
+
+    async def _connect(self, uri: str) -> _RpcConnection:
+        client = WebSocketRpcClient(
+            uri,
+            # we don't expose anything to the server
+            RpcMethodsBase(),
+            default_response_timeout=self._response_timeout,
+            # failing to connect fails the call (fetches are retried by the fetcher)
+            retry_config=False,
+        )
+        await client.__aenter__()
+        connection = _RpcConnection(client, self._max_inflight_calls)
+        if self._keep_alive > 0:
+            connection.health_task = asyncio.create_task(self._ping(connection))
+        return connection
+
+    async def _ping(self, connection: _RpcConnection):
+        while not connection.closed:
+            await asyncio.sleep(self._keep_alive)
+            try:
+                await connection.client.ping()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(
+                    "Rpc connection to {uri} failed a health ping: {err}",
+                    uri=connection.client.uri,
+                    err=repr(e),
+                )
+                await connection.close()
+
+    async def _lease_connection(self, uri: str) -> _RpcConnection:
+        endpoint = self._get_endpoint(uri)
+        async with endpoint.lock:
+            await self._evict(endpoint)
+            connections = endpoint.connections
+            available = [c for c in connections if c.leases < self._max_inflight_calls]
+            if available:
+                connection = min(available, key=lambda c: c.leases)
+            elif len(connections) < self._max_connections:
+                connection = await self._connect(uri)
+                connections.append(connection)
+            else:
+                # all connections are busy - wait for the least busy one
+                connection = min(connections, key=lambda c: c.leases)
+            connection.leases += 1
+        return connection
+
+    @asynccontextmanager
+    async def connection(self, uri: str) -> AsyncIterator[WebSocketRpcClient]:
+        """Leases a pooled connection to the rpc endpoint, for a single call
+        (the connection may be shared with concurrent calls).
+
+        Args:
+            uri (str): the websocket url of the rpc endpoint
+        """
+        connection = await self._lease_connection(uri)
+        try:
+            async with connection.slots:
+                yield connection.client
+        finally:
+            connection.leases -= 1
+            connection.last_used = time.monotonic()
+
+    async def call(self, uri: str, method: str, args: dict, timeout=None) -> Any:
+        """Calls an rpc method of the endpoint over a pooled connection.
+
+        A connection found closed by the call (i.e: dropped since it was
+        last used) is replaced and the call is made once more.
+        """
+        for attempt in range(2):
+            async with self.connection(uri) as client:
+                try:
+                    return await client.call(method, args, timeout=timeout)
+                except ConnectionClosed:
+                    if attempt:
+                        raise
+                    logger.info(
+                        "Rpc connection to {uri} was closed, reconnecting", uri=uri
+                    )
+                    await client.close()
+
+    @property
+    def size(self) -> int:
+        return sum(len(endpoint.connections) for endpoint in self._endpoints.values())
+
+    async def close_all(self):
+        """Closes all connections owned by the running event loop."""
+        loop = asyncio.get_running_loop()
+        endpoints, self._endpoints = self._endpoints, {}
+        for endpoint in endpoints.values():
+            if endpoint.loop is loop:
+                for connection in endpoint.connections:
+                    await connection.close()
+
+
+shared_rpc_connections = RpcConnectionPool()
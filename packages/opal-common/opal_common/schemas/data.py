@@ -13,6 +13,26 @@ JsonableValue = Union[List[JSONPatchAction], List[Any], Dict[str, Any]]
 DEFAULT_DATA_TOPIC = "policy_data"
 
 
+class DataProjection(BaseModel):
+    """Which part of a data source entry's fetched document to write into the
+    policy store (applied by the client as soon as the document is fetched)."""
+
+    select: Optional[str] = Field(
+        None,
+        description="Dot separated path of the part of the document to keep (i.e: 'data.users'), where '*' "
+        "stands for every item of a list (or value of an object) and numbers for list indices",
+    )
+    fields: Optional[List[str]] = Field(
+        None,
+        description="Fields to keep (dot separated for nested fields) of each item of the selected list, "
+        "or of each value of the selected object if the selection ends with '*' (otherwise of the selected object)",
+    )
+    key_by: Optional[str] = Field(
+        None,
+        description="Reshapes the selected list into an object, mapping each item by this (dot separated) field of it",
+    )
+
+
 class DataSourceEntry(BaseModel):
     """
     Data source configuration - where client's should retrieve data from and how they should store it
@@ -53,6 +73,25 @@ class DataSourceEntry(BaseModel):
         description="Data payload to embed within the data update (instead of having "
         "the client fetch it from the url).",
     )
+    diff_threshold: Optional[float] = Field(
+        None,
+        description="If set (PUT only), the client remembers the document it last wrote to dst_path, "
+        "and writes the next PUT as a JSON patch of the changes instead - if the patch is at most this "
+        "fraction (0-1) of the size of the full document. Otherwise (or if the last written document is "
+        "unknown) the document is PUT as usual.",
+    )
+    stream_raw: bool = Field(
+        False,
+        description="If set (PUT only), the fetched content is not parsed by the client, but streamed as is "
+        "into the policy store while it's fetched - keeping the client's memory usage bounded regardless of the "
+        "document's size (the policy store validates the JSON). Ignored if the policy store does not support it "
+        "(i.e: OPA with offline mode), for the root path, or for non-http / non-json sources.",
+    )
+    projection: Optional[DataProjection] = Field(
+        None,
+        description="If set (PUT only), only the projected part of the fetched document is written into the "
+        "policy store (entries with a projection are not streamed)",
+    )
 
 
 class DataSourceEntryWithPollingInterval(DataSourceEntry):
@@ -159,6 +198,49 @@ class DataUpdate(BaseModel):
     reason: str = Field(None, description="Reason for triggering the update")
     # Configuration for how to notify other services on the status of Update
     callback: UpdateCallback = UpdateCallback(callbacks=[])
+    # Set by the server when the update is published (@see DataUpdateLogPosition)
+    log_position: Optional["DataUpdateLogPosition"] = None
+
+
+class DataUpdateLogPosition(BaseModel):
+    """The position of a published data update in the server's log of data
+    updates."""
+
+    log_id: str = Field(
+        ..., description="identifies the log (a new log restarts the sequences)"
+    )
+    sequences: Dict[str, int] = Field(
+        ...,
+        description="the sequence number of the update on each topic it was published to "
+        "(sequences increase monotonically per topic)",
+    )
+
+
+DataUpdate.update_forward_refs()
+
+
+class DataUpdateReplayRequest(BaseModel):
+    """A request to replay the data updates published since the last updates
+    seen by a (reconnecting) client."""
+
+    topics: List[str] = Field(..., description="the data topics of the client")
+    log_id: Optional[str] = Field(
+        None, description="the log the sequences are of (omit to get the log heads)"
+    )
+    sequences: Dict[str, int] = Field(
+        {},
+        description="the last sequence seen on each topic - updates after it are replayed",
+    )
+
+
+class DataUpdateReplay(BaseModel):
+    log_id: str
+    sequences: Dict[str, int] = Field(
+        ..., description="the last sequence published on each of the requested topics"
+    )
+    updates: List[DataUpdate] = Field(
+        [], description="the missed updates, in the order they were published"
+    )
 
 
 class DataEntryReport(BaseModel):
@@ -171,6 +253,8 @@ class DataEntryReport(BaseModel):
     saved: Optional[bool] = False
     # Hash of the returned data
     hash: Optional[str] = None
+    # Was the save skipped since the data at the destination path was already up to date
+    unchanged: Optional[bool] = False
 
 
 class DataUpdateReport(BaseModel):
@@ -1,5 +1,6 @@
 import os
 import ssl
+from functools import lru_cache
 from typing import Optional
 
 from opal_common.config import opal_common_config
@@ -27,4 +28,11 @@ def get_custom_ssl_context() -> Optional[ssl.SSLContext]:
     if not os.path.isfile(ca_file_path):
         return None
 
+    return _load_ssl_context(ca_file_path)
+
+
+@lru_cache(maxsize=None)
+def _load_ssl_context(ca_file_path: str) -> ssl.SSLContext:
+    # the same context object is returned for the same CA file, so that
+    # shared http sessions (keyed by their ssl context) can be reused
     return ssl.create_default_context(cafile=ca_file_path)
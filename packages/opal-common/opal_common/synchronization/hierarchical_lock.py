@@ -1,33 +1,178 @@
 import asyncio
+import itertools
+from collections import deque
 from contextlib import asynccontextmanager
-from typing import Set
+from typing import Deque, Dict, List, Optional, Set
 
 from loguru import logger
 
 
+class _Waiter:
+    __slots__ = ("seq", "task", "future")
+
+    def __init__(self, seq: int, task: asyncio.Task, future: asyncio.Future):
+        self.seq = seq
+        self.task = task
+        self.future = future
+
+
+class _Node:
+    """A node in the path trie (one node per path character)."""
+
+    __slots__ = (
+        "key",
+        "parent",
+        "children",
+        "holder",
+        "locked_in_subtree",
+        "waiters",
+        "waiters_in_subtree",
+    )
+
+    def __init__(self, key: str = "", parent: Optional["_Node"] = None):
+        self.key = key
+        self.parent = parent
+        self.children: Dict[str, "_Node"] = {}
+        # the task holding the lock of this exact path (if locked)
+        self.holder: Optional[asyncio.Task] = None
+        # number of locked paths in the subtree (including this node)
+        self.locked_in_subtree = 0
+        # tasks waiting to lock this exact path, in FIFO order
+        self.waiters: Deque[_Waiter] = deque()
+        # number of waiters in the subtree (including this node)
+        self.waiters_in_subtree = 0
+
+    def ancestors(self):
+        """Yields the ancestors of the node (excluding the node itself), up to
+        the root."""
+        node = self.parent
+        while node is not None:
+            yield node
+            node = node.parent
+
+
 class HierarchicalLock:
     """A hierarchical lock for asyncio.
 
     - If a path is locked, no ancestor or descendant path can be locked.
     - Conversely, if a child path is locked, the parent path cannot be locked
       until all child paths are released.
+
+    A path is an ancestor of another path if it is a prefix of it (i.e: "alice"
+    is an ancestor of "alice.age"). Paths are kept in a trie, so acquiring and
+    releasing a path only walks the path itself (and not all the locked paths).
+    Waiters of the same path are served in FIFO order, a new acquirer never
+    overtakes an earlier waiter on a conflicting ancestor path, and releasing
+    a path only wakes waiters that were blocked by it.
     """
 
     def __init__(self):
-        # locked_paths: set of currently locked string paths
-        self._locked_paths: Set[str] = set()
+        self._root = _Node()
         # Map of tasks to their acquired locks for re-entrant protection
-        self._task_locks: dict[asyncio.Task, Set[str]] = {}
-        # Internal lock for synchronizing access to locked_paths
-        self._lock = asyncio.Lock()
-        # Condition to wake up tasks when a path is released
-        self._cond = asyncio.Condition(self._lock)
+        self._task_locks: Dict[asyncio.Task, Set[str]] = {}
+        self._counter = itertools.count()
 
     @staticmethod
     def _is_conflicting(p1: str, p2: str) -> bool:
         """Check if two paths conflict with each other."""
         return p1 == p2 or p1.startswith(p2) or p2.startswith(p1)
 
+    def _find_node(self, path: str) -> Optional[_Node]:
+        node = self._root
+        for char in path:
+            node = node.children.get(char)
+            if node is None:
+                return None
+        return node
+
+    def _get_or_create_node(self, path: str) -> _Node:
+        node = self._root
+        for char in path:
+            child = node.children.get(char)
+            if child is None:
+                child = node.children[char] = _Node(char, node)
+            node = child
+        return node
+
+    def _prune(self, node: _Node):
+        """Removes nodes that are no longer locked, waited on or leading to
+        such nodes."""
+        while (
+            node.parent is not None
+            and not node.children
+            and node.locked_in_subtree == 0
+            and node.waiters_in_subtree == 0
+        ):
+            del node.parent.children[node.key]
+            node = node.parent
+
+    def _can_grant(self, node: _Node, seq: Optional[int] = None) -> bool:
+        """Checks whether the path of the node can be locked by the waiter with
+        the given sequence number (or by a new acquirer if seq is None)"""
+        # the path itself or one of its descendants is locked
+        if node.locked_in_subtree > 0:
+            return False
+        # earlier waiters of the same path go first
+        if node.waiters and (seq is None or node.waiters[0].seq != seq):
+            return False
+        for ancestor in node.ancestors():
+            if ancestor.holder is not None:
+                return False
+            # do not overtake earlier waiters of ancestor paths
+            if ancestor.waiters and (seq is None or ancestor.waiters[0].seq < seq):
+                return False
+        return True
+
+    def _grant(self, node: _Node, task: asyncio.Task, path: str):
+        node.holder = task
+        node.locked_in_subtree += 1
+        for ancestor in node.ancestors():
+            ancestor.locked_in_subtree += 1
+        self._task_locks.setdefault(task, set()).add(path)
+
+    def _remove_waiter(self, node: _Node, waiter: _Waiter):
+        node.waiters.remove(waiter)
+        node.waiters_in_subtree -= 1
+        for ancestor in node.ancestors():
+            ancestor.waiters_in_subtree -= 1
+
+    def _wake_waiters(self, node: _Node, path: str):
+        """Grants the lock to waiters that may have been blocked by the node
+        (waiters of the node's path, its ancestors and descendants), in FIFO
+        order."""
+        candidates: List[tuple] = []
+        # waiters of the path itself and of its ancestors
+        ancestor_path = path
+        current = node
+        while current is not None:
+            if current.waiters:
+                candidates.append((current.waiters[0].seq, current, ancestor_path))
+            current = current.parent
+            ancestor_path = ancestor_path[:-1]
+        # waiters of descendant paths (only visiting branches with waiters)
+        stack = [(child, path + key) for key, child in node.children.items()]
+        while stack:
+            current, current_path = stack.pop()
+            if current.waiters_in_subtree == 0:
+                continue
+            if current.waiters:
+                candidates.append((current.waiters[0].seq, current, current_path))
+            stack.extend(
+                (child, current_path + key) for key, child in current.children.items()
+            )
+
+        candidates.sort(key=lambda candidate: candidate[0])
+        for seq, current, current_path in candidates:
+            if not current.waiters or current.waiters[0].seq != seq:
+                continue
+            if not self._can_grant(current, seq):
+                continue
+            waiter = current.waiters[0]
+            self._remove_waiter(current, waiter)
+            self._grant(current, waiter.task, current_path)
+            waiter.future.set_result(None)
+            logger.debug("Acquired lock for path: {}", current_path)
+
     async def acquire(self, path: str):
         """Acquire the lock for the given hierarchical path.
 
@@ -38,25 +183,51 @@ class HierarchicalLock:
         if task is None:
             raise RuntimeError("acquire() must be called from within a task.")
 
-        async with self._lock:
-            # Prevent re-entrant locking by the same task
-            if path in self._task_locks.get(task, set()):
-                raise RuntimeError(f"Task {task} cannot re-acquire lock on '{path}'.")
-
-            # Wait until there is no conflict with existing locked paths
-            while any(self._is_conflicting(path, lp) for lp in self._locked_paths):
-                logger.debug(
-                    f"Found conflicting path with {path!r}, waiting for release to check again..."
-                )
-                # Condition.wait() releases the lock and waits for notify_all()
-                await self._cond.wait()
-
-            # Acquire the path
-            self._locked_paths.add(path)
-            if task not in self._task_locks:
-                self._task_locks[task] = set()
-            self._task_locks[task].add(path)
+        # Prevent re-entrant locking by the same task
+        if path in self._task_locks.get(task, set()):
+            raise RuntimeError(f"Task {task} cannot re-acquire lock on '{path}'.")
+
+        node = self._get_or_create_node(path)
+        if self._can_grant(node):
+            self._grant(node, task, path)
             logger.debug("Acquired lock for path: {}", path)
+            return
+
+        logger.debug(
+            f"Found conflicting path with {path!r}, waiting for release to check again..."
+        )
+        waiter = _Waiter(
+            next(self._counter), task, asyncio.get_running_loop().create_future()
+        )
+        node.waiters.append(waiter)
+        node.waiters_in_subtree += 1
+        for ancestor in node.ancestors():
+            ancestor.waiters_in_subtree += 1
+
+        try:
+            # the lock is handed over to us (by release) before we are woken
+            await waiter.future
+        except asyncio.CancelledError:
+            if waiter.future.done() and not waiter.future.cancelled():
+                # we were granted the lock but cancelled before resuming
+                self._release_node(node, task, path)
+            else:
+                self._remove_waiter(node, waiter)
+                # waiters queued behind us may be able to proceed now
+                self._wake_waiters(node, path)
+                self._prune(node)
+            raise
+
+    def _release_node(self, node: _Node, task: asyncio.Task, path: str):
+        node.holder = None
+        node.locked_in_subtree -= 1
+        for ancestor in node.ancestors():
+            ancestor.locked_in_subtree -= 1
+        self._task_locks[task].remove(path)
+        if not self._task_locks[task]:
+            del self._task_locks[task]
+        self._wake_waiters(node, path)
+        self._prune(node)
 
     async def release(self, path: str):
         """Release the lock for the given path and notify waiting tasks."""
@@ -64,24 +235,22 @@ class HierarchicalLock:
         if task is None:
             raise RuntimeError("release() must be called from within a task.")
 
-        async with self._lock:
-            if path not in self._locked_paths:
-                raise RuntimeError(f"Cannot release path '{path}' that is not locked.")
+        node = self._find_node(path)
+        if node is None or node.holder is None:
+            raise RuntimeError(f"Cannot release path '{path}' that is not locked.")
 
-            if path not in self._task_locks.get(task, set()):
-                raise RuntimeError(
-                    f"Task {task} cannot release lock on '{path}' it does not hold."
-                )
+        if node.holder is not task:
+            raise RuntimeError(
+                f"Task {task} cannot release lock on '{path}' it does not hold."
+            )
 
-            # Remove the path from locked paths and task locks
-            self._locked_paths.remove(path)
-            self._task_locks[task].remove(path)
-            if not self._task_locks[task]:
-                del self._task_locks[task]
+        self._release_node(node, task, path)
+        logger.debug("Released lock for path: {}", path)
 
-            # Notify all tasks that something was released
-            self._cond.notify_all()
-            logger.debug("Released lock for path: {}", path)
+    def is_locked(self, path: str) -> bool:
+        """Returns whether the exact path is currently locked."""
+        node = self._find_node(path)
+        return node is not None and node.holder is not None
 
     @asynccontextmanager
     async def lock(self, path: str) -> "HierarchicalLock":
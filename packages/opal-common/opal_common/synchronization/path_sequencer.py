@@ -0,0 +1,65 @@
+import asyncio
+import itertools
+from typing import Dict, Optional
+
+from opal_common.synchronization.hierarchical_lock import HierarchicalLock
+
+
+class PathSequencer:
+    """Orders operations on hierarchical paths by their arrival order.
+
+    - take() hands out a ticket for a path, in arrival order.
+    - wait_turn() blocks until every earlier ticket on a conflicting path
+      (same path, ancestor or descendant) is done.
+    - done() marks a ticket as done (must always be called, even if the
+      operation was skipped or failed).
+
+    Tickets only wait on earlier tickets, so waiting can never deadlock.
+    This is used to let slow work (i.e: fetching) run concurrently while
+    the results are still applied in arrival order per path.
+    """
+
+    class Ticket:
+        def __init__(self, seq: int, path: str):
+            self.seq = seq
+            self.path = path
+            self._done = asyncio.Event()
+
+        @property
+        def is_done(self) -> bool:
+            return self._done.is_set()
+
+        def __repr__(self) -> str:
+            return f"Ticket(seq={self.seq}, path={self.path!r})"
+
+    def __init__(self):
+        self._counter = itertools.count()
+        # pending tickets, in arrival order (dicts keep insertion order)
+        self._pending: Dict[int, "PathSequencer.Ticket"] = {}
+
+    def take(self, path: str) -> "PathSequencer.Ticket":
+        """Reserves the next place in line for the given path."""
+        ticket = self.Ticket(next(self._counter), path)
+        self._pending[ticket.seq] = ticket
+        return ticket
+
+    async def wait_turn(self, ticket: "PathSequencer.Ticket"):
+        """Waits until all earlier tickets on conflicting paths are done."""
+        for other in list(self._pending.values()):
+            if other.seq >= ticket.seq:
+                # pending tickets are ordered, no earlier tickets left
+                break
+            if HierarchicalLock._is_conflicting(ticket.path, other.path):
+                await other._done.wait()
+
+    def done(self, ticket: Optional["PathSequencer.Ticket"]):
+        """Marks the ticket as done, letting later tickets on conflicting paths
+        proceed."""
+        if ticket is None or ticket.is_done:
+            return
+        self._pending.pop(ticket.seq, None)
+        ticket._done.set()
+
+    @property
+    def pending_count(self) -> int:
+        return len(self._pending)
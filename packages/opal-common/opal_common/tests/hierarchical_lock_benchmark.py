@@ -0,0 +1,94 @@
+"""Microbenchmark of HierarchicalLock with thousands of concurrent destination
+paths.
+
+Run with: python -m opal_common.tests.hierarchical_lock_benchmark [num_paths] [rounds]
+"""
+import asyncio
+import sys
+import time
+from contextlib import asynccontextmanager
+from typing import NamedTuple, Set
+
+from opal_common.synchronization.hierarchical_lock import HierarchicalLock
+
+
+class LinearScanHierarchicalLock:
+    """The previous implementation (scan all locked paths on every acquire,
+    wake all waiters on every release), kept as a reference point."""
+
+    def __init__(self):
+        self._locked_paths: Set[str] = set()
+        self._cond = asyncio.Condition()
+
+    async def acquire(self, path: str):
+        async with self._cond:
+            while any(
+                HierarchicalLock._is_conflicting(path, lp) for lp in self._locked_paths
+            ):
+                await self._cond.wait()
+            self._locked_paths.add(path)
+
+    async def release(self, path: str):
+        async with self._cond:
+            self._locked_paths.remove(path)
+            self._cond.notify_all()
+
+    @asynccontextmanager
+    async def lock(self, path: str):
+        await self.acquire(path)
+        try:
+            yield self
+        finally:
+            await self.release(path)
+
+
+class BenchmarkResult(NamedTuple):
+    acquisitions: int
+    duration: float
+
+    @property
+    def rate(self) -> float:
+        return self.acquisitions / self.duration if self.duration else float("inf")
+
+
+async def run_benchmark(
+    num_paths: int = 5000, rounds: int = 3, hold: float = 0.001, lock=None
+) -> BenchmarkResult:
+    """Locks `num_paths` destination paths, each by a writer of the path and a
+    writer of its parent path (so every pair conflicts), `rounds` times
+    each."""
+    lock = lock if lock is not None else HierarchicalLock()
+    acquisitions = 0
+
+    async def writer(path: str):
+        nonlocal acquisitions
+        for _ in range(rounds):
+            async with lock.lock(path):
+                acquisitions += 1
+                await asyncio.sleep(hold)
+
+    paths = []
+    for i in range(num_paths):
+        paths.append(f"/tenants/{i}/")
+        paths.append(f"/tenants/{i}/users")
+
+    start = time.perf_counter()
+    await asyncio.gather(*(writer(path) for path in paths))
+    return BenchmarkResult(acquisitions, time.perf_counter() - start)
+
+
+async def main(num_paths: int = 5000, rounds: int = 3):
+    for name, lock in (
+        ("trie", HierarchicalLock()),
+        ("linear scan", LinearScanHierarchicalLock()),
+    ):
+        result = await run_benchmark(num_paths, rounds, lock=lock)
+        print(
+            f"{name:>12}: {result.acquisitions} acquisitions in {result.duration:.3f}s "
+            f"({result.rate:,.0f}/s)"
+        )
+
+
+if __name__ == "__main__":
+    args = [int(arg) for arg in sys.argv[1:3]]
+    asyncio.run(main(*args))
@@ -233,3 +233,85 @@ async def test_same_task_reacquire_same_key_deadlock():
         same_task(),
         timeout=10,
     )
+
+
+@pytest.mark.asyncio
+async def test_waiters_of_same_path_are_fifo():
+    lock = HierarchicalLock()
+    order = []
+
+    async def lock_task(i: int):
+        async with lock.lock("alice"):
+            order.append(i)
+            await asyncio.sleep(0.01)
+
+    # each task starts waiting before the next one is created
+    tasks = []
+    for i in range(10):
+        tasks.append(asyncio.create_task(lock_task(i)))
+        await asyncio.sleep(0)
+    await asyncio.wait_for(asyncio.gather(*tasks), timeout=10)
+    assert order == list(range(10))
+
+
+@pytest.mark.asyncio
+async def test_new_child_does_not_overtake_waiting_parent():
+    lock = HierarchicalLock()
+    order = []
+
+    async def lock_task(path: str, delay: float, hold: float):
+        await asyncio.sleep(delay)
+        async with lock.lock(path):
+            order.append(path)
+            await asyncio.sleep(hold)
+
+    await asyncio.wait_for(
+        asyncio.gather(
+            lock_task("alice.age", 0, 0.1),
+            lock_task("alice", 0.02, 0),
+            # arrives while the parent is waiting, must wait for the parent
+            lock_task("alice.name", 0.05, 0),
+        ),
+        timeout=10,
+    )
+    assert order == ["alice.age", "alice", "alice.name"]
+
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter_does_not_block():
+    lock = HierarchicalLock()
+    await lock.acquire("alice")
+
+    cancelled = asyncio.create_task(lock.acquire("alice"))
+    await asyncio.sleep(0.01)
+    # waiting behind the cancelled waiter
+    child = asyncio.create_task(lock.acquire("alice.age"))
+    await asyncio.sleep(0.01)
+    cancelled.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await cancelled
+
+    await lock.release("alice")
+    await asyncio.wait_for(child, timeout=1)
+    assert lock.is_locked("alice.age")
+    assert not lock.is_locked("alice")
+
+
+@pytest.mark.asyncio
+async def test_release_by_other_task_fails():
+    lock = HierarchicalLock()
+    await lock.acquire("alice")
+
+    with pytest.raises(RuntimeError):
+        await asyncio.create_task(lock.release("alice"))
+    await lock.release("alice")
+
+
+@pytest.mark.asyncio
+async def test_many_concurrent_paths():
+    from opal_common.tests.hierarchical_lock_benchmark import run_benchmark
+
+    result = await asyncio.wait_for(
+        run_benchmark(num_paths=500, rounds=2, hold=0), timeout=30
+    )
+    assert result.acquisitions == 500 * 2 * 2
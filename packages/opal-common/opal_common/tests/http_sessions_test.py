@@ -0,0 +1,91 @@
+import asyncio
+
+import httpx
+import pytest
+from aiohttp import web
+from opal_common.http_sessions import HttpSessionRegistry
+
+
+@pytest.mark.asyncio
+async def test_sessions_are_shared_per_host_and_headers():
+    registry = HttpSessionRegistry()
+    async with registry.session("https://example.com/a") as s1:
+        async with registry.session("https://EXAMPLE.com/b?x=1") as s2:
+            assert s1 is s2
+        async with registry.session(
+            "https://example.com/a", headers={"Authorization": "Bearer x"}
+        ) as s3:
+            assert s3 is not s1
+        async with registry.session("http://example.com/a") as s4:
+            assert s4 is not s1
+        async with registry.session("https://other.com/a") as s5:
+            assert s5 is not s1
+    assert registry.size == 4
+    await registry.close_all()
+    assert registry.size == 0
+    assert s1.closed
+
+
+@pytest.mark.asyncio
+async def test_httpx_sessions_are_limited_per_host():
+    registry = HttpSessionRegistry(limit=100, limit_per_host=5, keepalive_timeout=15)
+    # (a session calls a single host, so its connections are the host's)
+    assert registry._httpx_limits() == httpx.Limits(
+        max_connections=5, max_keepalive_connections=None, keepalive_expiry=15
+    )
+    async with registry.session(
+        "https://example.com", kind=HttpSessionRegistry.HTTPX
+    ) as session:
+        assert isinstance(session, httpx.AsyncClient)
+    await registry.close_all()
+    assert session.is_closed
+
+    unlimited = HttpSessionRegistry(limit=0, limit_per_host=0, keepalive_timeout=15)
+    assert unlimited._httpx_limits() == httpx.Limits(
+        max_connections=None, max_keepalive_connections=None, keepalive_expiry=15
+    )
+    await unlimited.close_all()
+
+
+@pytest.mark.asyncio
+async def test_idle_sessions_are_evicted():
+    registry = HttpSessionRegistry(idle_timeout=0.05)
+    async with registry.session("http://leased.com") as leased:
+        async with registry.session("http://idle.com") as idle:
+            pass
+        await asyncio.sleep(0.1)
+        # eviction happens when leasing, a session in use is never evicted
+        async with registry.session("http://other.com"):
+            pass
+        assert idle.closed
+        assert not leased.closed
+    await registry.close_all()
+
+
+@pytest.mark.asyncio
+async def test_connections_are_reused_between_leases():
+    connections = set()
+
+    async def handler(request: web.Request):
+        connections.add(id(request.transport))
+        return web.json_response({"ok": True})
+
+    app = web.Application()
+    app.router.add_get("/data", handler)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    url = f"http://127.0.0.1:{port}"
+
+    registry = HttpSessionRegistry()
+    try:
+        for _ in range(5):
+            async with registry.session(url) as session:
+                async with session.get(f"{url}/data") as response:
+                    assert await response.json() == {"ok": True}
+        assert len(connections) == 1
+    finally:
+        await registry.close_all()
+        await runner.cleanup()
@@ -0,0 +1,49 @@
+import asyncio
+
+import pytest
+from opal_common.synchronization.path_sequencer import PathSequencer
+
+
+@pytest.mark.asyncio
+async def test_conflicting_paths_proceed_in_arrival_order():
+    sequencer = PathSequencer()
+    order = []
+
+    async def run(ticket: PathSequencer.Ticket, delay: float):
+        # the work itself (i.e: fetching) may finish in any order
+        await asyncio.sleep(delay)
+        await sequencer.wait_turn(ticket)
+        order.append(ticket.seq)
+        sequencer.done(ticket)
+
+    first = sequencer.take("/users")
+    second = sequencer.take("/users/alice")
+    third = sequencer.take("/users")
+    await asyncio.gather(run(first, 0.1), run(second, 0.05), run(third, 0))
+    assert order == [first.seq, second.seq, third.seq]
+    assert sequencer.pending_count == 0
+
+
+@pytest.mark.asyncio
+async def test_non_conflicting_paths_do_not_wait():
+    sequencer = PathSequencer()
+    slow = sequencer.take("/users")
+    fast = sequencer.take("/groups")
+    # an earlier pending ticket on another path does not block
+    await asyncio.wait_for(sequencer.wait_turn(fast), 0.1)
+    sequencer.done(fast)
+    sequencer.done(slow)
+
+
+@pytest.mark.asyncio
+async def test_released_tickets_unblock_waiters():
+    sequencer = PathSequencer()
+    skipped = sequencer.take("/users")
+    waiting = sequencer.take("/users")
+    waiter = asyncio.create_task(sequencer.wait_turn(waiting))
+    await asyncio.sleep(0.01)
+    assert not waiter.done()
+    # done() is idempotent and may be called for skipped tickets
+    sequencer.done(skipped)
+    sequencer.done(skipped)
+    await asyncio.wait_for(waiter, 0.1)
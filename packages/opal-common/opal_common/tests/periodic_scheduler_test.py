@@ -0,0 +1,92 @@
+import asyncio
+
+import pytest
+from opal_common.async_utils import PeriodicScheduler
+
+
+class Job:
+    def __init__(self, duration: float = 0, fail: bool = False):
+        self.runs = 0
+        self.duration = duration
+        self.fail = fail
+
+    async def __call__(self):
+        self.runs += 1
+        await asyncio.sleep(self.duration)
+        if self.fail:
+            raise ValueError("source is down")
+
+
+@pytest.mark.asyncio
+async def test_jobs_run_periodically():
+    scheduler = PeriodicScheduler(jitter=0)
+    fast, slow = Job(), Job()
+    scheduler.schedule("fast", fast, 0.05)
+    scheduler.schedule("slow", slow, 0.2)
+    await asyncio.sleep(0.27)
+    await scheduler.stop()
+    assert 5 <= fast.runs <= 6
+    assert slow.runs == 2
+
+
+@pytest.mark.asyncio
+async def test_rescheduling_does_not_duplicate_jobs():
+    scheduler = PeriodicScheduler(jitter=0)
+    job = Job()
+    for _ in range(5):
+        scheduler.schedule("job", job, 0.1)
+    await asyncio.sleep(0.05)
+    assert job.runs == 1
+
+    # keeps its next run time
+    scheduler.schedule("job", job, 0.1, run_now=False)
+    await asyncio.sleep(0.02)
+    assert job.runs == 1
+    await asyncio.sleep(0.06)
+    assert job.runs == 2
+
+    scheduler.unschedule("job")
+    assert "job" not in scheduler
+    await asyncio.sleep(0.15)
+    assert job.runs == 2
+    await scheduler.stop()
+
+
+@pytest.mark.asyncio
+async def test_tick_skipped_while_run_in_flight():
+    scheduler = PeriodicScheduler(jitter=0)
+    job = Job(duration=0.12)
+    scheduler.schedule("job", job, 0.05)
+    await asyncio.sleep(0.14)
+    assert job.runs == 1
+    assert scheduler.stats("job")["skipped_ticks"] == 2
+    await scheduler.stop()
+
+
+@pytest.mark.asyncio
+async def test_failing_jobs_back_off():
+    scheduler = PeriodicScheduler(jitter=0, max_backoff=0.2)
+    job = Job(fail=True)
+    scheduler.schedule("job", job, 0.05)
+    # runs at 0, 0.1, 0.3, 0.5 (backoff capped at 0.2)
+    await asyncio.sleep(0.42)
+    assert job.runs == 3
+    assert scheduler.stats("job")["failures"] == 3
+
+    job.fail = False
+    await asyncio.sleep(0.25)
+    assert scheduler.stats("job")["failures"] == 0
+    await scheduler.stop()
+
+
+@pytest.mark.asyncio
+async def test_jitter_spreads_runs():
+    scheduler = PeriodicScheduler(jitter=0.5)
+    jobs = [Job() for _ in range(20)]
+    for i, job in enumerate(jobs):
+        scheduler.schedule(i, job, 1)
+    await asyncio.sleep(0.25)
+    ran = sum(job.runs for job in jobs)
+    # first runs are spread over half an interval
+    assert 0 < ran < 20
+    await scheduler.stop()
@@ -270,6 +270,24 @@ class OpalServerConfig(Confi):
         description="Configuration of data sources by topics",
     )
 
+    DATA_UPDATES_REPLAY_ROUTE = confi.str(
+        "DATA_UPDATES_REPLAY_ROUTE",
+        "/data/updates/replay",
+        description="URL to replay the data updates a reconnecting client missed",
+    )
+    DATA_UPDATE_LOG_MAX_ENTRIES = confi.int(
+        "DATA_UPDATE_LOG_MAX_ENTRIES",
+        1000,
+        description="Number of recently published data updates to retain, for reconnecting clients to replay "
+        "(clients that missed older updates refetch all their data) - 0 disables the log. The log is "
+        "local to the server, so it is disabled with broadcasting (BROADCAST_URI)",
+    )
+    DATA_UPDATE_LOG_PATH = confi.str(
+        "DATA_UPDATE_LOG_PATH",
+        confi.delay("{BASE_DIR}/data-updates.sqlite"),
+        description="The (sqlite) file of the data updates log, shared by the server workers",
+    )
+
     DATA_UPDATE_TRIGGER_ROUTE = confi.str(
         "DATA_CONFIG_ROUTE",
         "/data/update",
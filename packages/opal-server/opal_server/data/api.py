@@ -14,6 +14,8 @@ from opal_common.logger import logger
 from opal_common.schemas.data import (
     DataSourceConfig,
     DataUpdate,
+    DataUpdateReplay,
+    DataUpdateReplayRequest,
     DataUpdateReport,
     ServerDataSourceConfig,
 )
@@ -21,12 +23,14 @@ from opal_common.schemas.security import PeerType
 from opal_common.urls import set_url_query_param
 from opal_server.config import opal_server_config
 from opal_server.data.data_update_publisher import DataUpdatePublisher
+from opal_server.data.update_log import DataUpdateLog
 
 
 def init_data_updates_router(
     data_update_publisher: DataUpdatePublisher,
     data_sources_config: ServerDataSourceConfig,
     authenticator: JWTAuthenticator,
+    data_update_log: Optional[DataUpdateLog] = None,
 ):
     router = APIRouter()
 
@@ -107,6 +111,37 @@ def init_data_updates_router(
                 detail="Did not find a data source configuration!",
             )
 
+    @router.post(
+        opal_server_config.DATA_UPDATES_REPLAY_ROUTE,
+        response_model=DataUpdateReplay,
+        responses={
+            410: {
+                "description": "The updates log does not cover the updates since the given sequences "
+                "(the client should refetch all its data)"
+            },
+        },
+        dependencies=[Depends(authenticator)],
+    )
+    async def replay_data_updates(request: DataUpdateReplayRequest):
+        """Provides reconnecting OPAL clients with the data updates published
+        (on their topics) since the last updates they've seen - instead of
+        refetching all their data.
+
+        Without sequences, returns the last sequences of the topics (the
+        log heads) for the client to resume from later on.
+        """
+        replay = None
+        if data_update_log is not None:
+            replay = await data_update_log.replay(
+                request.topics, request.log_id, request.sequences
+            )
+        if replay is None:
+            raise HTTPException(
+                status_code=status.HTTP_410_GONE,
+                detail="The data updates since the given sequences are not available",
+            )
+        return replay
+
     @router.post(opal_server_config.DATA_CONFIG_ROUTE)
     async def publish_data_update_event(
         update: DataUpdate, claims: JWTClaims = Depends(authenticator)
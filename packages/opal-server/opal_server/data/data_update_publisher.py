@@ -1,6 +1,6 @@
 import asyncio
 import os
-from typing import List
+from typing import List, Optional
 
 from fastapi_utils.tasks import repeat_every
 from opal_common.logger import logger
@@ -10,14 +10,28 @@ from opal_common.schemas.data import (
     ServerDataSourceConfig,
 )
 from opal_common.topics.publisher import TopicPublisher
+from opal_server.data.update_log import DataUpdateLog
 
 TOPIC_DELIMITER = "/"
 PREFIX_DELIMITER = ":"
 
 
 class DataUpdatePublisher:
-    def __init__(self, publisher: TopicPublisher) -> None:
+    def __init__(
+        self,
+        publisher: TopicPublisher,
+        update_log: Optional[DataUpdateLog] = None,
+        scope_id: Optional[str] = None,
+    ) -> None:
+        """
+        Args:
+            publisher (TopicPublisher): publishes the updates to the subscribed clients
+            update_log (DataUpdateLog, optional): logs the published updates, so clients can replay missed updates
+            scope_id (str, optional): the scope the publisher publishes to (its topics are logged with the scope prefix)
+        """
         self._publisher = publisher
+        self._update_log = update_log
+        self._scope_id = scope_id
 
     @staticmethod
     def get_topic_combos(topic: str) -> List[str]:
@@ -108,6 +122,15 @@ class DataUpdatePublisher:
             entries=logged_entries,
         )
 
+        # sequence the update on its topics (the sequences are published with the update)
+        update.log_position = None
+        if self._update_log is not None:
+            logged_topics = [
+                f"{self._scope_id}:{topic}" if self._scope_id else topic
+                for topic in all_topic_combos
+            ]
+            await self._update_log.append(logged_topics, update)
+
         await self._publisher.publish(
             list(all_topic_combos), update.dict(by_alias=True)
         )
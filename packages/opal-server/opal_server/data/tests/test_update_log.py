@@ -0,0 +1,88 @@
+import pytest
+from fastapi.testclient import TestClient
+from opal_common.schemas.data import DataSourceEntry, DataUpdate
+from opal_server.config import opal_server_config
+from opal_server.data.update_log import DataUpdateLog
+from opal_server.server import OpalServer
+
+
+def make_update(reason: str) -> DataUpdate:
+    return DataUpdate(reason=reason, entries=[DataSourceEntry(url="", data={})])
+
+
+@pytest.mark.asyncio
+async def test_updates_are_sequenced_per_topic(tmp_path):
+    log = DataUpdateLog(str(tmp_path / "log.sqlite"), max_entries=10)
+    first = await log.append(["a", "a/b"], make_update("1"))
+    second = await log.append(["a"], make_update("2"))
+    third = await log.append(["c"], make_update("3"))
+    assert first.log_position.sequences == {"a": 1, "a/b": 1}
+    assert second.log_position.sequences == {"a": 2}
+    assert third.log_position.sequences == {"c": 1}
+
+    # the log heads
+    heads = await log.replay(["a", "a/b", "c", "d"])
+    assert heads.log_id == log.log_id
+    assert heads.sequences == {"a": 2, "a/b": 1, "c": 1, "d": 0}
+    assert heads.updates == []
+
+    replay = await log.replay(["a", "c"], log.log_id, {"a": 0, "c": 0})
+    assert [u.reason for u in replay.updates] == ["1", "2", "3"]
+    # replayed updates keep their sequences
+    assert replay.updates[0].log_position == first.log_position
+    replay = await log.replay(["a/b", "c"], log.log_id, {"a/b": 1, "c": 0})
+    assert [u.reason for u in replay.updates] == ["3"]
+
+    # the log is shared (i.e: by the server workers)
+    other = DataUpdateLog(str(tmp_path / "log.sqlite"), max_entries=10)
+    assert other.log_id == log.log_id
+    assert (await other.append(["a"], make_update("4"))).log_position.sequences == {
+        "a": 3
+    }
+
+
+@pytest.mark.asyncio
+async def test_replay_of_uncovered_gaps(tmp_path):
+    log = DataUpdateLog(str(tmp_path / "log.sqlite"), max_entries=2, epoch="x")
+    for i in range(3):
+        await log.append(["a"], make_update(str(i)))
+    await log.append(["b"], make_update("3"))
+
+    # update 1 of 'a' was trimmed
+    assert await log.replay(["a"], log.log_id, {"a": 0}) is None
+    replay = await log.replay(["a"], log.log_id, {"a": 2})
+    assert [u.reason for u in replay.updates] == ["2"]
+    replay = await log.replay(["a"], log.log_id, {"a": 3})
+    assert replay.updates == []
+    # sequences from the future, or from another log
+    assert await log.replay(["a"], log.log_id, {"a": 4}) is None
+    assert await log.replay(["a"], "other", {"a": 3}) is None
+    other_epoch = DataUpdateLog(str(tmp_path / "log.sqlite"), max_entries=2, epoch="y")
+    assert await other_epoch.replay(["a"], log.log_id, {"a": 3}) is None
+
+
+def test_no_replay_across_servers_sharing_a_broadcaster(tmp_path, monkeypatch):
+    monkeypatch.setattr(
+        opal_server_config, "DATA_UPDATE_LOG_PATH", str(tmp_path / "log.sqlite")
+    )
+    make_server = lambda broadcaster_uri: OpalServer(
+        init_policy_watcher=False,
+        broadcaster_uri=broadcaster_uri,
+        enable_jwks_endpoint=False,
+    )
+    request = {"topics": ["policy_data"], "log_id": None, "sequences": {}}
+
+    # a lone server replays from its log
+    client = TestClient(make_server(None).app)
+    response = client.post(opal_server_config.DATA_UPDATES_REPLAY_ROUTE, json=request)
+    assert response.status_code == 200
+
+    # updates published by one server are missing from the log of the other, so
+    # clients of either refetch all their data
+    servers = [make_server("postgres://localhost/opal") for _ in range(2)]
+    for server in servers:
+        assert server.data_update_log is None
+        response = TestClient(server.app).post(
+            opal_server_config.DATA_UPDATES_REPLAY_ROUTE, json=request
+        )
+        assert response.status_code == 410
@@ -0,0 +1,195 @@
+import asyncio
+import json
+import os
+import sqlite3
+import uuid
+from contextlib import closing
+from typing import Dict, List, Optional
+
+from opal_common.logger import logger
+from opal_common.schemas.data import DataUpdate, DataUpdateLogPosition, DataUpdateReplay
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS updates (position INTEGER PRIMARY KEY AUTOINCREMENT, data TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS topics (topic TEXT PRIMARY KEY, last_seq INTEGER NOT NULL);
+CREATE TABLE IF NOT EXISTS topic_updates (
+    topic TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    position INTEGER NOT NULL,
+    PRIMARY KEY (topic, seq)
+);
+CREATE INDEX IF NOT EXISTS topic_updates_position ON topic_updates (position);
+"""
+
+
+class DataUpdateLog:
+    """A bounded log of the published data updates, so reconnecting clients can
+    replay the updates they missed (instead of refetching all their data).
+
+    Each published update is assigned a sequence number on each of its
+    topics (increasing monotonically per topic), and the last `max_entries`
+    updates are retained. The log is kept in a local sqlite file, shared by
+    the server workers of the host - clients of another server (i.e: behind
+    the same load balancer) see a different log id and refetch their data.
+    """
+
+    # seconds to wait for a lock on the log (held by another worker)
+    LOCK_TIMEOUT = 10
+
+    def __init__(self, path: str, max_entries: int, epoch: str = ""):
+        """
+        Args:
+            path (str): the path of the log file
+            max_entries (int): the number of (most recent) updates to retain
+            epoch (str, optional): part of the log id - logs of a different epoch
+                (i.e: of a different data sources config) can't be replayed from
+        """
+        self._path = path
+        self._max_entries = max_entries
+        self._epoch = epoch
+        self._log_id: Optional[str] = None
+
+    def _connect(self) -> sqlite3.Connection:
+        # (transactions are explicit)
+        return sqlite3.connect(
+            self._path, timeout=self.LOCK_TIMEOUT, isolation_level=None
+        )
+
+    def _init_log(self) -> str:
+        os.makedirs(os.path.dirname(os.path.abspath(self._path)), exist_ok=True)
+        with closing(self._connect()) as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+            # (the first worker to get here names the log)
+            conn.execute(
+                "INSERT OR IGNORE INTO meta (key, value) VALUES ('id', ?)",
+                (uuid.uuid4().hex,),
+            )
+            (log_id,) = conn.execute(
+                "SELECT value FROM meta WHERE key = 'id'"
+            ).fetchone()
+        return f"{log_id}-{self._epoch}" if self._epoch else log_id
+
+    @property
+    def log_id(self) -> str:
+        if self._log_id is None:
+            self._log_id = self._init_log()
+        return self._log_id
+
+    async def _run(self, func, *args):
+        # (sqlite is blocking, and may wait for a lock held by another worker)
+        return await asyncio.get_running_loop().run_in_executor(None, func, *args)
+
+    async def append(self, topics: List[str], update: DataUpdate) -> DataUpdate:
+        """Assigns the update its sequence numbers on the topics it's published
+        to (sets its log_position), and logs it."""
+        return await self._run(self._append, topics, update)
+
+    def _append(self, topics: List[str], update: DataUpdate) -> DataUpdate:
+        log_id = self.log_id
+        with closing(self._connect()) as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                sequences: Dict[str, int] = {}
+                for topic in sorted(set(topics)):
+                    row = conn.execute(
+                        "SELECT last_seq FROM topics WHERE topic = ?", (topic,)
+                    ).fetchone()
+                    sequences[topic] = (row[0] if row else 0) + 1
+                    conn.execute(
+                        "INSERT OR REPLACE INTO topics (topic, last_seq) VALUES (?, ?)",
+                        (topic, sequences[topic]),
+                    )
+                update.log_position = DataUpdateLogPosition(
+                    log_id=log_id, sequences=sequences
+                )
+                position = conn.execute(
+                    "INSERT INTO updates (data) VALUES (?)", (update.json(),)
+                ).lastrowid
+                conn.executemany(
+                    "INSERT INTO topic_updates (topic, seq, position) VALUES (?, ?, ?)",
+                    [(topic, seq, position) for topic, seq in sequences.items()],
+                )
+                self._trim(conn)
+                conn.execute("COMMIT")
+            except:
+                conn.execute("ROLLBACK")
+                raise
+        return update
+
+    def _trim(self, conn: sqlite3.Connection):
+        row = conn.execute(
+            "SELECT position FROM updates ORDER BY position DESC LIMIT 1 OFFSET ?",
+            (self._max_entries,),
+        ).fetchone()
+        if row is not None:
+            conn.execute("DELETE FROM updates WHERE position <= ?", row)
+            conn.execute("DELETE FROM topic_updates WHERE position <= ?", row)
+
+    async def replay(
+        self,
+        topics: List[str],
+        log_id: Optional[str] = None,
+        sequences: Optional[Dict[str, int]] = None,
+    ) -> Optional[DataUpdateReplay]:
+        """The updates published on each topic after its given sequence, and
+        the last sequence of each topic (the log heads).
+
+        Returns None if the log does not cover all the updates after the
+        given sequences (they were trimmed, or are of another log).
+        """
+        return await self._run(self._replay, topics, log_id, sequences or {})
+
+    def _replay(
+        self, topics: List[str], log_id: Optional[str], sequences: Dict[str, int]
+    ) -> Optional[DataUpdateReplay]:
+        # (initializes the log, if it's the first use)
+        current_log_id = self.log_id
+        if sequences and log_id != current_log_id:
+            return None
+        with closing(self._connect()) as conn:
+            # (a read transaction - all reads see the same state of the log)
+            conn.execute("BEGIN")
+            try:
+                heads = {topic: 0 for topic in topics}
+                heads.update(
+                    conn.execute(
+                        f"SELECT topic, last_seq FROM topics WHERE topic IN ({','.join('?' * len(topics))})",
+                        topics,
+                    ).fetchall()
+                )
+                positions = set()
+                for topic, since in sequences.items():
+                    last = heads.get(topic)
+                    if last is None or since > last:
+                        return None
+                    (first,) = conn.execute(
+                        "SELECT MIN(seq) FROM topic_updates WHERE topic = ?", (topic,)
+                    ).fetchone()
+                    if since < (first if first is not None else last + 1) - 1:
+                        # updates after the given sequence were trimmed
+                        return None
+                    positions.update(
+                        position
+                        for (position,) in conn.execute(
+                            "SELECT position FROM topic_updates WHERE topic = ? AND seq > ?",
+                            (topic, since),
+                        )
+                    )
+                updates = [
+                    DataUpdate.parse_obj(json.loads(data))
+                    for (data,) in conn.execute(
+                        f"SELECT data FROM updates WHERE position IN ({','.join('?' * len(positions))}) "
+                        "ORDER BY position",
+                        sorted(positions),
+                    )
+                ]
+            finally:
+                conn.execute("COMMIT")
+        logger.debug(
+            "Replaying {count} data updates for topics: {topics}",
+            count=len(updates),
+            topics=list(sequences),
+        )
+        return DataUpdateReplay(log_id=current_log_id, sequences=heads, updates=updates)
@@ -42,6 +42,7 @@ from opal_common.topics.publisher import (
 from opal_common.urls import set_url_query_param
 from opal_server.config import opal_server_config
 from opal_server.data.data_update_publisher import DataUpdatePublisher
+from opal_server.data.update_log import DataUpdateLog
 from opal_server.git_fetcher import GitPolicyFetcher
 from opal_server.scopes.scope_repository import ScopeNotFoundError, ScopeRepository
 
@@ -80,6 +81,7 @@ def init_scope_router(
     scopes: ScopeRepository,
     authenticator: JWTAuthenticator,
     pubsub_endpoint: PubSubEndpoint,
+    data_update_log: Optional[DataUpdateLog] = None,
 ):
     router = APIRouter()
 
@@ -350,7 +352,9 @@ def init_scope_router(
                 entry.topics = [f"data:{topic}" for topic in entry.topics]
 
             await DataUpdatePublisher(
-                ScopedServerSideTopicPublisher(pubsub_endpoint, scope_id)
+                ScopedServerSideTopicPublisher(pubsub_endpoint, scope_id),
+                data_update_log,
+                scope_id=scope_id,
             ).publish_data_updates(update)
         except Unauthorized as ex:
             logger.error(f"Unauthorized to publish update: {repr(ex)}")
@@ -1,4 +1,5 @@
 import asyncio
+import hashlib
 import os
 import signal
 import sys
@@ -25,6 +26,7 @@ from opal_common.topics.publisher import (
 from opal_server.config import opal_server_config
 from opal_server.data.api import init_data_updates_router
 from opal_server.data.data_update_publisher import DataUpdatePublisher
+from opal_server.data.update_log import DataUpdateLog
 from opal_server.loadlimiting import init_loadlimit_router
 from opal_server.policy.bundles.api import router as bundles_router
 from opal_server.policy.watcher.factory import setup_watcher_task
@@ -176,6 +178,26 @@ class OpalServer:
                 self.pubsub.endpoint.broadcaster.get_listening_context()
             )
 
+        self.data_update_log: Optional[DataUpdateLog] = None
+        if (
+            opal_server_config.DATA_UPDATE_LOG_MAX_ENTRIES > 0
+            and self.broadcaster_uri is not None
+        ):
+            # the log is local to this server - updates published by other servers (via
+            # the broadcaster) are not in it, so missed updates can't be replayed from it
+            logger.info(
+                "Data updates log is disabled with broadcasting (clients refetch their data on reconnect)"
+            )
+        elif opal_server_config.DATA_UPDATE_LOG_MAX_ENTRIES > 0:
+            self.data_update_log = DataUpdateLog(
+                opal_server_config.DATA_UPDATE_LOG_PATH,
+                opal_server_config.DATA_UPDATE_LOG_MAX_ENTRIES,
+                # updates published with another data sources config can't be replayed
+                epoch=hashlib.sha256(
+                    self.data_sources_config.json(sort_keys=True).encode()
+                ).hexdigest()[:16],
+            )
+
         self.watcher: PolicyWatcherTask = None
         self.leadership_lock: Optional[NamedLock] = None
 
@@ -223,11 +245,16 @@ class OpalServer:
 
         data_update_publisher: Optional[DataUpdatePublisher] = None
         if self.publisher is not None:
-            data_update_publisher = DataUpdatePublisher(self.publisher)
+            data_update_publisher = DataUpdatePublisher(
+                self.publisher, self.data_update_log
+            )
 
         # Init api routers with required dependencies
         data_updates_router = init_data_updates_router(
-            data_update_publisher, self.data_sources_config, authenticator
+            data_update_publisher,
+            self.data_sources_config,
+            authenticator,
+            self.data_update_log,
         )
         webhook_router = init_git_webhook_router(self.pubsub.endpoint, authenticator)
         security_router = init_security_router(
@@ -264,7 +291,12 @@ class OpalServer:
 
         if opal_server_config.SCOPES:
             app.include_router(
-                init_scope_router(self._scopes, authenticator, self.pubsub.endpoint),
+                init_scope_router(
+                    self._scopes,
+                    authenticator,
+                    self.pubsub.endpoint,
+                    self.data_update_log,
+                ),
                 tags=["Scopes"],
                 prefix="/scopes",
             )